@@ -8,18 +8,37 @@ YENİ YAPI:
 """
 
 from pyairtable import Api
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple, Callable
 import os
+import hashlib
+import json
 import logging
 import time
-from functools import wraps
+import threading
+from datetime import datetime, timezone
 from dotenv import load_dotenv
+from catalog_index import CatalogIndex, normalize_barcode
+from catalog_snapshot import (
+    SnapshotError, snapshot_path, read_snapshot, write_snapshot, read_watermark, write_watermark
+)
+from file_lock import ensure_dir
+from background import PeriodicTask
+from write_buffer import SayimWriteBuffer, is_local_id
+from sayim_store import SayimStore
+from rate_limiter import install_rate_limiter
+from storage import Formula, StorageTable, create_backend
+from stok_tracker import StokTracker, today_str
+from stok_aggregator import StokUpdateAggregator
+from stats_aggregator import DailyStats, STATUS_FIELD, empty_stats
 
 load_dotenv()
 
 # Logger setup
 logger = logging.getLogger(__name__)
 
+# Yerel durum dosyaları (sayım günlüğü vb.) için klasör
+DATA_DIR = os.getenv('DATA_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data'))
+
 
 # ============= SECURITY HELPERS =============
 
@@ -40,35 +59,171 @@ def escape_formula_string(s: str) -> str:
     return s.replace('\\', '\\\\').replace("'", "\\'").replace('"', '\\"')
 
 
-# ============= RATE LIMITING =============
+# ============= QUERY HELPERS =============
+
+# Delta senkronizasyonunda watermark'tan geriye bırakılan pay (saniye)
+SYNC_OVERLAP_SECONDS = 60
+
+# Tek bir OR(...) formülünde aranacak en fazla barkod (URL/formül uzunluğu için)
+BATCH_FORMULA_SIZE = 50
+
+# Yerel ID'li kayıt güncellenirken tamponun yazmasını bekleme süresi (saniye)
+RESOLVE_WAIT_SECONDS = 10
+
+# Manuel aramada dönen en fazla sonuç
+MANUAL_SEARCH_LIMIT = 20
+
+# Marka listesi önbelleğinin süresi (saniye)
+BRANDS_CACHE_TTL = 300
+
+# Sayım fotoğraflarının eklendiği alan
+PHOTO_FIELD = 'Fotograf'
+
+# Bundan eski katalog anlık görüntüsü kullanılmaz, katalog tam çekilir (saniye)
+CATALOG_SNAPSHOT_MAX_AGE = 7 * 24 * 3600
+
+# Urun_Katalogu okumalarında istenen alanlar (matcher, arama indeksleri ve
+# /api/search-manual bunların dışına bakmaz; Fotograf gibi ekler gelmez)
+PRODUCT_FIELDS = [
+    'SKU',
+    'Kategori',
+    'Marka',
+    'Marka Adı',
+    'Marka Kodu',
+    'Model Kodu',
+    'Model Adı',
+    'Renk Kodu',
+    'Renk Adı',
+    'Ekartman',
+    'Birim Fiyat',
+    'Durum',
+    'Tedarikçi Barkodu',
+    'Arama Kelimeleri'
+]
 
-def rate_limit(max_per_second=4):
+# Markalar okumalarında istenen alanlar
+BRAND_FIELDS = ['Marka Kodu', 'Marka Adı', 'Kategori']
+
+
+# Manuel aramada terimin arandığı alanlar
+SEARCH_FIELDS = ['Model Kodu', 'Model Adı', 'Renk Kodu', 'SKU', 'Arama Kelimeleri', 'Tedarikçi Barkodu']
+
+
+def projection(fields: List[str]) -> Dict[str, Any]:
     """
-    Decorator for rate limiting Airtable API calls
+    Okuma için alan listesi seçeneği
 
-    Airtable limits:
-    - 5 requests/second/base
-    - We use 4/second to be safe
+    AIRTABLE_FIELD_PROJECTION=false ise boş döner ve tüm alanlar çekilir
+    (ör. tabloda bir alan yeniden adlandırıldığında geçici çözüm).
 
     Args:
-        max_per_second: Maximum requests per second (default: 4)
+        fields: İstenen alan adları
+
+    Returns:
+        Dict: table.all(...) için {'fields': [...]} veya {}
+    """
+    if os.getenv('AIRTABLE_FIELD_PROJECTION', 'true').lower() != 'true':
+        return {}
+    return {'fields': list(fields)}
+
+
+def modified_since_formula(timestamp: float) -> Formula:
     """
-    min_interval = 1.0 / max_per_second
-    last_called = [0.0]
-
-    def decorator(func):
-        @wraps(func)
-        def wrapper(*args, **kwargs):
-            elapsed = time.time() - last_called[0]
-            left_to_wait = min_interval - elapsed
-            if left_to_wait > 0:
-                logger.debug(f"Rate limiting: waiting {left_to_wait:.3f}s")
-                time.sleep(left_to_wait)
-            ret = func(*args, **kwargs)
-            last_called[0] = time.time()
-            return ret
-        return wrapper
-    return decorator
+    Verilen andan sonra oluşturulan/değişen kayıtlar için formül üret
+
+    Args:
+        timestamp: Unix zamanı (saniye)
+
+    Returns:
+        Airtable formülü
+    """
+    iso = datetime.fromtimestamp(timestamp, tz=timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.000Z')
+    return Formula(
+        f"OR(IS_AFTER(LAST_MODIFIED_TIME(), '{iso}'), IS_AFTER(CREATED_TIME(), '{iso}'))",
+        ('modified_since', timestamp)
+    )
+
+
+def barcode_formula(barkod: str) -> Formula:
+    """Tek barkod için formül (barkod hem metin hem sayı olarak aranır)"""
+    safe_barkod = escape_formula_string(barkod)
+    formula = f"{{Tedarikçi Barkodu}} = '{safe_barkod}'"
+    if barkod.isnumeric():
+        formula = f"OR({{Tedarikçi Barkodu}} = '{safe_barkod}', {{Tedarikçi Barkodu}} = {barkod})"
+    return Formula(formula, ('any_eq', 'Tedarikçi Barkodu', [barkod]))
+
+
+def barcodes_formula(barkodlar: List[str]) -> Formula:
+    """Birden fazla barkod için tek OR(...) formülü"""
+    conditions = []
+    for barkod in barkodlar:
+        conditions.append(f"{{Tedarikçi Barkodu}} = '{escape_formula_string(barkod)}'")
+        if barkod.isnumeric():
+            conditions.append(f"{{Tedarikçi Barkodu}} = {barkod}")
+    return Formula("OR(" + ", ".join(conditions) + ")", ('any_eq', 'Tedarikçi Barkodu', list(barkodlar)))
+
+
+def barcode_prefix_formula(partial: str) -> Formula:
+    """Barkodu verilen önekle başlayan kayıtlar için formül"""
+    # FIND() fonksiyonu ile kısmi eşleşme
+    return Formula(
+        f"FIND('{escape_formula_string(partial)}', {{Tedarikçi Barkodu}}) = 1",
+        ('prefix', 'Tedarikçi Barkodu', partial)
+    )
+
+
+def sku_search_formula(
+    search_term: str,
+    context_brand: Optional[str] = None,
+    context_category: Optional[str] = None
+) -> Formula:
+    """
+    Manuel arama formülü (Model kodu, model adı, renk kodu, SKU, arama kelimeleri, barkod)
+
+    Args:
+        search_term: Arama terimi
+        context_brand: Marka filtresi (record ID)
+        context_category: Kategori filtresi (OF/GN/LN)
+
+    Returns:
+        Airtable formülü
+    """
+    search_conditions = []
+    queries: List[Tuple] = [('search', SEARCH_FIELDS, search_term.lower())]
+
+    # Arama terimi - birden fazla alanda ara (case-insensitive)
+    term_lower = escape_formula_string(search_term.lower())
+
+    # SEARCH fonksiyonu için boş olmayan alanlarda ara
+    # NOT: SEARCH() returns position (1-based) if found, 0 if not found
+    search_conditions.append(
+        f"OR("
+        f"SEARCH('{term_lower}', LOWER({{Model Kodu}} & '')), "
+        f"SEARCH('{term_lower}', LOWER({{Model Adı}} & '')), "
+        f"SEARCH('{term_lower}', LOWER({{Renk Kodu}} & '')), "
+        f"SEARCH('{term_lower}', LOWER({{SKU}} & '')), "
+        f"SEARCH('{term_lower}', LOWER({{Arama Kelimeleri}} & '')), "
+        f"SEARCH('{term_lower}', LOWER({{Tedarikçi Barkodu}} & ''))"
+        f")"
+    )
+
+    # Context filtreleri
+    if context_brand:
+        search_conditions.append(f"{{Marka}} = '{context_brand}'")
+        queries.append(('any_eq', 'Marka', [context_brand]))
+
+    if context_category:
+        search_conditions.append(f"{{Kategori}} = '{context_category}'")
+        queries.append(('any_eq', 'Kategori', [context_category]))
+
+    # AND ile birleştir
+    return Formula("AND(" + ", ".join(search_conditions) + ")", ('and', queries))
+
+
+def day_formula(day: str) -> Formula:
+    """Timestamp alanı verilen güne (YYYY-MM-DD) denk gelen kayıtlar"""
+    # NOT: Timestamp field'i Date tipinde ve "Timestamp" adında olmalı
+    return Formula(f"IS_SAME({{Timestamp}}, '{day}', 'day')", ('day', day))
 
 
 class AirtableClient:
@@ -92,25 +247,366 @@ class AirtableClient:
 
         base_id = base_mapping.get(category)
 
-        if not token:
+        # Tablolar Airtable'dan veya yerel SQLite deposundan (STORAGE_BACKEND)
+        backend = os.getenv('STORAGE_BACKEND', 'airtable').lower()
+
+        if not token and backend == 'airtable':
             raise ValueError("AIRTABLE_TOKEN .env dosyasında tanımlanmalı!")
 
         if not base_id:
             raise ValueError(f"Kategori '{category}' için AIRTABLE_BASE_{category} .env dosyasında tanımlanmalı!")
 
-        self.api = Api(token)
-        self.base = self.api.base(base_id)
+        self.api = None
+        self.rate_limiter = None
+        if backend == 'airtable':
+            # 429 tekrarları pyairtable yerine base'in ortak token bucket'ında yapılır
+            self.api = Api(
+                token,
+                retry_strategy=None,
+                endpoint_url=os.getenv('AIRTABLE_ENDPOINT_URL', 'https://api.airtable.com')
+            )
+            shared = os.getenv('RATE_LIMIT_SHARED', 'true').lower() == 'true'
+            self.rate_limiter = install_rate_limiter(
+                self.api, base_id,
+                state_dir=os.path.join(DATA_DIR, 'ratelimit') if shared else None
+            )
+        self.storage = create_backend(backend, base_id, DATA_DIR, api=self.api)
         self.category = category
+        self.base_id = base_id
 
         # Tablo referansları - Standardize edilmiş isimler
-        self.urun_katalogu = self.base.table('Urun_Katalogu')
-        self.sayim_kayitlari = self.base.table('Sayim_Kayitlari')
-        self.markalar = self.base.table('Markalar')
-        self.stok_kalemleri = self.base.table('Stok_Kalemleri')
+        self.urun_katalogu: StorageTable = self.storage.table('Urun_Katalogu')
+        self.sayim_kayitlari: StorageTable = self.storage.table('Sayim_Kayitlari')
+        self.markalar: StorageTable = self.storage.table('Markalar')
+        self.stok_kalemleri: StorageTable = self.storage.table('Stok_Kalemleri')
+
+        # Bellek içi katalog indeksi (ilk kullanımda bir kez yüklenir)
+        self.catalog_index = CatalogIndex()
+        self._catalog_lock = threading.Lock()
+        self._catalog_enabled = os.getenv('CATALOG_INDEX_ENABLED', 'true').lower() == 'true'
+
+        # Delta senkronizasyonu: watermark'tan sonra değişen kayıtlar çekilir,
+        # silinen kayıtlar için ID uzlaştırması daha seyrek yapılır
+        self._catalog_watermark: Optional[float] = None
+        self._last_reconcile: Optional[float] = None
+        self._sync_interval = float(os.getenv('CATALOG_SYNC_INTERVAL', '60'))
+        self._reconcile_interval = float(os.getenv('CATALOG_RECONCILE_INTERVAL', '3600'))
+        self._sync_task: Optional[PeriodicTask] = None
+
+        # Diskteki katalog anlık görüntüsü: açılışta tam çekim yerine okunur,
+        # ardından sadece watermark'tan sonraki değişiklikler çekilir
+        self._snapshot_path: Optional[str] = None
+        # Diskteki anlık görüntünün bu süreçteki indeksle aynı olduğu sürüm (saved_at);
+        # None ise indeks diskten ileride, sadece watermark yazmak güvenli değil
+        self._snapshot_saved_at: Optional[float] = None
+        if os.getenv('CATALOG_SNAPSHOT', 'true').lower() == 'true':
+            self._snapshot_path = snapshot_path(os.path.join(DATA_DIR, 'catalog'), category, base_id)
+        self._snapshot_max_age = float(os.getenv('CATALOG_SNAPSHOT_MAX_AGE', CATALOG_SNAPSHOT_MAX_AGE))
+
+        # Hazır marka listesi ve ETag'i; TTL dolunca veya marka deposu değişince yenilenir
+        self._brands_cache: Optional[Dict[str, Any]] = None
+        self._brands_lock = threading.Lock()
+        self._brands_ttl = float(os.getenv('BRANDS_CACHE_TTL', BRANDS_CACHE_TTL))
+
+        # Opsiyonel write-behind tamponu: sayım kayıtları 10'arlı batch_create ile yazılır.
+        # Yerel modda (SAYIM_LOCAL_STORE=true) tampon yerine SQLite deposu kullanılır;
+        # aynı arayüzü uygular, ayrıca istatistik ve son okutma okumalarına da hizmet eder
+        self.write_buffer: Optional[SayimWriteBuffer] = None
+        self.sayim_store: Optional[SayimStore] = None
+        if os.getenv('SAYIM_LOCAL_STORE', 'false').lower() == 'true':
+            self.sayim_store = SayimStore(
+                self.sayim_kayitlari,
+                os.path.join(DATA_DIR, 'sayim', f"sayim-{category}-{base_id}.sqlite3"),
+                flush_interval=float(os.getenv('SAYIM_FLUSH_INTERVAL', '1.0')),
+                min_batch_interval=0,
+                retention_days=int(os.getenv('SAYIM_STORE_RETENTION_DAYS', '7'))
+            )
+            self.sayim_store.start()
+            self.write_buffer = self.sayim_store
+        elif os.getenv('SAYIM_WRITE_BUFFER', 'false').lower() == 'true':
+            self.write_buffer = SayimWriteBuffer(
+                self.sayim_kayitlari,
+                journal_dir=os.path.join(DATA_DIR, 'journal'),
+                name=f"sayim-{category}",
+                flush_interval=float(os.getenv('SAYIM_FLUSH_INTERVAL', '1.0')),
+                # İstek aralığını base'in token bucket'ı belirler
+                min_batch_interval=0
+            )
+            self.write_buffer.start()
+
+        # Günlük SKU sayaçları ve SKU → Stok_Kalemleri eşlemesi (ilk stok güncellemesinde tohumlanır);
+        # dosya worker'lar arasında paylaşılır, her worker aynı sayacı artırır
+        self.stok_tracker = StokTracker(
+            reseed_interval=float(os.getenv('STOK_RESEED_INTERVAL', '300')),
+            db_path=os.path.join(DATA_DIR, 'stok', f"stok-{category}-{base_id}.sqlite3")
+        )
+
+        # Aynı SKU'nun art arda okutmaları kısa bir pencerede toplanıp tek
+        # batch_update ile yazılır; 0 = her kayıtta doğrudan yaz
+        self.stok_aggregator: Optional[StokUpdateAggregator] = None
+        stok_window = float(os.getenv('STOK_UPDATE_WINDOW', '0.5'))
+        if stok_window > 0:
+            self.stok_aggregator = StokUpdateAggregator(self.stok_kalemleri, self.stok_tracker, window=stok_window)
+
+        # /api/stats sayaçları: kayıt yazıldıkça artar, Airtable ile periyodik uzlaştırılır
+        self.daily_stats = DailyStats(os.path.join(DATA_DIR, 'stats', f"stats-{category}-{base_id}.sqlite3"))
+        self._stats_interval = float(os.getenv('STATS_RECONCILE_INTERVAL', '60'))
+        self._stats_task: Optional[PeriodicTask] = None
+
+    # ========== KATALOG İNDEKSİ ==========
+
+    def load_catalog(self) -> bool:
+        """
+        Bellek içi indeksi kur
+
+        Geçerli bir anlık görüntü varsa diskten yüklenip delta senkronizasyonu
+        yapılır; yoksa Urun_Katalogu ve Markalar tamamen çekilir ve anlık
+        görüntü yazılır.
+
+        Returns:
+            bool: Yükleme başarılı mı?
+        """
+        if self._load_catalog_snapshot():
+            return True
+
+        try:
+            started = time.time()
+            records = self.urun_katalogu.all(**projection(PRODUCT_FIELDS))
+            brands = self.markalar.all(**projection(BRAND_FIELDS))
+            self.catalog_index.load_brands(brands)
+            self.catalog_index.load(records)
+            self._catalog_watermark = started
+            self._last_reconcile = started
+            logger.info(f"Katalog indeksi yüklendi: {self.category} → {len(records)} kayıt, "
+                        f"{len(brands)} marka ({time.time() - started:.2f}s)")
+        except Exception as e:
+            logger.error("Katalog yükleme hatası", extra={'category': self.category, 'error': str(e)})
+            return False
+
+        self.save_catalog_snapshot()
+        return True
+
+    def _load_catalog_snapshot(self) -> bool:
+        """
+        İndeksi diskteki anlık görüntüden kur ve eksik değişiklikleri çek
+
+        Returns:
+            bool: Anlık görüntü kullanıldı mı? (False ise tam yükleme gerekir)
+        """
+        if self._snapshot_path is None:
+            return False
+
+        started = time.time()
+        try:
+            snapshot = read_snapshot(self._snapshot_path)
+        except (SnapshotError, OSError, KeyError) as e:
+            logger.warning("Katalog anlık görüntüsü okunamadı", extra={
+                'category': self.category, 'path': self._snapshot_path, 'error': str(e)
+            })
+            return False
+
+        if snapshot is None:
+            return False
+
+        # Değişikliksiz senkronizasyonlar watermark'ı yan dosyada ilerletir
+        marker = read_watermark(self._snapshot_path, snapshot.get('saved_at'))
+        if marker is not None:
+            snapshot['watermark'] = max(snapshot['watermark'], marker['watermark'])
+            snapshot['last_reconcile'] = max(snapshot['last_reconcile'] or 0, marker['last_reconcile'] or 0)
+
+        if not self._snapshot_usable(snapshot, started):
+            return False
+
+        self.catalog_index.load_brands(snapshot['brands'])
+        self.catalog_index.load(snapshot['products'])
+        self._catalog_watermark = snapshot['watermark']
+        self._last_reconcile = snapshot['last_reconcile']
+        self._snapshot_saved_at = snapshot['saved_at']
+        logger.info(f"Katalog indeksi anlık görüntüden yüklendi: {self.category} → "
+                    f"{len(snapshot['products'])} kayıt, {len(snapshot['brands'])} marka "
+                    f"({(time.time() - started) * 1000:.0f}ms)")
+
+        try:
+            self.sync_catalog()
+        except Exception as e:
+            # Anlık görüntüyle hizmet verilir; periyodik senkronizasyon tekrar dener
+            logger.warning("Anlık görüntü sonrası delta senkronizasyonu başarısız", extra={
+                'category': self.category, 'error': str(e)
+            })
+        return True
+
+    def _snapshot_usable(self, snapshot: Dict[str, Any], now: float) -> bool:
+        """Anlık görüntü bu base'e, bu alan listesine ait ve yeterince yeni mi?"""
+        if snapshot.get('base_id') != self.base_id or snapshot.get('category') != self.category:
+            return False
+        # Alan listesi değiştiyse eski kayıtlarda yeni alanlar eksiktir
+        if snapshot.get('fields') != projection(PRODUCT_FIELDS).get('fields'):
+            return False
+        if snapshot.get('brand_fields') != projection(BRAND_FIELDS).get('fields'):
+            return False
+        return now - snapshot['watermark'] <= self._snapshot_max_age
+
+    def save_catalog_snapshot(self) -> bool:
+        """
+        Yüklü indeksi ve watermark'ı diske yaz
+
+        Returns:
+            bool: Yazıldı mı?
+        """
+        if self._snapshot_path is None or not self.catalog_index.loaded:
+            return False
+
+        saved_at = time.time()
+        try:
+            ensure_dir(os.path.dirname(self._snapshot_path))
+            size = write_snapshot(self._snapshot_path, {
+                'category': self.category,
+                'base_id': self.base_id,
+                'fields': projection(PRODUCT_FIELDS).get('fields'),
+                'brand_fields': projection(BRAND_FIELDS).get('fields'),
+                'watermark': self._catalog_watermark,
+                'last_reconcile': self._last_reconcile,
+                'saved_at': saved_at,
+                'products': self.catalog_index.records(),
+                'brands': self.catalog_index.brands()
+            })
+            self._snapshot_saved_at = saved_at
+            logger.debug(f"Katalog anlık görüntüsü yazıldı: {self.category} → {size} bayt")
+            return True
+        except Exception as e:
+            self._snapshot_saved_at = None
+            logger.error("Katalog anlık görüntüsü yazılamadı", extra={
+                'category': self.category, 'path': self._snapshot_path, 'error': str(e)
+            })
+            return False
+
+    def save_catalog_watermark(self) -> bool:
+        """
+        Değişikliksiz senkronizasyondan sonra sadece watermark'ı diske yaz
+
+        Diskteki anlık görüntü bu süreçte okunan/yazılan sürüm değilse
+        (yazma hatası) tam anlık görüntü yazılır.
+
+        Returns:
+            bool: Yazıldı mı?
+        """
+        if self._snapshot_path is None or not self.catalog_index.loaded:
+            return False
+        if self._snapshot_saved_at is None:
+            return self.save_catalog_snapshot()
+
+        try:
+            write_watermark(self._snapshot_path, self._snapshot_saved_at,
+                            self._catalog_watermark, self._last_reconcile)
+            return True
+        except Exception as e:
+            logger.error("Katalog watermark'ı yazılamadı", extra={
+                'category': self.category, 'path': self._snapshot_path, 'error': str(e)
+            })
+            return False
+
+    def get_catalog_index(self) -> Optional[CatalogIndex]:
+        """
+        Yüklü katalog indeksini döndür (gerekirse ilk çağrıda yükler)
+
+        Returns:
+            CatalogIndex veya None (devre dışı ya da yüklenemediyse)
+        """
+        if not self._catalog_enabled:
+            return None
+
+        if not self.catalog_index.loaded:
+            with self._catalog_lock:
+                # Başka bir thread biz beklerken yüklemiş olabilir
+                if not self.catalog_index.loaded:
+                    if not self.load_catalog():
+                        return None
+                    if self._sync_interval > 0:
+                        self.start_catalog_sync()
+
+        return self.catalog_index
+
+    def sync_catalog(self) -> Dict[str, int]:
+        """
+        Son watermark'tan beri değişen Urun_Katalogu ve Markalar kayıtlarını
+        çekip indekse uygula
+
+        Maliyet değişen kayıt sayısıyla orantılıdır. Silinen kayıtlar
+        LAST_MODIFIED_TIME ile görünmediği için CATALOG_RECONCILE_INTERVAL
+        aralıklarıyla ID uzlaştırması yapılır.
+
+        Returns:
+            Dict: {urun: int, marka: int, silinen: int}
+        """
+        if not self.catalog_index.loaded or self._catalog_watermark is None:
+            return {'urun': 0, 'marka': 0, 'silinen': 0}
+
+        # Saat farkı ve sunucu gecikmesine karşı pay bırak; tekrar uygulamak zararsız
+        started = time.time()
+        formula = modified_since_formula(self._catalog_watermark - SYNC_OVERLAP_SECONDS)
+
+        changed = self.urun_katalogu.all(formula=formula, **projection(PRODUCT_FIELDS))
+        for record in changed:
+            self.catalog_index.upsert(record)
+
+        changed_brands = self.markalar.all(formula=formula, **projection(BRAND_FIELDS))
+        for record in changed_brands:
+            self.catalog_index.upsert_brand(record)
+
+        self._catalog_watermark = started
+
+        removed = 0
+        if started - (self._last_reconcile or 0) >= self._reconcile_interval:
+            removed = self.reconcile_catalog()
+
+        if changed or changed_brands or removed:
+            logger.info(f"Katalog senkronize edildi: {self.category} → {len(changed)} ürün, "
+                        f"{len(changed_brands)} marka, {removed} silinen")
+            self.save_catalog_snapshot()
+        else:
+            self.save_catalog_watermark()
+
+        return {'urun': len(changed), 'marka': len(changed_brands), 'silinen': removed}
+
+    def reconcile_catalog(self) -> int:
+        """
+        Airtable'da artık olmayan kayıtları indeksten çıkar
+
+        Sadece tek bir alan istenir; yanıt büyük ölçüde record ID'lerinden oluşur.
+
+        Returns:
+            int: Silinen kayıt sayısı
+        """
+        started = time.time()
+        live_ids = {r['id'] for r in self.urun_katalogu.all(**projection(['Tedarikçi Barkodu']))}
+        live_brand_ids = {r['id'] for r in self.markalar.all(**projection(['Marka Adı']))}
+
+        removed = 0
+        for record_id in self.catalog_index.record_ids() - live_ids:
+            self.catalog_index.remove(record_id)
+            removed += 1
+        for record_id in self.catalog_index.brand_ids() - live_brand_ids:
+            self.catalog_index.remove_brand(record_id)
+            removed += 1
+
+        self._last_reconcile = started
+        return removed
+
+    def start_catalog_sync(self) -> None:
+        """Arka plan delta senkronizasyon döngüsünü başlat"""
+        if self._sync_task is None:
+            self._sync_task = PeriodicTask(
+                f"catalog-sync-{self.category}", self._sync_interval, self.sync_catalog
+            )
+        self._sync_task.start()
+
+    def stop_catalog_sync(self) -> None:
+        """Arka plan senkronizasyonunu durdur"""
+        if self._sync_task is not None:
+            self._sync_task.stop()
 
     # ========== BARKOD ARAMA ==========
 
-    @rate_limit(max_per_second=4)
     def search_by_barcode(self, barkod: str) -> List[Dict[str, Any]]:
         """
         Urun_Katalogu tablosunda barkod ara
@@ -123,18 +619,41 @@ class AirtableClient:
         """
         try:
             # Barkodu hem metin hem de sayı olarak aramayı dene
-            safe_barkod = escape_formula_string(barkod)
-            formula = f"{{Tedarikçi Barkodu}} = '{safe_barkod}'"
-            if barkod.isnumeric():
-                formula = f"OR({{Tedarikçi Barkodu}} = '{safe_barkod}', {{Tedarikçi Barkodu}} = {barkod})"
-
-            results = self.urun_katalogu.all(formula=formula)
+            results = self.urun_katalogu.all(formula=barcode_formula(barkod), **projection(PRODUCT_FIELDS))
             return results
         except Exception as e:
             logger.error("Barkod arama hatası", extra={'barkod': barkod, 'error': str(e)})
             return []
 
-    @rate_limit(max_per_second=4)
+    def search_by_barcodes(self, barkodlar: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Birden fazla barkodu az sayıda OR(...) sorgusuyla ara
+
+        Args:
+            barkodlar: Aranan barkodlar
+
+        Returns:
+            Dict[str, List[Dict]]: barkod → bulunan ürün kayıtları
+                (bulunamayan barkodlar için boş liste)
+        """
+        unique = list(dict.fromkeys(normalize_barcode(b) for b in barkodlar if normalize_barcode(b)))
+        results: Dict[str, List[Dict[str, Any]]] = {b: [] for b in unique}
+
+        for start in range(0, len(unique), BATCH_FORMULA_SIZE):
+            chunk = unique[start:start + BATCH_FORMULA_SIZE]
+            try:
+                records = self.urun_katalogu.all(formula=barcodes_formula(chunk), **projection(PRODUCT_FIELDS))
+            except Exception as e:
+                logger.error("Toplu barkod arama hatası", extra={'count': len(chunk), 'error': str(e)})
+                continue
+
+            for record in records:
+                key = normalize_barcode(record['fields'].get('Tedarikçi Barkodu'))
+                if key in results:
+                    results[key].append(record)
+
+        return results
+
     def fuzzy_search_barcode(self, barkod: str, min_length: int = 10) -> List[Dict[str, Any]]:
         """
         Fuzzy arama - barkodun ilk N hanesine göre ara
@@ -150,11 +669,10 @@ class AirtableClient:
             return []
 
         try:
-            partial = barkod[:min_length]
-            safe_partial = escape_formula_string(partial)
-            # FIND() fonksiyonu ile kısmi eşleşme
-            formula = f"FIND('{safe_partial}', {{Tedarikçi Barkodu}}) = 1"
-            results = self.urun_katalogu.all(formula=formula)
+            results = self.urun_katalogu.all(
+                formula=barcode_prefix_formula(barkod[:min_length]),
+                **projection(PRODUCT_FIELDS)
+            )
             return results
         except Exception as e:
             logger.error("Fuzzy arama hatası", extra={'barkod': barkod, 'error': str(e)})
@@ -179,7 +697,6 @@ class AirtableClient:
             logger.error("SKU detay hatası", extra={'sku_record_id': sku_record_id, 'error': str(e)})
             return None
 
-    @rate_limit(max_per_second=4)
     def create_new_sku(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Urun_Katalogu tablosuna yeni ürün ekle (liste dışı ürünler için)
@@ -202,8 +719,7 @@ class AirtableClient:
             # SKU'yu oluştur: Kategori-Marka_Kodu-Model_Kodu-Renk_Kodu-Ekartman
             # Marka kodu için marka ID'den bilgi almamız gerekiyor
             marka_id = data.get('Marka')[0] if isinstance(data.get('Marka'), list) else data.get('Marka')
-            marka_record = self.markalar.get(marka_id)
-            marka_kodu = marka_record['fields'].get('Marka_Kodu', 'XX')
+            marka_kodu = self.get_brand_code(marka_id)
 
             kategori = data.get('Kategori')
             model_kodu = data.get('Model_Kodu')
@@ -222,6 +738,10 @@ class AirtableClient:
             # Kaydı oluştur
             record = self.urun_katalogu.create(data)
 
+            # Yeni barkod bir sonraki okutmada bulunabilsin
+            if self.catalog_index.loaded:
+                self.catalog_index.upsert(record)
+
             return {
                 'success': True,
                 'record_id': record['id'],
@@ -235,57 +755,60 @@ class AirtableClient:
                 'error': str(e)
             }
 
-    @rate_limit(max_per_second=4)
     def search_sku_by_term(
         self,
         search_term: str,
         context_brand: Optional[str] = None,
-        context_category: Optional[str] = None
+        context_category: Optional[str] = None,
+        fuzzy: bool = False
     ) -> List[Dict[str, Any]]:
         """
         Urun_Katalogu tablosunda manuel arama
         Model kodu, model adı, renk kodu, SKU ile arama yapar
 
+        Katalog indeksi açıksa arama bellekteki n-gram indeksinde yapılır;
+        değilse Airtable formülüyle sorgulanır.
+
+        `fuzzy=True` ile alt dize sonuçlarının ardına model kodu / SKU'su
+        yazım hatası mesafesinde olan kayıtlar eklenir ("RB214O" → "RB2140").
+        Bu modda her kayıtta `distance` anahtarı bulunur (alt dize eşleşmesi
+        için 0). Katalog indeksi kapalıyken fuzzy yok sayılır.
+
         Args:
             search_term: Arama terimi
             context_brand: Marka filtresi (record ID)
             context_category: Kategori filtresi (OF/GN/LN)
+            fuzzy: Yazım hatası toleranslı mod
 
         Returns:
             List[Dict]: Bulunan SKU kayıtları
         """
         try:
-            # Arama formülü oluştur
-            search_conditions = []
-
-            # Arama terimi - birden fazla alanda ara (case-insensitive)
-            term_lower = escape_formula_string(search_term.lower())
-
-            # SEARCH fonksiyonu için boş olmayan alanlarda ara
-            # NOT: SEARCH() returns position (1-based) if found, 0 if not found
-            search_conditions.append(
-                f"OR("
-                f"SEARCH('{term_lower}', LOWER({{Model Kodu}} & '')), "
-                f"SEARCH('{term_lower}', LOWER({{Model Adı}} & '')), "
-                f"SEARCH('{term_lower}', LOWER({{Renk Kodu}} & '')), "
-                f"SEARCH('{term_lower}', LOWER({{SKU}} & '')), "
-                f"SEARCH('{term_lower}', LOWER({{Arama Kelimeleri}} & '')), "
-                f"SEARCH('{term_lower}', LOWER({{Tedarikçi Barkodu}} & ''))"
-                f")"
-            )
-
-            # Context filtreleri
-            if context_brand:
-                search_conditions.append(f"{{Marka}} = '{context_brand}'")
-
-            if context_category:
-                search_conditions.append(f"{{Kategori}} = '{context_category}'")
-
-            # AND ile birleştir
-            formula = "AND(" + ", ".join(search_conditions) + ")"
+            index = self.get_catalog_index()
+            if index is not None:
+                results = index.search_text(search_term, brand=context_brand, category=context_category)
+                if not fuzzy:
+                    return results
+
+                ranked = [dict(record, distance=0) for record in results]
+                seen = {record['id'] for record in results}
+                if len(ranked) < MANUAL_SEARCH_LIMIT:
+                    near = index.search_fuzzy(search_term, brand=context_brand, category=context_category,
+                                              limit=MANUAL_SEARCH_LIMIT)
+                    for record, distance in near:
+                        if record['id'] not in seen and len(ranked) < MANUAL_SEARCH_LIMIT:
+                            seen.add(record['id'])
+                            ranked.append(dict(record, distance=distance))
+                return ranked
+
+            formula = sku_search_formula(search_term, context_brand, context_category)
 
             # Arama yap ve ilk 20 sonucu al
-            results = self.urun_katalogu.all(formula=formula, max_records=20)
+            results = self.urun_katalogu.all(
+                formula=formula,
+                max_records=MANUAL_SEARCH_LIMIT,
+                **projection(PRODUCT_FIELDS)
+            )
             return results
 
         except Exception as e:
@@ -294,11 +817,15 @@ class AirtableClient:
 
     # ========== SAYIM KAYDI ==========
 
-    @rate_limit(max_per_second=4)
     def create_sayim_record(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Sayim_Kayitlari tablosuna yeni kayıt ekle
 
+        Write-behind tamponu (SAYIM_WRITE_BUFFER=true) veya yerel depo
+        (SAYIM_LOCAL_STORE=true) açıksa kayıt diske yazılıp hemen yerel bir
+        ID ile döner (`pending: True`); gerçek record ID'si sonradan
+        `resolve_sayim_record_id` ile alınır.
+
         Args:
             data: Kayıt verileri
                 - Okutulan_Barkod (str)
@@ -310,10 +837,32 @@ class AirtableClient:
                 - Notlar (str, optional)
 
         Returns:
-            Dict: {success: bool, record_id: str, data: dict, error: str}
+            Dict: {success: bool, record_id: str, data: dict, pending: bool, error: str}
         """
+        if self.write_buffer is not None:
+            try:
+                local_id = self.write_buffer.add(data)
+                self.daily_stats.record(data.get(STATUS_FIELD))
+                return {
+                    'success': True,
+                    'record_id': local_id,
+                    'data': data,
+                    'pending': True
+                }
+            except Exception as e:
+                logger.error("Sayım kaydı tampona yazılamadı", extra={'error': str(e)})
+                return {
+                    'success': False,
+                    'error': str(e)
+                }
+
+        return self._create_sayim_record_direct(data)
+
+    def _create_sayim_record_direct(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Sayım kaydını tek istekle doğrudan Airtable'a yaz"""
         try:
             record = self.sayim_kayitlari.create(data)
+            self.daily_stats.record(data.get(STATUS_FIELD))
             return {
                 'success': True,
                 'record_id': record['id'],
@@ -326,6 +875,69 @@ class AirtableClient:
                 'error': str(e)
             }
 
+    def resolve_sayim_record_id(self, record_id: str, wait: float = 0) -> Optional[str]:
+        """
+        Tampondan dönen yerel ID'yi Airtable record ID'sine çevir
+
+        Args:
+            record_id: Yerel (`loc...`) veya gerçek (`rec...`) ID
+            wait: Kayıt henüz yazılmadıysa en fazla bekleme (saniye); 0 = bekleme
+
+        Returns:
+            Airtable record ID'si veya None (henüz yazılmadı / bilinmiyor)
+        """
+        if not is_local_id(record_id):
+            return record_id
+        if self.write_buffer is None:
+            return None
+        if wait > 0:
+            return self.write_buffer.wait_for(record_id, timeout=wait)
+        return self.write_buffer.resolve(record_id)
+
+    def get_sayim_record_status(self, record_id: str) -> str:
+        """
+        Sayım kaydının yazılma durumu
+
+        Returns:
+            'pending' | 'committed' | 'failed' | 'unknown'
+        """
+        if not is_local_id(record_id):
+            return 'committed'
+        if self.write_buffer is None:
+            return 'unknown'
+        return self.write_buffer.status(record_id)
+
+    def get_recent_sayim_records(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        Son okutmalar (en yeni önce)
+
+        Yerel modda Airtable'a gidilmez; henüz gönderilmemiş kayıtlar da
+        `status: 'pending'` ile döner.
+
+        Args:
+            limit: En fazla kayıt
+
+        Returns:
+            List[Dict]: {id, status, created_at, fields}
+        """
+        try:
+            if self.sayim_store is not None:
+                return self.sayim_store.recent(limit)
+
+            records = self.sayim_kayitlari.all(sort=['-Timestamp'], max_records=limit)
+            return [
+                {
+                    'id': record['id'],
+                    'status': 'committed',
+                    'created_at': record.get('createdTime'),
+                    'fields': record['fields']
+                }
+                for record in records
+            ]
+        except Exception as e:
+            logger.error("Son okutmalar hatası", extra={'error': str(e)})
+            return []
+
     def update_sayim_record(self, record_id: str, data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Mevcut sayım kaydını güncelle
@@ -338,7 +950,11 @@ class AirtableClient:
             Dict: {success: bool, record_id: str, data: dict}
         """
         try:
-            record = self.sayim_kayitlari.update(record_id, data)
+            real_id = self.resolve_sayim_record_id(record_id, wait=RESOLVE_WAIT_SECONDS)
+            if real_id is None:
+                raise ValueError(f"Sayım kaydı henüz Airtable'a yazılmadı: {record_id}")
+
+            record = self.sayim_kayitlari.update(real_id, data)
             return {
                 'success': True,
                 'record_id': record['id'],
@@ -351,54 +967,142 @@ class AirtableClient:
                 'error': str(e)
             }
 
+    def upload_sayim_photo(
+        self,
+        record_id: str,
+        filename: str,
+        content: bytes,
+        content_type: str = 'image/jpeg'
+    ) -> Dict[str, Any]:
+        """
+        Sayım kaydının Fotograf alanına dosya ekle (uploadAttachment uç noktası)
+
+        Dosya data: URL'si yerine doğrudan içerik uç noktasına gönderilir;
+        en fazla 5 MB kabul edilir (photo_pipeline önceden küçültür).
+
+        Args:
+            record_id: Sayim_Kayitlari record ID (yerel ID ise çözülmesi beklenir)
+            filename: Dosya adı
+            content: Dosya içeriği
+            content_type: MIME türü
+
+        Returns:
+            Dict: {success: bool, url: str}
+        """
+        try:
+            real_id = self.resolve_sayim_record_id(record_id, wait=RESOLVE_WAIT_SECONDS)
+            if real_id is None:
+                raise ValueError(f"Sayım kaydı henüz Airtable'a yazılmadı: {record_id}")
+
+            result = self.sayim_kayitlari.upload_attachment(real_id, PHOTO_FIELD, filename, content, content_type)
+            # Yanıttaki alanlar alan ID'si ile döner; tek alan istendi
+            attachments = next(iter(result.get('fields', {}).values()), [])
+            return {
+                'success': True,
+                'url': attachments[-1]['url'] if attachments else None
+            }
+        except Exception as e:
+            logger.error("Fotoğraf yükleme hatası", extra={'record_id': record_id, 'error': str(e)})
+            return {
+                'success': False,
+                'error': str(e)
+            }
+
     # ========== STOK YÖNETİMİ ==========
 
-    def update_stok_from_sayim(self, sku_id: str, konum: str = None) -> bool:
+    def seed_stok_tracker(self, force: bool = False) -> bool:
+        """
+        Günlük sayaçları ve stok eşlemesini Airtable'dan tohumla
+
+        Açılışta, gün dönümünde ve `STOK_RESEED_INTERVAL` aralığıyla bir kez
+        çalışır; aradaki stok güncellemeleri tarama yapmaz.
+
+        Args:
+            force: Süre dolmamış olsa da yeniden tohumla
+
+        Returns:
+            bool: Tohumlama yapıldı mı?
+        """
+        day = today_str()
+        if not force and not self.stok_tracker.needs_seed(day):
+            return False
+
+        with self.stok_tracker.write_lock:
+            if not force and not self.stok_tracker.needs_seed(day):
+                return False
+
+            sayim_records = self.sayim_kayitlari.all(
+                formula=day_formula(day),
+                **projection(['SKU'])
+            )
+            stok_records = self.stok_kalemleri.all(**projection(['SKU', 'Mevcut_Miktar']))
+            self.stok_tracker.seed(day, sayim_records, stok_records)
+
+        logger.info(f"Stok sayaçları tohumlandı: {len(sayim_records)} sayım, {len(stok_records)} stok kalemi")
+        return True
+
+    def update_stok_from_sayim(
+        self,
+        sku_id: str,
+        konum: str = None,
+        schedule_flush: Optional[Callable[[], Any]] = None
+    ) -> bool:
         """
         Sayım sonrası stok kalemini otomatik güncelle
 
+        Bugünkü sayım adedi ve stok kalemi ID'si worker'ların paylaştığı
+        StokTracker'dan gelir. Aggregator açıksa artış takipçi dosyasına
+        kaydedilir ve pencere sonunda toplu yazılır; değilse mevcut kalem
+        için tek bir update, yoksa tek bir create yapılır.
+
         Args:
             sku_id: SKU record ID
             konum: Ürün konumu (opsiyonel)
+            schedule_flush: Aggregator açıksa flush'ı planlayan fonksiyon
+                (ör. iş kuyruğuna 'stok_flush'); verilmezse aggregator'ın
+                kendi thread'i yazar
+
+        Başarısız olursa sayaç artışı geri alınır; çağıran (ör. iş kuyruğu)
+        çift sayım yapmadan tekrar deneyebilir.
 
         Returns:
-            bool: Başarılı mı?
+            bool: Başarılı mı? (artış kaydedildiyse True)
         """
+        counted = False
         try:
-            from datetime import datetime
-            today = datetime.now().strftime('%Y-%m-%d')
+            self.seed_stok_tracker()
 
             # Bugün bu SKU için kaç adet sayıldı?
-            # NOT: Timestamp field'i Date tipinde ve "Timestamp" adında olmalı
-            formula = f"AND(IS_SAME({{Timestamp}}, '{today}', 'day'), SEARCH('{sku_id}', ARRAYJOIN({{SKU}})))"
-            records = self.sayim_kayitlari.all(formula=formula)
-            count = len(records)
-            
+            count = self.stok_tracker.increment(sku_id)
+            counted = True
             logger.info(f"Stok güncelleme: {sku_id} için bugün {count} adet sayıldı")
 
-            # Stok_Kalemleri tablosunda bu SKU var mı?
-            stok_formula = f"SEARCH('{sku_id}', ARRAYJOIN({{SKU}}))"
-            stok_records = self.stok_kalemleri.all(formula=stok_formula)
+            if self.stok_aggregator is not None:
+                self.stok_aggregator.add(sku_id, konum, schedule=schedule_flush)
+                return True
 
-            if stok_records:
-                # Güncelle (ilk kaydı)
-                record_id = stok_records[0]['id']
-                current_mevcut = stok_records[0]['fields'].get('Mevcut_Miktar', 0)
-                
-                update_data = {
-                    'Son_Sayim_Tarihi': today,
-                    'Son_Sayim_Miktari': count,
-                    # Mevcut_Miktar'ı artır (her sayımda +1)
-                    'Mevcut_Miktar': current_mevcut + 1
-                }
-                # Konum belirtilmişse güncelle
-                if konum:
-                    update_data['Konum'] = konum
+            return self._write_stok_update(sku_id, konum)
 
-                self.stok_kalemleri.update(record_id, update_data)
-                logger.info(f"Stok güncellendi: {sku_id} → Mevcut: {current_mevcut + 1}, Bugün: {count}")
-            else:
-                # Yeni oluştur
+        except Exception as e:
+            logger.error("Stok güncelleme hatası", extra={'sku_id': sku_id, 'error': str(e)})
+            if counted:
+                self.stok_tracker.increment(sku_id, -1)
+            return False
+
+    def _write_stok_update(self, sku_id: str, konum: Optional[str]) -> bool:
+        """
+        Tek SKU için stok kalemini doğrudan güncelle/oluştur (aggregator kapalıyken)
+
+        Sayaç ve Mevcut_Miktar kilit içinde paylaşılan takipçiden okunur;
+        başka bir worker'ın yazdığı daha yeni değer eskisiyle ezilmez.
+        """
+        today = today_str()
+
+        with self.stok_tracker.write_lock:
+            count = self.stok_tracker.count(sku_id)
+            # Mevcut_Miktar'ı artır (her sayımda +1)
+            target = self.stok_tracker.bump_mevcut(sku_id)
+            if target is None:
                 create_data = {
                     'SKU': [sku_id],
                     'Konum': konum or 'Genel',
@@ -406,21 +1110,47 @@ class AirtableClient:
                     'Son_Sayim_Miktari': count,
                     'Mevcut_Miktar': 1  # İlk sayımda 1 adet
                 }
-                self.stok_kalemleri.create(create_data)
+                created = self.stok_kalemleri.create(create_data)
+                self.stok_tracker.set_stok_record(sku_id, created['id'], 1)
                 logger.info(f"Yeni stok kalemi oluşturuldu: {sku_id} → 1 adet")
+                return True
 
-            return True
+            record_id, mevcut = target
+            update_data = {
+                'Son_Sayim_Tarihi': today,
+                'Son_Sayim_Miktari': count,
+                'Mevcut_Miktar': mevcut
+            }
+            # Konum belirtilmişse güncelle
+            if konum:
+                update_data['Konum'] = konum
 
-        except Exception as e:
-            logger.error("Stok güncelleme hatası", extra={'sku_id': sku_id, 'error': str(e)})
-            return False
+            try:
+                self.stok_kalemleri.update(record_id, update_data)
+            except Exception:
+                # Yazılamayan artışı geri al, önbellek Airtable ile tutarlı kalsın
+                self.stok_tracker.bump_mevcut(sku_id, -1)
+                raise
+
+        logger.info(f"Stok güncellendi: {sku_id} → Mevcut: {mevcut}, Bugün: {count}")
+        return True
 
     # ========== İSTATİSTİKLER ==========
 
-    def get_today_stats(self) -> Dict[str, Any]:
+    def get_today_stats(self, refresh: Optional[Callable[[], Any]] = None) -> Dict[str, Any]:
         """
         Bugünün sayım istatistiklerini getir
 
+        Sayaçlar worker'ların paylaştığı DailyStats'ta tutulur; Airtable'a
+        sadece günün ilk isteğinde ve arka planda STATS_RECONCILE_INTERVAL
+        aralığıyla gidilir. Yerel modda uzlaştırma Airtable yerine yerel
+        depodan yapılır.
+
+        Args:
+            refresh: Verilirse gereken uzlaştırma istek içinde yapılmaz, bu
+                fonksiyonla (ör. iş kuyruğuna) bırakılır; o zamana kadar
+                mevcut sayaçlar döner
+
         Returns:
             Dict: {
                 total: int,
@@ -431,50 +1161,160 @@ class AirtableClient:
             }
         """
         try:
-            # Bugünün kayıtlarını çek
-            from datetime import datetime
-            today = datetime.now().strftime('%Y-%m-%d')
+            if self.daily_stats.needs_reconcile():
+                if refresh is not None:
+                    refresh()
+                else:
+                    self.reconcile_stats()
+            self._start_stats_task()
+            return self.daily_stats.snapshot()
 
-            formula = f"IS_SAME({{Timestamp}}, '{today}', 'day')"
-            records = self.sayim_kayitlari.all(formula=formula)
+        except Exception as e:
+            logger.error("İstatistik hatası", extra={'error': str(e)})
+            return empty_stats()
 
-            total = len(records)
-            direkt = sum(1 for r in records if r['fields'].get('Eslesme_Durumu') == 'Direkt')
-            belirsiz = sum(1 for r in records if r['fields'].get('Eslesme_Durumu') == 'Belirsiz')
-            bulunamadi = sum(1 for r in records if r['fields'].get('Eslesme_Durumu') == 'Bulunamadı')
+    def reconcile_stats(self) -> int:
+        """
+        Günlük sayaçları Airtable'daki bugünün kayıtlarıyla uzlaştır
 
-            direkt_oran = round(direkt / total * 100, 1) if total > 0 else 0
+        Sadece eşleşme durumu alanı çekilir; diğer worker'ların yazdığı
+        kayıtlar da böylece sayaçlara yansır. Yerel modda kayıtlar (henüz
+        gönderilmemişler dahil) yerel depodan okunur.
 
-            return {
-                'total': total,
-                'direkt': direkt,
-                'belirsiz': belirsiz,
-                'bulunamadi': bulunamadi,
-                'direkt_oran': direkt_oran
-            }
+        Returns:
+            int: Çekilen kayıt sayısı
+        """
+        day = today_str()
+        count = self.daily_stats.reconcile(day, lambda: self._day_sayim_records(day))
+        logger.debug(f"İstatistikler uzlaştırıldı: {self.category} → {count} kayıt")
+        return count
 
-        except Exception as e:
-            logger.error("İstatistik hatası", extra={'error': str(e)})
-            return {
-                'total': 0,
-                'direkt': 0,
-                'belirsiz': 0,
-                'bulunamadi': 0,
-                'direkt_oran': 0
-            }
+    def _day_sayim_records(self, day: str) -> List[Dict[str, Any]]:
+        """
+        Günün sayım kayıtları (sadece durum alanı yeterli)
+
+        Yazma tamponu açıksa henüz Airtable'a yazılmamış kayıtlar da eklenir;
+        yoksa uzlaştırma tampondaki okutmaları sayaçlardan düşürürdü.
+        Tampon çekimden önce okunur: çekim sürerken yazılıp Airtable
+        sonucunda görünen kayıtlar ID'leriyle ayıklanır.
+        """
+        if self.sayim_store is not None:
+            return self.sayim_store.day_records(day)
+
+        pending = self.write_buffer.pending_records() if self.write_buffer is not None else []
+        records = self.sayim_kayitlari.all(formula=day_formula(day), **projection([STATUS_FIELD]))
+        if pending:
+            fetched = {record['id'] for record in records}
+            for entry in pending:
+                state = self.write_buffer.status(entry['id'])
+                if state == 'failed' or (state == 'committed' and self.write_buffer.resolve(entry['id']) in fetched):
+                    continue
+                records.append(entry)
+        return records
+
+    def _start_stats_task(self) -> None:
+        """Periyodik uzlaştırmayı başlat (STATS_RECONCILE_INTERVAL=0 ise sadece gün dönümünde)"""
+        if self._stats_interval <= 0:
+            return
+        if self._stats_task is None:
+            self._stats_task = PeriodicTask(
+                f"stats-reconcile-{self.category}", self._stats_interval, self._periodic_reconcile
+            )
+        self._stats_task.start()
+
+    def _periodic_reconcile(self) -> None:
+        """Sayaçlar paylaşıldığı için başka bir worker yakın zamanda uzlaştırdıysa atla"""
+        reconciled_at = self.daily_stats.reconciled_at
+        if (not self.daily_stats.needs_reconcile() and reconciled_at is not None
+                and time.time() - reconciled_at < self._stats_interval / 2):
+            return
+        self.reconcile_stats()
+
+    def stop_stats_reconcile(self) -> None:
+        """Arka plan uzlaştırmasını durdur"""
+        if self._stats_task is not None:
+            self._stats_task.stop()
 
     # ========== MARKALAR ==========
 
     def get_all_brands(self) -> List[Dict[str, Any]]:
         """
-        Tüm markaları listele
+        Tüm markaları listele (önbellekten)
 
         Returns:
             List[Dict]: {id, kod, ad, kategori}
         """
+        brands, _ = self.get_brands_snapshot()
+        return list(brands)
+
+    def get_brands_snapshot(self) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Hazır (filtrelenmiş ve sıralanmış) marka listesi ve içerik ETag'i
+
+        Liste BRANDS_CACHE_TTL süresince saklanır; katalog indeksi yüklüyse
+        marka deposu değiştiğinde (delta senkronizasyonu) hemen yenilenir.
+        Aynı içerik her zaman aynı ETag'i üretir, böylece worker'lar arasında
+        da 304 yanıtı verilebilir.
+
+        Returns:
+            Tuple[List[Dict], Optional[str]]: (markalar, ETag) - hata durumunda ([], None)
+        """
+        with self._brands_lock:
+            version = self.catalog_index.brands_version if self.catalog_index.loaded else None
+            cache = self._brands_cache
+            if cache is not None and cache['version'] == version and time.time() < cache['expires_at']:
+                return cache['brands'], cache['etag']
+
+            brands = self._load_brands()
+            if brands is None:
+                return [], None
+
+            payload = json.dumps(brands, sort_keys=True, ensure_ascii=False).encode('utf-8')
+            etag = hashlib.sha1(payload).hexdigest()
+            self._brands_cache = {
+                'brands': brands,
+                'etag': etag,
+                'version': version,
+                'expires_at': time.time() + self._brands_ttl
+            }
+            return brands, etag
+
+    def invalidate_brands(self) -> None:
+        """Marka listesi önbelleğini boşalt (bir sonraki istekte yeniden kurulur)"""
+        with self._brands_lock:
+            self._brands_cache = None
+
+    def get_brand_code(self, marka_id: str) -> str:
+        """
+        Marka kodunu önce marka önbelleğinden/deposundan, yoksa Airtable'dan çöz
+
+        Args:
+            marka_id: Markalar record ID
+
+        Returns:
+            str: Marka kodu (bulunamazsa 'XX')
+        """
+        record = self.catalog_index.get_brand(marka_id) if self.catalog_index.loaded else None
+        if record is not None:
+            return record['fields'].get('Marka Kodu') or 'XX'
+
+        brands, _ = self.get_brands_snapshot()
+        for brand in brands:
+            if brand['id'] == marka_id and brand['kod']:
+                return brand['kod']
+
+        # Önbellekte olmayan (ör. adı girilmemiş) marka
+        fields = self.markalar.get(marka_id)['fields']
+        return fields.get('Marka Kodu') or fields.get('Marka_Kodu') or 'XX'
+
+    def _load_brands(self) -> Optional[List[Dict[str, Any]]]:
+        """Marka listesini kur (hata durumunda None)"""
         try:
-            # Tüm markaları çek (formül olmadan)
-            records = self.markalar.all()
+            # Katalog yüklüyse senkronize marka deposunu kullan, yoksa tüm markaları çek
+            if self.catalog_index.loaded:
+                records = self.catalog_index.brands()
+            else:
+                records = self.markalar.all(**projection(BRAND_FIELDS))
 
             brands = []
             for record in records:
@@ -494,7 +1334,7 @@ class AirtableClient:
 
         except Exception as e:
             logger.error("Marka listesi hatası", extra={'error': str(e)})
-            return []
+            return None
 
     # ========== YARDIMCI FONKSİYONLAR ==========
 
@@ -507,7 +1347,7 @@ class AirtableClient:
         """
         try:
             # Basit bir sorgu yap
-            self.markalar.first()
+            self.markalar.first(**projection(['Marka Adı']))
             return True
         except Exception as e:
             logger.error("Health check başarısız", extra={'error': str(e)})
@@ -10,15 +10,26 @@ YENİ YAPI:
 
 from flask import Flask, request, jsonify, send_from_directory
 from flask_cors import CORS
+import airtable_client
 from airtable_client import AirtableClient
 from matcher import BarcodeMatcher
+from rate_limiter import get_rate_limit_stats
+from photo_pipeline import PhotoPipeline, LocalPhotoStore, PhotoError, spool_upload
+from file_lock import ensure_dir
+from job_queue import JobQueue, PermanentJobError
+import atexit
 import os
 import sys
 import logging
 from dotenv import load_dotenv
 from datetime import datetime
 from werkzeug.utils import secure_filename
-import base64
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Dict, List, Optional
 
 load_dotenv()
 
@@ -132,9 +143,11 @@ logger.info(f"CORS configured for origins: {allowed_origins}")
 
 # ============= CATEGORY-BASED CLIENT FACTORY WITH POOLING =============
 
+CATEGORIES = ['OF', 'GN', 'LN']
+
 # Client pool - cache clients by category
 _client_pool = {}
-_pool_lock = None  # For thread safety (optional)
+_pool_lock = threading.Lock()
 
 
 def get_airtable_client(category: str = 'OF') -> AirtableClient:
@@ -150,21 +163,26 @@ def get_airtable_client(category: str = 'OF') -> AirtableClient:
     Returns:
         AirtableClient instance (cached)
     """
-    # Check if client already exists in pool
-    if category in _client_pool:
+    # Check if client already exists in pool (lock-free fast path)
+    client = _client_pool.get(category)
+    if client is not None:
         logger.debug(f"Using cached client for category: {category}")
-        return _client_pool[category]
-
-    # Create new client and add to pool
-    try:
-        logger.info(f"Creating new Airtable client for category: {category}")
-        client = AirtableClient(category=category)
-        _client_pool[category] = client
         return client
-    except Exception as e:
-        logger.error(f"Category '{category}' için Airtable client oluşturulamadı",
-                    extra={'category': category, 'error': str(e)})
-        raise
+
+    # Create new client and add to pool; eşzamanlı ilk istekler tek client kurar
+    with _pool_lock:
+        client = _client_pool.get(category)
+        if client is not None:
+            return client
+        try:
+            logger.info(f"Creating new Airtable client for category: {category}")
+            client = AirtableClient(category=category)
+            _client_pool[category] = client
+            return client
+        except Exception as e:
+            logger.error(f"Category '{category}' için Airtable client oluşturulamadı",
+                        extra={'category': category, 'error': str(e)})
+            raise
 
 
 def clear_client_pool():
@@ -172,22 +190,402 @@ def clear_client_pool():
     Client pool'u temizle (testing veya reset için)
     """
     global _client_pool
-    _client_pool = {}
+    with _pool_lock:
+        _client_pool = {}
+    clear_matcher_pool()
     logger.info("Client pool cleared")
 
 
+def get_sayim_store_stats() -> Dict[str, Dict]:
+    """Kategori başına yerel sayım deposu replikasyon durumu (SAYIM_LOCAL_STORE=true ise)"""
+    with _pool_lock:
+        clients = dict(_client_pool)
+    return {
+        category: client.sayim_store.snapshot()
+        for category, client in clients.items()
+        if getattr(client, 'sayim_store', None) is not None
+    }
+
+
+# Matcher pool - kategori başına tek matcher (istekler arası sıcak durum)
+_matcher_pool: Dict[str, BarcodeMatcher] = {}
+_matcher_lock = threading.Lock()
+
+
 def get_matcher(category: str = 'OF') -> BarcodeMatcher:
     """
-    Kategoriye göre Matcher döndür
+    Kategoriye göre Matcher döndür (cached)
+
+    Matcher kategori başına bir kez oluşturulur ve gunicorn thread'leri
+    arasında paylaşılır; böylece indeks/önbellek gibi sıcak durumu
+    istekler arasında korunur. Pool'daki client değişirse (ör.
+    clear_client_pool sonrası) matcher yeniden kurulur.
 
     Args:
         category: 'OF' (Optik) | 'GN' (Güneş) | 'LN' (Lens)
 
     Returns:
-        BarcodeMatcher instance
+        BarcodeMatcher instance (cached)
+    """
+    client = get_airtable_client(category)
+    with _matcher_lock:
+        matcher = _matcher_pool.get(category)
+        if matcher is None or matcher.client is not client:
+            matcher = BarcodeMatcher(client)
+            _matcher_pool[category] = matcher
+        return matcher
+
+
+def warm_matcher(category: str = 'OF') -> bool:
+    """
+    Kategorinin matcher'ını oluştur ve ısıt (katalog indeksini yükle)
+
+    Returns:
+        bool: Matcher yerel indeksle çalışmaya hazırsa True
+    """
+    return get_matcher(category).warm()
+
+
+def invalidate_matchers(category: Optional[str] = None) -> None:
+    """
+    Matcher'ların sıcak durumunu geçersiz kıl (ör. yeni SKU/barkod eklenince)
+
+    Args:
+        category: Sadece bu kategori (None = hepsi)
+    """
+    with _matcher_lock:
+        matchers = [m for c, m in _matcher_pool.items() if category is None or c == category]
+    for matcher in matchers:
+        matcher.invalidate()
+
+
+def get_matcher_stats() -> Dict[str, Dict]:
+    """Kategori başına matcher sonuç önbelleği sayaçları"""
+    with _matcher_lock:
+        matchers = dict(_matcher_pool)
+    return {category: matcher.cache_stats() for category, matcher in matchers.items()}
+
+
+def clear_matcher_pool():
+    """
+    Matcher pool'u temizle (testing veya reset için)
+    """
+    with _matcher_lock:
+        _matcher_pool.clear()
+
+
+def warm_up_pool(categories: Optional[List[str]] = None) -> Dict[str, bool]:
+    """
+    Kategorilerin client ve matcher'larını trafik almadan önce hazırla
+
+    Client kurulumu ve katalog indeksi yüklemesi kategoriler arasında
+    paralel yapılır; böylece her kategorinin ilk okutması da kararlı
+    durumdaki gecikmeyle çalışır. gunicorn'da post_fork hook'undan
+    (gunicorn.conf.py) her worker için çağrılır. Hata veren kategori
+    False döner; o kategori ilk istekte yeniden denenir.
+
+    Args:
+        categories: Hazırlanacak kategoriler (None = hepsi)
+
+    Returns:
+        Dict[str, bool]: Kategori → yerel indeksle hazır mı
+    """
+    categories = categories or CATEGORIES
+    started = time.time()
+
+    def warm(category: str) -> bool:
+        try:
+            return warm_matcher(category)
+        except Exception as e:
+            logger.error(f"Category '{category}' ısıtılamadı", extra={'category': category, 'error': str(e)})
+            return False
+
+    with ThreadPoolExecutor(max_workers=len(categories), thread_name_prefix='warm-up') as executor:
+        results = dict(zip(categories, executor.map(warm, categories)))
+
+    logger.info(f"Client pool ısıtıldı ({time.time() - started:.2f}s)", extra={'categories': results})
+    return results
+
+
+# Toplu barkod aramada tek istekte kabul edilen en fazla barkod
+MAX_BATCH_BARCODES = 200
+
+
+# ============= HEALTH PROBES =============
+
+HEALTH_CATEGORIES = CATEGORIES
+
+# Derin sağlık kontrolü sonucu bu süre (saniye) boyunca tekrar kullanılır
+HEALTH_CACHE_TTL = float(os.getenv('HEALTH_CACHE_TTL', '30'))
+
+# Tek bir kategori probunun en fazla süresi (saniye)
+HEALTH_PROBE_TIMEOUT = float(os.getenv('HEALTH_PROBE_TIMEOUT', '5'))
+
+_health_cache = {'categories': None, 'checked_at': 0.0}
+_health_lock = threading.Lock()
+_health_executor = ThreadPoolExecutor(max_workers=len(HEALTH_CATEGORIES), thread_name_prefix='health-probe')
+
+
+def _probe_category(category: str) -> bool:
+    """Tek kategori için Airtable bağlantısını test et"""
+    try:
+        client = get_airtable_client(category)
+        return client.health_check()
+    except Exception as e:
+        logger.warning(f"Health check failed for category {category}", extra={'category': category, 'error': str(e)})
+        return False
+
+
+def get_categories_health() -> tuple:
+    """
+    Tüm kategorileri paralel probla (sonuç HEALTH_CACHE_TTL boyunca önbellekte)
+
+    Aynı anda gelen istekler tek bir probu bekler; Airtable'a TTL başına
+    en fazla kategori sayısı kadar istek gider.
+
+    Returns:
+        (Dict[str, bool], float, bool): kategori sonuçları, kontrol zamanı, önbellekten mi?
+    """
+    with _health_lock:
+        now = time.time()
+        if _health_cache['categories'] is not None and now - _health_cache['checked_at'] < HEALTH_CACHE_TTL:
+            return dict(_health_cache['categories']), _health_cache['checked_at'], True
+
+        futures = {cat: _health_executor.submit(_probe_category, cat) for cat in HEALTH_CATEGORIES}
+        deadline = now + HEALTH_PROBE_TIMEOUT
+        categories_health = {}
+        for cat, future in futures.items():
+            try:
+                categories_health[cat] = bool(future.result(timeout=max(0.0, deadline - time.time())))
+            except Exception:
+                logger.warning(f"Health check timed out for category {cat}", extra={'category': cat})
+                categories_health[cat] = False
+
+        _health_cache['categories'] = categories_health
+        _health_cache['checked_at'] = time.time()
+        return dict(categories_health), _health_cache['checked_at'], False
+
+
+def clear_health_cache():
+    """
+    Health önbelleğini temizle (testing veya reset için)
+    """
+    with _health_lock:
+        _health_cache['categories'] = None
+        _health_cache['checked_at'] = 0.0
+
+
+# ============= FOTOĞRAF İŞLEME =============
+
+# 'airtable': uploadAttachment ile Fotograf alanına | 'local': DATA_DIR/photos altına
+PHOTO_STORE = os.getenv('PHOTO_STORE', 'airtable').lower()
+
+# Kabul edilen en büyük yükleme (küçültmeden önce)
+PHOTO_MAX_UPLOAD_BYTES = int(float(os.getenv('PHOTO_MAX_UPLOAD_MB', '25')) * 1024 * 1024)
+
+# Werkzeug gövdeyi bundan büyükse okumadan 413 döner (multipart başlıkları için pay)
+app.config['MAX_CONTENT_LENGTH'] = PHOTO_MAX_UPLOAD_BYTES + 1024 * 1024
+
+# Küçültme işinin en fazla bekleneceği süre (saniye)
+PHOTO_PROCESS_TIMEOUT = float(os.getenv('PHOTO_PROCESS_TIMEOUT', '30'))
+
+_photo_pipeline: Optional[PhotoPipeline] = None
+_photo_lock = threading.Lock()
+
+
+def get_photo_pipeline() -> PhotoPipeline:
     """
+    Worker'ın fotoğraf küçültme havuzunu döndür (ilk kullanımda kurulur)
+
+    Havuz worker süreci içinde kurulur; thread'ler fork'tan sağ çıkmaz.
+    """
+    global _photo_pipeline
+    with _photo_lock:
+        if _photo_pipeline is None:
+            _photo_pipeline = PhotoPipeline(
+                workers=int(os.getenv('PHOTO_WORKERS', '2')),
+                max_dimension=int(os.getenv('PHOTO_MAX_DIMENSION', '1600')),
+                quality=int(os.getenv('PHOTO_JPEG_QUALITY', '82'))
+            )
+        return _photo_pipeline
+
+
+def clear_photo_pipeline():
+    """
+    Fotoğraf havuzunu kapat (testing veya reset için)
+    """
+    global _photo_pipeline
+    with _photo_lock:
+        pipeline, _photo_pipeline = _photo_pipeline, None
+    if pipeline is not None:
+        pipeline.shutdown(wait=False)
+
+
+def get_photo_stats() -> Dict:
+    """Fotoğraf havuzu sayaçları (havuz henüz kurulmadıysa sıfır)"""
+    with _photo_lock:
+        pipeline = _photo_pipeline
+    if pipeline is None:
+        return {'processed': 0, 'failed': 0, 'in_flight': 0, 'bytes_in': 0, 'bytes_out': 0}
+    return pipeline.snapshot()
+
+
+def get_local_photo_store() -> LocalPhotoStore:
+    """PHOTO_STORE=local için fotoğraf deposu"""
+    return LocalPhotoStore(os.path.join(airtable_client.DATA_DIR, 'photos'))
+
+
+# ============= ARKA PLAN İŞLERİ =============
+
+# Yanıt için gerekmeyen işler (stok güncelleme, fotoğraf işleme) kuyruğa yazılır;
+# false ise eski davranış: istek içinde senkron çalışır
+JOB_QUEUE_ENABLED = os.getenv('JOB_QUEUE_ENABLED', 'true').lower() == 'true'
+
+_job_queue: Optional[JobQueue] = None
+_job_lock = threading.Lock()
+
+
+def _run_stok_update(payload: Dict) -> None:
+    """'stok_update' işi: sayım sonrası stok kalemini güncelle"""
+    category = payload['category']
     client = get_airtable_client(category)
-    return BarcodeMatcher(client)
+    schedule = None
+    if client.stok_aggregator is not None:
+        # Artış takipçi dosyasına yazılır; pencere sonunda tek bir 'stok_flush'
+        # işi tüm worker'ların artışlarını yazar ve hata verirse tekrar denenir
+        schedule = partial(get_job_queue().enqueue, 'stok_flush', {'category': category},
+                           delay=client.stok_aggregator.window, unique=True)
+    # Başarısız denemede sayaç artışı geri alınır; geri çekilmeyle tekrar
+    # denemek çift sayım yapmaz
+    if not client.update_stok_from_sayim(payload['sku_id'], schedule_flush=schedule):
+        raise RuntimeError("Stok kalemi güncellenemedi")
+
+
+def _run_stok_flush(payload: Dict) -> None:
+    """'stok_flush' işi: bekleyen Mevcut_Miktar artışlarını Airtable'a yaz"""
+    aggregator = get_airtable_client(payload['category']).stok_aggregator
+    if aggregator is not None:
+        aggregator.flush()
+
+
+def _run_stats_refresh(payload: Dict) -> None:
+    """'stats_refresh' işi: günlük sayaçları Airtable ile uzlaştır (sayaçlar worker'lar arası paylaşılır)"""
+    get_airtable_client(payload['category']).reconcile_stats()
+
+
+def _store_photo(client: AirtableClient, category: str, record_id: str, prepared: Dict) -> Dict:
+    """Hazırlanmış fotoğrafı PHOTO_STORE'a yaz"""
+    if PHOTO_STORE == 'local':
+        return get_local_photo_store().put(category, record_id, prepared['filename'], prepared['content'])
+    return client.upload_sayim_photo(
+        record_id, prepared['filename'], prepared['content'], prepared['content_type']
+    )
+
+
+def _run_photo_upload(payload: Dict) -> None:
+    """'photo_upload' işi: diske akıtılmış fotoğrafı küçült ve sakla"""
+    category = payload['category']
+    client = get_airtable_client(category)
+    record_id = payload['record_id']
+
+    if PHOTO_STORE != 'local':
+        # Tampondaki kayıt henüz yazılmadıysa iş geri çekilmeyle tekrar denenir
+        record_id = client.resolve_sayim_record_id(record_id, wait=0)
+        if not record_id:
+            raise RuntimeError("Sayım kaydı henüz Airtable'a yazılmadı")
+
+    try:
+        prepared = get_photo_pipeline().process(
+            payload['path'], payload['filename'], timeout=PHOTO_PROCESS_TIMEOUT, remove=False
+        )
+    except PhotoError as e:
+        raise PermanentJobError(str(e))
+
+    result = _store_photo(client, category, record_id, prepared)
+    if not result['success']:
+        raise RuntimeError(result.get('error') or 'Fotoğraf yazılamadı')
+    _discard_spool(payload)
+
+
+def _discard_spool(payload: Dict) -> None:
+    """Fotoğraf işinin geçici dosyasını sil"""
+    try:
+        os.remove(payload['path'])
+    except OSError:
+        pass
+
+
+def get_job_queue() -> Optional[JobQueue]:
+    """
+    Worker'ın iş kuyruğunu döndür (ilk kullanımda kurulup başlatılır)
+
+    Kuyruk dosyası DATA_DIR altındadır; aynı dosyayı kullanan gunicorn
+    worker'ları işleri birbirinden bağımsız sahiplenir. Worker thread'leri
+    fork'tan sağ çıkmadığı için kuyruk worker süreci içinde kurulur.
+
+    Returns:
+        JobQueue: JOB_QUEUE_ENABLED=false ise None
+    """
+    global _job_queue
+    if not JOB_QUEUE_ENABLED:
+        return None
+    with _job_lock:
+        if _job_queue is None:
+            queue = JobQueue(
+                os.path.join(ensure_dir(airtable_client.DATA_DIR), 'jobs.sqlite3'),
+                workers=int(os.getenv('JOB_WORKERS', '2')),
+                max_attempts=int(os.getenv('JOB_MAX_ATTEMPTS', '5')),
+                backoff_base=float(os.getenv('JOB_BACKOFF_BASE', '1')),
+                backoff_max=float(os.getenv('JOB_BACKOFF_MAX', '300'))
+            )
+            queue.register('stok_update', _run_stok_update)
+            queue.register('stok_flush', _run_stok_flush)
+            queue.register('stats_refresh', _run_stats_refresh)
+            queue.register('photo_upload', _run_photo_upload,
+                           on_failure=lambda payload, error: _discard_spool(payload))
+            queue.start()
+            _job_queue = queue
+        return _job_queue
+
+
+def clear_job_queue():
+    """
+    İş kuyruğunu durdur (testing veya reset için; bekleyen işler dosyada kalır)
+    """
+    global _job_queue
+    with _job_lock:
+        queue, _job_queue = _job_queue, None
+    if queue is not None:
+        queue.stop(timeout=5)
+
+
+def shutdown_worker():
+    """
+    Worker kapanırken arka plan işlerini durdur ve bekleyen stok artışlarını yaz
+
+    gunicorn'un worker_exit kancasından ve süreç çıkışında (atexit) çağrılır;
+    ikinci çağrıda yazılacak bir şey kalmaz.
+    """
+    clear_job_queue()
+    with _pool_lock:
+        clients = list(_client_pool.values())
+    for client in clients:
+        aggregator = getattr(client, 'stok_aggregator', None)
+        if aggregator is not None:
+            aggregator.stop(timeout=5)
+
+
+atexit.register(shutdown_worker)
+
+
+def get_job_stats() -> Dict:
+    """Kuyruk derinliği, gecikme ve sayaçlar (kuyruk kapalıysa enabled=False)"""
+    with _job_lock:
+        queue = _job_queue
+    if queue is None:
+        return {'enabled': JOB_QUEUE_ENABLED, 'depth': 0, 'ready': 0, 'running': 0, 'failed': 0,
+                'lag_seconds': 0.0, 'oldest_age_seconds': 0.0}
+    return dict(queue.snapshot(), enabled=True)
 
 
 # ============= FRONTEND SERVE =============
@@ -209,11 +607,41 @@ def static_files(path):
 
 # ============= API ENDPOINTS =============
 
+@app.route('/api/health/live', methods=['GET'])
+def health_live():
+    """
+    Canlılık kontrolü - Airtable'a istek atmaz (Docker HEALTHCHECK için)
+
+    Returns:
+        {"status": "alive", "timestamp": str}
+    """
+    return jsonify({
+        'status': 'alive',
+        'timestamp': datetime.now().isoformat()
+    })
+
+
+def _health_payload():
+    categories_health, checked_at, cached = get_categories_health()
+    all_healthy = all(categories_health.values())
+
+    return all_healthy, {
+        'status': 'healthy' if all_healthy else 'degraded',
+        'version': '2.0.0',
+        'categories': categories_health,
+        'cached': cached,
+        'checked_at': datetime.fromtimestamp(checked_at).isoformat(),
+        'timestamp': datetime.now().isoformat()
+    }
+
+
 @app.route('/api/health', methods=['GET'])
 def health_check():
     """
     Sistem sağlık kontrolü - Tüm kategoriler
 
+    Kategoriler paralel problanır, sonuç HEALTH_CACHE_TTL saniye önbellekte tutulur.
+
     Returns:
         {
             "status": "healthy",
@@ -223,26 +651,85 @@ def health_check():
                 "GN": bool,
                 "LN": bool
             },
+            "cached": bool,
+            "checked_at": str,
             "timestamp": str
         }
     """
-    categories_health = {}
-    categories = ['OF', 'GN', 'LN']
+    _, payload = _health_payload()
+    return jsonify(payload)
 
-    for cat in categories:
-        try:
-            client = get_airtable_client(cat)
-            categories_health[cat] = client.health_check()
-        except Exception as e:
-            logger.warning(f"Health check failed for category {cat}", extra={'category': cat, 'error': str(e)})
-            categories_health[cat] = False
 
-    all_healthy = all(categories_health.values())
+@app.route('/api/health/ready', methods=['GET'])
+def health_ready():
+    """
+    Hazırlık kontrolü - /api/health ile aynı, bir kategori erişilemezse 503 döner
+    """
+    all_healthy, payload = _health_payload()
+    return jsonify(payload), (200 if all_healthy else 503)
+
 
+@app.route('/api/metrics', methods=['GET'])
+def metrics():
+    """
+    Performans sayaçları (izleme için)
+
+    Returns:
+        {
+            "rate_limiter": {
+                "<base_id>": {
+                    "acquired": int,        # Alınan token (yapılan HTTP isteği)
+                    "waited": int,          # Beklemek zorunda kalan istek
+                    "wait_seconds": float,  # Toplam bekleme süresi
+                    "throttled": int        # Alınan 429 yanıtı
+                }
+            },
+            "match_cache": {
+                "<kategori>": {
+                    "size": int,            # Önbellekteki sonuç
+                    "maxsize": int,
+                    "hits": int,
+                    "misses": int,
+                    "hit_rate": float,
+                    "evictions": int,       # LRU ile atılan
+                    "expired": int          # Süresi dolan
+                }
+            },
+            "photos": {
+                "processed": int,           # Küçültülüp hazırlanan fotoğraf
+                "failed": int,
+                "in_flight": int,           # Kuyrukta/işlenmekte
+                "bytes_in": int,            # Yüklenen (orijinal) bayt
+                "bytes_out": int            # Airtable'a/diske giden bayt
+            },
+            "jobs": {
+                "enabled": bool,
+                "depth": int,               # Bekleyen iş (gecikmeliler dahil)
+                "ready": int,               # Çalışmaya hazır iş
+                "running": int,
+                "failed": int,              # Deneme hakkı biten iş
+                "lag_seconds": float,       # En eski hazır işin bekleme süresi
+                "oldest_age_seconds": float,
+                "enqueued": int, "succeeded": int, "retried": int, "failed_total": int
+            },
+            "sayim_store": {
+                "<kategori>": {
+                    "pending": int,         # Airtable'a gönderilmemiş kayıt
+                    "committed": int,
+                    "failed": int,
+                    "oldest_pending_seconds": float,
+                    "flushed": int, "batches": int, "errors": int
+                }
+            },
+            "timestamp": str
+        }
+    """
     return jsonify({
-        'status': 'healthy' if all_healthy else 'degraded',
-        'version': '2.0.0',
-        'categories': categories_health,
+        'rate_limiter': get_rate_limit_stats(),
+        'match_cache': get_matcher_stats(),
+        'photos': get_photo_stats(),
+        'jobs': get_job_stats(),
+        'sayim_store': get_sayim_store_stats(),
         'timestamp': datetime.now().isoformat()
     })
 
@@ -294,6 +781,76 @@ def search_barcode():
         return jsonify({'error': f'Arama hatası: {str(e)}'}), 500
 
 
+@app.route('/api/search-barcode/batch', methods=['POST'])
+def search_barcode_batch():
+    """
+    Toplu barkod arama (çevrimdışı kalan el terminalinin okutmalarını tekrar oynatmak için)
+
+    Request Body:
+        {
+            "barkodlar": ["8056597412261", "8056597412262", ...],
+            "category": "OF" | "GN" | "LN",
+            "context_brand": "recXXXXXX" (optional),
+            "context_category": "OF" (optional)
+        }
+
+    Response:
+        {
+            "count": int,
+            "results": [
+                {
+                    "barkod": str,
+                    "found": bool,
+                    "status": "direkt" | "belirsiz" | "bulunamadi",
+                    "confidence": 0-100,
+                    "product": {...},
+                    "candidates": [...]
+                }
+            ]
+        }
+    """
+    data = request.json
+    barkodlar = data.get('barkodlar')
+    category = data.get('category', 'OF')
+    context_brand = data.get('context_brand')
+    context_category = data.get('context_category')
+
+    if not isinstance(barkodlar, list) or not barkodlar:
+        return jsonify({'error': 'barkodlar listesi gerekli'}), 400
+
+    if len(barkodlar) > MAX_BATCH_BARCODES:
+        return jsonify({'error': f'En fazla {MAX_BATCH_BARCODES} barkod gönderilebilir'}), 400
+
+    if not all(isinstance(b, str) for b in barkodlar):
+        return jsonify({'error': 'Barkodlar metin olmalı'}), 400
+
+    barkodlar = [b.strip() for b in barkodlar]
+    if not all(barkodlar):
+        return jsonify({'error': 'Boş barkod gönderilemez'}), 400
+
+    try:
+        matcher = get_matcher(category)
+        results = matcher.match_many(barkodlar, context_brand, context_category)
+
+        return jsonify({
+            'count': len(results),
+            'results': [
+                {
+                    'barkod': barkod,
+                    'found': result['status'] != 'bulunamadi',
+                    'status': result['status'],
+                    'confidence': result['confidence'],
+                    'product': result.get('product'),
+                    'candidates': result.get('candidates', [])
+                }
+                for barkod, result in zip(barkodlar, results)
+            ]
+        })
+    except Exception as e:
+        logger.error("Toplu barkod arama hatası", extra={'count': len(barkodlar), 'category': category, 'error': str(e)})
+        return jsonify({'error': f'Arama hatası: {str(e)}'}), 500
+
+
 @app.route('/api/save-count', methods=['POST'])
 def save_count():
     """
@@ -361,10 +918,14 @@ def save_count():
         result = client.create_sayim_record(record_data)
 
         if result['success']:
-            # Stok kalemini otomatik güncelle (sku_id varsa)
+            # Stok kalemini otomatik güncelle (sku_id varsa); kuyruk açıksa yanıttan sonra
             if sku_id:
                 try:
-                    client.update_stok_from_sayim(sku_id)
+                    queue = get_job_queue()
+                    if queue is not None:
+                        queue.enqueue('stok_update', {'category': category, 'sku_id': sku_id})
+                    else:
+                        client.update_stok_from_sayim(sku_id)
                 except Exception as e:
                     logger.warning("Stok güncelleme hatası (devam ediliyor)",
                                  extra={'sku_id': sku_id, 'error': str(e)})
@@ -372,7 +933,8 @@ def save_count():
 
             return jsonify({
                 'success': True,
-                'record_id': result['record_id']
+                'record_id': result['record_id'],
+                'pending': result.get('pending', False)
             })
         else:
             return jsonify({
@@ -385,6 +947,85 @@ def save_count():
         return jsonify({'error': str(e)}), 500
 
 
+@app.route('/api/sayim-kaydi/<record_id>', methods=['GET'])
+def get_sayim_record_status(record_id):
+    """
+    Sayım kaydının yazılma durumu (write-behind tamponu açıkken)
+
+    `/api/save-count` tampon açıksa yerel bir ID (`loc...`) döndürür;
+    istemci gerçek Airtable record ID'sini bu endpoint ile alır.
+
+    Query:
+        category: "OF" | "GN" | "LN"
+
+    Response:
+        {
+            "success": true,
+            "status": "pending" | "committed" | "failed" | "unknown",
+            "record_id": "recXXXXXX" | null
+        }
+    """
+    category = request.args.get('category', 'OF')
+
+    try:
+        client = get_airtable_client(category)
+        status = client.get_sayim_record_status(record_id)
+
+        return jsonify({
+            'success': True,
+            'status': status,
+            'record_id': client.resolve_sayim_record_id(record_id) if status == 'committed' else None
+        })
+    except Exception as e:
+        logger.error("Sayım kaydı durum hatası", extra={'record_id': record_id, 'error': str(e)})
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
+@app.route('/api/sayim-kayitlari', methods=['GET'])
+def get_recent_sayim_records():
+    """
+    Son okutmalar (en yeni önce)
+
+    Yerel depo açıksa (SAYIM_LOCAL_STORE=true) Airtable'a gidilmez; henüz
+    gönderilmemiş kayıtlar da listelenir.
+
+    Query:
+        category: "OF" | "GN" | "LN"
+        limit: int (varsayılan 20, en fazla 100)
+
+    Response:
+        {
+            "success": true,
+            "records": [
+                {
+                    "id": "recXXXXXX" | "loc...",
+                    "status": "pending" | "committed" | "failed",
+                    "created_at": str,
+                    "fields": {...}
+                }
+            ]
+        }
+    """
+    category = request.args.get('category', 'OF')
+    try:
+        limit = min(max(int(request.args.get('limit', '20')), 1), 100)
+    except ValueError:
+        return jsonify({'error': 'Geçersiz limit'}), 400
+
+    if category not in CATEGORIES:
+        return jsonify({'error': 'Geçersiz kategori'}), 400
+
+    try:
+        client = get_airtable_client(category)
+        return jsonify({
+            'success': True,
+            'records': client.get_recent_sayim_records(limit)
+        })
+    except Exception as e:
+        logger.error("Son okutmalar hatası", extra={'category': category, 'error': str(e)})
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
 @app.route('/api/search-manual', methods=['POST'])
 def search_manual():
     """
@@ -395,14 +1036,15 @@ def search_manual():
             "category": "OF" | "GN" | "LN",
             "term": "2140",
             "context_brand": "recXXXXXX" (optional),
-            "context_category": "OF" (optional)
+            "context_category": "OF" (optional),
+            "fuzzy": true (optional - yazım hatası toleranslı arama)
         }
 
     Response:
         {
             "found": bool,
             "count": int,
-            "products": [...]
+            "products": [...]  (fuzzy modda her üründe "distance")
         }
     """
     data = request.json
@@ -410,13 +1052,17 @@ def search_manual():
     term = data.get('term', '').strip()
     context_brand = data.get('context_brand')
     context_category = data.get('context_category')
+    fuzzy = bool(data.get('fuzzy', False))
 
     if not term or len(term) < 2:
         return jsonify({'error': 'En az 2 karakter girin'}), 400
 
     try:
         client = get_airtable_client(category)
-        results = client.search_sku_by_term(term, context_brand, context_category)
+        if fuzzy:
+            results = client.search_sku_by_term(term, context_brand, context_category, fuzzy=True)
+        else:
+            results = client.search_sku_by_term(term, context_brand, context_category)
 
         products = []
         for record in results:
@@ -426,7 +1072,7 @@ def search_manual():
                 fields.get('Marka Adı'), list
             ) else fields.get('Marka Adı', '')
 
-            products.append({
+            product = {
                 'id': record['id'],
                 'sku': fields.get('SKU'),
                 'kategori': fields.get('Kategori'),
@@ -438,7 +1084,10 @@ def search_manual():
                 'ekartman': fields.get('Ekartman'),
                 'birim_fiyat': fields.get('Birim Fiyat', 0),
                 'durum': fields.get('Durum', 'Aktif')
-            })
+            }
+            if 'distance' in record:
+                product['distance'] = record['distance']
+            products.append(product)
 
         return jsonify({
             'found': len(products) > 0,
@@ -451,6 +1100,30 @@ def search_manual():
         return jsonify({'error': str(e)}), 500
 
 
+# Kategori başına son serileştirilmiş marka listesi: (ETag, JSON gövdesi)
+_brands_bodies: Dict[str, tuple] = {}
+_brands_bodies_lock = threading.Lock()
+
+
+def _brands_body(category: str, brands: List[Dict], etag: str) -> bytes:
+    """Marka listesi yanıt gövdesi (ETag değişmedikçe yeniden serileştirilmez)"""
+    with _brands_bodies_lock:
+        cached = _brands_bodies.get(category)
+        if cached is not None and cached[0] == etag:
+            return cached[1]
+
+    body = json.dumps({'success': True, 'brands': brands}, ensure_ascii=False).encode('utf-8')
+    with _brands_bodies_lock:
+        _brands_bodies[category] = (etag, body)
+    return body
+
+
+def clear_brands_cache():
+    """Serileştirilmiş marka listelerini temizle (testing veya reset için)"""
+    with _brands_bodies_lock:
+        _brands_bodies.clear()
+
+
 @app.route('/api/brands', methods=['GET', 'POST'])
 def get_brands():
     """
@@ -473,6 +1146,8 @@ def get_brands():
                 }
             ]
         }
+
+    Yanıt ETag başlığı taşır; If-None-Match aynıysa gövdesiz 304 döner.
     """
     # POST veya GET destekle (geriye dönük uyumluluk için)
     if request.method == 'POST':
@@ -483,12 +1158,19 @@ def get_brands():
 
     try:
         client = get_airtable_client(category)
-        brands = client.get_all_brands()
+        brands, etag = client.get_brands_snapshot()
+        if etag is None:
+            return jsonify({'success': True, 'brands': brands})
 
-        return jsonify({
-            'success': True,
-            'brands': brands
-        })
+        # Liste değişmediyse gövde gönderilmez
+        if request.if_none_match.contains(etag):
+            response = app.response_class(status=304)
+        else:
+            response = app.response_class(_brands_body(category, brands, etag), mimetype='application/json')
+        response.set_etag(etag)
+        # Tarayıcı saklayabilir ama her seferinde ETag ile doğrulamalı
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
     except Exception as e:
         logger.error("Marka listesi hatası", extra={'category': category, 'error': str(e)})
         return jsonify({
@@ -528,7 +1210,12 @@ def get_stats():
 
     try:
         client = get_airtable_client(category)
-        stats = client.get_today_stats()
+        queue = get_job_queue()
+        refresh = None
+        if queue is not None:
+            # Günün ilk uzlaştırması yanıttan sonra kuyrukta yapılır
+            refresh = partial(queue.enqueue, 'stats_refresh', {'category': category}, unique=True)
+        stats = client.get_today_stats(refresh=refresh)
 
         return jsonify({
             'success': True,
@@ -547,51 +1234,121 @@ def upload_photo():
     """
     Fotoğraf upload endpoint
 
+    Fotoğraf geçici dosyaya akıtılır, worker havuzunda küçültülür ve
+    Airtable'ın uploadAttachment uç noktasına (veya PHOTO_STORE=local ise
+    diske) yazılır.
+
+    async=1 ile (iş kuyruğu açıksa) fotoğraf sadece diske akıtılır ve
+    202 döner; küçültme ve yükleme yanıttan sonra kuyrukta yapılır.
+
     Request: multipart/form-data
         - photo: file
         - record_id: string (Sayim_Kayitlari record ID)
         - category: string (OF/GN/LN)
+        - async: "1" (optional)
+
+    Request (doğrudan binary): Content-Type: image/*
+        - Gövde: dosya içeriği
+        - Query: record_id, category, filename (optional), async (optional)
 
     Response:
         {
             "success": bool,
-            "url": string (optional)
+            "url": string (optional),
+            "size": int (yüklenen bayt)
+        }
+
+    Response (async, 202):
+        {
+            "success": true,
+            "queued": true,
+            "job_id": int
         }
     """
-    if 'photo' not in request.files:
-        return jsonify({'error': 'Fotoğraf bulunamadı'}), 400
+    if request.mimetype.startswith('image/'):
+        stream = request.stream
+        filename = request.args.get('filename', 'photo.jpg')
+        record_id = request.args.get('record_id')
+        category = request.args.get('category', 'OF')
+        run_async = request.args.get('async') == '1'
+    else:
+        if 'photo' not in request.files:
+            return jsonify({'error': 'Fotoğraf bulunamadı'}), 400
 
-    photo = request.files['photo']
-    record_id = request.form.get('record_id')
-    category = request.form.get('category', 'OF')
+        photo = request.files['photo']
+        stream = photo.stream
+        filename = photo.filename
+        record_id = request.form.get('record_id')
+        category = request.form.get('category', 'OF')
+        run_async = request.form.get('async') == '1'
 
     if not record_id:
         return jsonify({'error': 'record_id gerekli'}), 400
 
-    if photo.filename == '':
+    if filename == '':
         return jsonify({'error': 'Dosya seçilmedi'}), 400
 
-    try:
-        client = get_airtable_client(category)
+    if category not in CATEGORIES:
+        return jsonify({'error': 'Geçersiz kategori'}), 400
 
-        photo_data = photo.read()
-        photo_base64 = base64.b64encode(photo_data).decode('utf-8')
-        filename = secure_filename(photo.filename)
+    filename = secure_filename(filename) or 'photo.jpg'
 
-        attachment = [{
-            "url": f"data:image/jpeg;base64,{photo_base64}",
-            "filename": filename
-        }]
+    queue = get_job_queue() if run_async else None
 
-        client.sayim_kayitlari.update(record_id, {
-            'Fotograf': attachment
-        })
+    try:
+        if queue is not None:
+            # Kayıt ID'si iş içinde çözülür; tampondaki kayıt yazılana kadar iş tekrar denenir
+            spool_dir = ensure_dir(os.path.join(airtable_client.DATA_DIR, 'uploads'))
+            path = spool_upload(stream, spool_dir, PHOTO_MAX_UPLOAD_BYTES)
+            job_id = queue.enqueue('photo_upload', {
+                'category': category,
+                'record_id': record_id,
+                'path': path,
+                'filename': filename
+            })
+            return jsonify({
+                'success': True,
+                'message': 'Fotoğraf kuyruğa alındı',
+                'queued': True,
+                'job_id': job_id
+            }), 202
+
+        client = get_airtable_client(category)
+
+        if PHOTO_STORE != 'local':
+            # Tampondan dönen yerel ID ise kaydın Airtable'a yazılmasını bekle
+            airtable_record_id = client.resolve_sayim_record_id(record_id, wait=10)
+            if not airtable_record_id:
+                return jsonify({
+                    'success': False,
+                    'error': 'Sayım kaydı henüz kaydedilmedi, tekrar deneyin'
+                }), 409
+            record_id = airtable_record_id
+
+        spool_dir = ensure_dir(os.path.join(airtable_client.DATA_DIR, 'uploads'))
+        path = spool_upload(stream, spool_dir, PHOTO_MAX_UPLOAD_BYTES)
+        prepared = get_photo_pipeline().process(path, filename, timeout=PHOTO_PROCESS_TIMEOUT)
+        result = _store_photo(client, category, record_id, prepared)
+
+        if not result['success']:
+            return jsonify({
+                'success': False,
+                'error': result.get('error')
+            }), 500
 
         return jsonify({
             'success': True,
-            'message': 'Fotoğraf yüklendi'
+            'message': 'Fotoğraf yüklendi',
+            'url': result.get('url'),
+            'size': len(prepared['content'])
         })
 
+    except PhotoError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), e.status
+
     except Exception as e:
         logger.error("Fotoğraf yükleme hatası", extra={'record_id': record_id, 'error': str(e)})
         return jsonify({
@@ -600,6 +1357,16 @@ def upload_photo():
         }), 500
 
 
+@app.route('/api/photos/<category>/<path:name>', methods=['GET'])
+def get_photo(category: str, name: str):
+    """
+    PHOTO_STORE=local ile yazılmış fotoğrafı döndür
+    """
+    if PHOTO_STORE != 'local' or category not in CATEGORIES:
+        return jsonify({'error': 'Endpoint bulunamadı'}), 404
+    return send_from_directory(get_local_photo_store().category_dir(category), name)
+
+
 @app.route('/api/save-unlisted-product', methods=['POST'])
 def save_unlisted_product():
     """
@@ -668,6 +1435,9 @@ def save_unlisted_product():
                 'error': f"SKU oluşturulamadı: {sku_result.get('error')}"
             }), 500
 
+        # Yeni barkod: matcher'ların önbelleğe aldığı sonuçlar artık eski
+        invalidate_matchers(category)
+
         # 2. Sayım kaydı oluştur
         sayim_data = {
             'Okutulan Barkod': barkod,
@@ -716,6 +1486,12 @@ def not_found(e):
     return jsonify({'error': 'Endpoint bulunamadı'}), 404
 
 
+@app.errorhandler(413)
+def too_large(e):
+    """413 hatası (MAX_CONTENT_LENGTH aşıldı)"""
+    return jsonify({'success': False, 'error': 'İstek çok büyük'}), 413
+
+
 @app.errorhandler(500)
 def server_error(e):
     """500 hatası"""
@@ -744,4 +1520,7 @@ if __name__ == '__main__':
 
     logger.info(f"Sunucu başlatılıyor - Port: {port}, Debug: {debug}, CORS: {allowed_origins}")
 
+    if os.getenv('WARM_UP_ON_START', 'true').lower() == 'true':
+        warm_up_pool()
+
     app.run(host='0.0.0.0', port=port, debug=debug)
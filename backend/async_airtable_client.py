@@ -0,0 +1,723 @@
+"""
+Async Airtable Client - Konyalı Optik Sayım Sistemi
+httpx + asyncio ile AirtableClient'ın sorgu metotlarının asenkron karşılığı
+
+- Tüm kategoriler tek bir keep-alive bağlantı havuzunu (httpx.AsyncClient) paylaşır
+- OF/GN/LN base'leri `fan_out` ile aynı anda sorgulanır
+- Bağımsız istekler (barkod parçaları, farklı tablolar) paralel gönderilir;
+  her istek base'in ortak token bucket'ından geçtiği için limit aşılmaz
+- Airtable sayfalaması offset zinciriyle çalışır: bir tablonun sayfaları
+  sırayla çekilir, eşzamanlılık sorgular/base'ler arasındadır
+- Günlük istatistikler senkron istemcinin paylaşılan DailyStats dosyasından
+  okunur; Airtable sadece sayaçlar eskiyse (gün döndü) taranır
+- Stok güncellemesi senkron istemciyle aynı StokTracker dosyasını ve
+  süreçler arası yazma kilidini kullanır; SQLite ve flock çağrıları event
+  loop'u bloklamamak için thread'de çalışır
+
+Test için `transport=httpx.MockTransport(...)` veya `endpoint_url` ile yerel
+bir sahte Airtable sunucusu verilebilir.
+"""
+
+import asyncio
+import base64
+import os
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Optional, List, Dict, Any, Callable, Awaitable, Iterable
+from urllib.parse import quote
+import httpx
+import airtable_client
+from airtable_client import (
+    BATCH_FORMULA_SIZE,
+    BRANDS_CACHE_TTL,
+    MANUAL_SEARCH_LIMIT,
+    PHOTO_FIELD,
+    PRODUCT_FIELDS,
+    BRAND_FIELDS,
+    projection,
+    barcode_formula,
+    barcodes_formula,
+    barcode_prefix_formula,
+    sku_search_formula,
+    day_formula
+)
+from catalog_index import normalize_barcode
+from rate_limiter import get_bucket, MAX_THROTTLE_RETRIES, MAX_THROTTLE_BACKOFF
+from stok_tracker import StokTracker, today_str
+from stats_aggregator import DailyStats, STATUS_FIELD, empty_stats
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ENDPOINT = 'https://api.airtable.com'
+
+# Ek yükleme (uploadAttachment) ayrı bir alan adında çalışır
+DEFAULT_CONTENT_ENDPOINT = 'https://content.airtable.com'
+
+# Airtable'ın sayfa başına en fazla kayıt sayısı
+PAGE_SIZE = 100
+
+CATEGORIES = ('OF', 'GN', 'LN')
+
+
+def make_http_client(
+    transport: Optional[httpx.AsyncBaseTransport] = None,
+    max_connections: int = 20,
+    timeout: float = 30.0
+) -> httpx.AsyncClient:
+    """
+    Kategoriler arasında paylaşılacak keep-alive HTTP istemcisi
+
+    Args:
+        transport: Özel transport (test için httpx.MockTransport)
+        max_connections: Havuzdaki en fazla bağlantı
+        timeout: İstek zaman aşımı (saniye)
+
+    Returns:
+        httpx.AsyncClient
+    """
+    return httpx.AsyncClient(
+        transport=transport,
+        timeout=timeout,
+        limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+    )
+
+
+class AsyncAirtableClient:
+    """Tek kategori (base) için asenkron Airtable istemcisi"""
+
+    def __init__(
+        self,
+        category: str = 'OF',
+        http: Optional[httpx.AsyncClient] = None,
+        endpoint_url: Optional[str] = None
+    ):
+        """
+        Args:
+            category: 'OF' (Optik) | 'GN' (Güneş) | 'LN' (Lens)
+            http: Paylaşılan httpx.AsyncClient (None ise kendi havuzunu açar)
+            endpoint_url: Airtable API adresi (varsayılan: AIRTABLE_ENDPOINT_URL veya api.airtable.com)
+        """
+        token = os.getenv('AIRTABLE_TOKEN')
+
+        # Kategoriye göre base_id seç
+        base_mapping = {
+            'OF': os.getenv('AIRTABLE_BASE_OPTIK'),
+            'GN': os.getenv('AIRTABLE_BASE_GUNES'),
+            'LN': os.getenv('AIRTABLE_BASE_LENS')
+        }
+
+        base_id = base_mapping.get(category)
+
+        if not token:
+            raise ValueError("AIRTABLE_TOKEN .env dosyasında tanımlanmalı!")
+
+        if not base_id:
+            raise ValueError(f"Kategori '{category}' için AIRTABLE_BASE_{category} .env dosyasında tanımlanmalı!")
+
+        self.category = category
+        self.base_id = base_id
+        self.endpoint_url = (endpoint_url or os.getenv('AIRTABLE_ENDPOINT_URL', DEFAULT_ENDPOINT)).rstrip('/')
+        # Sahte sunucu verilmişse ekler de ona gider
+        self.content_url = DEFAULT_CONTENT_ENDPOINT if self.endpoint_url == DEFAULT_ENDPOINT else self.endpoint_url
+        self._token = token
+        self._owns_http = http is None
+        self.http = http or make_http_client()
+
+        # Senkron istemciyle aynı base bütçesi
+        shared = os.getenv('RATE_LIMIT_SHARED', 'true').lower() == 'true'
+        self.rate_limiter = get_bucket(
+            base_id,
+            state_dir=os.path.join(airtable_client.DATA_DIR, 'ratelimit') if shared else None
+        )
+
+        # Marka listesi önbelleği (get_all_brands, get_brand_code)
+        self._brands_cache: Optional[Dict[str, Any]] = None
+        self._brands_ttl = float(os.getenv('BRANDS_CACHE_TTL', BRANDS_CACHE_TTL))
+
+        # Senkron istemciyle (ve diğer worker'larla) aynı sayaç dosyaları
+        self.daily_stats = DailyStats(
+            os.path.join(airtable_client.DATA_DIR, 'stats', f"stats-{category}-{base_id}.sqlite3")
+        )
+        self.stok_tracker = StokTracker(
+            reseed_interval=float(os.getenv('STOK_RESEED_INTERVAL', '300')),
+            db_path=os.path.join(airtable_client.DATA_DIR, 'stok', f"stok-{category}-{base_id}.sqlite3")
+        )
+        # write_lock thread'e bağlıdır (RLock): hep aynı thread'de alınıp bırakılır,
+        # bu süreçteki coroutine'ler önce asyncio kilidinde sıralanır
+        self._stok_lock = asyncio.Lock()
+        self._lock_thread = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"stok-lock-{category}")
+
+    async def aclose(self) -> None:
+        """Kendi açtığı bağlantı havuzunu kapat"""
+        self._lock_thread.shutdown(wait=False)
+        if self._owns_http:
+            await self.http.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
+
+    # ========== HTTP ==========
+
+    def _url(self, table: str, record_id: Optional[str] = None) -> str:
+        url = f"{self.endpoint_url}/v0/{self.base_id}/{quote(table, safe='')}"
+        if record_id:
+            url += f"/{record_id}"
+        return url
+
+    async def _request(self, method: str, table: str, record_id: Optional[str] = None, **kwargs) -> Dict[str, Any]:
+        """Tablo uç noktasına istek at (bkz. _send)"""
+        return await self._send(method, self._url(table, record_id), **kwargs)
+
+    async def _send(self, method: str, url: str, **kwargs) -> Dict[str, Any]:
+        """Token bucket'tan geçerek istek at; 429'da Retry-After kadar bekleyip tekrar dene"""
+        headers = {'Authorization': f"Bearer {self._token}"}
+        attempt = 0
+        while True:
+            await self.rate_limiter.acquire_async()
+            response = await self.http.request(method, url, headers=headers, **kwargs)
+            if response.status_code == 429 and attempt < MAX_THROTTLE_RETRIES:
+                try:
+                    delay = float(response.headers.get('Retry-After'))
+                except (TypeError, ValueError):
+                    delay = min(2 ** attempt, MAX_THROTTLE_BACKOFF)
+                attempt += 1
+                logger.warning(f"Airtable 429: {delay:.1f}s bekleniyor (deneme {attempt})")
+                await self.rate_limiter.penalize_async(delay)
+                continue
+            response.raise_for_status()
+            return response.json()
+
+    async def _all(
+        self,
+        table: str,
+        formula: Optional[str] = None,
+        fields: Optional[List[str]] = None,
+        max_records: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """Tablodaki eşleşen tüm kayıtlar (offset ile sayfalayarak)"""
+        params: List = [('pageSize', PAGE_SIZE)]
+        if formula:
+            params.append(('filterByFormula', formula))
+        if max_records:
+            params.append(('maxRecords', max_records))
+        for field in fields or []:
+            params.append(('fields[]', field))
+
+        records: List[Dict[str, Any]] = []
+        offset = None
+        while True:
+            page_params = params + ([('offset', offset)] if offset else [])
+            data = await self._request('GET', table, params=page_params)
+            records.extend(data.get('records', []))
+            offset = data.get('offset')
+            if not offset or (max_records and len(records) >= max_records):
+                break
+        return records[:max_records] if max_records else records
+
+    # ========== BARKOD ARAMA ==========
+
+    async def search_by_barcode(self, barkod: str) -> List[Dict[str, Any]]:
+        """
+        Urun_Katalogu tablosunda barkod ara
+
+        Args:
+            barkod: Aranan barkod (string)
+
+        Returns:
+            List[Dict]: Bulunan ürün kayıtları
+        """
+        try:
+            return await self._all('Urun_Katalogu', formula=barcode_formula(barkod), **projection(PRODUCT_FIELDS))
+        except Exception as e:
+            logger.error("Barkod arama hatası", extra={'barkod': barkod, 'error': str(e)})
+            return []
+
+    async def search_by_barcodes(self, barkodlar: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Birden fazla barkodu OR(...) sorgularıyla ara (parçalar paralel gönderilir)
+
+        Args:
+            barkodlar: Aranan barkodlar
+
+        Returns:
+            Dict[str, List[Dict]]: barkod → bulunan ürün kayıtları
+        """
+        unique = list(dict.fromkeys(normalize_barcode(b) for b in barkodlar if normalize_barcode(b)))
+        results: Dict[str, List[Dict[str, Any]]] = {b: [] for b in unique}
+        chunks = [unique[i:i + BATCH_FORMULA_SIZE] for i in range(0, len(unique), BATCH_FORMULA_SIZE)]
+
+        pages = await asyncio.gather(
+            *(
+                self._all('Urun_Katalogu', formula=barcodes_formula(chunk), **projection(PRODUCT_FIELDS))
+                for chunk in chunks
+            ),
+            return_exceptions=True
+        )
+
+        for chunk, records in zip(chunks, pages):
+            if isinstance(records, Exception):
+                logger.error("Toplu barkod arama hatası", extra={'count': len(chunk), 'error': str(records)})
+                continue
+            for record in records:
+                key = normalize_barcode(record['fields'].get('Tedarikçi Barkodu'))
+                if key in results:
+                    results[key].append(record)
+
+        return results
+
+    async def fuzzy_search_barcode(self, barkod: str, min_length: int = 10) -> List[Dict[str, Any]]:
+        """
+        Fuzzy arama - barkodun ilk N hanesine göre ara
+
+        Args:
+            barkod: Aranan barkod
+            min_length: Karşılaştırılacak minimum hane sayısı
+
+        Returns:
+            List[Dict]: Potansiyel eşleşmeler
+        """
+        if len(barkod) < min_length:
+            return []
+
+        try:
+            return await self._all(
+                'Urun_Katalogu',
+                formula=barcode_prefix_formula(barkod[:min_length]),
+                **projection(PRODUCT_FIELDS)
+            )
+        except Exception as e:
+            logger.error("Fuzzy arama hatası", extra={'barkod': barkod, 'error': str(e)})
+            return []
+
+    # ========== SKU İŞLEMLERİ ==========
+
+    async def get_sku_details(self, sku_record_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Urun_Katalogu tablosundan ürün detaylarını getir
+
+        Args:
+            sku_record_id: Airtable record ID (rec...)
+
+        Returns:
+            Dict: SKU detayları veya None
+        """
+        try:
+            record = await self._request('GET', 'Urun_Katalogu', sku_record_id)
+            return record['fields']
+        except Exception as e:
+            logger.error("SKU detay hatası", extra={'sku_record_id': sku_record_id, 'error': str(e)})
+            return None
+
+    async def create_new_sku(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Urun_Katalogu tablosuna yeni ürün ekle (liste dışı ürünler için)
+
+        Args:
+            data: Ürün verileri (AirtableClient.create_new_sku ile aynı alanlar)
+
+        Returns:
+            Dict: {success: bool, record_id: str, sku: str, error: str}
+        """
+        try:
+            # SKU formatı: Kategori-Marka_Kodu-Model_Kodu-Renk_Kodu-Ekartman
+            marka_id = data.get('Marka')[0] if isinstance(data.get('Marka'), list) else data.get('Marka')
+            marka_kodu = await self.get_brand_code(marka_id)
+            sku = f"{data.get('Kategori')}-{marka_kodu}-{data.get('Model_Kodu')}-{data.get('Renk_Kodu')}-{data.get('Ekartman')}"
+
+            # SKU alanı formula olduğu için eklenmez; Durum varsayılan olarak Aktif
+            if 'Durum' not in data:
+                data['Durum'] = 'Aktif'
+
+            record = await self._request('POST', 'Urun_Katalogu', json={'fields': data})
+            return {
+                'success': True,
+                'record_id': record['id'],
+                'sku': sku,
+                'data': record['fields']
+            }
+        except Exception as e:
+            logger.error("Yeni SKU oluşturma hatası", extra={'data': data, 'error': str(e)})
+            return {
+                'success': False,
+                'error': str(e)
+            }
+
+    async def search_sku_by_term(
+        self,
+        search_term: str,
+        context_brand: Optional[str] = None,
+        context_category: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Urun_Katalogu tablosunda manuel arama (ilk 20 sonuç)
+
+        Args:
+            search_term: Arama terimi
+            context_brand: Marka filtresi (record ID)
+            context_category: Kategori filtresi (OF/GN/LN)
+
+        Returns:
+            List[Dict]: Bulunan SKU kayıtları
+        """
+        try:
+            formula = sku_search_formula(search_term, context_brand, context_category)
+            return await self._all(
+                'Urun_Katalogu',
+                formula=formula,
+                max_records=MANUAL_SEARCH_LIMIT,
+                **projection(PRODUCT_FIELDS)
+            )
+        except Exception as e:
+            logger.error("Manuel arama hatası", extra={'search_term': search_term, 'error': str(e)})
+            return []
+
+    # ========== SAYIM KAYDI ==========
+
+    async def create_sayim_record(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Sayim_Kayitlari tablosuna yeni kayıt ekle
+
+        Returns:
+            Dict: {success: bool, record_id: str, data: dict, error: str}
+        """
+        try:
+            record = await self._request('POST', 'Sayim_Kayitlari', json={'fields': data})
+            await asyncio.to_thread(self.daily_stats.record, data.get(STATUS_FIELD))
+            return {
+                'success': True,
+                'record_id': record['id'],
+                'data': record['fields']
+            }
+        except Exception as e:
+            logger.error("Sayım kaydı oluşturma hatası", extra={'error': str(e)})
+            return {
+                'success': False,
+                'error': str(e)
+            }
+
+    async def update_sayim_record(self, record_id: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Mevcut sayım kaydını güncelle
+
+        Returns:
+            Dict: {success: bool, record_id: str, data: dict}
+        """
+        try:
+            record = await self._request('PATCH', 'Sayim_Kayitlari', record_id, json={'fields': data})
+            return {
+                'success': True,
+                'record_id': record['id'],
+                'data': record['fields']
+            }
+        except Exception as e:
+            logger.error("Sayım kaydı güncelleme hatası", extra={'record_id': record_id, 'error': str(e)})
+            return {
+                'success': False,
+                'error': str(e)
+            }
+
+    async def upload_sayim_photo(
+        self,
+        record_id: str,
+        filename: str,
+        content: bytes,
+        content_type: str = 'image/jpeg'
+    ) -> Dict[str, Any]:
+        """
+        Sayım kaydının Fotograf alanına dosya ekle (uploadAttachment uç noktası)
+
+        Args:
+            record_id: Sayim_Kayitlari record ID
+            filename: Dosya adı
+            content: Dosya içeriği (en fazla 5 MB)
+            content_type: MIME türü
+
+        Returns:
+            Dict: {success: bool, url: str}
+        """
+        try:
+            url = f"{self.content_url}/v0/{self.base_id}/{record_id}/{quote(PHOTO_FIELD, safe='')}/uploadAttachment"
+            result = await self._send('POST', url, json={
+                'contentType': content_type,
+                'filename': filename,
+                'file': base64.b64encode(content).decode('ascii')
+            })
+            # Yanıttaki alanlar alan ID'si ile döner; tek alan istendi
+            attachments = next(iter(result.get('fields', {}).values()), [])
+            return {
+                'success': True,
+                'url': attachments[-1]['url'] if attachments else None
+            }
+        except Exception as e:
+            logger.error("Fotoğraf yükleme hatası", extra={'record_id': record_id, 'error': str(e)})
+            return {
+                'success': False,
+                'error': str(e)
+            }
+
+    # ========== STOK YÖNETİMİ ==========
+
+    async def seed_stok_tracker(self, force: bool = False) -> bool:
+        """
+        Günlük sayaçları ve stok eşlemesini Airtable'dan tohumla
+
+        Args:
+            force: Süre dolmamış olsa da yeniden tohumla
+
+        Returns:
+            bool: Tohumlama yapıldı mı?
+        """
+        day = today_str()
+        if not force and not await asyncio.to_thread(self.stok_tracker.needs_seed, day):
+            return False
+
+        async with self._stok_write_lock():
+            if not force and not await asyncio.to_thread(self.stok_tracker.needs_seed, day):
+                return False
+
+            sayim_records, stok_records = await asyncio.gather(
+                self._all('Sayim_Kayitlari', formula=day_formula(day), **projection(['SKU'])),
+                self._all('Stok_Kalemleri', **projection(['SKU', 'Mevcut_Miktar']))
+            )
+            await asyncio.to_thread(self.stok_tracker.seed, day, sayim_records, stok_records)
+
+        logger.info(f"Stok sayaçları tohumlandı: {len(sayim_records)} sayım, {len(stok_records)} stok kalemi")
+        return True
+
+    async def update_stok_from_sayim(self, sku_id: str, konum: Optional[str] = None) -> bool:
+        """
+        Sayım sonrası stok kalemini güncelle (yoksa oluştur)
+
+        Başarısız olursa sayaç artışı geri alınır; çağıran çift sayım
+        yapmadan tekrar deneyebilir.
+
+        Args:
+            sku_id: SKU record ID
+            konum: Ürün konumu (opsiyonel)
+
+        Returns:
+            bool: Başarılı mı?
+        """
+        counted = False
+        try:
+            await self.seed_stok_tracker()
+
+            count = await asyncio.to_thread(self.stok_tracker.increment, sku_id)
+            counted = True
+            logger.info(f"Stok güncelleme: {sku_id} için bugün {count} adet sayıldı")
+
+            return await self._write_stok_update(sku_id, konum)
+
+        except Exception as e:
+            logger.error("Stok güncelleme hatası", extra={'sku_id': sku_id, 'error': str(e)})
+            if counted:
+                await asyncio.to_thread(self.stok_tracker.increment, sku_id, -1)
+            return False
+
+    async def _write_stok_update(self, sku_id: str, konum: Optional[str]) -> bool:
+        """Stok kalemini kilit içinde güncelle/oluştur (AirtableClient._write_stok_update ile aynı)"""
+        today = today_str()
+        tracker = self.stok_tracker
+
+        async with self._stok_write_lock():
+            count = await asyncio.to_thread(tracker.count, sku_id)
+            target = await asyncio.to_thread(tracker.bump_mevcut, sku_id)
+            if target is None:
+                created = await self._request('POST', 'Stok_Kalemleri', json={'fields': {
+                    'SKU': [sku_id],
+                    'Konum': konum or 'Genel',
+                    'Son_Sayim_Tarihi': today,
+                    'Son_Sayim_Miktari': count,
+                    'Mevcut_Miktar': 1  # İlk sayımda 1 adet
+                }})
+                await asyncio.to_thread(tracker.set_stok_record, sku_id, created['id'], 1)
+                logger.info(f"Yeni stok kalemi oluşturuldu: {sku_id} → 1 adet")
+                return True
+
+            record_id, mevcut = target
+            update_data = {
+                'Son_Sayim_Tarihi': today,
+                'Son_Sayim_Miktari': count,
+                'Mevcut_Miktar': mevcut
+            }
+            if konum:
+                update_data['Konum'] = konum
+
+            try:
+                await self._request('PATCH', 'Stok_Kalemleri', record_id, json={'fields': update_data})
+            except Exception:
+                # Yazılamayan artışı geri al, önbellek Airtable ile tutarlı kalsın
+                await asyncio.to_thread(tracker.bump_mevcut, sku_id, -1)
+                raise
+
+        logger.info(f"Stok güncellendi: {sku_id} → Mevcut: {mevcut}, Bugün: {count}")
+        return True
+
+    @asynccontextmanager
+    async def _stok_write_lock(self):
+        """StokTracker.write_lock'u event loop'u bloklamadan tut (flock thread'de beklenir)"""
+        loop = asyncio.get_running_loop()
+        lock = self.stok_tracker.write_lock
+        async with self._stok_lock:
+            await loop.run_in_executor(self._lock_thread, lock.__enter__)
+            try:
+                yield
+            finally:
+                await loop.run_in_executor(self._lock_thread, lock.__exit__, None, None, None)
+
+    # ========== İSTATİSTİKLER ==========
+
+    async def get_today_stats(self) -> Dict[str, Any]:
+        """
+        Bugünün sayım istatistiklerini getir
+
+        Sayaçlar senkron istemciyle paylaşılır (periyodik uzlaştırmayı onun
+        arka plan görevi yapar); günün kayıtları sadece sayaçlar bu gün için
+        hiç uzlaştırılmadıysa çekilir.
+
+        Returns:
+            Dict: {total, direkt, belirsiz, bulunamadi, direkt_oran}
+        """
+        try:
+            if await asyncio.to_thread(self.daily_stats.needs_reconcile):
+                await self.reconcile_stats()
+            return await asyncio.to_thread(self.daily_stats.snapshot)
+
+        except Exception as e:
+            logger.error("İstatistik hatası", extra={'error': str(e)})
+            return empty_stats()
+
+    async def reconcile_stats(self) -> int:
+        """
+        Paylaşılan sayaçları Airtable'daki bugünün kayıtlarıyla uzlaştır
+
+        DailyStats.reconcile (kilit ve çekim sırasında yazılanların sayımı
+        dahil) bir thread'de çalışır; çekim o thread'den event loop'a
+        gönderilen istekle yapılır.
+
+        Returns:
+            int: Çekilen kayıt sayısı
+        """
+        loop = asyncio.get_running_loop()
+        day = today_str()
+
+        def fetch() -> List[Dict[str, Any]]:
+            request = self._all('Sayim_Kayitlari', formula=day_formula(day), **projection([STATUS_FIELD]))
+            return asyncio.run_coroutine_threadsafe(request, loop).result()
+
+        return await asyncio.to_thread(self.daily_stats.reconcile, day, fetch)
+
+    # ========== MARKALAR ==========
+
+    async def get_all_brands(self) -> List[Dict[str, Any]]:
+        """
+        Tüm markaları listele (BRANDS_CACHE_TTL süresince önbellekten)
+
+        Returns:
+            List[Dict]: {id, kod, ad, kategori}
+        """
+        cache = self._brands_cache
+        if cache is not None and time.time() < cache['expires_at']:
+            return list(cache['brands'])
+
+        try:
+            records = await self._all('Markalar', **projection(BRAND_FIELDS))
+
+            brands = [
+                {
+                    'id': record['id'],
+                    'kod': record['fields'].get('Marka Kodu', ''),
+                    'ad': record['fields'].get('Marka Adı', ''),
+                    'kategori': record['fields'].get('Kategori', [])
+                }
+                for record in records
+                # Sadece Marka Adı olan kayıtları al
+                if record['fields'].get('Marka Adı')
+            ]
+
+            # Marka adına göre sırala
+            brands.sort(key=lambda x: x['ad'])
+            self._brands_cache = {'brands': brands, 'expires_at': time.time() + self._brands_ttl}
+            return list(brands)
+
+        except Exception as e:
+            logger.error("Marka listesi hatası", extra={'error': str(e)})
+            return []
+
+    def invalidate_brands(self) -> None:
+        """Marka listesi önbelleğini boşalt"""
+        self._brands_cache = None
+
+    async def get_brand_code(self, marka_id: str) -> str:
+        """
+        Marka kodunu önce marka önbelleğinden, yoksa Airtable'dan çöz
+
+        Args:
+            marka_id: Markalar record ID
+
+        Returns:
+            str: Marka kodu (bulunamazsa 'XX')
+        """
+        for brand in await self.get_all_brands():
+            if brand['id'] == marka_id and brand['kod']:
+                return brand['kod']
+
+        # Önbellekte olmayan (ör. adı girilmemiş) marka
+        fields = (await self._request('GET', 'Markalar', marka_id))['fields']
+        return fields.get('Marka Kodu') or fields.get('Marka_Kodu') or 'XX'
+
+    # ========== YARDIMCI FONKSİYONLAR ==========
+
+    async def health_check(self) -> bool:
+        """
+        Airtable bağlantısını test et
+
+        Returns:
+            bool: Bağlantı sağlıklı mı?
+        """
+        try:
+            await self._request('GET', 'Markalar', params=[('maxRecords', 1), ('pageSize', 1)])
+            return True
+        except Exception as e:
+            logger.error("Health check başarısız", extra={'category': self.category, 'error': str(e)})
+            return False
+
+
+# ========== ÇOKLU BASE ==========
+
+async def fan_out(
+    func: Callable[[AsyncAirtableClient], Awaitable[Any]],
+    categories: Iterable[str] = CATEGORIES,
+    http: Optional[httpx.AsyncClient] = None,
+    endpoint_url: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Aynı işlemi birden fazla kategoride aynı anda çalıştır
+
+    Örnek:
+        results = await fan_out(lambda c: c.health_check())
+
+    Args:
+        func: Her kategori istemcisi için çağrılacak coroutine fonksiyonu
+        categories: Kategoriler (varsayılan: OF, GN, LN)
+        http: Paylaşılan httpx.AsyncClient (None ise geçici havuz açılır)
+        endpoint_url: Airtable API adresi
+
+    Returns:
+        Dict[str, Any]: kategori → sonuç (hata olursa Exception nesnesi)
+    """
+    categories = list(categories)
+    owns_http = http is None
+    http = http or make_http_client()
+    try:
+        clients = [AsyncAirtableClient(cat, http=http, endpoint_url=endpoint_url) for cat in categories]
+        results = await asyncio.gather(*(func(client) for client in clients), return_exceptions=True)
+        return dict(zip(categories, results))
+    finally:
+        if owns_http:
+            await http.aclose()
@@ -0,0 +1,64 @@
+"""
+Arka Plan Görevleri - Konyalı Optik Sayım Sistemi
+Periyodik çalışan daemon thread yardımcıları
+"""
+
+import threading
+import logging
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicTask:
+    """
+    Bir fonksiyonu sabit aralıklarla daemon thread'de çalıştırır
+
+    Fonksiyon hata fırlatırsa loglanır ve bir sonraki turda tekrar denenir;
+    döngü durmaz.
+    """
+
+    def __init__(self, name: str, interval: float, func: Callable[[], None]):
+        """
+        Args:
+            name: Thread adı (loglarda görünür)
+            interval: Çalıştırmalar arası bekleme (saniye)
+            func: Çalıştırılacak fonksiyon
+        """
+        self.name = name
+        self.interval = interval
+        self.func = func
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        # start() istek thread'lerinden de çağrılır; kontrol + başlatma atomik olmalı
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """Döngüyü başlat (zaten çalışıyorsa bir şey yapmaz)"""
+        with self._lock:
+            if self.running:
+                return
+
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+        logger.info(f"Arka plan görevi başlatıldı: {self.name} ({self.interval}s)")
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Döngüyü durdur ve thread'in bitmesini bekle"""
+        with self._lock:
+            self._stop.set()
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            thread.join(timeout)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.func()
+            except Exception as e:
+                logger.error(f"Arka plan görevi hatası: {self.name}", extra={'error': str(e)})
@@ -0,0 +1,277 @@
+"""
+Katalog İndeksi - Konyalı Optik Sayım Sistemi
+Urun_Katalogu ve Markalar kayıtlarının bellek içi (in-process) indeksi
+
+Her okutmada Airtable'a formül sorgusu atmak yerine, katalog bir kez
+yüklenir ve barkod → ürün kayıtları eşlemesi bellekte tutulur.
+Direkt ve çoklu eşleşme yolları böylece ağ çağrısı olmadan çalışır.
+Sonraki değişiklikler AirtableClient.sync_catalog() ile delta olarak uygulanır.
+"""
+
+import threading
+import time
+from typing import Dict, List, Any, Optional, Iterable, Set, Tuple
+from prefix_index import BarcodePrefixIndex
+from search_index import SearchIndex, MAX_RESULTS
+from fuzzy_index import FuzzyCodeIndex
+
+
+BARCODE_FIELD = 'Tedarikçi Barkodu'
+
+
+def normalize_barcode(value: Any) -> str:
+    """
+    Barkod değerini indeks anahtarına çevir
+
+    Airtable'da barkod alanı bazı kayıtlarda sayı olarak dönebiliyor
+    (ör. 8056597412261.0). Arama formülündeki `OR(... = '...', ... = 123)`
+    davranışını korumak için hepsi aynı metin anahtarına indirgenir.
+
+    Args:
+        value: Alan değeri (str, int, float veya None)
+
+    Returns:
+        Normalize edilmiş barkod (boş string olabilir)
+    """
+    if value is None:
+        return ''
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip()
+
+
+class CatalogIndex:
+    """Urun_Katalogu (barkod indeksi) ve Markalar için thread-safe bellek deposu"""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._records: Dict[str, Dict[str, Any]] = {}
+        self._by_barcode: Dict[str, List[Dict[str, Any]]] = {}
+        self._prefix = BarcodePrefixIndex()
+        self._search = SearchIndex()
+        self._fuzzy = FuzzyCodeIndex()
+        self._brands: Dict[str, Dict[str, Any]] = {}
+        self.loaded = False
+        self.loaded_at: Optional[float] = None
+        # Ürün kayıtları her değiştiğinde artar (türetilmiş önbellekler için)
+        self.version = 0
+        # Marka kayıtları her değiştiğinde artar
+        self.brands_version = 0
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def load(self, records: Iterable[Dict[str, Any]]) -> None:
+        """
+        İndeksi verilen kayıtlarla baştan kur
+
+        Args:
+            records: Urun_Katalogu kayıtları ({id, fields})
+        """
+        new_records: Dict[str, Dict[str, Any]] = {}
+        new_by_barcode: Dict[str, List[Dict[str, Any]]] = {}
+
+        for record in records:
+            new_records[record['id']] = record
+            barkod = normalize_barcode(record['fields'].get(BARCODE_FIELD))
+            if barkod:
+                new_by_barcode.setdefault(barkod, []).append(record)
+
+        new_prefix = BarcodePrefixIndex(new_by_barcode)
+        new_search = SearchIndex(new_records.values())
+        new_fuzzy = FuzzyCodeIndex(new_records.values())
+
+        with self._lock:
+            self._records = new_records
+            self._by_barcode = new_by_barcode
+            self._prefix = new_prefix
+            self._search = new_search
+            self._fuzzy = new_fuzzy
+            self.version += 1
+            self.loaded = True
+            self.loaded_at = time.time()
+
+    def upsert(self, record: Dict[str, Any]) -> None:
+        """
+        Tek bir kaydı ekle veya güncelle (ör. create_new_sku sonrası)
+
+        Args:
+            record: Urun_Katalogu kaydı ({id, fields})
+        """
+        with self._lock:
+            self._discard(record['id'])
+            self.version += 1
+            self._records[record['id']] = record
+            self._search.add(record)
+            self._fuzzy.add(record)
+            barkod = normalize_barcode(record['fields'].get(BARCODE_FIELD))
+            if barkod:
+                self._by_barcode.setdefault(barkod, []).append(record)
+                self._prefix.add(barkod)
+
+    def remove(self, record_id: str) -> None:
+        """
+        Kaydı indeksten çıkar
+
+        Args:
+            record_id: Airtable record ID
+        """
+        with self._lock:
+            self._discard(record_id)
+            self.version += 1
+
+    def record_ids(self) -> Set[str]:
+        """İndeksteki tüm ürün kayıt ID'leri (silme uzlaştırması için)"""
+        with self._lock:
+            return set(self._records)
+
+    def records(self) -> List[Dict[str, Any]]:
+        """İndeksteki tüm ürün kayıtları (anlık görüntü yazmak için)"""
+        with self._lock:
+            return list(self._records.values())
+
+    def get(self, barkod: str) -> List[Dict[str, Any]]:
+        """
+        Barkoda ait kayıtları döndür
+
+        Args:
+            barkod: Aranan barkod
+
+        Returns:
+            List[Dict]: Bulunan ürün kayıtları (yükleme sırasıyla)
+        """
+        with self._lock:
+            return list(self._by_barcode.get(normalize_barcode(barkod), ()))
+
+    def search_prefix(self, prefix: str) -> List[Dict[str, Any]]:
+        """
+        Barkodu verilen önekle başlayan kayıtlar (FIND(...) = 1 karşılığı)
+
+        Args:
+            prefix: Barkod öneki (ör. ilk 10 hane)
+
+        Returns:
+            List[Dict]: Ürün kayıtları (barkod sırasıyla)
+        """
+        with self._lock:
+            return [r for b in self._prefix.prefix(prefix) for r in self._by_barcode[b]]
+
+    def search_near(self, prefix: str, max_distance: int = 1) -> List[Dict[str, Any]]:
+        """
+        Barkod öneki en fazla `max_distance` düzenleme uzaklıkta olan kayıtlar
+
+        Yanlış okunan/girilen haneleri yakalamak için kullanılır; mesafe 0
+        sonuçlar `search_prefix` ile aynıdır.
+
+        Args:
+            prefix: Barkod öneki
+            max_distance: İzin verilen en fazla düzenleme
+
+        Returns:
+            List[Dict]: Ürün kayıtları (önce mesafeye, sonra barkoda göre)
+        """
+        with self._lock:
+            matches = self._prefix.within_distance(prefix, max_distance)
+            matches.sort(key=lambda m: m[1])
+            return [r for b, _ in matches for r in self._by_barcode[b]]
+
+    def search_text(
+        self,
+        term: str,
+        brand: Optional[str] = None,
+        category: Optional[str] = None,
+        limit: int = MAX_RESULTS
+    ) -> List[Dict[str, Any]]:
+        """
+        Manuel arama: model kodu, model adı, renk kodu, SKU, arama kelimeleri
+        veya barkodda `term` geçen kayıtlar (search_sku_by_term karşılığı)
+
+        Args:
+            term: Arama terimi
+            brand: Marka filtresi (record ID)
+            category: Kategori filtresi (OF/GN/LN)
+            limit: En fazla sonuç
+
+        Returns:
+            List[Dict]: Ürün kayıtları (en iyi eşleşme önce)
+        """
+        with self._lock:
+            return self._search.search(term, brand=brand, category=category, limit=limit)
+
+    def search_fuzzy(
+        self,
+        term: str,
+        brand: Optional[str] = None,
+        category: Optional[str] = None,
+        limit: int = MAX_RESULTS,
+        max_distance: Optional[int] = None
+    ) -> List[Tuple[Dict[str, Any], int]]:
+        """
+        Yazım hatası toleranslı arama: model kodu / SKU'su `term`e yakın kayıtlar
+
+        Args:
+            term: Arama terimi (ör. 'RB214O')
+            brand: Marka filtresi (record ID)
+            category: Kategori filtresi (OF/GN/LN)
+            limit: En fazla sonuç
+            max_distance: En fazla düzenleme (None = sorgu uzunluğuna göre)
+
+        Returns:
+            List[Tuple[Dict, int]]: (ürün kaydı, düzenleme mesafesi) - yakın olan önce
+        """
+        with self._lock:
+            return self._fuzzy.search(term, brand=brand, category=category, limit=limit, max_distance=max_distance)
+
+    # ========== MARKALAR ==========
+
+    def load_brands(self, records: Iterable[Dict[str, Any]]) -> None:
+        """Markalar tablosunu baştan yükle"""
+        brands = {record['id']: record for record in records}
+        with self._lock:
+            self._brands = brands
+            self.brands_version += 1
+
+    def upsert_brand(self, record: Dict[str, Any]) -> None:
+        """Tek bir marka kaydını ekle veya güncelle"""
+        with self._lock:
+            self._brands[record['id']] = record
+            self.brands_version += 1
+
+    def remove_brand(self, record_id: str) -> None:
+        """Marka kaydını sil"""
+        with self._lock:
+            if self._brands.pop(record_id, None) is not None:
+                self.brands_version += 1
+
+    def get_brand(self, record_id: str) -> Optional[Dict[str, Any]]:
+        """Marka kaydını ID ile döndür"""
+        with self._lock:
+            return self._brands.get(record_id)
+
+    def brands(self) -> List[Dict[str, Any]]:
+        """Tüm marka kayıtları"""
+        with self._lock:
+            return list(self._brands.values())
+
+    def brand_ids(self) -> Set[str]:
+        """Tüm marka kayıt ID'leri (silme uzlaştırması için)"""
+        with self._lock:
+            return set(self._brands)
+
+    def _discard(self, record_id: str) -> None:
+        """Kaydı barkod listesinden ve kayıt tablosundan sil (lock altında çağrılır)"""
+        old = self._records.pop(record_id, None)
+        if old is None:
+            return
+        self._search.remove(record_id)
+        self._fuzzy.remove(record_id)
+
+        barkod = normalize_barcode(old['fields'].get(BARCODE_FIELD))
+        bucket = self._by_barcode.get(barkod)
+        if bucket is None:
+            return
+
+        bucket[:] = [r for r in bucket if r['id'] != record_id]
+        if not bucket:
+            del self._by_barcode[barkod]
+            self._prefix.discard(barkod)
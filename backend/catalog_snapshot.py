@@ -0,0 +1,225 @@
+"""
+Katalog Anlık Görüntüsü - Konyalı Optik Sayım Sistemi
+Urun_Katalogu ve Markalar kayıtlarının diskteki sıkıştırılmış kopyası
+
+Cloud Run'da yeniden başlayan her worker, yerel eşleştirme yapabilmek
+için tüm kataloğu Airtable'dan (5 istek/sn sınırıyla, sayfa sayfa)
+tekrar çekiyordu; açılış süresi katalog büyüdükçe uzuyordu. Anlık görüntü
+her tam yüklemeden ve değişiklik getiren her delta senkronizasyondan sonra
+yazılır; açılışta diskten okunup sadece watermark'tan sonraki değişiklikler
+çekilir.
+
+Dosya biçimi (sürüm 1):
+    başlık: MAGIC (6 bayt) | biçim sürümü (uint16) | gövde uzunluğu (uint64) | SHA-256 (32 bayt)
+    gövde:  zlib ile sıkıştırılmış JSON; kayıtlar sütun bazlı tutulur
+            ({'ids': [...], 'columns': {alan: [değer | None, ...]}})
+
+Sütun düzeni alan adlarının her kayıtta tekrarlanmasını önler ve iyi
+sıkışır. Okumada sağlama toplamı, sürüm, base ve alan listesi doğrulanır;
+uymayan dosya yok sayılır ve katalog Airtable'dan tam çekilir.
+
+Değişiklik getirmeyen senkronizasyonlarda tüm dosya yeniden yazılmaz;
+ilerleyen watermark yanındaki küçük `.wm` dosyasına yazılır. Bu dosya
+anlık görüntünün `saved_at` değerini taşır ve sadece o anlık görüntüyle
+birlikte geçerlidir. Böylece sessiz bir katalogda anlık görüntü
+CATALOG_SNAPSHOT_MAX_AGE'i aşıp her açılışı tam yüklemeye çevirmez.
+"""
+
+import hashlib
+import json
+import os
+import struct
+import tempfile
+import zlib
+from typing import Dict, List, Any, Optional, Iterable
+
+MAGIC = b'KOSCAT'
+FORMAT_VERSION = 1
+
+_HEADER_FORMAT = '>6sHQ32s'
+_HEADER_SIZE = struct.calcsize(_HEADER_FORMAT)
+
+
+class SnapshotError(ValueError):
+    """Anlık görüntü dosyası bozuk veya bu sürümle uyumsuz"""
+
+
+def snapshot_path(directory: str, category: str, base_id: str) -> str:
+    """Kategori/base için anlık görüntü dosyasının yolu"""
+    return os.path.join(directory, f"catalog-{category}-{base_id}.snap")
+
+
+def encode_records(records: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Kayıtları sütun bazlı yapıya çevir
+
+    Args:
+        records: Airtable kayıtları ({id, fields})
+
+    Returns:
+        Dict: {'ids': [...], 'columns': {alan: [değer | None]}}
+    """
+    records = list(records)
+    names: Dict[str, None] = {}
+    for record in records:
+        names.update(dict.fromkeys(record['fields']))
+
+    columns = {name: [record['fields'].get(name) for record in records] for name in names}
+    return {'ids': [record['id'] for record in records], 'columns': columns}
+
+
+def decode_records(data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Sütun bazlı yapıdan kayıt listesini geri kur
+
+    Airtable boş alanları yanıtta hiç göndermediği için None değerler
+    alan yok olarak geri çevrilir.
+    """
+    columns = list(data['columns'].items())
+    records = []
+    for i, record_id in enumerate(data['ids']):
+        fields = {}
+        for name, values in columns:
+            value = values[i]
+            if value is not None:
+                fields[name] = value
+        records.append({'id': record_id, 'fields': fields})
+    return records
+
+
+def write_snapshot(path: str, snapshot: Dict[str, Any]) -> int:
+    """
+    Anlık görüntüyü atomik olarak yaz
+
+    Geçici dosya fsync edildikten sonra os.replace ile yerine konur;
+    aynı dosyayı yazan diğer worker'lar veya yarıda kalan bir yazma
+    okuyucuya bozuk dosya göstermez.
+
+    Args:
+        path: Hedef dosya
+        snapshot: {category, base_id, fields, brand_fields, watermark,
+                   last_reconcile, saved_at, products: [...], brands: [...]}
+
+    Returns:
+        int: Yazılan bayt
+    """
+    body = dict(snapshot)
+    body['products'] = encode_records(snapshot['products'])
+    body['brands'] = encode_records(snapshot['brands'])
+
+    payload = zlib.compress(
+        json.dumps(body, ensure_ascii=False, separators=(',', ':')).encode('utf-8'), 6
+    )
+    header = struct.pack(_HEADER_FORMAT, MAGIC, FORMAT_VERSION, len(payload),
+                         hashlib.sha256(payload).digest())
+
+    _replace_atomically(path, header + payload)
+    return len(header) + len(payload)
+
+
+def _replace_atomically(path: str, data: bytes) -> None:
+    """
+    Veriyi yazma başına benzersiz bir geçici dosyaya yazıp yerine koy
+
+    Geçici ad her çağrıda mkstemp ile üretilir; aynı worker'daki açılış
+    yüklemesi ile senkronizasyon thread'i aynı anda yazsa da birbirinin
+    dosyasını ezmez.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or '.',
+                                    prefix=os.path.basename(path) + '.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as tmp:
+            tmp.write(data)
+            tmp.flush()
+            os.fsync(tmp.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def read_snapshot(path: str) -> Optional[Dict[str, Any]]:
+    """
+    Anlık görüntüyü oku ve doğrula
+
+    Args:
+        path: Dosya yolu
+
+    Returns:
+        Dict: write_snapshot'a verilen yapı (dosya yoksa None)
+
+    Raises:
+        SnapshotError: Başlık, sürüm veya sağlama toplamı tutmuyorsa
+    """
+    try:
+        with open(path, 'rb') as f:
+            raw = f.read()
+    except FileNotFoundError:
+        return None
+
+    if len(raw) < _HEADER_SIZE:
+        raise SnapshotError("Dosya başlıktan kısa")
+
+    magic, version, length, digest = struct.unpack(_HEADER_FORMAT, raw[:_HEADER_SIZE])
+    if magic != MAGIC:
+        raise SnapshotError("Tanınmayan dosya")
+    if version != FORMAT_VERSION:
+        raise SnapshotError(f"Desteklenmeyen biçim sürümü: {version}")
+
+    payload = raw[_HEADER_SIZE:]
+    if len(payload) != length or hashlib.sha256(payload).digest() != digest:
+        raise SnapshotError("Sağlama toplamı tutmuyor")
+
+    try:
+        body = json.loads(zlib.decompress(payload).decode('utf-8'))
+    except (zlib.error, ValueError) as e:
+        raise SnapshotError(f"Gövde çözülemedi: {e}")
+
+    body['products'] = decode_records(body['products'])
+    body['brands'] = decode_records(body['brands'])
+    return body
+
+
+def watermark_path(path: str) -> str:
+    """Anlık görüntünün watermark dosyasının yolu"""
+    return f"{path}.wm"
+
+
+def write_watermark(path: str, saved_at: float, watermark: float, last_reconcile: Optional[float]) -> None:
+    """
+    Anlık görüntüyü yeniden yazmadan ilerleyen watermark'ı kaydet
+
+    Args:
+        path: Anlık görüntü dosyası
+        saved_at: Watermark'ın ait olduğu anlık görüntünün `saved_at` değeri
+        watermark: Anlık görüntünün bu ana kadar güncel olduğu zaman
+        last_reconcile: Son ID uzlaştırma zamanı
+    """
+    body = {'saved_at': saved_at, 'watermark': watermark, 'last_reconcile': last_reconcile}
+    _replace_atomically(watermark_path(path), json.dumps(body).encode('utf-8'))
+
+
+def read_watermark(path: str, saved_at: float) -> Optional[Dict[str, Any]]:
+    """
+    Anlık görüntüye ait watermark dosyasını oku
+
+    Args:
+        path: Anlık görüntü dosyası
+        saved_at: Okunan anlık görüntünün `saved_at` değeri
+
+    Returns:
+        Dict: {watermark, last_reconcile}; dosya yoksa, bozuksa ya da başka
+        bir anlık görüntüye aitse None
+    """
+    try:
+        with open(watermark_path(path), encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if not isinstance(data, dict) or data.get('saved_at') != saved_at:
+        return None
+    return data
@@ -0,0 +1,114 @@
+"""
+Dosya Kilidi - Konyalı Optik Sayım Sistemi
+Gunicorn worker'ları (ayrı süreçler) arasında paylaşılan dosyalar için
+advisory kilit yardımcıları
+
+POSIX'te fcntl.flock kullanılır. fcntl olmayan platformlarda (Windows
+geliştirme ortamı) kilitler no-op'tur; orada tek süreç çalıştığı varsayılır.
+"""
+
+import os
+import threading
+from contextlib import contextmanager
+from typing import Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+
+def try_lock(fd: int) -> bool:
+    """
+    Dosyayı beklemeden özel (exclusive) kilitle
+
+    Args:
+        fd: Açık dosya tanımlayıcısı
+
+    Returns:
+        bool: Kilit alındı mı? (başka süreç tutuyorsa False)
+    """
+    if fcntl is None:
+        return True
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        return True
+    except OSError:
+        return False
+
+
+def unlock(fd: int) -> None:
+    """Kilidi bırak"""
+    if fcntl is not None:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+
+
+@contextmanager
+def locked(fd: int):
+    """
+    Blok süresince dosyayı özel kilitle (gerekirse bekler)
+
+    Args:
+        fd: Açık dosya tanımlayıcısı
+    """
+    if fcntl is not None:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+    try:
+        yield
+    finally:
+        unlock(fd)
+
+
+def ensure_dir(path: str) -> str:
+    """Klasörü yoksa oluştur ve yolunu döndür"""
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+class FileLock:
+    """
+    Süreç içinde reentrant, süreçler arası özel kilit
+
+    Aynı süreçteki thread'ler RLock ile sıralanır; dosya kilidi sadece en
+    dıştaki girişte alınır. Dosya tanımlayıcısı süreç başına açılır, fork
+    sonrası çocuk süreç kilidi ebeveynle paylaşmaz.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        Args:
+            path: Kilit dosyası (None = sadece bu süreç)
+        """
+        self.path = path
+        self._lock = threading.RLock()
+        self._depth = 0
+        self._fd: Optional[int] = None
+        self._pid: Optional[int] = None
+
+    def __enter__(self) -> 'FileLock':
+        self._lock.acquire()
+        if self._depth == 0 and self.path:
+            try:
+                fd = self._open()
+                if fcntl is not None:
+                    fcntl.flock(fd, fcntl.LOCK_EX)
+            except Exception:
+                self._lock.release()
+                raise
+        self._depth += 1
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._depth -= 1
+        try:
+            if self._depth == 0 and self.path:
+                unlock(self._fd)
+        finally:
+            self._lock.release()
+
+    def _open(self) -> int:
+        if self._fd is None or self._pid != os.getpid():
+            ensure_dir(os.path.dirname(self.path) or '.')
+            self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            self._pid = os.getpid()
+        return self._fd
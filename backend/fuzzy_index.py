@@ -0,0 +1,238 @@
+"""
+Yazım Hatası Toleranslı Arama - Konyalı Optik Sayım Sistemi
+Model Kodu / SKU değerleri üzerinde BK-tree ile yakın eşleşme
+
+Manuel arama alt dize araması yapar; "RB2140" yerine "RB214O" yazan bir
+sayımcı sonuç alamaz. Burada her ürün için kısa kod anahtarları üretilir
+(model kodu, marka kodu + model kodu, SKU) ve bir BK-tree'ye eklenir.
+Sorgu, Levenshtein mesafesi eşik altında kalan anahtarları döndürür;
+ziyaret edilen düğüm sayısı sınırlandığı için süre katalog büyüklüğünden
+bağımsız olarak sınırlıdır.
+"""
+
+import re
+from typing import Dict, List, Any, Optional, Iterable, Tuple, Callable
+import Levenshtein
+from search_index import fold
+
+# Aramada ziyaret edilecek en fazla ağaç düğümü (süre sınırı)
+MAX_VISITS = 20000
+
+# Silinen anahtar oranı bunu aşınca ağaç yeniden kurulur
+REBUILD_RATIO = 0.25
+
+MAX_RESULTS = 20
+
+# Anahtar türü önceliği (küçük = önce): model kodu, marka+model, SKU
+_KIND_MODEL, _KIND_BRAND_MODEL, _KIND_SKU = 0, 1, 2
+
+_NON_ALNUM = re.compile(r'[^0-9a-z]+')
+
+
+def compact(value: Any) -> str:
+    """Katlanmış metinden harf/rakam dışındaki karakterleri at ('OF-RB 2140' → 'ofrb2140')"""
+    return _NON_ALNUM.sub('', fold(value))
+
+
+def default_max_distance(query: str) -> int:
+    """Sorgu uzunluğuna göre izin verilen düzenleme sayısı"""
+    if len(query) <= 3:
+        return 0
+    if len(query) <= 6:
+        return 1
+    return 2
+
+
+class BKTree:
+    """Burkhard-Keller ağacı (metrik: Levenshtein mesafesi)"""
+
+    def __init__(self, words: Iterable[str] = (), distance: Callable[[str, str], int] = Levenshtein.distance):
+        self._distance = distance
+        # Düğüm: [kelime, {mesafe: çocuk düğüm}]
+        self._root: Optional[list] = None
+        self._size = 0
+        for word in words:
+            self.add(word)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, word: str) -> None:
+        """Kelimeyi ekle (zaten varsa bir şey yapmaz)"""
+        if self._root is None:
+            self._root = [word, {}]
+            self._size = 1
+            return
+
+        node = self._root
+        while True:
+            d = self._distance(word, node[0])
+            if d == 0:
+                return
+            child = node[1].get(d)
+            if child is None:
+                node[1][d] = [word, {}]
+                self._size += 1
+                return
+            node = child
+
+    def search(self, word: str, max_distance: int, max_visits: int = MAX_VISITS) -> List[Tuple[str, int]]:
+        """
+        `word`e en fazla `max_distance` uzaklıktaki kelimeler
+
+        Args:
+            word: Sorgu
+            max_distance: İzin verilen en fazla düzenleme
+            max_visits: Ziyaret edilecek en fazla düğüm
+
+        Returns:
+            List[Tuple[str, int]]: (kelime, mesafe) - mesafeye göre sıralı
+        """
+        if self._root is None:
+            return []
+
+        results = []
+        stack = [self._root]
+        visits = 0
+        while stack and visits < max_visits:
+            node = stack.pop()
+            visits += 1
+            d = self._distance(word, node[0])
+            if d <= max_distance:
+                results.append((node[0], d))
+            # Üçgen eşitsizliği: sadece |d - k| <= max_distance olan çocuklar
+            for k, child in node[1].items():
+                if d - max_distance <= k <= d + max_distance:
+                    stack.append(child)
+
+        results.sort(key=lambda r: (r[1], r[0]))
+        return results
+
+
+class FuzzyCodeIndex:
+    """
+    Ürün kodları için yazım hatası toleranslı indeks (CatalogIndex kilidi altında kullanılır)
+
+    BK-tree'den silme yapılamadığı için silinen kayıtların anahtarları
+    ağaçta kalır (sahipsiz anahtarlar atlanır); oranları eşiği aşınca
+    ağaç yeniden kurulur.
+    """
+
+    def __init__(self, records: Iterable[Dict[str, Any]] = ()):
+        self._tree = BKTree()
+        # anahtar → {record ID: anahtar türü}
+        self._owners: Dict[str, Dict[str, int]] = {}
+        self._records: Dict[str, Dict[str, Any]] = {}
+        self._keys: Dict[str, List[str]] = {}
+        self._orphans = 0
+        for record in records:
+            self.add(record)
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    @staticmethod
+    def record_keys(record: Dict[str, Any]) -> Dict[str, int]:
+        """Kaydın arama anahtarları ve türleri"""
+        fields = record.get('fields', {})
+        keys: Dict[str, int] = {}
+        model = compact(fields.get('Model Kodu'))
+        sku = compact(fields.get('SKU'))
+        # Marka Kodu lookup alanı yoksa SKU'dan alınır
+        # (Kategori-Marka_Kodu-Model_Kodu-Renk_Kodu-Ekartman)
+        marka_kodu = compact(fields.get('Marka Kodu'))
+        if not marka_kodu:
+            parts = str(fields.get('SKU') or '').split('-')
+            marka_kodu = compact(parts[1]) if len(parts) > 2 else ''
+        for key, kind in ((sku, _KIND_SKU), (marka_kodu + model if model else '', _KIND_BRAND_MODEL), (model, _KIND_MODEL)):
+            if key:
+                keys[key] = min(kind, keys.get(key, kind))
+        return keys
+
+    def add(self, record: Dict[str, Any]) -> None:
+        """Kaydı ekle (aynı ID varsa eskisinin yerine geçer)"""
+        self.remove(record['id'])
+
+        keys = self.record_keys(record)
+        for key, kind in keys.items():
+            owners = self._owners.get(key)
+            if owners is None:
+                owners = self._owners[key] = {}
+                self._tree.add(key)
+            elif not owners:
+                self._orphans -= 1
+            owners[record['id']] = kind
+
+        self._records[record['id']] = record
+        self._keys[record['id']] = list(keys)
+
+    def remove(self, record_id: str) -> None:
+        """Kaydı sil"""
+        if self._records.pop(record_id, None) is None:
+            return
+        for key in self._keys.pop(record_id):
+            owners = self._owners[key]
+            owners.pop(record_id, None)
+            if not owners:
+                self._orphans += 1
+        if self._orphans > REBUILD_RATIO * max(len(self._owners), 1):
+            self._rebuild()
+
+    def search(
+        self,
+        term: str,
+        brand: Optional[str] = None,
+        category: Optional[str] = None,
+        limit: int = MAX_RESULTS,
+        max_distance: Optional[int] = None
+    ) -> List[Tuple[Dict[str, Any], int]]:
+        """
+        Kodu `term`e yakın kayıtlar
+
+        Args:
+            term: Arama terimi (ör. 'RB214O')
+            brand: Marka filtresi (record ID)
+            category: Kategori filtresi (OF/GN/LN)
+            limit: En fazla sonuç
+            max_distance: En fazla düzenleme (None = sorgu uzunluğuna göre)
+
+        Returns:
+            List[Tuple[Dict, int]]: (kayıt, mesafe) - önce mesafe, sonra anahtar türü, sonra SKU
+        """
+        query = compact(term)
+        if max_distance is None:
+            max_distance = default_max_distance(query)
+        if not query or max_distance <= 0:
+            return []
+
+        best: Dict[str, Tuple[int, int]] = {}
+        for key, distance in self._tree.search(query, max_distance):
+            for record_id, kind in self._owners.get(key, {}).items():
+                rank = (distance, kind)
+                if record_id not in best or rank < best[record_id]:
+                    best[record_id] = rank
+
+        ranked = []
+        for record_id, (distance, kind) in best.items():
+            record = self._records[record_id]
+            fields = record.get('fields', {})
+            if brand:
+                marka = fields.get('Marka') or []
+                if brand not in (marka if isinstance(marka, list) else [marka]):
+                    continue
+            if category and fields.get('Kategori') != category:
+                continue
+            ranked.append((distance, kind, fold(fields.get('SKU')), record_id))
+
+        ranked.sort()
+        return [(self._records[record_id], distance) for distance, _, _, record_id in ranked[:limit]]
+
+    def _rebuild(self) -> None:
+        records = list(self._records.values())
+        self._tree = BKTree()
+        self._owners = {}
+        self._records = {}
+        self._keys = {}
+        self._orphans = 0
+        for record in records:
+            self.add(record)
@@ -0,0 +1,46 @@
+"""
+Gunicorn Ayarları - Konyalı Optik Sayım Sistemi
+
+- preload_app: Uygulama master süreçte bir kez import edilir, worker'lar
+  fork ile kopyalanır (import maliyeti worker başına ödenmez)
+- post_fork: Her worker trafik almadan önce kendi client pool'unu kurar ve
+  katalog indekslerini yükler. Client'lar (HTTP oturumları, arka plan
+  thread'leri) fork'tan sağ çıkmadığı için master'da oluşturulmaz.
+- worker_exit: Worker kapanırken (yeniden başlatma, SIGTERM) iş kuyruğu
+  durdurulur ve bekleyen stok artışları son kez yazılır.
+
+Kullanım: gunicorn -c gunicorn.conf.py app:app
+"""
+
+import os
+
+bind = f":{os.getenv('PORT', '5000')}"
+workers = int(os.getenv('GUNICORN_WORKERS', '2'))
+threads = int(os.getenv('GUNICORN_THREADS', '4'))
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '120'))
+accesslog = '-'
+errorlog = '-'
+
+preload_app = True
+
+
+def post_fork(server, worker):
+    """Worker fork edildi: pool'u sıfırla ve kategorileri ısıt"""
+    import app as application
+
+    # Master'da yanlışlıkla kurulmuş client'lar fork sonrası kullanılamaz
+    application.clear_client_pool()
+    application.clear_health_cache()
+    application.clear_photo_pipeline()
+    application.clear_job_queue()
+
+    if os.getenv('WARM_UP_ON_START', 'true').lower() == 'true':
+        results = application.warm_up_pool()
+        server.log.info(f"Worker {worker.pid} ısıtıldı: {results}")
+
+
+def worker_exit(server, worker):
+    """Worker kapanıyor: kuyruğu durdur ve bekleyen stok artışlarını yaz"""
+    import app as application
+
+    application.shutdown_worker()
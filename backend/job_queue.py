@@ -0,0 +1,389 @@
+"""
+İş Kuyruğu - Konyalı Optik Sayım Sistemi
+SQLite'ta kalıcı, thread havuzlu arka plan iş kuyruğu
+
+/api/save-count yanıtı, sayım kaydından sonra stok güncellemesi gibi
+ardışık Airtable çağrıları bitene kadar bekliyordu. Yanıt için gerekmeyen
+işler kuyruğa yazılıp hemen dönülür; worker thread'leri işleri sırayla
+çalıştırır:
+- İşler DATA_DIR altındaki SQLite dosyasına (WAL) yazılır; süreç
+  yeniden başlarsa bekleyen işler kaybolmaz
+- Hata veren iş üstel geri çekilme (+ jitter) ile tekrar denenir;
+  deneme hakkı biten iş 'failed' olarak saklanır
+- Aynı dosyayı kullanan gunicorn worker'ları işleri BEGIN IMMEDIATE ile
+  atomik olarak sahiplenir; kilitli (lease) süresi dolan 'running' işler
+  (ör. çöken süreç) tekrar sahiplenilebilir
+- Derinlik ve gecikme (en eski hazır işin bekleme süresi) metriklerde görünür
+"""
+
+import json
+import logging
+import os
+import random
+import sqlite3
+import threading
+import time
+from typing import Dict, Any, Callable, Optional, List
+
+logger = logging.getLogger(__name__)
+
+# Bir işin en fazla deneme sayısı
+MAX_ATTEMPTS = 5
+
+# Tekrar denemeler arası bekleme: BACKOFF_BASE * 2^(deneme-1), en fazla BACKOFF_MAX (saniye)
+BACKOFF_BASE = 1.0
+BACKOFF_MAX = 300.0
+
+# Sahiplenilen iş bu süre içinde bitmezse başka worker tekrar alabilir (saniye)
+LEASE_SECONDS = 300.0
+
+# Boş kuyrukta gecikmeli işler için yoklama aralığı (saniye)
+POLL_INTERVAL = 1.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'queued',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    available_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    last_error TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_ready ON jobs (status, available_at);
+"""
+
+
+class PermanentJobError(Exception):
+    """Tekrar denemenin anlamı olmayan hata (ör. bozuk dosya); iş hemen 'failed' olur"""
+
+
+def backoff_delay(attempts: int, base: float = BACKOFF_BASE, maximum: float = BACKOFF_MAX) -> float:
+    """
+    Tekrar denemeden önce beklenecek süre
+
+    Args:
+        attempts: Şimdiye kadarki deneme sayısı (>= 1)
+
+    Returns:
+        float: Saniye (aynı anda düşen işler ayrışsın diye %50-100 arası jitter)
+    """
+    delay = min(maximum, base * (2 ** (attempts - 1)))
+    return delay * random.uniform(0.5, 1.0)
+
+
+class JobQueue:
+    """SQLite destekli, thread havuzlu kalıcı iş kuyruğu"""
+
+    def __init__(
+        self,
+        db_path: str,
+        workers: int = 2,
+        max_attempts: int = MAX_ATTEMPTS,
+        backoff_base: float = BACKOFF_BASE,
+        backoff_max: float = BACKOFF_MAX,
+        lease_seconds: float = LEASE_SECONDS,
+        poll_interval: float = POLL_INTERVAL
+    ):
+        """
+        Args:
+            db_path: SQLite dosyası (gunicorn worker'ları arasında paylaşılabilir)
+            workers: İşleri çalıştıran thread sayısı
+            max_attempts: Bir işin en fazla deneme sayısı
+            backoff_base: İlk tekrar denemeden önceki bekleme (saniye)
+            backoff_max: Bekleme üst sınırı (saniye)
+            lease_seconds: Sahiplenilen işin kilitli kalma süresi
+            poll_interval: Boş kuyrukta yoklama aralığı
+        """
+        self.db_path = db_path
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+
+        self._handlers: Dict[str, Callable[[Dict[str, Any]], None]] = {}
+        self._on_failure: Dict[str, Callable[[Dict[str, Any], str], None]] = {}
+        self._local = threading.local()
+        self._wakeup = threading.Condition()
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._lock = threading.Lock()
+        self._active = 0
+        self.stats = {'enqueued': 0, 'succeeded': 0, 'retried': 0, 'failed': 0}
+
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    # ========== BAĞLANTI ==========
+
+    def _connect(self) -> sqlite3.Connection:
+        """Thread'e özel bağlantı (sqlite3 bağlantıları thread'ler arası paylaşılmaz)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    # ========== İŞ EKLEME ==========
+
+    def register(
+        self,
+        kind: str,
+        handler: Callable[[Dict[str, Any]], None],
+        on_failure: Optional[Callable[[Dict[str, Any], str], None]] = None
+    ) -> None:
+        """
+        İş türü için çalıştırıcı kaydet
+
+        Args:
+            kind: İş türü (ör. 'stok_update')
+            handler: payload alır; hata fırlatırsa iş tekrar denenir
+            on_failure: Deneme hakkı bitince (payload, hata) ile çağrılır (ör. geçici dosyayı sil)
+        """
+        self._handlers[kind] = handler
+        if on_failure is not None:
+            self._on_failure[kind] = on_failure
+
+    def enqueue(self, kind: str, payload: Dict[str, Any], delay: float = 0, unique: bool = False) -> int:
+        """
+        İşi kuyruğa yaz
+
+        Args:
+            kind: Kayıtlı iş türü
+            payload: JSON'a çevrilebilir iş verisi
+            delay: En erken çalışma zamanı için gecikme (saniye)
+            unique: Aynı tür ve veriyle henüz başlamamış iş varsa yenisini
+                ekleme (tüm worker'larda); çalışan iş sayılmaz, başladıktan
+                sonraki değişiklikleri görmeyebilir
+
+        Returns:
+            int: İş ID'si (unique ise mevcut işin ID'si olabilir)
+        """
+        now = time.time()
+        payload_json = json.dumps(payload, ensure_ascii=False, sort_keys=unique)
+        conn = self._connect()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            if unique:
+                row = conn.execute(
+                    "SELECT id FROM jobs WHERE kind = ? AND payload = ? AND status = 'queued'",
+                    (kind, payload_json)
+                ).fetchone()
+                if row is not None:
+                    conn.execute('COMMIT')
+                    return row[0]
+            cursor = conn.execute(
+                "INSERT INTO jobs (kind, payload, created_at, available_at) VALUES (?, ?, ?, ?)",
+                (kind, payload_json, now, now + delay)
+            )
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        with self._lock:
+            self.stats['enqueued'] += 1
+        with self._wakeup:
+            self._wakeup.notify()
+        return cursor.lastrowid
+
+    # ========== WORKER'LAR ==========
+
+    @property
+    def running(self) -> bool:
+        return any(t.is_alive() for t in self._threads)
+
+    def start(self) -> None:
+        """Worker thread'lerini başlat (zaten çalışıyorsa bir şey yapmaz)"""
+        if self.running:
+            return
+        self._stop.clear()
+        self._threads = [
+            threading.Thread(target=self._worker, name=f"job-worker-{i}", daemon=True)
+            for i in range(self.workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+        logger.info(f"İş kuyruğu başlatıldı: {self.workers} worker ({self.db_path})")
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Worker'ları durdur (çalışan iş bitince çıkarlar)"""
+        self._stop.set()
+        with self._wakeup:
+            self._wakeup.notify_all()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def _worker(self) -> None:
+        while not self._stop.is_set():
+            try:
+                ran = self.run_next()
+            except Exception as e:
+                logger.error("İş kuyruğu hatası", extra={'error': str(e)})
+                ran = False
+            if not ran:
+                with self._wakeup:
+                    self._wakeup.wait(self.poll_interval)
+
+    def _claim(self) -> Optional[sqlite3.Row]:
+        """Hazır en eski işi atomik olarak sahiplen"""
+        now = time.time()
+        conn = self._connect()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute(
+                "SELECT id, kind, payload, attempts FROM jobs "
+                "WHERE (status = 'queued' AND available_at <= ?) "
+                "   OR (status = 'running' AND started_at <= ?) "
+                "ORDER BY available_at, id LIMIT 1",
+                (now, now - self.lease_seconds)
+            ).fetchone()
+            if row is not None:
+                conn.execute(
+                    "UPDATE jobs SET status = 'running', started_at = ?, attempts = attempts + 1 WHERE id = ?",
+                    (now, row[0])
+                )
+            conn.execute('COMMIT')
+            return row
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+
+    def run_next(self) -> bool:
+        """
+        Hazır bir işi çalıştır
+
+        Returns:
+            bool: Bir iş çalıştırıldı mı? (kuyruk boşsa False)
+        """
+        with self._lock:
+            self._active += 1
+        try:
+            row = self._claim()
+            if row is None:
+                return False
+            self._execute(*row)
+            return True
+        finally:
+            with self._lock:
+                self._active -= 1
+
+    def _execute(self, job_id: int, kind: str, payload_json: str, attempts: int) -> None:
+        attempts += 1
+        payload = json.loads(payload_json)
+        conn = self._connect()
+        try:
+            handler = self._handlers.get(kind)
+            if handler is None:
+                raise LookupError(f"Kayıtlı olmayan iş türü: {kind}")
+            handler(payload)
+        except Exception as e:
+            error = str(e) or type(e).__name__
+            if attempts < self.max_attempts and not isinstance(e, PermanentJobError):
+                delay = backoff_delay(attempts, self.backoff_base, self.backoff_max)
+                conn.execute(
+                    "UPDATE jobs SET status = 'queued', available_at = ?, last_error = ? WHERE id = ?",
+                    (time.time() + delay, error, job_id)
+                )
+                with self._lock:
+                    self.stats['retried'] += 1
+                logger.warning(f"İş başarısız, {delay:.1f}s sonra tekrar denenecek",
+                               extra={'job_id': job_id, 'kind': kind, 'attempts': attempts, 'error': error})
+            else:
+                conn.execute(
+                    "UPDATE jobs SET status = 'failed', finished_at = ?, last_error = ? WHERE id = ?",
+                    (time.time(), error, job_id)
+                )
+                with self._lock:
+                    self.stats['failed'] += 1
+                logger.error("İş deneme hakkını doldurdu",
+                             extra={'job_id': job_id, 'kind': kind, 'attempts': attempts, 'error': error})
+                on_failure = self._on_failure.get(kind)
+                if on_failure is not None:
+                    try:
+                        on_failure(payload, error)
+                    except Exception as cleanup_error:
+                        logger.error("İş temizleme hatası", extra={'job_id': job_id, 'error': str(cleanup_error)})
+            return
+
+        # Başarılı işler saklanmaz; tablo sadece bekleyen ve başarısız işleri tutar
+        conn.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+        with self._lock:
+            self.stats['succeeded'] += 1
+
+    # ========== İZLEME ==========
+
+    def wait_idle(self, timeout: float = 10.0) -> bool:
+        """
+        Hazır iş kalmayana ve çalışan iş bitene kadar bekle (testler ve kapanış için)
+
+        Returns:
+            bool: Süre dolmadan boşaldı mı?
+        """
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            snapshot = self.snapshot()
+            with self._lock:
+                active = self._active
+            if snapshot['ready'] == 0 and snapshot['running'] == 0 and active == 0:
+                return True
+            time.sleep(0.01)
+        return False
+
+    def get_job(self, job_id: int) -> Optional[Dict[str, Any]]:
+        """
+        İşin durumu
+
+        Returns:
+            Dict: {id, kind, status, attempts, last_error} (başarıyla bitmişse None)
+        """
+        row = self._connect().execute(
+            "SELECT id, kind, status, attempts, last_error FROM jobs WHERE id = ?", (job_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        return dict(zip(('id', 'kind', 'status', 'attempts', 'last_error'), row))
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Kuyruk metrikleri
+
+        Returns:
+            Dict: {depth, ready, running, failed, lag_seconds, oldest_age_seconds,
+                   enqueued, succeeded, retried, failed_total}
+        """
+        now = time.time()
+        conn = self._connect()
+        depth, ready, oldest_ready, oldest = conn.execute(
+            "SELECT COUNT(*), "
+            "       SUM(CASE WHEN available_at <= ? THEN 1 ELSE 0 END), "
+            "       MIN(CASE WHEN available_at <= ? THEN available_at END), "
+            "       MIN(created_at) "
+            "FROM jobs WHERE status = 'queued'",
+            (now, now)
+        ).fetchone()
+        running = conn.execute("SELECT COUNT(*) FROM jobs WHERE status = 'running'").fetchone()[0]
+        failed = conn.execute("SELECT COUNT(*) FROM jobs WHERE status = 'failed'").fetchone()[0]
+
+        with self._lock:
+            stats = dict(self.stats)
+        return {
+            'depth': depth,
+            'ready': ready or 0,
+            'running': running,
+            'failed': failed,
+            # Hazır olup worker bekleyen en eski işin gecikmesi
+            'lag_seconds': round(now - oldest_ready, 3) if oldest_ready is not None else 0.0,
+            'oldest_age_seconds': round(now - oldest, 3) if oldest is not None else 0.0,
+            'enqueued': stats['enqueued'],
+            'succeeded': stats['succeeded'],
+            'retried': stats['retried'],
+            'failed_total': stats['failed']
+        }
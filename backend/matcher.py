@@ -6,13 +6,34 @@ YENİ YAPI:
 - Artık tek tablo (Urun_Katalogu) - barkod ve ürün bilgileri birlikte
 """
 
+import copy
+import os
+import threading
 from typing import Dict, Optional, List, Any
-from fuzzywuzzy import fuzz
 from airtable_client import AirtableClient
+from catalog_index import CatalogIndex, normalize_barcode
+from result_cache import TTLCache, MISS
+from scoring import batch_ratio
+
+# Yerel fuzzy aramada ilk 10 hane için izin verilen düzenleme mesafesi.
+# 2 düzenleme yan yana yer değiştiren haneleri de kapsar (skor 90);
+# daha uzak adaylar zaten %85 eşiğinin altında kalır.
+FUZZY_MAX_DISTANCE = 2
+
+# Eşleştirme sonuç önbelleği: en fazla girdi, bulunan ve bulunamayan
+# barkodlar için geçerlilik süreleri (saniye)
+MATCH_CACHE_SIZE = 2048
+MATCH_CACHE_TTL = 60.0
+MATCH_CACHE_NEGATIVE_TTL = 10.0
 
 
 class BarcodeMatcher:
-    """Barkod eşleştirme ve SKU bulma motoru"""
+    """
+    Barkod eşleştirme ve SKU bulma motoru
+
+    Kategori başına bir kez oluşturulup thread'ler arasında paylaşılır
+    (app.get_matcher); paylaşılan durum `_lock` altında tutulur.
+    """
 
     def __init__(self, airtable_client: AirtableClient):
         """
@@ -20,6 +41,48 @@ class BarcodeMatcher:
             airtable_client: Airtable bağlantı nesnesi
         """
         self.client = airtable_client
+        self._lock = threading.RLock()
+        self.warmed = False
+
+        # (kategori, indeks sürümü, barkod, marka, kategori bağlamı) → sonuç
+        # Ayarlar: MATCH_CACHE_SIZE, MATCH_CACHE_TTL, MATCH_CACHE_NEGATIVE_TTL (0 = kapalı)
+        self.cache = TTLCache(
+            maxsize=int(os.getenv('MATCH_CACHE_SIZE', MATCH_CACHE_SIZE)),
+            ttl=float(os.getenv('MATCH_CACHE_TTL', MATCH_CACHE_TTL))
+        )
+        self.negative_ttl = float(os.getenv('MATCH_CACHE_NEGATIVE_TTL', MATCH_CACHE_NEGATIVE_TTL))
+
+    # ========== LIFECYCLE ==========
+
+    def warm(self) -> bool:
+        """
+        Sıcak durumu hazırla: client'ın katalog indeksini yükle
+
+        İlk okutmanın katalog yükleme maliyetini ödememesi için worker
+        açılışında çağrılır. Hata durumunda matcher Airtable sorgularıyla
+        çalışmaya devam eder.
+
+        Returns:
+            bool: Yerel indeks hazırsa True
+        """
+        with self._lock:
+            self.warmed = self._get_index() is not None
+            return self.warmed
+
+    def invalidate(self) -> None:
+        """
+        Matcher'da tutulan türetilmiş durumu geçersiz kıl
+
+        Katalog değiştiğinde (ör. liste dışı ürün eklenince) çağrılır;
+        bir sonraki eşleştirme güncel veriyle yapılır.
+        """
+        with self._lock:
+            self.warmed = False
+            self.cache.clear()
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """Sonuç önbelleğinin boyutu ve isabet oranı (metrikler için)"""
+        return self.cache.snapshot()
 
     def match(
         self,
@@ -31,7 +94,7 @@ class BarcodeMatcher:
         Ana eşleştirme fonksiyonu
 
         Algoritma:
-        1. Direkt barkod eşleşmesi (exact match)
+        1. Direkt barkod eşleşmesi (exact match - önce bellek içi indeks)
         2. Fuzzy search (ilk 10 hane)
         3. Bulunamadı durumu
 
@@ -51,8 +114,101 @@ class BarcodeMatcher:
         """
 
         # 1. Direkt arama - YENİ: Artık direkt Urun_Katalogu'nda ara
-        urun_records = self.client.search_by_barcode(barkod)
+        key = self._cache_key(barkod, context_brand, context_category)
+        cached = self.cache.get(key)
+        if cached is not MISS:
+            return copy.deepcopy(cached)
+
+        urun_records = self._lookup_barcode(barkod)
+        result = self._match_records(barkod, urun_records, context_brand, context_category)
+        self._remember(key, result)
+        return result
+
+    def match_many(
+        self,
+        barkodlar: List[str],
+        context_brand: Optional[str] = None,
+        context_category: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Birden fazla barkodu tek seferde eşleştir (çevrimdışı okutma tekrarı için)
+
+        Direkt aramalar yerel indeksten ya da birkaç OR(...) sorgusuyla
+        toplu yapılır; aynı barkod listede tekrar ederse bir kez işlenir.
+
+        Args:
+            barkodlar: Okutulan barkodlar
+            context_brand: Marka bağlamı (record ID, optional)
+            context_category: Kategori bağlamı (OF/GN/LN, optional)
+
+        Returns:
+            List[Dict]: Girdi sırasıyla `match()` sonuçları
+        """
+        results: Dict[str, Dict[str, Any]] = {}
+        keys: Dict[str, tuple] = {}
+        for barkod in barkodlar:
+            if barkod in keys:
+                continue
+            keys[barkod] = self._cache_key(barkod, context_brand, context_category)
+            cached = self.cache.get(keys[barkod])
+            if cached is not MISS:
+                results[barkod] = copy.deepcopy(cached)
+
+        missing = [barkod for barkod in keys if barkod not in results]
+        if missing:
+            index = self._get_index()
+            if index is not None:
+                lookups = {barkod: index.get(barkod) for barkod in missing}
+            else:
+                lookups = self.client.search_by_barcodes(missing)
+
+            for barkod in missing:
+                urun_records = lookups.get(normalize_barcode(barkod), [])
+                results[barkod] = self._match_records(barkod, urun_records, context_brand, context_category)
+                self._remember(keys[barkod], results[barkod])
+
+        return [results[barkod] for barkod in barkodlar]
+
+    def _cache_key(
+        self,
+        barkod: str,
+        context_brand: Optional[str],
+        context_category: Optional[str]
+    ) -> tuple:
+        """
+        Önbellek anahtarı
 
+        İndeks sürümü anahtarda olduğu için katalog değiştiğinde (delta
+        senkronizasyonu, yeni SKU) eski sonuçlar kendiliğinden kullanılmaz.
+        """
+        index = self._get_index()
+        version = index.version if index is not None else None
+        return (getattr(self.client, 'category', None), version, barkod, context_brand, context_category)
+
+    def _remember(self, key: tuple, result: Dict[str, Any]) -> None:
+        """Sonucu önbelleğe al; bulunamadı sonuçları daha kısa süre tutulur"""
+        ttl = self.negative_ttl if result['status'] == 'bulunamadi' else None
+        self.cache.set(key, copy.deepcopy(result), ttl=ttl)
+
+    def _match_records(
+        self,
+        barkod: str,
+        urun_records: List[Dict],
+        context_brand: Optional[str] = None,
+        context_category: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Direkt arama sonucundan eşleştirme sonucunu üret (gerekirse fuzzy'e geç)
+
+        Args:
+            barkod: Okutulan barkod
+            urun_records: Barkodla bulunan Urun_Katalogu kayıtları
+            context_brand: Marka filtresi
+            context_category: Kategori filtresi
+
+        Returns:
+            Eşleştirme sonucu
+        """
         if len(urun_records) == 0:
             # 2. Fuzzy search dene
             fuzzy_results = self._fuzzy_search(barkod, context_brand, context_category)
@@ -79,6 +235,34 @@ class BarcodeMatcher:
                 context_category
             )
 
+    def _lookup_barcode(self, barkod: str) -> List[Dict]:
+        """
+        Barkodu önce yerel katalog indeksinde, yoksa Airtable'da ara
+
+        İndeks yüklüyse sonuç yetkilidir (yeni SKU'lar indekse eklenir),
+        ağ çağrısı yapılmaz.
+
+        Args:
+            barkod: Okutulan barkod
+
+        Returns:
+            Urun_Katalogu kayıtları
+        """
+        index = self._get_index()
+        if index is not None:
+            return index.get(barkod)
+
+        return self.client.search_by_barcode(barkod)
+
+    def _get_index(self) -> Optional[CatalogIndex]:
+        """Client'ın katalog indeksini döndür (yoksa None)"""
+        get_index = getattr(self.client, 'get_catalog_index', None)
+        if get_index is None:
+            return None
+
+        index = get_index()
+        return index if isinstance(index, CatalogIndex) else None
+
     def _process_single_match(
         self,
         urun_record: Dict,
@@ -215,29 +399,33 @@ class BarcodeMatcher:
         if len(barkod) < 10:
             return None
 
-        # İlk 10 haneye göre ara
-        fuzzy_results = self.client.fuzzy_search_barcode(barkod, min_length=10)
+        # İlk 10 haneye göre ara - indeks varsa yerelde, hatalı haneleri de kapsayarak
+        index = self._get_index()
+        if index is not None:
+            fuzzy_results = index.search_near(barkod[:10], max_distance=FUZZY_MAX_DISTANCE)
+        else:
+            fuzzy_results = self.client.fuzzy_search_barcode(barkod, min_length=10)
 
         if not fuzzy_results:
             return None
 
-        # Benzerlik skorlarını hesapla
-        matches = []
+        # Benzerlik skorlarını hesapla - ilk 10 hane, tüm adaylar tek çağrıda
+        scored_records = []
+        prefixes = []
         for record in fuzzy_results:
-            fields = record['fields']
-            stored_barcode = fields.get('Tedarikçi Barkodu', '')
+            stored_barcode = normalize_barcode(record['fields'].get('Tedarikçi Barkodu'))
 
             if len(stored_barcode) < 10:
                 continue
 
-            # İlk 10 haneyi karşılaştır
-            score = fuzz.ratio(barkod[:10], stored_barcode[:10])
+            scored_records.append(record)
+            prefixes.append(stored_barcode[:10])
 
-            if score >= 85:  # %85 ve üzeri benzerlik
-                matches.append({
-                    'record': record,
-                    'score': score
-                })
+        matches = [
+            {'record': record, 'score': score}
+            for record, score in zip(scored_records, batch_ratio(barkod[:10], prefixes))
+            if score >= 85  # %85 ve üzeri benzerlik
+        ]
 
         if not matches:
             return None
@@ -0,0 +1,249 @@
+"""
+Fotoğraf İşleme - Konyalı Optik Sayım Sistemi
+/api/upload-photo için diske akıtma, küçültme ve saklama
+
+Eskiden fotoğraf tamamen belleğe okunup base64'e çevriliyor (+%33 boyut
+ve ikinci bir tam kopya) ve JSON içinde `data:` URL'si olarak
+gönderiliyordu. Telefon fotoğrafları gunicorn thread'ini bloke ediyor ve
+bellek kullanımını ikiye katlıyordu. Burada:
+- Yükleme 64 KB'lık parçalarla geçici dosyaya akıtılır (bellek sınırlı)
+- Küçültme/yeniden kodlama sınırlı sayıda worker thread'inde yapılır;
+  JPEG'ler draft modunda küçültülmüş ölçekte çözülür
+- Sonuç Airtable'ın uploadAttachment uç noktasına (AirtableClient) veya
+  yerel diske (LocalPhotoStore) yazılır
+
+Pillow kurulu değilse veya biçim tanınmazsa (ör. HEIC) fotoğraf
+küçültülmeden, Airtable'ın ek boyutu sınırı içindeyse olduğu gibi gönderilir.
+"""
+
+import io
+import logging
+import mimetypes
+import os
+import tempfile
+import threading
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Any, BinaryIO, Optional
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # Pillow opsiyonel
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+# uploadAttachment uç noktasının kabul ettiği en büyük dosya
+AIRTABLE_ATTACHMENT_LIMIT = 5 * 1024 * 1024
+
+# Kabul edilen en büyük yükleme (küçültmeden önce)
+MAX_UPLOAD_BYTES = 25 * 1024 * 1024
+
+# Küçültülmüş fotoğrafın uzun kenarı (piksel) ve JPEG kalitesi
+MAX_DIMENSION = 1600
+JPEG_QUALITY = 82
+
+# Diske akıtma parça boyutu
+CHUNK_SIZE = 64 * 1024
+
+
+class PhotoError(ValueError):
+    """Fotoğraf kabul edilemedi (boş, çok büyük veya bozuk)"""
+
+    def __init__(self, message: str, status: int = 400):
+        super().__init__(message)
+        self.status = status
+
+
+def spool_upload(stream: BinaryIO, directory: str, max_bytes: int = MAX_UPLOAD_BYTES) -> str:
+    """
+    Yükleme akışını parça parça geçici dosyaya yaz
+
+    Args:
+        stream: Okunabilir akış (request.stream veya FileStorage.stream)
+        directory: Geçici dosyanın klasörü
+        max_bytes: İzin verilen en büyük boyut
+
+    Returns:
+        str: Geçici dosyanın yolu (işlendikten sonra PhotoPipeline veya iş kuyruğu siler)
+
+    Raises:
+        PhotoError: Akış boşsa (400) veya sınırı aşıyorsa (413)
+    """
+    fd, path = tempfile.mkstemp(suffix='.upload', dir=directory)
+    total = 0
+    try:
+        with os.fdopen(fd, 'wb') as spool:
+            while True:
+                chunk = stream.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                total += len(chunk)
+                if total > max_bytes:
+                    raise PhotoError(f"Fotoğraf çok büyük (en fazla {max_bytes // (1024 * 1024)} MB)", 413)
+                spool.write(chunk)
+        if total == 0:
+            raise PhotoError("Boş dosya")
+    except BaseException:
+        os.remove(path)
+        raise
+    return path
+
+
+def prepare_photo(
+    path: str,
+    filename: str,
+    max_dimension: int = MAX_DIMENSION,
+    quality: int = JPEG_QUALITY
+) -> Dict[str, Any]:
+    """
+    Fotoğrafı yönünü düzeltip küçült ve JPEG olarak yeniden kodla
+
+    Args:
+        path: Kaynak dosya
+        filename: Orijinal dosya adı (güvenli hale getirilmiş)
+        max_dimension: Uzun kenar sınırı (piksel)
+        quality: JPEG kalitesi
+
+    Returns:
+        Dict: {content: bytes, filename, content_type, original_size}
+
+    Raises:
+        PhotoError: Küçültülemeyen dosya ek boyutu sınırını aşıyorsa
+    """
+    original_size = os.path.getsize(path)
+
+    if Image is not None:
+        try:
+            with Image.open(path) as image:
+                # JPEG'i 1/2, 1/4, 1/8 ölçekte çöz (tam çözünürlüklü bitmap oluşmaz)
+                image.draft('RGB', (max_dimension, max_dimension))
+                image = ImageOps.exif_transpose(image)
+                image.thumbnail((max_dimension, max_dimension))
+                if image.mode != 'RGB':
+                    image = image.convert('RGB')
+                output = io.BytesIO()
+                image.save(output, 'JPEG', quality=quality, optimize=True)
+            return {
+                'content': output.getvalue(),
+                'filename': os.path.splitext(filename)[0] + '.jpg',
+                'content_type': 'image/jpeg',
+                'original_size': original_size
+            }
+        except Image.DecompressionBombError:
+            raise PhotoError("Fotoğraf çözünürlüğü çok yüksek")
+        except OSError as e:
+            logger.info("Fotoğraf çözülemedi, olduğu gibi gönderilecek", extra={'photo_name': filename, 'error': str(e)})
+
+    if original_size > AIRTABLE_ATTACHMENT_LIMIT:
+        raise PhotoError("Fotoğraf küçültülemedi ve 5 MB sınırını aşıyor", 413)
+
+    with open(path, 'rb') as f:
+        content = f.read()
+    return {
+        'content': content,
+        'filename': filename,
+        'content_type': mimetypes.guess_type(filename)[0] or 'application/octet-stream',
+        'original_size': original_size
+    }
+
+
+class PhotoPipeline:
+    """Fotoğrafları sınırlı sayıda worker thread'inde hazırlar"""
+
+    def __init__(self, workers: int = 2, max_dimension: int = MAX_DIMENSION, quality: int = JPEG_QUALITY):
+        """
+        Args:
+            workers: Aynı anda çözülen en fazla fotoğraf (bellek üst sınırını belirler)
+            max_dimension: Uzun kenar sınırı (piksel)
+            quality: JPEG kalitesi
+        """
+        self.max_dimension = max_dimension
+        self.quality = quality
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='photo')
+        self._lock = threading.Lock()
+        self.stats = {'processed': 0, 'failed': 0, 'in_flight': 0, 'bytes_in': 0, 'bytes_out': 0}
+
+    def submit(self, path: str, filename: str, remove: bool = True) -> Future:
+        """
+        Geçici dosyayı işlemeye gönder
+
+        Args:
+            path: Geçici dosya
+            filename: Orijinal dosya adı
+            remove: İşlendikten sonra dosya silinsin mi? (iş kuyruğu tekrar
+                denemek için dosyayı saklar)
+
+        Returns:
+            Future: prepare_photo sonucu
+        """
+        with self._lock:
+            self.stats['in_flight'] += 1
+        return self._executor.submit(self._run, path, filename, remove)
+
+    def process(self, path: str, filename: str, timeout: Optional[float] = None,
+                remove: bool = True) -> Dict[str, Any]:
+        """submit() ve sonucu bekle"""
+        return self.submit(path, filename, remove).result(timeout=timeout)
+
+    def _run(self, path: str, filename: str, remove: bool = True) -> Dict[str, Any]:
+        try:
+            result = prepare_photo(path, filename, self.max_dimension, self.quality)
+        except Exception:
+            with self._lock:
+                self.stats['failed'] += 1
+            raise
+        else:
+            with self._lock:
+                self.stats['processed'] += 1
+                self.stats['bytes_in'] += result['original_size']
+                self.stats['bytes_out'] += len(result['content'])
+            return result
+        finally:
+            with self._lock:
+                self.stats['in_flight'] -= 1
+            if remove:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    def snapshot(self) -> Dict[str, Any]:
+        """İşlenen/başarısız fotoğraf ve bayt sayaçları (metrikler için)"""
+        with self._lock:
+            return dict(self.stats)
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait)
+
+
+class LocalPhotoStore:
+    """Fotoğrafları yerel diske yazan, Airtable yerine kullanılabilen depo"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def category_dir(self, category: str) -> str:
+        return os.path.join(self.directory, category)
+
+    def put(self, category: str, record_id: str, filename: str, content: bytes) -> Dict[str, Any]:
+        """
+        Fotoğrafı yaz
+
+        Args:
+            category: OF/GN/LN
+            record_id: Sayım kaydı ID'si
+            filename: Güvenli dosya adı
+            content: Dosya içeriği
+
+        Returns:
+            Dict: {success, url, filename}
+        """
+        directory = self.category_dir(category)
+        os.makedirs(directory, exist_ok=True)
+        name = f"{record_id}-{uuid.uuid4().hex[:8]}-{filename}"
+        tmp_path = os.path.join(directory, name + '.tmp')
+        with open(tmp_path, 'wb') as f:
+            f.write(content)
+        os.replace(tmp_path, os.path.join(directory, name))
+        return {'success': True, 'url': f"/api/photos/{category}/{name}", 'filename': name}
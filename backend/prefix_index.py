@@ -0,0 +1,128 @@
+"""
+Barkod Önek İndeksi - Konyalı Optik Sayım Sistemi
+Sıralı barkod dizisi üzerinde bisect ile önek araması
+
+Airtable'daki `FIND('<ilk10>', {Tedarikçi Barkodu}) = 1` sorgusu tüm tabloyu
+tarar. Burada barkodlar sıralı tutulur:
+- Önek araması: O(log n + k)
+- Mesafe araması: sıralı dizi örtük bir trie gibi gezilir; ortak öneki olan
+  barkodlar Levenshtein DP satırlarını paylaşır, eşiği aşan dallar bisect ile
+  tek adımda atlanır.
+"""
+
+import bisect
+from typing import List, Tuple, Iterable
+
+
+def _prefix_end(keys: List[str], prefix: str) -> int:
+    """`prefix` ile başlayan son anahtarın bir sonrası (bisect ile)"""
+    if not prefix:
+        return len(keys)
+    upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+    return bisect.bisect_left(keys, upper)
+
+
+class BarcodePrefixIndex:
+    """Tekil barkodların sıralı dizisi (thread-safe değildir, CatalogIndex kilidi altında kullanılır)"""
+
+    def __init__(self, barcodes: Iterable[str] = ()):
+        self._keys: List[str] = sorted(set(barcodes))
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def add(self, barkod: str) -> None:
+        """Barkodu ekle (zaten varsa bir şey yapmaz)"""
+        pos = bisect.bisect_left(self._keys, barkod)
+        if pos == len(self._keys) or self._keys[pos] != barkod:
+            self._keys.insert(pos, barkod)
+
+    def discard(self, barkod: str) -> None:
+        """Barkodu çıkar (yoksa bir şey yapmaz)"""
+        pos = bisect.bisect_left(self._keys, barkod)
+        if pos < len(self._keys) and self._keys[pos] == barkod:
+            del self._keys[pos]
+
+    def prefix(self, prefix: str) -> List[str]:
+        """
+        Verilen önekle başlayan barkodlar - O(log n + k)
+
+        Args:
+            prefix: Aranan önek
+
+        Returns:
+            List[str]: Sıralı barkod listesi
+        """
+        start = bisect.bisect_left(self._keys, prefix)
+        return self._keys[start:_prefix_end(self._keys, prefix)]
+
+    def within_distance(self, prefix: str, max_distance: int) -> List[Tuple[str, int]]:
+        """
+        Öneki en fazla `max_distance` düzenleme ile tutan barkodlar
+
+        Mesafe, sorgu ile barkodun herhangi bir öneki arasındaki en küçük
+        Levenshtein mesafesidir; böylece yanlış okunan, eksik veya fazla
+        girilen haneler de yakalanır.
+
+        Args:
+            prefix: Aranan önek (ör. barkodun ilk 10 hanesi)
+            max_distance: İzin verilen en fazla düzenleme (1-2 önerilir)
+
+        Returns:
+            List[Tuple[str, int]]: (barkod, mesafe) - barkod sırasıyla
+        """
+        keys = self._keys
+        n = len(prefix)
+        limit = n + max_distance  # Bu derinlikten sonra mesafe düşemez
+
+        # rows[d]: prefix ile key[:d] arasındaki DP satırı
+        # best[d]: 0..d derinliklerinde görülen en küçük tam-önek mesafesi
+        rows = [list(range(n + 1))]
+        best = [n]
+        path = ''
+        results: List[Tuple[str, int]] = []
+
+        i = 0
+        while i < len(keys):
+            key = keys[i]
+
+            # Önceki anahtarla ortak önek kadar DP satırlarını yeniden kullan
+            common = 0
+            shared = min(len(path), len(key))
+            while common < shared and path[common] == key[common]:
+                common += 1
+            del rows[common + 1:]
+            del best[common + 1:]
+
+            depth = common
+            pruned = False
+            stop = min(len(key), limit)
+            while depth < stop:
+                ch = key[depth]
+                prev = rows[depth]
+                row = [prev[0] + 1]
+                for j in range(1, n + 1):
+                    cost = 0 if prefix[j - 1] == ch else 1
+                    row.append(min(row[j - 1] + 1, prev[j] + 1, prev[j - 1] + cost))
+                rows.append(row)
+                best.append(min(best[-1], row[n]))
+                depth += 1
+                if min(row) > max_distance:
+                    pruned = True
+                    break
+
+            path = key[:depth]
+
+            if pruned or depth == limit:
+                # Bu önekle başlayan tüm barkodlar aynı sonucu paylaşır
+                end = _prefix_end(keys, path)
+                if best[depth] <= max_distance:
+                    results.extend((k, best[depth]) for k in keys[i:end])
+                i = end
+            else:
+                # Anahtar sınırdan kısa; sadece kendisi değerlendirilir
+                if best[depth] <= max_distance:
+                    results.append((key, best[depth]))
+                i += 1
+
+        return results
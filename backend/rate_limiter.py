@@ -0,0 +1,292 @@
+"""
+Rate Limiter - Konyalı Optik Sayım Sistemi
+Airtable base'i başına paylaşılan token bucket
+
+Airtable limiti base başına saniyede 5 istektir. Eski `rate_limit`
+decorator'ı fonksiyon başına ayrı (ve kilitsiz) bir zaman damgası tuttuğu
+için aynı base'e giden farklı metotlar toplamda limiti aşabiliyordu.
+
+Burada:
+- Her base ID için tek bir bucket vardır (thread-safe)
+- Paylaşım klasörü verilirse bucket durumu bir dosyada flock ile
+  tutulur; böylece gunicorn worker'ları aynı bütçeyi paylaşır
+- Bucket HTTP adapter seviyesinde uygulanır: pyairtable'ın her isteği
+  (sayfalama dahil) bir token harcar
+- 429 yanıtında tüm worker'lar Retry-After (yoksa üstel) süresince bekler
+"""
+
+import asyncio
+import os
+import struct
+import threading
+import time
+import logging
+from contextlib import contextmanager
+from typing import Dict, Any, Optional
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from file_lock import locked, ensure_dir
+
+logger = logging.getLogger(__name__)
+
+# Airtable: 5 istek/saniye/base
+DEFAULT_RATE = 5.0
+DEFAULT_BURST = 5.0
+
+# 429 sonrası en fazla tekrar ve bekleme
+MAX_THROTTLE_RETRIES = 5
+MAX_THROTTLE_BACKOFF = 30.0
+
+# Paylaşılan durum dosyası: tokens, updated_at, blocked_until (float64)
+_STATE_FORMAT = '<ddd'
+_STATE_SIZE = struct.calcsize(_STATE_FORMAT)
+
+
+class TokenBucket:
+    """Thread-safe (opsiyonel olarak süreçler arası) token bucket"""
+
+    def __init__(self, rate: float = DEFAULT_RATE, burst: float = DEFAULT_BURST, state_path: Optional[str] = None):
+        """
+        Args:
+            rate: Saniyede eklenen token
+            burst: En fazla biriken token (anlık patlama)
+            state_path: Süreçler arası paylaşım için durum dosyası (None = sadece bu süreç)
+        """
+        self.rate = rate
+        self.burst = burst
+        self._lock = threading.Lock()
+        self.state_path = state_path
+        # Dosya tanımlayıcısı süreç başına açılır (bkz. _state_fd)
+        self._fd: Optional[int] = None
+        self._pid: Optional[int] = None
+        if state_path:
+            ensure_dir(os.path.dirname(state_path))
+            os.close(os.open(state_path, os.O_RDWR | os.O_CREAT, 0o644))
+
+        self._tokens = burst
+        self._updated = time.time()
+        self._blocked_until = 0.0
+
+        self.stats = {'acquired': 0, 'waited': 0, 'wait_seconds': 0.0, 'throttled': 0}
+
+    def acquire(self) -> float:
+        """
+        Bir token al (gerekirse bekle)
+
+        Returns:
+            float: Beklenen süre (saniye)
+        """
+        waited = 0.0
+        while True:
+            wait = self._try_take(time.time())
+            if wait <= 0:
+                break
+            time.sleep(wait)
+            waited += wait
+
+        self._record(waited)
+        return waited
+
+    async def acquire_async(self) -> float:
+        """
+        Bir token al (asyncio sürümü; beklerken event loop'u bloklamaz)
+
+        Paylaşılan durum dosyasının kilidi (flock) başka bir worker tutarken
+        bekleyebileceği için dosyalı bucket'ta token bir thread'de alınır.
+
+        Returns:
+            float: Beklenen süre (saniye)
+        """
+        waited = 0.0
+        while True:
+            wait = await self._run_async(self._try_take, time.time())
+            if wait <= 0:
+                break
+            await asyncio.sleep(wait)
+            waited += wait
+
+        self._record(waited)
+        return waited
+
+    def penalize(self, seconds: float) -> None:
+        """429 alındı: bucket'ı boşalt ve `seconds` boyunca token verme"""
+        with self._shared_state() as state:
+            state[0] = 0.0
+            state[2] = max(state[2], time.time() + seconds)
+        with self._lock:
+            self.stats['throttled'] += 1
+
+    async def penalize_async(self, seconds: float) -> None:
+        """penalize'ın asyncio sürümü (dosya kilidi event loop dışında beklenir)"""
+        await self._run_async(self.penalize, seconds)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Sayaçların kopyası (metrikler için)"""
+        with self._lock:
+            stats = dict(self.stats)
+        stats['wait_seconds'] = round(stats['wait_seconds'], 3)
+        return stats
+
+    # ========== INTERNALS ==========
+
+    def _record(self, waited: float) -> None:
+        with self._lock:
+            self.stats['acquired'] += 1
+            if waited:
+                self.stats['waited'] += 1
+                self.stats['wait_seconds'] += waited
+
+    async def _run_async(self, func, *args):
+        """Dosyalı bucket'ta func'ı thread'de, bellek içi bucket'ta doğrudan çalıştır"""
+        if self.state_path is None:
+            return func(*args)
+        return await asyncio.to_thread(func, *args)
+
+    def _try_take(self, now: float) -> float:
+        """Token varsa al ve 0 döndür, yoksa gereken bekleme süresini döndür"""
+        with self._shared_state() as state:
+            tokens, updated, blocked_until = state
+            if now < blocked_until:
+                return blocked_until - now
+
+            tokens = min(self.burst, tokens + max(0.0, now - updated) * self.rate)
+            state[1] = now
+            if tokens >= 1:
+                state[0] = tokens - 1
+                return 0.0
+            state[0] = tokens
+            return (1 - tokens) / self.rate
+
+    @contextmanager
+    def _shared_state(self):
+        """Bucket durumunu ([tokens, updated_at, blocked_until]) kilit altında oku/yaz"""
+        with self._lock:
+            if self.state_path is None:
+                state = [self._tokens, self._updated, self._blocked_until]
+                yield state
+                self._tokens, self._updated, self._blocked_until = state
+                return
+
+            fd = self._state_fd()
+            with locked(fd):
+                raw = os.pread(fd, _STATE_SIZE, 0)
+                if len(raw) == _STATE_SIZE:
+                    state = list(struct.unpack(_STATE_FORMAT, raw))
+                else:
+                    state = [self.burst, time.time(), 0.0]
+                yield state
+                os.pwrite(fd, struct.pack(_STATE_FORMAT, *state), 0)
+
+    def _state_fd(self) -> int:
+        """
+        Durum dosyasının bu süreçteki tanımlayıcısı (self._lock altında)
+
+        Fork sonrası (preload_app) ebeveynden gelen tanımlayıcı aynı açık
+        dosya kaydını paylaşır ve flock kardeş worker'ları dışlamaz; bu
+        yüzden her süreç dosyayı kendisi açar.
+        """
+        if self._fd is None or self._pid != os.getpid():
+            self._fd = os.open(self.state_path, os.O_RDWR | os.O_CREAT, 0o644)
+            self._pid = os.getpid()
+        return self._fd
+
+
+# ========== BASE REGISTRY ==========
+
+_buckets: Dict[str, TokenBucket] = {}
+_buckets_lock = threading.Lock()
+
+
+def get_bucket(base_id: str, state_dir: Optional[str] = None) -> TokenBucket:
+    """
+    Base ID için süreç içinde tekil bucket döndür
+
+    Args:
+        base_id: Airtable base ID
+        state_dir: Süreçler arası paylaşım klasörü (None = sadece bu süreç)
+
+    Ayarlar: AIRTABLE_RATE_LIMIT, AIRTABLE_RATE_BURST
+    """
+    with _buckets_lock:
+        bucket = _buckets.get(base_id)
+        if bucket is None:
+            state_path = None
+            # os.pread/pwrite olmayan platformlarda (Windows) sadece süreç içi
+            if state_dir and hasattr(os, 'pread'):
+                state_path = os.path.join(state_dir, f"{base_id}.bucket")
+            bucket = TokenBucket(
+                rate=float(os.getenv('AIRTABLE_RATE_LIMIT', DEFAULT_RATE)),
+                burst=float(os.getenv('AIRTABLE_RATE_BURST', DEFAULT_BURST)),
+                state_path=state_path
+            )
+            _buckets[base_id] = bucket
+        return bucket
+
+
+def get_rate_limit_stats() -> Dict[str, Dict[str, Any]]:
+    """Tüm base'lerin limiter sayaçları"""
+    with _buckets_lock:
+        buckets = dict(_buckets)
+    return {base_id: bucket.snapshot() for base_id, bucket in buckets.items()}
+
+
+# ========== HTTP ADAPTER ==========
+
+def _retry_after(response) -> Optional[float]:
+    value = response.headers.get('Retry-After')
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+class RateLimitedAdapter(HTTPAdapter):
+    """
+    Her HTTP isteğinden önce bucket'tan token alan adapter
+
+    429 yanıtları urllib3 yerine burada tekrar denenir; böylece her deneme
+    de bucket'tan geçer ve bekleme diğer worker'larla paylaşılır.
+    """
+
+    def __init__(self, bucket: TokenBucket, max_throttle_retries: int = MAX_THROTTLE_RETRIES):
+        # Bağlantı hataları için urllib3 tekrarları (429 hariç; Retry-After'lı
+        # 429'ı urllib3 kendisi denemeye kalkıp RetryError atmasın)
+        super().__init__(max_retries=Retry(total=3, connect=3, read=0, status=0, backoff_factor=0.2,
+                                           respect_retry_after_header=False))
+        self.bucket = bucket
+        self.max_throttle_retries = max_throttle_retries
+
+    def send(self, request, *args, **kwargs):
+        attempt = 0
+        while True:
+            self.bucket.acquire()
+            response = super().send(request, *args, **kwargs)
+            if response.status_code != 429 or attempt >= self.max_throttle_retries:
+                return response
+
+            delay = _retry_after(response)
+            if delay is None:
+                delay = min(2 ** attempt, MAX_THROTTLE_BACKOFF)
+            attempt += 1
+            logger.warning(f"Airtable 429: {delay:.1f}s bekleniyor (deneme {attempt})")
+            self.bucket.penalize(delay)
+            response.close()
+
+
+def install_rate_limiter(api, base_id: str, state_dir: Optional[str] = None) -> TokenBucket:
+    """
+    pyairtable Api oturumuna base'in bucket'ını bağla
+
+    Args:
+        api: pyairtable Api
+        base_id: Airtable base ID
+        state_dir: Süreçler arası paylaşım klasörü (None = sadece bu süreç)
+
+    Returns:
+        TokenBucket: Kullanılan bucket
+    """
+    bucket = get_bucket(base_id, state_dir)
+    adapter = RateLimitedAdapter(bucket)
+    api.session.mount('https://', adapter)
+    api.session.mount('http://', adapter)
+    return bucket
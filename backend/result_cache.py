@@ -0,0 +1,92 @@
+"""
+Sonuç Önbelleği - Konyalı Optik Sayım Sistemi
+Boyut sınırlı LRU + TTL önbellek (BarcodeMatcher.match sonuçları için)
+
+Sayımcılar aynı barkodu sık sık tekrar okutur (adet kontrolü, tepsideki
+aynı ürünler) ve bulunamayan barkodları birkaç kez dener. Sonuçlar kısa
+süre saklanır; bulunamadı (negatif) sonuçlar için ayrı, daha kısa bir
+süre kullanılır.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Hashable, Optional
+
+# get() için "önbellekte yok" işareti (None geçerli bir değer olabilir)
+MISS = object()
+
+
+class TTLCache:
+    """Thread-safe LRU önbellek; her girdinin kendi süresi vardır"""
+
+    def __init__(self, maxsize: int = 2048, ttl: float = 60.0):
+        """
+        Args:
+            maxsize: En fazla girdi (aşılınca en eski kullanılan atılır)
+            ttl: Varsayılan geçerlilik süresi (saniye)
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        # key → (expires_at, value)
+        self._data: 'OrderedDict[Hashable, tuple]' = OrderedDict()
+
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'expired': 0}
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
+
+    def get(self, key: Hashable, default: Any = MISS) -> Any:
+        """
+        Girdiyi döndür (yoksa veya süresi dolmuşsa `default`)
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.stats['misses'] += 1
+                return default
+            if entry[0] <= now:
+                del self._data[key]
+                self.stats['expired'] += 1
+                self.stats['misses'] += 1
+                return default
+            self._data.move_to_end(key)
+            self.stats['hits'] += 1
+            return entry[1]
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """
+        Girdiyi ekle veya güncelle
+
+        Args:
+            key: Anahtar
+            value: Değer
+            ttl: Bu girdinin süresi (None = varsayılan, <= 0 = saklama)
+        """
+        ttl = self.ttl if ttl is None else ttl
+        if ttl <= 0 or self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.stats['evictions'] += 1
+
+    def clear(self) -> None:
+        """Tüm girdileri sil (sayaçlar korunur)"""
+        with self._lock:
+            self._data.clear()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Boyut ve isabet sayaçları (metrikler için)"""
+        with self._lock:
+            stats = dict(self.stats)
+            stats['size'] = len(self._data)
+        stats['maxsize'] = self.maxsize
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = round(stats['hits'] / lookups, 3) if lookups else 0.0
+        return stats
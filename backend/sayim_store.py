@@ -0,0 +1,419 @@
+"""
+Yerel Sayım Deposu - Konyalı Optik Sayım Sistemi
+Sayim_Kayitlari yazmalarını önce yerel SQLite'a alan çevrimdışı-öncelikli depo
+
+Yoğun sayım gününde her okutma Airtable'ın gecikmesini ve base başına
+5 istek/sn sınırını bekliyordu; mağazanın sayım hızını Airtable
+belirliyordu. Yerel modda (SAYIM_LOCAL_STORE=true):
+- Kayıt SQLite'a (WAL) yazılır ve istemciye hemen yerel bir ID (`loc...`) döner
+- Arka plandaki replikatör bekleyen kayıtları 10'arlı batch_create ile
+  Airtable'a gönderir; ağ kesilirse kayıtlar dosyada bekler
+- Günlük istatistikler ve son okutmalar Airtable yerine yerel dosyadan okunur
+
+Aynı dosyayı kullanan gunicorn worker'ları bekleyen kayıtları BEGIN
+IMMEDIATE ile sahiplenir; bir kayıt iki kez gönderilmez. Gönderim
+sırasında çöken worker'ın sahiplendiği kayıtlar kilit süresi dolunca
+tekrar gönderilir. Arayüz SayimWriteBuffer ile aynıdır (add, resolve,
+status, wait_for); AirtableClient ikisini aynı şekilde kullanır.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, List, Any, Optional, Tuple
+from write_buffer import LOCAL_ID_PREFIX, BATCH_SIZE, is_permanent_error
+from stok_tracker import today_str
+
+logger = logging.getLogger(__name__)
+
+# Sahiplenilen batch bu süre içinde yazılamazsa başka worker tekrar dener (saniye)
+CLAIM_SECONDS = 120.0
+
+# Airtable'a yazılmış kayıtların yerelde tutulduğu gün sayısı
+RETENTION_DAYS = 7
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sayim (
+    local_id TEXT PRIMARY KEY,
+    day TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    fields TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    record_id TEXT,
+    claimed_at REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT
+);
+CREATE INDEX IF NOT EXISTS sayim_pending ON sayim (status, created_at);
+CREATE INDEX IF NOT EXISTS sayim_day ON sayim (day, created_at);
+"""
+
+
+class SayimStore:
+    """Sayim_Kayitlari için SQLite depo + Airtable replikatörü"""
+
+    def __init__(
+        self,
+        table,
+        db_path: str,
+        flush_interval: float = 1.0,
+        max_backoff: float = 30.0,
+        min_batch_interval: float = 0.25,
+        retention_days: int = RETENTION_DAYS
+    ):
+        """
+        Args:
+            table: pyairtable Table (Sayim_Kayitlari)
+            db_path: SQLite dosyası (worker'lar arasında paylaşılabilir)
+            flush_interval: Tam dolmamış batch'lerin en fazla bekleme süresi (saniye)
+            max_backoff: Hata sonrası en uzun bekleme (saniye)
+            min_batch_interval: Art arda batch istekleri arası en az süre
+            retention_days: Yazılmış kayıtların yerelde tutulacağı gün
+        """
+        self.table = table
+        self.db_path = db_path
+        self.flush_interval = flush_interval
+        self.max_backoff = max_backoff
+        self.min_batch_interval = min_batch_interval
+        self.retention_days = retention_days
+        self._last_batch_at = 0.0
+
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._committed_event = threading.Condition(self._lock)
+        self._flush_lock = threading.Lock()
+        self._added = 0
+        self._failures = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self.stats = {'flushed': 0, 'batches': 0, 'errors': 0, 'failed': 0}
+
+        os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+        self._connect().executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        """Thread'e özel bağlantı"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    # ========== YAZMA ==========
+
+    def add(self, fields: Dict[str, Any], local_id: Optional[str] = None) -> str:
+        """
+        Kaydı yerel depoya yaz
+
+        Args:
+            fields: Sayim_Kayitlari alanları
+            local_id: Verilirse bu ID kullanılır; aynı ID ikinci kez eklenmez
+                (yarıda kalıp tekrarlanan aktarım kaydı iki kez göndermez)
+
+        Returns:
+            str: Yerel kayıt ID'si
+        """
+        local_id = local_id or f"{LOCAL_ID_PREFIX}{uuid.uuid4().hex}"
+        self._connect().execute(
+            "INSERT OR IGNORE INTO sayim (local_id, day, created_at, fields) VALUES (?, ?, ?, ?)",
+            (local_id, today_str(), time.time(), json.dumps(fields, ensure_ascii=False))
+        )
+        with self._lock:
+            self._added += 1
+            if self._added >= BATCH_SIZE:
+                self._wakeup.notify()
+        return local_id
+
+    def resolve(self, local_id: str) -> Optional[str]:
+        """Yerel ID'nin Airtable record ID'si (henüz yazılmadıysa None)"""
+        row = self._connect().execute(
+            "SELECT record_id FROM sayim WHERE local_id = ?", (local_id,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def status(self, local_id: str) -> str:
+        """
+        Yerel kaydın durumu
+
+        Returns:
+            'pending' | 'committed' | 'failed' | 'unknown'
+        """
+        row = self._connect().execute(
+            "SELECT status FROM sayim WHERE local_id = ?", (local_id,)
+        ).fetchone()
+        return row[0] if row else 'unknown'
+
+    def wait_for(self, local_id: str, timeout: float = 10.0) -> Optional[str]:
+        """
+        Kayıt Airtable'a yazılana kadar bekle (gerekirse hemen gönder)
+
+        Kaydı başka bir worker da gönderebileceği için durum kısa
+        aralıklarla dosyadan tekrar okunur.
+
+        Returns:
+            Airtable record ID'si veya None (zaman aşımı / başarısız)
+        """
+        deadline = time.time() + timeout
+        with self._lock:
+            self._wakeup.notify()
+        while True:
+            if self.status(local_id) != 'pending':
+                return self.resolve(local_id)
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                return None
+            with self._lock:
+                self._committed_event.wait(min(remaining, 0.1))
+
+    @property
+    def pending_count(self) -> int:
+        return self._connect().execute(
+            "SELECT COUNT(*) FROM sayim WHERE status = 'pending'"
+        ).fetchone()[0]
+
+    # ========== OKUMA ==========
+
+    def day_records(self, day: str) -> List[Dict[str, Any]]:
+        """
+        Günün kayıtları (istatistik uzlaştırması için)
+
+        Returns:
+            List[Dict]: Airtable kayıt biçiminde ({id, fields}) kayıtlar
+        """
+        rows = self._connect().execute(
+            "SELECT local_id, record_id, fields FROM sayim WHERE day = ? AND status != 'failed'",
+            (day,)
+        ).fetchall()
+        return [{'id': record_id or local_id, 'fields': json.loads(fields)}
+                for local_id, record_id, fields in rows]
+
+    def recent(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        Son okutmalar (en yeni önce)
+
+        Returns:
+            List[Dict]: {id, local_id, status, created_at, fields}
+        """
+        rows = self._connect().execute(
+            "SELECT local_id, record_id, status, created_at, fields FROM sayim "
+            "ORDER BY created_at DESC LIMIT ?",
+            (limit,)
+        ).fetchall()
+        return [
+            {
+                'id': record_id or local_id,
+                'local_id': local_id,
+                'status': status,
+                'created_at': datetime.fromtimestamp(created_at).isoformat(),
+                'fields': json.loads(fields)
+            }
+            for local_id, record_id, status, created_at, fields in rows
+        ]
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Replikasyon durumu (metrikler için)
+
+        Returns:
+            Dict: {pending, committed, failed, oldest_pending_seconds,
+                   flushed, batches, errors}
+        """
+        conn = self._connect()
+        counts = dict(conn.execute("SELECT status, COUNT(*) FROM sayim GROUP BY status").fetchall())
+        oldest = conn.execute(
+            "SELECT MIN(created_at) FROM sayim WHERE status = 'pending'"
+        ).fetchone()[0]
+        with self._lock:
+            stats = dict(self.stats)
+        return {
+            'pending': counts.get('pending', 0),
+            'committed': counts.get('committed', 0),
+            'failed': counts.get('failed', 0),
+            'oldest_pending_seconds': round(time.time() - oldest, 3) if oldest is not None else 0.0,
+            'flushed': stats['flushed'],
+            'batches': stats['batches'],
+            'errors': stats['errors']
+        }
+
+    # ========== REPLİKASYON ==========
+
+    def flush(self) -> int:
+        """
+        Bekleyen kayıtları 10'arlı gruplar halinde Airtable'a yaz
+
+        Returns:
+            int: Yazılan kayıt sayısı
+        """
+        written = 0
+        with self._flush_lock:
+            while True:
+                batch = self._claim_batch()
+                if not batch:
+                    break
+
+                wait = self._last_batch_at + self.min_batch_interval - time.time()
+                if wait > 0:
+                    time.sleep(wait)
+                self._last_batch_at = time.time()
+
+                try:
+                    records = self.table.batch_create([fields for _, fields in batch])
+                except Exception as e:
+                    with self._lock:
+                        self.stats['errors'] += 1
+                    if len(batch) > 1 and is_permanent_error(e):
+                        # Hatalı kaydı bulmak için tek tek dene
+                        written += self._create_individually(batch)
+                        continue
+                    if is_permanent_error(e):
+                        self._mark_failed(batch[0][0], e)
+                        continue
+                    self._release(batch, e)
+                    raise
+
+                for (local_id, _), record in zip(batch, records):
+                    self._commit(local_id, record['id'])
+                written += len(batch)
+                with self._lock:
+                    self.stats['batches'] += 1
+                    self.stats['flushed'] += len(batch)
+        return written
+
+    def prune(self) -> int:
+        """
+        Airtable'a yazılmış eski kayıtları sil
+
+        Returns:
+            int: Silinen kayıt sayısı
+        """
+        cutoff = (datetime.now() - timedelta(days=self.retention_days)).strftime('%Y-%m-%d')
+        cursor = self._connect().execute(
+            "DELETE FROM sayim WHERE status = 'committed' AND day < ?", (cutoff,)
+        )
+        return cursor.rowcount
+
+    def start(self) -> None:
+        """Arka plan replikatörünü başlat"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        pending = self.pending_count
+        if pending:
+            logger.info(f"Yerel depoda {pending} gönderilmemiş sayım kaydı var",
+                        extra={'db_path': self.db_path})
+        try:
+            self.prune()
+        except sqlite3.Error as e:
+            logger.warning("Eski sayım kayıtları silinemedi", extra={'error': str(e)})
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='sayim-replicator', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Replikatörü durdur, bekleyenleri son kez yazmayı dene"""
+        self._stop.set()
+        with self._lock:
+            self._wakeup.notify()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        try:
+            self.flush()
+        except Exception as e:
+            logger.warning("Kapanışta replikasyon başarısız, kayıtlar yerel depoda kaldı",
+                           extra={'error': str(e)})
+
+    # ========== INTERNALS ==========
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            with self._lock:
+                if self._added < BATCH_SIZE:
+                    self._wakeup.wait(self._current_delay())
+                self._added = 0
+            if self._stop.is_set():
+                break
+            try:
+                self.flush()
+                self._failures = 0
+            except Exception as e:
+                self._failures += 1
+                logger.warning("Sayım replikasyonu hatası, tekrar denenecek",
+                               extra={'pending': self.pending_count, 'error': str(e)})
+                self._stop.wait(self._current_delay())
+
+    def _current_delay(self) -> float:
+        if not self._failures:
+            return self.flush_interval
+        return min(self.flush_interval * (2 ** self._failures), self.max_backoff)
+
+    def _claim_batch(self) -> List[Tuple[str, Dict[str, Any]]]:
+        """Sahipsiz (veya kilidi dolmuş) en eski bekleyen kayıtları sahiplen"""
+        now = time.time()
+        conn = self._connect()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            rows = conn.execute(
+                "SELECT local_id, fields FROM sayim WHERE status = 'pending' "
+                "AND (claimed_at IS NULL OR claimed_at <= ?) ORDER BY created_at LIMIT ?",
+                (now - CLAIM_SECONDS, BATCH_SIZE)
+            ).fetchall()
+            conn.executemany(
+                "UPDATE sayim SET claimed_at = ?, attempts = attempts + 1 WHERE local_id = ?",
+                [(now, local_id) for local_id, _ in rows]
+            )
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        return [(local_id, json.loads(fields)) for local_id, fields in rows]
+
+    def _release(self, batch: List[Tuple[str, Dict[str, Any]]], error: Exception) -> None:
+        """Geçici hatada sahipliği bırak (sonraki flush tekrar dener)"""
+        self._connect().executemany(
+            "UPDATE sayim SET claimed_at = NULL, last_error = ? WHERE local_id = ?",
+            [(str(error), local_id) for local_id, _ in batch]
+        )
+
+    def _create_individually(self, batch: List[Tuple[str, Dict[str, Any]]]) -> int:
+        written = 0
+        for i, (local_id, fields) in enumerate(batch):
+            try:
+                record = self.table.create(fields)
+            except Exception as e:
+                if not is_permanent_error(e):
+                    self._release(batch[i:], e)
+                    raise
+                self._mark_failed(local_id, e)
+                continue
+            self._commit(local_id, record['id'])
+            written += 1
+            with self._lock:
+                self.stats['flushed'] += 1
+        return written
+
+    def _commit(self, local_id: str, record_id: str) -> None:
+        self._connect().execute(
+            "UPDATE sayim SET status = 'committed', record_id = ?, claimed_at = NULL WHERE local_id = ?",
+            (record_id, local_id)
+        )
+        with self._lock:
+            self._committed_event.notify_all()
+
+    def _mark_failed(self, local_id: str, error: Exception) -> None:
+        self._connect().execute(
+            "UPDATE sayim SET status = 'failed', claimed_at = NULL, last_error = ? WHERE local_id = ?",
+            (str(error), local_id)
+        )
+        with self._lock:
+            self.stats['failed'] += 1
+            self._committed_event.notify_all()
+        logger.error("Sayım kaydı kalıcı hata ile atlandı", extra={'local_id': local_id, 'error': str(error)})
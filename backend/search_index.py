@@ -0,0 +1,274 @@
+"""
+Metin Arama İndeksi - Konyalı Optik Sayım Sistemi
+Manuel arama (search_sku_by_term) için bellek içi n-gram ters indeksi
+
+Airtable'daki altı alanlı `OR(SEARCH(LOWER(...)))` formülü her aramada
+tüm tabloyu tarar. Burada her kaydın arama alanları Türkçe kurallarına
+göre katlanır (İ/I/ı → i, ç → c, ...) ve 3-gram'larına ayrılır:
+- Sorgunun 3-gram'larının posting listeleri kesiştirilir
+- Kalan az sayıdaki aday alt dize (substring) olarak doğrulanır
+- Sonuçlar alan önceliği ve eşleşme tipine göre sıralanır
+
+Silme/güncellemelerde sahipsiz kalan değerler mezar taşı (tombstone) olarak
+posting listelerinde kalır; oranları eşiği aşınca indeks baştan kurulur.
+"""
+
+import heapq
+from typing import Dict, List, Any, Optional, Iterable, Set
+
+# Aranan alanlar ve ağırlıkları (Airtable formülüyle aynı alanlar)
+SEARCH_FIELDS = {
+    'Model Kodu': 5,
+    'SKU': 5,
+    'Tedarikçi Barkodu': 4,
+    'Renk Kodu': 3,
+    'Model Adı': 3,
+    'Arama Kelimeleri': 2
+}
+
+NGRAM = 3
+
+# Manuel aramada dönen en fazla sonuç
+MAX_RESULTS = 20
+
+# Mezar taşı oranı bunu aşınca indeks yeniden kurulur
+REBUILD_RATIO = 0.25
+
+# Bu sayıdan fazla değer eşleşirse heap merge yerine düz sıralama kullanılır
+MERGE_FANIN = 32
+
+# Eşleşme tipi çarpanları: tam alan > önek > alt dize
+_EXACT, _PREFIX, _SUBSTRING = 3, 2, 1
+
+_TURKISH_FOLD = str.maketrans({
+    'İ': 'i', 'I': 'i', 'ı': 'i',
+    'Ç': 'c', 'ç': 'c',
+    'Ğ': 'g', 'ğ': 'g',
+    'Ö': 'o', 'ö': 'o',
+    'Ş': 's', 'ş': 's',
+    'Ü': 'u', 'ü': 'u'
+})
+
+
+def fold(value: Any) -> str:
+    """
+    Türkçe duyarlı küçük harfe çevirme ve aksan katlama
+
+    `str.lower()` 'İ' harfini 'i̇' (i + birleşik nokta) yapar ve 'I' harfini
+    'ı' yerine 'i' yapar; bu yüzden I ailesi önce tek bir 'i' harfine
+    indirgenir. Aksanlı harfler de katlanır ki 'gunes' araması 'GÜNEŞ'i bulsun.
+
+    Args:
+        value: Alan değeri (str, sayı, liste veya None)
+
+    Returns:
+        Katlanmış metin
+    """
+    if value is None:
+        return ''
+    if isinstance(value, list):
+        return ' '.join(fold(v) for v in value)
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).translate(_TURKISH_FOLD).lower().strip()
+
+
+def _ngrams(text: str) -> Set[str]:
+    return {text[i:i + NGRAM] for i in range(len(text) - NGRAM + 1)}
+
+
+class _Doc:
+    __slots__ = ('record', 'values', 'brands', 'category', 'sort_key')
+
+    def __init__(self, record: Dict[str, Any], values: List[int]):
+        fields = record.get('fields', {})
+        self.record = record
+        self.values = values
+        marka = fields.get('Marka') or []
+        self.brands = frozenset(marka if isinstance(marka, list) else [marka])
+        self.category = fields.get('Kategori')
+        self.sort_key = fold(fields.get('SKU'))
+
+
+class SearchIndex:
+    """
+    Urun_Katalogu kayıtları için n-gram ters indeksi (CatalogIndex kilidi altında kullanılır)
+
+    İndeks, alan başına *farklı* değerler üzerinde kurulur: binlerce kayıtta
+    aynı olan "wayfarer" model adı bir kez doğrulanır ve puanlanır, sonra
+    o değere sahip dokümanlara yayılır.
+    """
+
+    def __init__(self, records: Iterable[Dict[str, Any]] = ()):
+        self._docs: Dict[str, _Doc] = {}
+        # Değer numarası → (katlanmış metin, alan ağırlığı) ve o değere sahip kayıt ID'leri
+        self._values: List[tuple] = []
+        self._value_docs: List[Set[str]] = []
+        self._value_ids: Dict[tuple, int] = {}
+        self._postings: Dict[str, List[int]] = {}
+        # Değer numarası → SKU sırasına dizilmiş (sort_key, record ID) listesi (ilk aramada kurulur)
+        self._sorted_docs: Dict[int, List[tuple]] = {}
+        self._tombstones = 0
+        for record in records:
+            self.add(record)
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def add(self, record: Dict[str, Any]) -> None:
+        """Kaydı ekle (aynı ID varsa eskisinin yerine geçer)"""
+        self.remove(record['id'])
+
+        fields = record.get('fields', {})
+        values = []
+        for name, weight in SEARCH_FIELDS.items():
+            text = fold(fields.get(name))
+            if text:
+                value_no = self._value_no(text, weight)
+                if value_no in values:
+                    continue
+                self._value_docs[value_no].add(record['id'])
+                self._sorted_docs.pop(value_no, None)
+                values.append(value_no)
+
+        self._docs[record['id']] = _Doc(record, values)
+
+    def remove(self, record_id: str) -> None:
+        """Kaydı sil; sahipsiz kalan değerler mezar taşı olur (gerekirse indeks yeniden kurulur)"""
+        doc = self._docs.pop(record_id, None)
+        if doc is None:
+            return
+        for value_no in doc.values:
+            owners = self._value_docs[value_no]
+            owners.discard(record_id)
+            self._sorted_docs.pop(value_no, None)
+            if not owners:
+                self._tombstones += 1
+        if self._tombstones > REBUILD_RATIO * max(len(self._values), 1):
+            self._rebuild()
+
+    def search(
+        self,
+        term: str,
+        brand: Optional[str] = None,
+        category: Optional[str] = None,
+        limit: int = MAX_RESULTS
+    ) -> List[Dict[str, Any]]:
+        """
+        Arama alanlarından birinde `term` geçen kayıtlar
+
+        Args:
+            term: Arama terimi (alt dize olarak aranır)
+            brand: Marka filtresi (record ID)
+            category: Kategori filtresi (OF/GN/LN)
+            limit: En fazla sonuç
+
+        Returns:
+            List[Dict]: Ürün kayıtları (en iyi eşleşme önce, eşitlikte SKU sırası)
+        """
+        query = fold(term)
+        if not query:
+            return []
+
+        # Her eşleşen değeri bir kez puanla: skor → değer numaraları
+        by_score: Dict[int, List[int]] = {}
+        for value_no in self._candidates(query):
+            if not self._value_docs[value_no]:
+                continue
+            text, weight = self._values[value_no]
+            pos = text.find(query)
+            if pos < 0:
+                continue
+            kind = _EXACT if text == query else _PREFIX if pos == 0 else _SUBSTRING
+            by_score.setdefault(weight * kind, []).append(value_no)
+
+        # Yüksek skordan başlayarak dokümanları topla; bir doküman ilk
+        # görüldüğü (en yüksek) skorla sayılır
+        results: List[Dict[str, Any]] = []
+        seen: Set[str] = set()
+        for score in sorted(by_score, reverse=True):
+            # Aynı skordaki değerlerin sıralı doküman listeleri birleştirilir;
+            # ihtiyaç kadar doküman alınınca durulur. Çok sayıda küçük liste
+            # (ör. her kayıtta farklı olan SKU'lar) için düz sıralama daha hızlı.
+            values = by_score[score]
+            if len(values) <= MERGE_FANIN:
+                merged = heapq.merge(*(self._sorted(value_no) for value_no in values))
+            else:
+                flat = [entry for value_no in values for entry in self._sorted(value_no)]
+                if brand or category:
+                    merged = sorted(flat)
+                else:
+                    # Filtre yoksa en fazla bu kadar giriş yeterli: daha önce görülenler
+                    # + doküman başına alan sayısı kadar tekrar
+                    merged = heapq.nsmallest((limit - len(results)) * len(SEARCH_FIELDS) + len(seen), flat)
+            for _, record_id in merged:
+                if record_id in seen:
+                    continue
+                seen.add(record_id)
+                doc = self._docs[record_id]
+                if brand and brand not in doc.brands:
+                    continue
+                if category and doc.category != category:
+                    continue
+                results.append(doc.record)
+                if len(results) >= limit:
+                    return results
+
+        return results
+
+    # ========== INTERNALS ==========
+
+    def _value_no(self, text: str, weight: int) -> int:
+        key = (text, weight)
+        value_no = self._value_ids.get(key)
+        if value_no is None:
+            value_no = len(self._values)
+            self._values.append(key)
+            self._value_docs.append(set())
+            self._value_ids[key] = value_no
+            for gram in _ngrams(text):
+                self._postings.setdefault(gram, []).append(value_no)
+        elif not self._value_docs[value_no]:
+            # Mezar taşı olan değer yeniden kullanılıyor
+            self._tombstones -= 1
+        return value_no
+
+    def _sorted(self, value_no: int) -> List[tuple]:
+        entries = self._sorted_docs.get(value_no)
+        if entries is None:
+            entries = sorted((self._docs[rid].sort_key, rid) for rid in self._value_docs[value_no])
+            self._sorted_docs[value_no] = entries
+        return entries
+
+    def _candidates(self, query: str) -> Iterable[int]:
+        """Sorgunun tüm n-gram'larını içeren değer numaraları"""
+        if len(query) < NGRAM:
+            # Kısa sorgularda n-gram yok; tüm farklı değerler doğrulanır
+            return range(len(self._values))
+
+        postings = []
+        for gram in _ngrams(query):
+            posting = self._postings.get(gram)
+            if not posting:
+                return ()
+            postings.append(posting)
+
+        postings.sort(key=len)
+        result = set(postings[0])
+        for posting in postings[1:]:
+            result.intersection_update(posting)
+            if not result:
+                break
+        return result
+
+    def _rebuild(self) -> None:
+        records = [doc.record for doc in self._docs.values()]
+        self._docs = {}
+        self._values = []
+        self._value_docs = []
+        self._value_ids = {}
+        self._postings = {}
+        self._sorted_docs = {}
+        self._tombstones = 0
+        for record in records:
+            self.add(record)
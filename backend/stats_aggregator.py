@@ -0,0 +1,231 @@
+"""
+Günlük İstatistik Toplayıcısı - Konyalı Optik Sayım Sistemi
+/api/stats için eşleşme durumu sayaçları
+
+Eskiden her istatistik isteğinde bugünün tüm Sayim_Kayitlari kayıtları
+(tüm alanlarıyla) çekilip Python'da üç ayrı geçişle sayılıyordu; gün
+ilerledikçe istek binlerce kayıt indiriyordu. Burada:
+- Sayaçlar başarılı her sayım kaydında artırılır
+- Airtable ile periyodik olarak (sadece durum alanı çekilerek) uzlaştırılır
+- İstatistik okuması sabit zamanlıdır
+
+Sayaçlar gunicorn worker'larının paylaştığı bir SQLite dosyasındadır: her
+worker aynı sayaçları artırır ve uzlaştırmayı hangi worker (veya iş
+kuyruğundaki hangi iş) yaparsa yapsın sonuç hepsine yansır. Dosya
+verilmezse (testler, tek süreç) veritabanı bellekte tutulur.
+
+Uzlaştırma sürerken yazılan kayıtlar ayrıca tutulur ve Airtable'dan gelen
+toplama eklenir; uzlaştırma sonucu bu yazmaları kaybetmez.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Any, Optional, Callable
+from file_lock import FileLock, ensure_dir
+from stok_tracker import today_str
+
+# Sayim_Kayitlari eşleşme durumu alanı
+STATUS_FIELD = 'Eşleşme Durumu'
+
+# Eski kayıtlarda/araçlarda görülen alan adı (okurken yedek olarak bakılır)
+LEGACY_STATUS_FIELD = 'Eslesme_Durumu'
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+-- scope: 'day' = günün sayaçları, 'since' = uzlaştırma sürerken yazılanlar
+CREATE TABLE IF NOT EXISTS counts (
+    scope TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value INTEGER NOT NULL,
+    PRIMARY KEY (scope, key)
+);
+"""
+
+# Airtable değeri → istatistik anahtarı
+STATUS_KEYS = {
+    'Direkt': 'direkt',
+    'Belirsiz': 'belirsiz',
+    'Bulunamadı': 'bulunamadi'
+}
+
+
+def empty_stats() -> Dict[str, Any]:
+    """Boş istatistik sözlüğü"""
+    return {'total': 0, 'direkt': 0, 'belirsiz': 0, 'bulunamadi': 0, 'direkt_oran': 0}
+
+
+def record_status(fields: Dict[str, Any]) -> Optional[str]:
+    """Kayıt alanlarından eşleşme durumu"""
+    return fields.get(STATUS_FIELD, fields.get(LEGACY_STATUS_FIELD))
+
+
+class DailyStats:
+    """Thread-safe (opsiyonel olarak süreçler arası) günlük eşleşme durumu sayaçları"""
+
+    def __init__(self, db_path: Optional[str] = None):
+        """
+        Args:
+            db_path: Worker'lar arası paylaşılan SQLite dosyası (None = sadece bu süreç)
+        """
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+        if db_path:
+            ensure_dir(os.path.dirname(db_path))
+        # Aynı anda tek uzlaştırma çalışır (tüm worker'larda)
+        self._reconcile_lock = FileLock(db_path + '.lock' if db_path else None)
+
+        with self._lock:
+            self._connect().executescript(_SCHEMA)
+
+    @staticmethod
+    def _empty_counts() -> Dict[str, int]:
+        return {'total': 0, 'direkt': 0, 'belirsiz': 0, 'bulunamadi': 0}
+
+    @property
+    def reconciled_at(self) -> Optional[float]:
+        with self._lock:
+            value = self._meta(self._connect()).get('reconciled_at')
+        return float(value) if value is not None else None
+
+    def needs_reconcile(self, day: Optional[str] = None) -> bool:
+        """Hiç uzlaştırılmadı veya gün döndü mü?"""
+        day = day or today_str()
+        with self._lock:
+            meta = self._meta(self._connect())
+        return meta.get('day') != day or 'reconciled_at' not in meta
+
+    def record(self, status: Optional[str], day: Optional[str] = None) -> None:
+        """
+        Başarılı bir sayım kaydını say
+
+        Args:
+            status: Eşleşme durumu ('Direkt' | 'Belirsiz' | 'Bulunamadı' | 'Manuel' ...)
+            day: Kayıt günü (varsayılan: bugün)
+        """
+        day = day or today_str()
+        with self._transaction() as conn:
+            meta = self._meta(conn)
+            if meta.get('day') != day:
+                # Gün döndü: önceki günün sayaçları geçersiz
+                conn.execute("DELETE FROM counts WHERE scope = 'day'")
+                conn.execute("DELETE FROM meta WHERE key = 'reconciled_at'")
+                conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('day', ?)", (day,))
+            self._bump(conn, 'day', status)
+            if meta.get('reconciling'):
+                self._bump(conn, 'since', status)
+
+    def reconcile(self, day: str, fetch: Callable[[], List[Dict[str, Any]]]) -> int:
+        """
+        Sayaçları Airtable kayıtlarından yeniden kur
+
+        Args:
+            day: Sayım günü (YYYY-MM-DD)
+            fetch: O günün kayıtlarını döndüren fonksiyon (sadece durum alanı yeterli)
+
+        Returns:
+            int: Çekilen kayıt sayısı
+        """
+        with self._reconcile_lock:
+            with self._transaction() as conn:
+                conn.execute("DELETE FROM counts WHERE scope = 'since'")
+                conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('reconciling', '1')")
+            try:
+                records = fetch()
+            except Exception:
+                with self._transaction() as conn:
+                    conn.execute("DELETE FROM meta WHERE key = 'reconciling'")
+                raise
+
+            counts = self._empty_counts()
+            for record in records:
+                key = STATUS_KEYS.get(record_status(record.get('fields', {})))
+                counts['total'] += 1
+                if key:
+                    counts[key] += 1
+
+            with self._transaction() as conn:
+                conn.execute("DELETE FROM meta WHERE key = 'reconciling'")
+                since = self._counts(conn, 'since')
+                conn.execute("DELETE FROM counts WHERE scope = 'since'")
+                current_day = self._meta(conn).get('day')
+                if current_day is not None and current_day > day:
+                    # Çekim sürerken gün döndü; eski günün sonucu uygulanmaz
+                    return len(records)
+                if current_day == day:
+                    # Çekim sırasında yazılanlar (tüm worker'lar)
+                    for key, value in since.items():
+                        counts[key] += value
+                conn.execute("DELETE FROM counts WHERE scope = 'day'")
+                conn.executemany(
+                    "INSERT INTO counts (scope, key, value) VALUES ('day', ?, ?)", counts.items()
+                )
+                conn.executemany(
+                    'INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)',
+                    [('day', day), ('reconciled_at', repr(time.time()))]
+                )
+            return len(records)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """İstatistikler: {total, direkt, belirsiz, bulunamadi, direkt_oran}"""
+        with self._lock:
+            stats: Dict[str, Any] = self._counts(self._connect(), 'day')
+        total = stats['total']
+        stats['direkt_oran'] = round(stats['direkt'] / total * 100, 1) if total > 0 else 0
+        return stats
+
+    # ========== INTERNALS ==========
+
+    @staticmethod
+    def _meta(conn: sqlite3.Connection) -> Dict[str, str]:
+        return dict(conn.execute('SELECT key, value FROM meta').fetchall())
+
+    def _counts(self, conn: sqlite3.Connection, scope: str) -> Dict[str, int]:
+        counts = self._empty_counts()
+        counts.update(conn.execute('SELECT key, value FROM counts WHERE scope = ?', (scope,)).fetchall())
+        return counts
+
+    @staticmethod
+    def _bump(conn: sqlite3.Connection, scope: str, status: Optional[str]) -> None:
+        keys = ['total']
+        key = STATUS_KEYS.get(status)
+        if key:
+            keys.append(key)
+        conn.executemany(
+            'INSERT INTO counts (scope, key, value) VALUES (?, ?, 1) '
+            'ON CONFLICT(scope, key) DO UPDATE SET value = value + 1',
+            [(scope, k) for k in keys]
+        )
+
+    def _connect(self) -> sqlite3.Connection:
+        """Süreç başına tek bağlantı (self._lock altında kullanılır)"""
+        if self._conn is None or self._pid != os.getpid():
+            if self.db_path:
+                conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None, check_same_thread=False)
+                conn.execute('PRAGMA journal_mode=WAL')
+                conn.execute('PRAGMA synchronous=NORMAL')
+            else:
+                conn = sqlite3.connect(':memory:', isolation_level=None, check_same_thread=False)
+            self._conn = conn
+            self._pid = os.getpid()
+        return self._conn
+
+    @contextmanager
+    def _transaction(self):
+        """BEGIN IMMEDIATE ... COMMIT bloğu (hata olursa ROLLBACK)"""
+        with self._lock:
+            conn = self._connect()
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                yield conn
+            except Exception:
+                conn.execute('ROLLBACK')
+                raise
+            conn.execute('COMMIT')
@@ -0,0 +1,211 @@
+"""
+Stok Güncelleme Toplayıcısı - Konyalı Optik Sayım Sistemi
+Aynı SKU'nun art arda okutmalarını kısa bir pencerede birleştirir
+
+30 adetlik bir koli okutulduğunda her okutma için ayrı ayrı
+Mevcut_Miktar oku-değiştir-yaz yapmak yerine, artışlar SKU başına
+toplanır ve pencere sonunda her SKU tek kez yazılır:
+- Mevcut kalemler: batch_update (10'arlı)
+- Yeni kalemler: batch_create (10'arlı)
+
+Kalıcılık: Artışlar bellekte değil, worker'ların paylaştığı takipçi
+dosyasında (`tracker.add_delta`) bekler; süreç çökse veya yeniden başlasa
+da kaybolmaz. Flush bir SKU'yu yazdıktan sonra yazdığı artışı aynı
+transaction'da bekleyenlerden düşer; bu arada gelen artışlar bir sonraki
+flush'a kalır. Geçici hatada artışlar bekleyenlerde kalır ve flush hata
+fırlatır; çağıran (iş kuyruğundaki 'stok_flush' işi veya periyodik thread)
+tekrar dener. Kalıcı hatada (4xx) artış atılır, günlük sayaç geri alınır ve
+flush PermanentJobError fırlatır; 'stok_flush' işi 'failed' olarak kalır.
+Worker kapanırken `stop()` bekleyenleri son kez yazar.
+
+Worker'lar: Flush, süreçler arası `tracker.write_lock` altında tüm
+worker'ların artışlarını paylaşılan Mevcut_Miktar'a ekler ve sonucu
+yazar; böylece diğer worker'ın yazdığı değer eskisiyle ezilmez, yeni
+kalem de bir kez oluşturulur.
+"""
+
+import threading
+import logging
+from typing import Dict, List, Any, Callable, Optional
+from background import PeriodicTask
+from job_queue import PermanentJobError
+from stok_tracker import StokTracker, today_str
+from write_buffer import is_permanent_error, BATCH_SIZE
+
+logger = logging.getLogger(__name__)
+
+
+class StokUpdateAggregator:
+    """SKU başına Mevcut_Miktar artışlarını toplayıp toplu yazan tampon"""
+
+    def __init__(self, table, tracker: StokTracker, window: float = 0.5):
+        """
+        Args:
+            table: pyairtable Table (Stok_Kalemleri)
+            tracker: Worker'ların paylaştığı sayaç, stok kalemi ve artış deposu
+            window: Artışların toplanma süresi (saniye)
+        """
+        self.table = table
+        self.tracker = tracker
+        self.window = window
+        self._lock = threading.Lock()
+        self._task = PeriodicTask('stok-aggregator', window, self.flush)
+
+        self.stats = {'queued': 0, 'written': 0, 'batches': 0, 'errors': 0, 'dropped': 0}
+
+    def add(
+        self,
+        sku_id: str,
+        konum: Optional[str] = None,
+        delta: int = 1,
+        schedule: Optional[Callable[[], Any]] = None
+    ) -> None:
+        """
+        SKU için artışı kaydet ve flush'ı planla
+
+        Args:
+            sku_id: SKU record ID
+            konum: Ürün konumu (opsiyonel, son verilen geçerli olur)
+            delta: Mevcut_Miktar artışı
+            schedule: Verilirse flush bu fonksiyonla (ör. iş kuyruğuna)
+                planlanır; verilmezse flush thread'i ilk çağrıda başlar
+        """
+        self.tracker.add_delta(sku_id, delta, konum)
+        with self._lock:
+            self.stats['queued'] += delta
+
+        if schedule is None:
+            if not self._task.running:
+                self._task.start()
+            return
+        try:
+            schedule()
+        except Exception:
+            # Çağıran tekrar deneyecek; artış iki kez yazılmasın
+            self.tracker.discard_delta(sku_id, delta)
+            raise
+
+    @property
+    def pending_count(self) -> int:
+        return len(self.tracker.pending_deltas())
+
+    def flush(self) -> int:
+        """
+        Bekleyen artışları (tüm worker'ların) Airtable'a yaz
+
+        Returns:
+            int: Yazılan SKU sayısı
+
+        Raises:
+            RuntimeError: Bir batch geçici hatayla yazılamadı; artışları
+                bekleyenlerde kalır, flush tekrar denenmelidir
+            PermanentJobError: Bazı SKU'lar kalıcı hatayla yazılamadı;
+                artışları atıldı ve sayaçları geri alındı
+        """
+        with self.tracker.write_lock:
+            pending = self.tracker.pending_deltas()
+            if not pending:
+                return 0
+
+            today = today_str()
+            updates: List[Dict[str, Any]] = []
+            creates: List[Dict[str, Any]] = []
+            update_skus: List[str] = []
+            create_skus: List[str] = []
+
+            for sku_id, entry in pending.items():
+                count = self.tracker.count(sku_id)
+                current = self.tracker.stok_record(sku_id)
+                if current is None:
+                    creates.append({
+                        'SKU': [sku_id],
+                        'Konum': entry['konum'] or 'Genel',
+                        'Son_Sayim_Tarihi': today,
+                        'Son_Sayim_Miktari': count,
+                        'Mevcut_Miktar': entry['delta']
+                    })
+                    create_skus.append(sku_id)
+                    continue
+
+                fields = {
+                    'Son_Sayim_Tarihi': today,
+                    'Son_Sayim_Miktari': count,
+                    'Mevcut_Miktar': current[1] + entry['delta']
+                }
+                if entry['konum']:
+                    fields['Konum'] = entry['konum']
+                updates.append({'id': current[0], 'fields': fields})
+                update_skus.append(sku_id)
+
+            written = 0
+            retry: List[str] = []
+            rejected: List[str] = []
+            last_error: Optional[Exception] = None
+
+            for start in range(0, len(updates), BATCH_SIZE):
+                chunk = update_skus[start:start + BATCH_SIZE]
+                records = updates[start:start + BATCH_SIZE]
+                try:
+                    self.table.batch_update(records)
+                except Exception as e:
+                    last_error = e
+                    self._failed_batch(chunk, e, rejected if is_permanent_error(e) else retry)
+                    continue
+                for sku_id, record in zip(chunk, records):
+                    self.tracker.commit_delta(sku_id, pending[sku_id]['delta'],
+                                              record['id'], record['fields']['Mevcut_Miktar'])
+                written += len(chunk)
+                self.stats['batches'] += 1
+
+            for start in range(0, len(creates), BATCH_SIZE):
+                chunk = create_skus[start:start + BATCH_SIZE]
+                try:
+                    records = self.table.batch_create(creates[start:start + BATCH_SIZE])
+                except Exception as e:
+                    last_error = e
+                    self._failed_batch(chunk, e, rejected if is_permanent_error(e) else retry)
+                    continue
+                for sku_id, record in zip(chunk, records):
+                    delta = pending[sku_id]['delta']
+                    self.tracker.commit_delta(sku_id, delta, record['id'], delta)
+                written += len(chunk)
+                self.stats['batches'] += 1
+
+            self.stats['written'] += written
+            if written:
+                logger.info(f"Stok kalemleri toplu güncellendi: {written} SKU")
+            if retry:
+                # Reddedilen artışlar da bekler; tekrar denemede yine reddedilirse atılır
+                raise RuntimeError(f"Stok güncellemesi yazılamadı: {len(retry)} SKU") from last_error
+            if rejected:
+                self._drop(rejected, pending, last_error)
+            return written
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Thread'i durdur ve bekleyen artışları son kez yazmayı dene"""
+        self._task.stop(timeout)
+        try:
+            self.flush()
+        except Exception as e:
+            # Geçici hatada artışlar dosyada kalır, sonraki flush yazar
+            logger.warning("Bekleyen stok güncellemeleri yazılamadı", extra={'error': str(e)})
+
+    # ========== INTERNALS ==========
+
+    def _failed_batch(self, skus: List[str], error: Exception, failed: List[str]) -> None:
+        """Başarısız batch'i logla ve SKU'larını `failed` listesine ekle"""
+        self.stats['errors'] += 1
+        failed.extend(skus)
+        logger.warning("Stok güncellemesi başarısız",
+                       extra={'skus': skus, 'permanent': is_permanent_error(error), 'error': str(error)})
+
+    def _drop(self, skus: List[str], pending: Dict[str, Dict[str, Any]], error: Exception) -> None:
+        """Kalıcı hatayla reddedilen artışları at, sayaçları geri al ve hatayı çağırana bildir"""
+        for sku_id in skus:
+            self.tracker.discard_delta(sku_id, pending[sku_id]['delta'], uncount=True)
+        self.stats['dropped'] += len(skus)
+        logger.error("Stok güncellemesi kalıcı hata ile atlandı",
+                     extra={'skus': skus, 'error': str(error)})
+        raise PermanentJobError(
+            f"Stok güncellemesi kalıcı hata ile atlandı ({', '.join(skus)}): {error}"
+        ) from error
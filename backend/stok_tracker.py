@@ -0,0 +1,292 @@
+"""
+Stok Takipçisi - Konyalı Optik Sayım Sistemi
+Günlük SKU sayım sayaçları ve SKU → Stok_Kalemleri eşlemesi
+
+Eskiden her kayıtta bugünün tüm Sayim_Kayitlari'i ve Stok_Kalemleri
+formülle taranıyordu (kayıt başına 2-3 ek istek, gün ilerledikçe büyüyen iş).
+Burada sayaçlar bir kez (açılışta / gün dönümünde) Airtable'dan tohumlanır,
+sonraki okutmalarda sadece yerelde artırılır.
+
+Sayaçlar ve Mevcut_Miktar değerleri gunicorn worker'larının paylaştığı
+bir SQLite dosyasında tutulur; artışlar BEGIN IMMEDIATE ile atomiktir.
+`write_lock` da süreçler arasıdır: bir worker Mevcut_Miktar'ı artırıp
+Airtable'a yazarken diğeri araya girip eski bir mutlak değeri yazamaz.
+Henüz Airtable'a yazılmamış Mevcut_Miktar artışları (`deltas`) da aynı
+dosyadadır; süreç çökse bile kaybolmaz, yazıldıkça düşülür.
+Dosya verilmezse (testler, tek süreç) veritabanı bellekte tutulur.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, List, Any, Optional, Tuple
+from file_lock import FileLock, ensure_dir
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS counts (
+    sku_id TEXT PRIMARY KEY,
+    count INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS stok (
+    sku_id TEXT PRIMARY KEY,
+    record_id TEXT NOT NULL,
+    mevcut INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS deltas (
+    sku_id TEXT PRIMARY KEY,
+    delta INTEGER NOT NULL,
+    konum TEXT
+);
+"""
+
+
+def today_str() -> str:
+    """Yerel tarihe göre bugün (YYYY-MM-DD)"""
+    return datetime.now().strftime('%Y-%m-%d')
+
+
+def _linked_ids(record: Dict[str, Any], field: str = 'SKU') -> List[str]:
+    """Linked record alanındaki ID listesi (boşsa [])"""
+    value = record.get('fields', {}).get(field) or []
+    return value if isinstance(value, list) else [value]
+
+
+class StokTracker:
+    """Thread-safe (opsiyonel olarak süreçler arası) günlük sayaç ve stok kalemi önbelleği"""
+
+    def __init__(self, reseed_interval: float = 300.0, db_path: Optional[str] = None):
+        """
+        Args:
+            reseed_interval: Sayaçların Airtable'dan yeniden tohumlanma aralığı
+                (saniye); 0 = sadece açılışta ve gün dönümünde
+            db_path: Worker'lar arası paylaşılan SQLite dosyası (None = sadece bu süreç)
+        """
+        self.reseed_interval = reseed_interval
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+        if db_path:
+            ensure_dir(os.path.dirname(db_path))
+        # Tohumlama ve Airtable yazmaları bu kilitle sıralanır; böylece yazma
+        # sürerken yapılan bir tohumlama önbelleği eski değere çekemez
+        self.write_lock = FileLock(db_path + '.lock' if db_path else None)
+
+        with self._lock:
+            self._connect().executescript(_SCHEMA)
+
+    def needs_seed(self, day: Optional[str] = None, now: Optional[float] = None) -> bool:
+        """
+        Tohumlama gerekli mi? (hiç yapılmadı, gün döndü veya süre doldu)
+
+        Args:
+            day: Bugün (varsayılan: today_str())
+            now: Şimdiki zaman (varsayılan: time.time())
+        """
+        day = day or today_str()
+        now = now if now is not None else time.time()
+        with self._lock:
+            meta = dict(self._connect().execute('SELECT key, value FROM meta').fetchall())
+        if meta.get('day') != day or 'seeded_at' not in meta:
+            return True
+        return bool(self.reseed_interval) and now - float(meta['seeded_at']) >= self.reseed_interval
+
+    def seed(self, day: str, sayim_records: List[Dict[str, Any]], stok_records: List[Dict[str, Any]]) -> None:
+        """
+        Sayaçları ve stok eşlemesini Airtable kayıtlarından kur
+
+        Aynı gün içindeki yeniden tohumlamada sayaç küçülmez: başka bir
+        worker'ın artırdığı ama kaydı henüz Airtable'a ulaşmamış okutmalar
+        korunur.
+
+        Args:
+            day: Sayım günü (YYYY-MM-DD)
+            sayim_records: O günün Sayim_Kayitlari kayıtları (SKU alanı yeterli)
+            stok_records: Stok_Kalemleri kayıtları (SKU, Mevcut_Miktar)
+        """
+        counts: Dict[str, int] = {}
+        for record in sayim_records:
+            for sku_id in _linked_ids(record):
+                counts[sku_id] = counts.get(sku_id, 0) + 1
+
+        stok: Dict[str, Tuple[str, int]] = {}
+        for record in stok_records:
+            mevcut = record['fields'].get('Mevcut_Miktar', 0) or 0
+            for sku_id in _linked_ids(record):
+                # Aynı SKU için birden fazla kalem varsa ilki kullanılır
+                stok.setdefault(sku_id, (record['id'], mevcut))
+
+        with self._transaction() as conn:
+            row = conn.execute("SELECT value FROM meta WHERE key = 'day'").fetchone()
+            if row and row[0] == day:
+                for sku_id, count in conn.execute('SELECT sku_id, count FROM counts'):
+                    counts[sku_id] = max(counts.get(sku_id, 0), count)
+
+            conn.execute('DELETE FROM counts')
+            conn.executemany('INSERT INTO counts (sku_id, count) VALUES (?, ?)', counts.items())
+            conn.execute('DELETE FROM stok')
+            conn.executemany(
+                'INSERT INTO stok (sku_id, record_id, mevcut) VALUES (?, ?, ?)',
+                [(sku_id, record_id, mevcut) for sku_id, (record_id, mevcut) in stok.items()]
+            )
+            conn.executemany(
+                'INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)',
+                [('day', day), ('seeded_at', repr(time.time()))]
+            )
+
+    def increment(self, sku_id: str, delta: int = 1) -> int:
+        """
+        SKU'nun bugünkü sayacını artır
+
+        Args:
+            sku_id: SKU record ID
+            delta: Eklenecek adet (başarısız güncellemeyi geri almak için negatif)
+
+        Returns:
+            int: Bugün bu SKU için sayılan toplam adet (tüm worker'lar)
+        """
+        with self._transaction() as conn:
+            conn.execute(
+                'INSERT INTO counts (sku_id, count) VALUES (?, ?) '
+                'ON CONFLICT(sku_id) DO UPDATE SET count = count + excluded.count',
+                (sku_id, delta)
+            )
+            return conn.execute('SELECT count FROM counts WHERE sku_id = ?', (sku_id,)).fetchone()[0]
+
+    def count(self, sku_id: str) -> int:
+        """SKU'nun bugünkü sayacı"""
+        with self._lock:
+            row = self._connect().execute('SELECT count FROM counts WHERE sku_id = ?', (sku_id,)).fetchone()
+        return row[0] if row else 0
+
+    def stok_record(self, sku_id: str) -> Optional[Tuple[str, int]]:
+        """SKU'nun stok kalemi: (record ID, Mevcut_Miktar) veya None"""
+        with self._lock:
+            row = self._connect().execute(
+                'SELECT record_id, mevcut FROM stok WHERE sku_id = ?', (sku_id,)
+            ).fetchone()
+        return (row[0], row[1]) if row else None
+
+    def bump_mevcut(self, sku_id: str, delta: int = 1) -> Optional[Tuple[str, int]]:
+        """
+        Bilinen stok kaleminin Mevcut_Miktar değerini atomik olarak değiştir
+
+        Sonuç Airtable'a yazılana kadar `write_lock` tutulmalıdır.
+
+        Args:
+            sku_id: SKU record ID
+            delta: Eklenecek miktar (geri almak için negatif)
+
+        Returns:
+            (record ID, yeni Mevcut_Miktar) veya None (kalem henüz yok)
+        """
+        with self._transaction() as conn:
+            conn.execute('UPDATE stok SET mevcut = mevcut + ? WHERE sku_id = ?', (delta, sku_id))
+            row = conn.execute('SELECT record_id, mevcut FROM stok WHERE sku_id = ?', (sku_id,)).fetchone()
+        return (row[0], row[1]) if row else None
+
+    def set_stok_record(self, sku_id: str, record_id: str, mevcut: int) -> None:
+        """Yeni oluşturulan stok kalemini eşlemeye ekle"""
+        with self._lock:
+            self._connect().execute(
+                'INSERT OR REPLACE INTO stok (sku_id, record_id, mevcut) VALUES (?, ?, ?)',
+                (sku_id, record_id, mevcut)
+            )
+
+    def add_delta(self, sku_id: str, delta: int = 1, konum: Optional[str] = None) -> None:
+        """
+        Airtable'a yazılacak Mevcut_Miktar artışını kaydet
+
+        Args:
+            sku_id: SKU record ID
+            delta: Eklenecek miktar
+            konum: Ürün konumu (opsiyonel, son verilen geçerli olur)
+        """
+        with self._transaction() as conn:
+            conn.execute(
+                'INSERT INTO deltas (sku_id, delta, konum) VALUES (?, ?, ?) '
+                'ON CONFLICT(sku_id) DO UPDATE SET delta = delta + excluded.delta, '
+                'konum = COALESCE(excluded.konum, konum)',
+                (sku_id, delta, konum)
+            )
+
+    def pending_deltas(self) -> Dict[str, Dict[str, Any]]:
+        """Yazılmayı bekleyen artışlar: {sku_id: {'delta': int, 'konum': Optional[str]}}"""
+        with self._lock:
+            rows = self._connect().execute('SELECT sku_id, delta, konum FROM deltas').fetchall()
+        return {sku_id: {'delta': delta, 'konum': konum} for sku_id, delta, konum in rows}
+
+    def commit_delta(self, sku_id: str, delta: int, record_id: str, mevcut: int) -> None:
+        """
+        Airtable'a yazılan artışı bekleyenlerden düş ve stok kalemini güncelle
+
+        İkisi tek transaction'dadır: yazma sonrası süreç çökerse artış
+        bekleyenlerde kalır ve aynı mutlak değer tekrar yazılır (çift ekleme olmaz).
+        `write_lock` tutulmalıdır.
+
+        Args:
+            sku_id: SKU record ID
+            delta: Yazılan artış (bu arada eklenenler bekleyenlerde kalır)
+            record_id: Stok kalemi record ID
+            mevcut: Airtable'a yazılan Mevcut_Miktar
+        """
+        with self._transaction() as conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO stok (sku_id, record_id, mevcut) VALUES (?, ?, ?)',
+                (sku_id, record_id, mevcut)
+            )
+            self._take_delta(conn, sku_id, delta)
+
+    def discard_delta(self, sku_id: str, delta: int, uncount: bool = False) -> None:
+        """
+        Yazılamayacak artışı bekleyenlerden düş
+
+        Args:
+            sku_id: SKU record ID
+            delta: Düşülecek artış
+            uncount: Bugünkü sayaçtan da düş (kalıcı hata; okutmalar stoka hiç yansımadı)
+        """
+        with self._transaction() as conn:
+            self._take_delta(conn, sku_id, delta)
+            if uncount:
+                conn.execute('UPDATE counts SET count = count - ? WHERE sku_id = ?', (delta, sku_id))
+
+    # ========== INTERNALS ==========
+
+    @staticmethod
+    def _take_delta(conn: sqlite3.Connection, sku_id: str, delta: int) -> None:
+        conn.execute('UPDATE deltas SET delta = delta - ? WHERE sku_id = ?', (delta, sku_id))
+        conn.execute('DELETE FROM deltas WHERE sku_id = ? AND delta = 0', (sku_id,))
+
+    def _connect(self) -> sqlite3.Connection:
+        """Süreç başına tek bağlantı (self._lock altında kullanılır)"""
+        if self._conn is None or self._pid != os.getpid():
+            if self.db_path:
+                conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None, check_same_thread=False)
+                conn.execute('PRAGMA journal_mode=WAL')
+                conn.execute('PRAGMA synchronous=NORMAL')
+            else:
+                conn = sqlite3.connect(':memory:', isolation_level=None, check_same_thread=False)
+            self._conn = conn
+            self._pid = os.getpid()
+        return self._conn
+
+    @contextmanager
+    def _transaction(self):
+        """BEGIN IMMEDIATE ... COMMIT bloğu (hata olursa ROLLBACK)"""
+        with self._lock:
+            conn = self._connect()
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                yield conn
+            except Exception:
+                conn.execute('ROLLBACK')
+                raise
+            conn.execute('COMMIT')
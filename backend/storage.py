@@ -0,0 +1,746 @@
+"""
+Depolama Arka Ucu - Konyalı Optik Sayım Sistemi
+AirtableClient'ın tablolarına erişim için değiştirilebilir arka uç
+
+AirtableClient eskiden dört pyairtable tablosunu doğrudan kuruyordu; yerel
+depolamayla çalışmak veya ağsız yük testi yapmak mümkün değildi. Tablolar
+artık bir StorageBackend'den alınır (STORAGE_BACKEND):
+- airtable: pyairtable tabloları (varsayılan; davranış aynı)
+- sqlite: Tek dosyada tüm tablolar; barkod, SKU ve zaman sütunları indeksli
+
+Arayüz, istemcinin kullandığı pyairtable Table alt kümesidir (all, first,
+get, create, batch_create, update, batch_update, upload_attachment).
+Sorgu yardımcıları (barcode_formula vb.) Formula döndürür: Airtable'a
+giden formül metni olarak davranır ve SQLite deposunun yorumladığı
+yapısal sorguyu taşır; Airtable formül dili yerelde ayrıştırılmaz.
+
+Yapısal sorgular (tuple):
+    ('any_eq', alan, [değer, ...])    alan değerlerden birine eşit (liste alanlarda içerir)
+    ('prefix', alan, önek)            alan önekle başlar
+    ('search', [alan, ...], terim)    terim alanlardan birinde geçer (büyük/küçük harf duyarsız)
+    ('and', [sorgu, ...])
+    ('modified_since', unix_zamanı)   oluşturulma/değişme zamanı sonrası
+    ('day', 'YYYY-MM-DD')             o gün oluşturulan (Timestamp) kayıtlar
+
+Katalog yerel depoya `python storage.py seed` ile, yerel değişiklikler
+Airtable'a `python storage.py push` ile aktarılır. Yerelde oluşturulan
+kayıtların ID'si `lrec` ile başlar (Airtable ID'si sanılmaz); gönderilince
+Airtable'ın verdiği ID `remote_id` sütununa yazılır ve bağlantı alanlarındaki
+yerel ID'ler gönderimden önce bu ID'lerle değiştirilir.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone, timedelta
+from typing import Dict, List, Any, Optional, Set, Tuple, Iterable
+from sayim_store import SayimStore
+from write_buffer import BATCH_SIZE, is_permanent_error
+
+logger = logging.getLogger(__name__)
+
+TABLES = ('Urun_Katalogu', 'Sayim_Kayitlari', 'Markalar', 'Stok_Kalemleri')
+
+# İndeksli sütunlara yazılan alanlar
+BARCODE_FIELDS = ('Tedarikçi Barkodu', 'Okutulan Barkod')
+SKU_FIELD = 'SKU'
+
+# Sıralamada kaydın oluşturulma zamanına karşılık gelen alan
+TIMESTAMP_FIELD = 'Timestamp'
+
+# Yerelde oluşturulan kayıtların ID öneki (Airtable 'rec' kullanır)
+LOCAL_RECORD_PREFIX = 'lrec'
+
+# Push sırası: bağlanan tablolar bağlandıkları tablolardan sonra gönderilir
+PUSH_ORDER = ('Markalar', 'Urun_Katalogu', 'Stok_Kalemleri', 'Sayim_Kayitlari')
+
+
+class Formula(str):
+    """Airtable formül metni + yerel arka ucun yorumladığı yapısal sorgu"""
+
+    def __new__(cls, text: str, query: Tuple):
+        formula = super().__new__(cls, text)
+        formula.query = query
+        return formula
+
+
+class StorageTable(ABC):
+    """Tablo arayüzü (pyairtable Table ile aynı imzalar)"""
+
+    name: str
+
+    @abstractmethod
+    def all(self, formula: Optional[str] = None, fields: Optional[List[str]] = None,
+            sort: Optional[List[str]] = None, max_records: Optional[int] = None) -> List[Dict[str, Any]]:
+        ...
+
+    def first(self, **options) -> Optional[Dict[str, Any]]:
+        records = self.all(max_records=1, **options)
+        return records[0] if records else None
+
+    @abstractmethod
+    def get(self, record_id: str) -> Dict[str, Any]:
+        ...
+
+    @abstractmethod
+    def create(self, fields: Dict[str, Any]) -> Dict[str, Any]:
+        ...
+
+    @abstractmethod
+    def batch_create(self, records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        ...
+
+    @abstractmethod
+    def update(self, record_id: str, fields: Dict[str, Any]) -> Dict[str, Any]:
+        ...
+
+    @abstractmethod
+    def batch_update(self, records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        ...
+
+    @abstractmethod
+    def upload_attachment(self, record_id: str, field: str, filename: str,
+                          content: bytes, content_type: Optional[str] = None) -> Dict[str, Any]:
+        ...
+
+
+class StorageBackend(ABC):
+    """Tablo sağlayıcısı"""
+
+    name = 'base'
+
+    @abstractmethod
+    def table(self, name: str) -> StorageTable:
+        ...
+
+
+# ========== AIRTABLE ==========
+
+class AirtableBackend(StorageBackend):
+    """pyairtable tabloları (Table arayüzü zaten uyumlu)"""
+
+    name = 'airtable'
+
+    def __init__(self, api, base_id: str):
+        """
+        Args:
+            api: pyairtable Api (rate limiter kurulmuş)
+            base_id: Airtable base ID
+        """
+        self.base = api.base(base_id)
+
+    def table(self, name: str):
+        return self.base.table(name)
+
+
+# ========== SQLITE ==========
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS records (
+    tbl TEXT NOT NULL,
+    id TEXT NOT NULL,
+    fields TEXT NOT NULL,
+    barcode TEXT,
+    sku TEXT,
+    created_at REAL NOT NULL,
+    modified_at REAL NOT NULL,
+    synced_at REAL,
+    remote_id TEXT,
+    dirty TEXT,
+    PRIMARY KEY (tbl, id)
+);
+CREATE INDEX IF NOT EXISTS records_barcode ON records (tbl, barcode);
+CREATE INDEX IF NOT EXISTS records_sku ON records (tbl, sku);
+CREATE INDEX IF NOT EXISTS records_created ON records (tbl, created_at);
+CREATE INDEX IF NOT EXISTS records_modified ON records (tbl, modified_at);
+"""
+
+
+def new_record_id() -> str:
+    """Yerel kayıt ID'si (lrec + 14 karakter; Airtable ID'leriyle karışmaz)"""
+    return LOCAL_RECORD_PREFIX + uuid.uuid4().hex[:14]
+
+
+def iso_time(timestamp: float) -> str:
+    """Unix zamanı → Airtable createdTime biçimi"""
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.') + \
+        f"{int(timestamp * 1000) % 1000:03d}Z"
+
+
+def parse_time(value: Optional[str]) -> Optional[float]:
+    """Airtable createdTime → Unix zamanı"""
+    if not value:
+        return None
+    return datetime.strptime(value[:19], '%Y-%m-%dT%H:%M:%S').replace(tzinfo=timezone.utc).timestamp()
+
+
+def _values(value: Any) -> List[str]:
+    """Alan değerini karşılaştırma için metin listesine çevir (liste alanlar dahil)"""
+    if value is None:
+        return []
+    if isinstance(value, list):
+        return [str(v) for v in value]
+    return [str(value)]
+
+
+def _indexed_columns(fields: Dict[str, Any]) -> Tuple[Optional[str], Optional[str]]:
+    """(barcode, sku) indeks sütunlarının değerleri"""
+    barcode = None
+    for name in BARCODE_FIELDS:
+        if fields.get(name) not in (None, ''):
+            barcode = str(fields[name])
+            break
+    sku_values = _values(fields.get(SKU_FIELD))
+    return barcode, (sku_values[0] if sku_values else None)
+
+
+def _day_bounds(day: str) -> Tuple[float, float]:
+    """Yerel günün başlangıç ve bitiş zamanı (today_str ile aynı saat dilimi)"""
+    start = datetime.strptime(day, '%Y-%m-%d')
+    return start.timestamp(), (start + timedelta(days=1)).timestamp()
+
+
+def matches(query: Tuple, record: Dict[str, Any], created_at: float = 0.0, modified_at: float = 0.0) -> bool:
+    """
+    Kayıt yapısal sorguya uyuyor mu?
+
+    Args:
+        query: Yapısal sorgu (modül açıklamasına bakın)
+        record: {id, fields}
+        created_at: Kaydın oluşturulma zamanı
+        modified_at: Kaydın son değişme zamanı
+    """
+    kind = query[0]
+    fields = record['fields']
+    if kind == 'and':
+        return all(matches(q, record, created_at, modified_at) for q in query[1])
+    if kind == 'any_eq':
+        wanted = {str(v) for v in query[2]}
+        return any(v in wanted for v in _values(fields.get(query[1])))
+    if kind == 'prefix':
+        return any(v.startswith(query[2]) for v in _values(fields.get(query[1])))
+    if kind == 'search':
+        term = query[2].lower()
+        return any(term in v.lower() for name in query[1] for v in _values(fields.get(name)))
+    if kind == 'modified_since':
+        return max(created_at, modified_at) > query[1]
+    if kind == 'day':
+        start, end = _day_bounds(query[1])
+        return start <= created_at < end
+    raise ValueError(f"Bilinmeyen sorgu: {kind}")
+
+
+def _column_for(field: str) -> Optional[str]:
+    if field in BARCODE_FIELDS:
+        return 'barcode'
+    if field == SKU_FIELD:
+        return 'sku'
+    return None
+
+
+def compile_query(query: Tuple) -> Tuple[List[str], List[Any], bool]:
+    """
+    Sorgunun indeksli sütunlarla ifade edilebilen kısmını SQL'e çevir
+
+    Returns:
+        Tuple: (WHERE koşulları, parametreler, SQL tam karşılıyor mu?)
+            Tam karşılamıyorsa adaylar ayrıca matches() ile süzülür.
+    """
+    kind = query[0]
+    if kind == 'and':
+        where, params, exact = [], [], True
+        for sub in query[1]:
+            sub_where, sub_params, sub_exact = compile_query(sub)
+            where += sub_where
+            params += sub_params
+            exact = exact and sub_exact
+        return where, params, exact
+    if kind == 'any_eq' and _column_for(query[1]):
+        values = [str(v) for v in query[2]]
+        placeholders = ', '.join('?' * len(values))
+        # Liste alanlarda (SKU bağlantısı) indekste sadece ilk değer var
+        return [f"{_column_for(query[1])} IN ({placeholders})"], values, query[1] != SKU_FIELD
+    if kind == 'prefix' and _column_for(query[1]):
+        column = _column_for(query[1])
+        return [f"{column} >= ? AND {column} < ?"], [query[2], query[2] + '\uffff'], True
+    if kind == 'modified_since':
+        return ["MAX(created_at, modified_at) > ?"], [query[1]], True
+    if kind == 'day':
+        return ["created_at >= ? AND created_at < ?"], list(_day_bounds(query[1])), True
+    return [], [], False
+
+
+class SqliteTable(StorageTable):
+    """SQLite arka ucunda bir tablo"""
+
+    def __init__(self, backend: 'SqliteBackend', name: str):
+        self.backend = backend
+        self.name = name
+
+    # ========== OKUMA ==========
+
+    def all(self, formula: Optional[str] = None, fields: Optional[List[str]] = None,
+            sort: Optional[List[str]] = None, max_records: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Kayıtları oku
+
+        Args:
+            formula: Formula (yapısal sorgusu olmayan düz formül metni desteklenmez)
+            fields: Döndürülecek alanlar (None = hepsi)
+            sort: Alan adları; '-' öneki azalan sıra. 'Timestamp' oluşturulma zamanıdır
+            max_records: En fazla kayıt
+
+        Raises:
+            ValueError: Formül yapısal sorgu taşımıyorsa
+        """
+        query = None
+        where, params, exact = ['tbl = ?'], [self.name], True
+        if formula:
+            query = getattr(formula, 'query', None)
+            if query is None:
+                raise ValueError(f"SQLite deposu düz Airtable formülünü yorumlayamaz: {formula}")
+            sub_where, sub_params, exact = compile_query(query)
+            where += sub_where
+            params += sub_params
+
+        sql = f"SELECT id, fields, created_at, modified_at FROM records WHERE {' AND '.join(where)}"
+        sort = list(sort or [])
+        sql_sort = all(key.lstrip('-') == TIMESTAMP_FIELD for key in sort)
+        if sort and sql_sort:
+            # Aynı andaki kayıtlar eklenme sırasıyla (rowid)
+            sql += ' ORDER BY ' + ', '.join(
+                'created_at DESC, rowid DESC' if key.startswith('-') else 'created_at, rowid' for key in sort
+            )
+        elif not sort:
+            sql += ' ORDER BY created_at, rowid'
+        if max_records and exact and (sql_sort or not sort):
+            sql += f" LIMIT {int(max_records)}"
+
+        records = []
+        for record_id, raw, created_at, modified_at in self.backend.connect().execute(sql, params):
+            record = {'id': record_id, 'createdTime': iso_time(created_at), 'fields': json.loads(raw)}
+            if query is not None and not exact and not matches(query, record, created_at, modified_at):
+                continue
+            records.append(record)
+
+        if sort and not sql_sort:
+            for key in reversed(sort):
+                name = key.lstrip('-')
+                records.sort(key=lambda r: (r['fields'].get(name) is None, str(r['fields'].get(name, ''))),
+                             reverse=key.startswith('-'))
+        if max_records:
+            records = records[:max_records]
+        if fields is not None:
+            wanted = set(fields)
+            for record in records:
+                record['fields'] = {k: v for k, v in record['fields'].items() if k in wanted}
+        return records
+
+    def get(self, record_id: str) -> Dict[str, Any]:
+        row = self.backend.connect().execute(
+            "SELECT fields, created_at FROM records WHERE tbl = ? AND id = ?", (self.name, record_id)
+        ).fetchone()
+        if row is None:
+            raise KeyError(f"Kayıt bulunamadı: {self.name}/{record_id}")
+        return {'id': record_id, 'createdTime': iso_time(row[1]), 'fields': json.loads(row[0])}
+
+    # ========== YAZMA ==========
+
+    def create(self, fields: Dict[str, Any]) -> Dict[str, Any]:
+        return self.batch_create([fields])[0]
+
+    def batch_create(self, records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        now = time.time()
+        created = [{'id': new_record_id(), 'createdTime': iso_time(now), 'fields': dict(fields)}
+                   for fields in records]
+        self._write(created, now, synced_at=None, created_at=now)
+        return created
+
+    def update(self, record_id: str, fields: Dict[str, Any]) -> Dict[str, Any]:
+        return self.batch_update([{'id': record_id, 'fields': fields}])[0]
+
+    def batch_update(self, records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Alanları mevcut kayıtla birleştir (Airtable PATCH gibi)"""
+        now = time.time()
+        updated = []
+        with self.backend.transaction() as conn:
+            for record in records:
+                current = self.get(record['id'])
+                current['fields'].update(record['fields'])
+                barcode, sku = _indexed_columns(current['fields'])
+                # Push sadece değişen alanları gönderir (lookup/formül alanları yazılamaz)
+                row = conn.execute("SELECT dirty FROM records WHERE tbl = ? AND id = ?",
+                                   (self.name, record['id'])).fetchone()
+                dirty = sorted(set(json.loads(row[0] or '[]')) | set(record['fields']))
+                conn.execute(
+                    "UPDATE records SET fields = ?, barcode = ?, sku = ?, modified_at = ?, synced_at = NULL, "
+                    "dirty = ? WHERE tbl = ? AND id = ?",
+                    (json.dumps(current['fields'], ensure_ascii=False), barcode, sku, now,
+                     json.dumps(dirty, ensure_ascii=False), self.name, record['id'])
+                )
+                updated.append(current)
+        return updated
+
+    def upload_attachment(self, record_id: str, field: str, filename: str,
+                          content: bytes, content_type: Optional[str] = None) -> Dict[str, Any]:
+        """Dosyayı depo klasörüne yaz ve ek alanına ekle"""
+        directory = os.path.join(self.backend.attachment_dir, self.name, record_id)
+        os.makedirs(directory, exist_ok=True)
+        attachment_id = 'att' + uuid.uuid4().hex[:14]
+        path = os.path.join(directory, f"{attachment_id}-{filename}")
+        with open(path, 'wb') as f:
+            f.write(content)
+
+        attachments = list(self.get(record_id)['fields'].get(field) or [])
+        attachments.append({
+            'id': attachment_id,
+            'url': 'file://' + os.path.abspath(path),
+            'filename': filename,
+            'size': len(content),
+            'type': content_type or 'application/octet-stream'
+        })
+        record = self.update(record_id, {field: attachments})
+        return {'id': record_id, 'createdTime': record['createdTime'], 'fields': {field: attachments}}
+
+    def import_records(self, records: Iterable[Dict[str, Any]], synced: bool = True) -> int:
+        """
+        Kayıtları ID'leri ve oluşturulma zamanlarıyla aktar (Airtable'dan tohumlama, benchmark)
+
+        Args:
+            records: Airtable kayıtları ({id, createdTime, fields})
+            synced: Kayıtlar Airtable'da zaten var mı? (push edilmez, ID'leri Airtable ID'sidir)
+
+        Returns:
+            int: Aktarılan kayıt sayısı
+        """
+        now = time.time()
+        records = list(records)
+        self._write(records, now, synced_at=now if synced else None)
+        return len(records)
+
+    # ========== SENKRONİZASYON ==========
+
+    def unsynced(self) -> List[Dict[str, Any]]:
+        """
+        Airtable'a gönderilmemiş kayıtlar (yerelde oluşturulan veya değişen)
+
+        Returns:
+            List[Dict]: {id, fields, remote_id, dirty, modified_at}; remote_id
+                None ise kayıt Airtable'da henüz yok, dirty değişen alan adları
+        """
+        rows = self.backend.connect().execute(
+            "SELECT id, fields, remote_id, dirty, modified_at FROM records "
+            "WHERE tbl = ? AND synced_at IS NULL ORDER BY created_at, rowid",
+            (self.name,)
+        ).fetchall()
+        return [
+            {'id': record_id, 'fields': json.loads(raw), 'remote_id': remote_id,
+             'dirty': json.loads(dirty) if dirty else None, 'modified_at': modified_at}
+            for record_id, raw, remote_id, dirty, modified_at in rows
+        ]
+
+    def mark_synced(self, record_id: str, remote_id: str, modified_at: float) -> None:
+        """
+        Gönderilen kaydın Airtable ID'sini yaz
+
+        Kayıt okunduktan sonra tekrar değiştiyse (modified_at farklı) bekleyen
+        olarak kalır; sonraki push değişen alanları günceller.
+        """
+        self.backend.connect().execute(
+            "UPDATE records SET remote_id = ?, "
+            "synced_at = CASE WHEN modified_at = ? THEN ? END, "
+            "dirty = CASE WHEN modified_at = ? THEN NULL ELSE dirty END "
+            "WHERE tbl = ? AND id = ?",
+            (remote_id, modified_at, time.time(), modified_at, self.name, record_id)
+        )
+
+    def _write(self, records: List[Dict[str, Any]], now: float, synced_at: Optional[float],
+               created_at: Optional[float] = None) -> None:
+        rows = []
+        for record in records:
+            barcode, sku = _indexed_columns(record['fields'])
+            created = created_at or parse_time(record.get('createdTime')) or now
+            rows.append((self.name, record['id'], json.dumps(record['fields'], ensure_ascii=False),
+                         barcode, sku, created, now, synced_at, record['id'] if synced_at else None))
+        with self.backend.transaction() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO records "
+                "(tbl, id, fields, barcode, sku, created_at, modified_at, synced_at, remote_id) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+
+
+class _Transaction:
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+
+    def __enter__(self) -> sqlite3.Connection:
+        self.conn.execute('BEGIN IMMEDIATE')
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.conn.execute('ROLLBACK' if exc_type else 'COMMIT')
+
+
+class _NestedTransaction(_Transaction):
+    def __enter__(self) -> sqlite3.Connection:
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        pass
+
+
+class SqliteBackend(StorageBackend):
+    """Tüm tabloları tek SQLite dosyasında (WAL) tutan yerel arka uç"""
+
+    name = 'sqlite'
+
+    def __init__(self, db_path: str):
+        """
+        Args:
+            db_path: SQLite dosyası (worker'lar arasında paylaşılabilir)
+        """
+        self.db_path = db_path
+        self.attachment_dir = os.path.splitext(db_path)[0] + '-attachments'
+        self.outbox_dir = os.path.splitext(db_path)[0] + '-push'
+        self._local = threading.local()
+        self._tables: Dict[str, SqliteTable] = {}
+        os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+        conn = self.connect()
+        conn.executescript(_SCHEMA)
+        # Senkronizasyon sütunları olmadan oluşturulmuş eski depo dosyaları
+        columns = {row[1] for row in conn.execute('PRAGMA table_info(records)')}
+        for column in ('remote_id', 'dirty'):
+            if column not in columns:
+                conn.execute(f'ALTER TABLE records ADD COLUMN {column} TEXT')
+        if 'remote_id' not in columns:
+            conn.execute('UPDATE records SET remote_id = id WHERE synced_at IS NOT NULL')
+
+    def connect(self) -> sqlite3.Connection:
+        """Thread'e özel bağlantı"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def transaction(self) -> _Transaction:
+        """BEGIN IMMEDIATE ... COMMIT (hata olursa ROLLBACK)"""
+        conn = self.connect()
+        if conn.in_transaction:
+            # İç içe çağrı (ör. batch_update içinde get): dış işlem kapsar
+            return _NestedTransaction(conn)
+        return _Transaction(conn)
+
+    def table(self, name: str) -> SqliteTable:
+        if name not in self._tables:
+            self._tables[name] = SqliteTable(self, name)
+        return self._tables[name]
+
+    def link_ids(self) -> Tuple[Dict[str, str], Set[str]]:
+        """
+        Bağlantı alanlarının push öncesi çevrilmesi için ID durumu
+
+        Returns:
+            Tuple: ({yerel ID: Airtable ID}, Airtable'da henüz olmayan kayıt ID'leri)
+        """
+        rows = self.connect().execute("SELECT id, remote_id FROM records").fetchall()
+        mapping = {record_id: remote_id for record_id, remote_id in rows if remote_id and remote_id != record_id}
+        pending = {record_id for record_id, remote_id in rows if not remote_id}
+        return mapping, pending
+
+
+def create_backend(name: str, base_id: str, data_dir: str, api=None) -> StorageBackend:
+    """
+    STORAGE_BACKEND değerine göre arka ucu kur
+
+    Args:
+        name: 'airtable' | 'sqlite'
+        base_id: Airtable base ID (SQLite dosya adında da kullanılır)
+        data_dir: Yerel dosyaların klasörü
+        api: pyairtable Api (airtable için)
+
+    Raises:
+        ValueError: Bilinmeyen arka uç
+    """
+    if name == 'airtable':
+        return AirtableBackend(api, base_id)
+    if name == 'sqlite':
+        return SqliteBackend(os.path.join(data_dir, 'storage', f"{base_id}.sqlite3"))
+    raise ValueError(f"Bilinmeyen STORAGE_BACKEND: {name} (airtable | sqlite)")
+
+
+# ========== AIRTABLE İLE AKTARIM ==========
+
+def seed_from_airtable(source, target: SqliteBackend,
+                       tables: Iterable[str] = ('Urun_Katalogu', 'Markalar', 'Stok_Kalemleri')) -> Dict[str, int]:
+    """
+    Airtable tablolarını yerel depoya kopyala (ID'ler korunur, bağlantılar geçerli kalır)
+
+    Args:
+        source: AirtableBackend
+        target: SqliteBackend
+        tables: Kopyalanacak tablolar
+
+    Returns:
+        Dict: {tablo: kayıt sayısı}
+    """
+    return {name: target.table(name).import_records(source.table(name).all()) for name in tables}
+
+
+def push_to_airtable(source: SqliteBackend, target, tables: Iterable[str] = PUSH_ORDER) -> Dict[str, int]:
+    """
+    Yerelde oluşturulan ve değiştirilen kayıtları Airtable'a gönder
+
+    Tablolar bağlantı sırasıyla gönderilir (markalar → ürünler → stok →
+    sayım); böylece bir kaydın bağlandığı yeni kayıtların Airtable ID'si
+    gönderimden önce bilinir. Yeni kayıtlar tablo başına bir SayimStore
+    giden kutusundan 10'arlı batch_create ile yazılır: kayıt kutuya yerel
+    ID'siyle bir kez girer, kalıcı hatalı kayıt atlanır, geçici hatada
+    istisna yükselir. Airtable'da olan kayıtların sadece değişen alanları
+    batch_update ile gönderilir. Yarıda kalan push tekrar çalıştırılabilir;
+    gönderilmiş kayıt ikinci kez oluşturulmaz.
+
+    Args:
+        source: SqliteBackend
+        target: AirtableBackend
+        tables: Gönderilecek tablolar (PUSH_ORDER sırasıyla)
+
+    Returns:
+        Dict: {tablo: gönderilen (oluşturulan + güncellenen) kayıt sayısı}
+    """
+    return {name: _push_table(source, target.table(name), name) for name in tables}
+
+
+def _push_table(source: SqliteBackend, remote_table, name: str) -> int:
+    local_table = source.table(name)
+    records = local_table.unsynced()
+    if not records:
+        return 0
+
+    mapping, pending = source.link_ids()
+    creates, updates = [], []
+    for record in records:
+        fields = record['fields']
+        if record['remote_id'] and record['dirty'] is not None:
+            fields = {key: value for key, value in fields.items() if key in record['dirty']}
+        fields = _remap_links(fields, mapping, pending - {record['id']})
+        if fields is None:
+            logger.warning("Bağlandığı kayıt Airtable'a gönderilmedi, kayıt bekletiliyor",
+                           extra={'table': name, 'record_id': record['id']})
+            continue
+        fields, files = _split_attachments(fields)
+        (updates if record['remote_id'] else creates).append((record, fields, files))
+
+    pushed = 0
+    if creates:
+        # Giden kutusu kaydı yerel ID'siyle tutar; tekrar eklenen kayıt yeniden gönderilmez
+        outbox = SayimStore(remote_table, os.path.join(source.outbox_dir, f"{name}.sqlite3"),
+                            min_batch_interval=0)
+        for record, fields, _ in creates:
+            outbox.add(fields, local_id=record['id'])
+        outbox.flush()
+        for record, _, files in creates:
+            remote_id = outbox.resolve(record['id'])
+            if remote_id is None:
+                continue
+            _upload_attachments(remote_table, remote_id, files)
+            local_table.mark_synced(record['id'], remote_id, record['modified_at'])
+            pushed += 1
+
+    for start in range(0, len(updates), BATCH_SIZE):
+        batch = updates[start:start + BATCH_SIZE]
+        try:
+            remote_table.batch_update([{'id': record['remote_id'], 'fields': fields}
+                                       for record, fields, _ in batch])
+        except Exception as e:
+            if not is_permanent_error(e):
+                raise
+            logger.error("Kayıtlar Airtable'da güncellenemedi, atlandı",
+                         extra={'table': name, 'error': str(e)})
+            continue
+        for record, _, files in batch:
+            _upload_attachments(remote_table, record['remote_id'], files)
+            local_table.mark_synced(record['id'], record['remote_id'], record['modified_at'])
+        pushed += len(batch)
+    return pushed
+
+
+def _remap_links(fields: Dict[str, Any], mapping: Dict[str, str], pending: Set[str]) -> Optional[Dict[str, Any]]:
+    """
+    Bağlantı alanlarındaki yerel ID'leri Airtable ID'leriyle değiştir
+
+    Returns:
+        Dict veya None (bağlanan kayıt henüz Airtable'da yok)
+    """
+    remapped = {}
+    for key, value in fields.items():
+        if isinstance(value, list) and value and all(isinstance(v, str) for v in value):
+            if any(v in pending for v in value):
+                return None
+            value = [mapping.get(v, v) for v in value]
+        remapped[key] = value
+    return remapped
+
+
+def _split_attachments(fields: Dict[str, Any]) -> Tuple[Dict[str, Any], List[Tuple[str, Dict[str, Any]]]]:
+    """
+    Yerel dosyadaki ekleri (file://) alanlardan ayır; Airtable URL'lerini kabul etmez
+
+    Returns:
+        Tuple: (kalan alanlar, [(alan, ek), ...])
+    """
+    remaining, files = {}, []
+    for key, value in fields.items():
+        if isinstance(value, list) and any(_is_local_file(v) for v in value):
+            files += [(key, v) for v in value if _is_local_file(v)]
+            value = [v for v in value if not _is_local_file(v)]
+            if not value:
+                continue
+        remaining[key] = value
+    return remaining, files
+
+
+def _is_local_file(value: Any) -> bool:
+    return isinstance(value, dict) and str(value.get('url', '')).startswith('file://')
+
+
+def _upload_attachments(remote_table, record_id: str, files: List[Tuple[str, Dict[str, Any]]]) -> None:
+    for field, attachment in files:
+        with open(attachment['url'][len('file://'):], 'rb') as f:
+            content = f.read()
+        remote_table.upload_attachment(record_id, field, attachment['filename'], content, attachment.get('type'))
+
+
+def main() -> None:
+    import argparse
+    from dotenv import load_dotenv
+    from airtable_client import AirtableClient, DATA_DIR
+
+    load_dotenv()
+    parser = argparse.ArgumentParser(description='Yerel SQLite deposu ile Airtable arasında aktarım')
+    parser.add_argument('command', choices=['seed', 'push'],
+                        help='seed: katalog Airtable → yerel | push: yerel değişiklikler → Airtable')
+    parser.add_argument('--category', default='OF', choices=['OF', 'GN', 'LN'])
+    args = parser.parse_args()
+
+    os.environ['STORAGE_BACKEND'] = 'airtable'
+    remote = AirtableClient(category=args.category).storage
+    local = create_backend('sqlite', remote.base.id, DATA_DIR)
+    if args.command == 'seed':
+        print(seed_from_airtable(remote, local))
+    else:
+        for name, count in push_to_airtable(local, remote).items():
+            print(f"{name}: {count} kayıt gönderildi")
+
+
+if __name__ == '__main__':
+    main()
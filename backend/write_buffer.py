@@ -0,0 +1,466 @@
+"""
+Sayım Yazma Tamponu - Konyalı Optik Sayım Sistemi
+Sayim_Kayitlari oluşturma işlemlerini 10'arlı batch_create çağrılarında toplar
+
+Her okutma tek bir create isteği yerine tampona yazılır ve istemciye hemen
+yerel bir ID (`loc...`) döner. Arka plandaki flush thread'i kayıtları
+Airtable'ın 10 kayıtlık toplu oluşturma limitiyle gönderir.
+
+Dayanıklılık:
+- Her kayıt önce diske (JSONL günlük) yazılır ve fsync edilir
+- Airtable'a yazılan kayıtlar için günlüğe `commit` satırı eklenir
+- Süreç çökerse, açılışta commit'i olmayan kayıtlar yeniden kuyruğa alınır
+- Birden fazla worker aynı klasörü kullanabilir; her biri kilit dosyasıyla
+  ayrı bir günlük (slot) alır, sahipsiz kalan slotlar yeniden başlatmada devralınır
+
+Yerel ID'ler worker'lar arasında paylaşılan bir SQLite eşleme dosyasına
+(`<name>.ids.sqlite3`) da yazılır. İstemcinin sonraki isteği (kayıt
+sorgusu, fotoğraf yükleme) başka bir worker'a düşse de yerel ID çözülür;
+bellekteki eşleme sadece önbellektir. Bekleyen kayıtların alanları da
+eşlemededir; istatistik uzlaştırması tüm worker'ların henüz yazılmamış
+kayıtlarını buradan okur.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+import logging
+from collections import OrderedDict
+from typing import Dict, List, Any, Optional
+from file_lock import try_lock, ensure_dir
+
+logger = logging.getLogger(__name__)
+
+LOCAL_ID_PREFIX = 'loc'
+
+# Airtable batch_create limiti
+BATCH_SIZE = 10
+
+# Bellekte tutulan en fazla "yerel ID → gerçek ID" eşlemesi
+MAX_RESOLVED = 10000
+
+# Bir worker'ın deneyeceği en fazla günlük slotu
+MAX_JOURNAL_SLOTS = 16
+
+# Günlük bu boyutu aşınca flush sonrası sıkıştırılır
+COMPACT_THRESHOLD_BYTES = 1024 * 1024
+
+# Paylaşılan eşlemede yazılmış kayıtların tutulduğu süre (saniye)
+ID_MAP_RETENTION = 7 * 24 * 3600
+
+# Başka worker'ın kaydını beklerken eşlemenin tekrar okunma aralığı (saniye)
+ID_MAP_POLL_INTERVAL = 0.1
+
+_ID_MAP_SCHEMA = """
+CREATE TABLE IF NOT EXISTS ids (
+    local_id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    record_id TEXT,
+    updated_at REAL NOT NULL,
+    fields TEXT
+);
+"""
+
+
+def is_local_id(record_id: Optional[str]) -> bool:
+    """Kayıt ID'si tampondan dönen yerel bir ID mi?"""
+    return bool(record_id) and record_id.startswith(LOCAL_ID_PREFIX)
+
+
+def is_permanent_error(error: Exception) -> bool:
+    """Tekrar denemekle düzelmeyecek hata mı? (429 dışındaki 4xx)"""
+    response = getattr(error, 'response', None)
+    status = getattr(response, 'status_code', None)
+    return status is not None and 400 <= status < 500 and status != 429
+
+
+class SayimWriteBuffer:
+    """Sayim_Kayitlari için günlüklü (journaled) write-behind tamponu"""
+
+    def __init__(
+        self,
+        table,
+        journal_dir: str,
+        name: str,
+        flush_interval: float = 1.0,
+        max_backoff: float = 30.0,
+        min_batch_interval: float = 0.25
+    ):
+        """
+        Args:
+            table: pyairtable Table (Sayim_Kayitlari)
+            journal_dir: Günlük dosyalarının klasörü
+            name: Günlük dosya adı öneki (ör. 'sayim-OF')
+            flush_interval: Tam dolmamış batch'lerin en fazla bekleme süresi (saniye)
+            max_backoff: Hata sonrası en uzun bekleme (saniye)
+            min_batch_interval: Art arda batch istekleri arası en az süre
+                (base başına 4 istek/saniye sınırı için)
+        """
+        self.table = table
+        self.flush_interval = flush_interval
+        self.max_backoff = max_backoff
+        self.min_batch_interval = min_batch_interval
+        self._last_batch_at = 0.0
+
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._flush_lock = threading.Lock()
+        self._pending: 'OrderedDict[str, Dict[str, Any]]' = OrderedDict()
+        self._resolved: 'OrderedDict[str, Optional[str]]' = OrderedDict()
+        self._committed_event = threading.Condition(self._lock)
+        self._failures = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self.stats = {'flushed': 0, 'batches': 0, 'errors': 0, 'failed': 0}
+
+        ensure_dir(journal_dir)
+        self._local = threading.local()
+        self._id_map_path = os.path.join(journal_dir, f"{name}.ids.sqlite3")
+        self._init_id_map()
+
+        self._journal = None
+        self._journal_path = self._acquire_slot(journal_dir, name)
+        self._replay()
+
+    # ========== PUBLIC API ==========
+
+    def add(self, fields: Dict[str, Any]) -> str:
+        """
+        Kaydı tampona ekle (diske yazıldıktan sonra döner)
+
+        Args:
+            fields: Sayim_Kayitlari alanları
+
+        Returns:
+            str: Yerel kayıt ID'si
+        """
+        local_id = f"{LOCAL_ID_PREFIX}{uuid.uuid4().hex}"
+        with self._lock:
+            self._append({'op': 'add', 'id': local_id, 'fields': fields, 'ts': time.time()})
+            self._pending[local_id] = fields
+            if len(self._pending) >= BATCH_SIZE:
+                self._wakeup.notify()
+        self._map_set([(local_id, 'pending', None, fields)])
+        return local_id
+
+    def resolve(self, local_id: str) -> Optional[str]:
+        """Yerel ID'nin Airtable record ID'si (henüz yazılmadıysa None)"""
+        with self._lock:
+            if local_id in self._resolved:
+                return self._resolved[local_id]
+            if local_id in self._pending:
+                return None
+        row = self._map_get(local_id)
+        return row[1] if row else None
+
+    def status(self, local_id: str) -> str:
+        """
+        Yerel kaydın durumu
+
+        Returns:
+            'pending' | 'committed' | 'failed' | 'unknown'
+        """
+        with self._lock:
+            if local_id in self._pending:
+                return 'pending'
+            if local_id in self._resolved:
+                return 'committed' if self._resolved[local_id] else 'failed'
+        # Başka bir worker'ın kaydı ya da bellekten atılmış eski bir eşleme
+        row = self._map_get(local_id)
+        return row[0] if row else 'unknown'
+
+    def wait_for(self, local_id: str, timeout: float = 10.0) -> Optional[str]:
+        """
+        Kayıt Airtable'a yazılana kadar bekle (gerekirse hemen flush et)
+
+        Args:
+            local_id: Yerel kayıt ID'si
+            timeout: En fazla bekleme (saniye)
+
+        Kayıt başka bir worker'ın tamponundaysa onun flush'ı beklenir;
+        durum paylaşılan eşlemeden kısa aralıklarla okunur.
+
+        Returns:
+            Airtable record ID'si veya None (zaman aşımı / başarısız)
+        """
+        deadline = time.time() + timeout
+        with self._lock:
+            self._wakeup.notify()
+            while local_id in self._pending:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    return None
+                self._committed_event.wait(remaining)
+            if local_id in self._resolved:
+                return self._resolved[local_id]
+
+        while self.status(local_id) == 'pending':
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                return None
+            time.sleep(min(remaining, ID_MAP_POLL_INTERVAL))
+        return self.resolve(local_id)
+
+    @property
+    def pending_count(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def pending_records(self) -> List[Dict[str, Any]]:
+        """
+        Henüz Airtable'a yazılmamış kayıtlar (tüm worker'lar)
+
+        Eşleme okunamazsa sadece bu worker'ın tamponu döner.
+
+        Returns:
+            List[Dict]: [{'id': yerel ID, 'fields': {...}}]
+        """
+        try:
+            rows = self._connect().execute(
+                "SELECT local_id, fields FROM ids WHERE status = 'pending' AND fields IS NOT NULL"
+            ).fetchall()
+            return [{'id': local_id, 'fields': json.loads(fields)} for local_id, fields in rows]
+        except (sqlite3.Error, ValueError) as e:
+            logger.warning("Paylaşılan ID eşlemesi okunamadı", extra={'error': str(e)})
+            with self._lock:
+                return [{'id': local_id, 'fields': fields} for local_id, fields in self._pending.items()]
+
+    def flush(self) -> int:
+        """
+        Bekleyen kayıtları 10'arlı gruplar halinde Airtable'a yaz
+
+        Returns:
+            int: Yazılan kayıt sayısı
+        """
+        written = 0
+        with self._flush_lock:
+            while True:
+                with self._lock:
+                    batch = list(self._pending.items())[:BATCH_SIZE]
+                if not batch:
+                    break
+
+                wait = self._last_batch_at + self.min_batch_interval - time.time()
+                if wait > 0:
+                    time.sleep(wait)
+                self._last_batch_at = time.time()
+
+                try:
+                    records = self.table.batch_create([fields for _, fields in batch])
+                except Exception as e:
+                    self.stats['errors'] += 1
+                    if len(batch) > 1 and is_permanent_error(e):
+                        # Hatalı kaydı bulmak için tek tek dene
+                        written += self._create_individually(batch)
+                        continue
+                    if is_permanent_error(e):
+                        self._commit(batch[0][0], None)
+                        self.stats['failed'] += 1
+                        logger.error("Sayım kaydı kalıcı hata ile atlandı",
+                                     extra={'local_id': batch[0][0], 'error': str(e)})
+                        continue
+                    raise
+
+                for (local_id, _), record in zip(batch, records):
+                    self._commit(local_id, record['id'])
+                written += len(batch)
+                self.stats['batches'] += 1
+                self.stats['flushed'] += len(batch)
+
+            with self._lock:
+                if self._journal.tell() > COMPACT_THRESHOLD_BYTES:
+                    self._compact()
+
+        return written
+
+    def start(self) -> None:
+        """Arka plan flush thread'ini başlat"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='sayim-write-buffer', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Thread'i durdur, bekleyenleri son kez yazmayı dene"""
+        self._stop.set()
+        with self._lock:
+            self._wakeup.notify()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        try:
+            self.flush()
+        except Exception as e:
+            logger.warning("Kapanışta flush başarısız, kayıtlar günlükte kaldı", extra={'error': str(e)})
+
+    # ========== INTERNALS ==========
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            with self._lock:
+                if len(self._pending) < BATCH_SIZE:
+                    self._wakeup.wait(self._current_delay())
+            if self._stop.is_set():
+                break
+            try:
+                self.flush()
+                self._failures = 0
+            except Exception as e:
+                self._failures += 1
+                logger.warning("Sayım tamponu flush hatası, tekrar denenecek",
+                               extra={'pending': self.pending_count, 'error': str(e)})
+                self._stop.wait(self._current_delay())
+
+    def _current_delay(self) -> float:
+        if not self._failures:
+            return self.flush_interval
+        return min(self.flush_interval * (2 ** self._failures), self.max_backoff)
+
+    def _create_individually(self, batch: List) -> int:
+        written = 0
+        for local_id, fields in batch:
+            try:
+                record = self.table.create(fields)
+            except Exception as e:
+                if not is_permanent_error(e):
+                    raise
+                self._commit(local_id, None)
+                self.stats['failed'] += 1
+                logger.error("Sayım kaydı kalıcı hata ile atlandı",
+                             extra={'local_id': local_id, 'error': str(e)})
+                continue
+            self._commit(local_id, record['id'])
+            written += 1
+            self.stats['flushed'] += 1
+        return written
+
+    def _commit(self, local_id: str, record_id: Optional[str]) -> None:
+        with self._lock:
+            self._append({'op': 'commit', 'id': local_id, 'record_id': record_id})
+            self._pending.pop(local_id, None)
+            self._remember(local_id, record_id)
+        self._map_set([(local_id, 'committed' if record_id else 'failed', record_id, None)])
+        with self._lock:
+            self._committed_event.notify_all()
+
+    def _remember(self, local_id: str, record_id: Optional[str]) -> None:
+        self._resolved[local_id] = record_id
+        while len(self._resolved) > MAX_RESOLVED:
+            self._resolved.popitem(last=False)
+
+    # ========== PAYLAŞILAN ID EŞLEMESİ ==========
+
+    def _connect(self) -> sqlite3.Connection:
+        """Thread'e özel eşleme bağlantısı"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self._id_map_path, timeout=30, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def _init_id_map(self) -> None:
+        """Şemayı kur ve saklama süresini geçmiş yazılmış eşlemeleri sil"""
+        conn = self._connect()
+        conn.executescript(_ID_MAP_SCHEMA)
+        # Alan sütunu olmadan oluşturulmuş eski eşleme dosyaları
+        if 'fields' not in {row[1] for row in conn.execute('PRAGMA table_info(ids)')}:
+            conn.execute('ALTER TABLE ids ADD COLUMN fields TEXT')
+        conn.execute("DELETE FROM ids WHERE status != 'pending' AND updated_at < ?",
+                     (time.time() - ID_MAP_RETENTION,))
+
+    def _map_set(self, rows: List) -> None:
+        """
+        Eşlemeye (local_id, durum, record_id, alanlar) satırlarını yaz
+
+        Alanlar sadece bekleyen kayıtlar için tutulur (yazılınca silinir).
+
+        Kayıt zaten günlükte olduğu için hata kaydı kaybettirmez; sadece
+        diğer worker'lar ID'yi çözemez. Bu yüzden loglanıp geçilir.
+        """
+        now = time.time()
+        try:
+            self._connect().executemany(
+                "INSERT OR REPLACE INTO ids (local_id, status, record_id, updated_at, fields) VALUES (?, ?, ?, ?, ?)",
+                [(local_id, status, record_id, now, json.dumps(fields, ensure_ascii=False) if fields else None)
+                 for local_id, status, record_id, fields in rows]
+            )
+        except sqlite3.Error as e:
+            logger.warning("Paylaşılan ID eşlemesine yazılamadı", extra={'error': str(e)})
+
+    def _map_get(self, local_id: str) -> Optional[tuple]:
+        """(durum, record_id) ya da None"""
+        try:
+            return self._connect().execute(
+                "SELECT status, record_id FROM ids WHERE local_id = ?", (local_id,)
+            ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning("Paylaşılan ID eşlemesi okunamadı", extra={'error': str(e)})
+            return None
+
+    def _append(self, entry: Dict[str, Any]) -> None:
+        self._journal.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        self._journal.flush()
+        os.fsync(self._journal.fileno())
+
+    def _acquire_slot(self, journal_dir: str, name: str):
+        """Kilidi başka süreçte olmayan ilk günlük slotunu al"""
+        for slot in range(MAX_JOURNAL_SLOTS):
+            base = os.path.join(journal_dir, f"{name}-{slot}")
+            lock_handle = open(base + '.lock', 'a')
+            if try_lock(lock_handle.fileno()):
+                self._lock_handle = lock_handle
+                return base + '.jsonl'
+            lock_handle.close()
+        raise RuntimeError(f"Boş günlük slotu bulunamadı: {journal_dir}/{name}-*.jsonl")
+
+    def _replay(self) -> None:
+        """Günlüğü oku, commit'i olmayan kayıtları kuyruğa al, dosyayı sıkıştır"""
+        if os.path.exists(self._journal_path):
+            with open(self._journal_path, 'r', encoding='utf-8') as journal:
+                for line in journal:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # Çökme sırasında yarım kalmış son satır
+                        continue
+                    if entry.get('op') == 'add':
+                        self._pending[entry['id']] = entry['fields']
+                    elif entry.get('op') == 'commit':
+                        self._pending.pop(entry['id'], None)
+                        self._remember(entry['id'], entry.get('record_id'))
+
+        if self._pending:
+            logger.info(f"Sayım günlüğünden {len(self._pending)} bekleyen kayıt geri yüklendi",
+                        extra={'journal': self._journal_path})
+            # Çökmeden önce eşlemeye yazılamamış olabilir
+            self._map_set([(local_id, 'pending', None, fields) for local_id, fields in self._pending.items()])
+
+        self._compact()
+
+    def _compact(self) -> None:
+        """
+        Günlüğü sadece bekleyen kayıtlar ve son eşlemelerle yeniden yaz
+
+        Yeni dosya yazılıp fsync edildikten sonra os.replace ile atomik olarak
+        değiştirilir; yarıda kalan bir sıkıştırma eski günlüğü bozmaz.
+        """
+        tmp_path = self._journal_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as tmp:
+            for local_id, record_id in self._resolved.items():
+                tmp.write(json.dumps({'op': 'commit', 'id': local_id, 'record_id': record_id}) + '\n')
+            for local_id, fields in self._pending.items():
+                tmp.write(json.dumps({'op': 'add', 'id': local_id, 'fields': fields}, ensure_ascii=False) + '\n')
+            tmp.flush()
+            os.fsync(tmp.fileno())
+
+        if self._journal is not None:
+            self._journal.close()
+        os.replace(tmp_path, self._journal_path)
+        self._journal = open(self._journal_path, 'a', encoding='utf-8')
@@ -0,0 +1,77 @@
+"""
+Benchmark Ortak Yardımcıları - Konyalı Optik Sayım Sistemi
+Yüzdelik özetleri ve karşılaştırılabilir JSON çıktısı
+
+Her benchmark sonucu aynı biçimde yazar:
+    {'benchmark': ..., 'meta': {...}, 'config': {...}, 'results': [{'name': ..., 'p50_ms': ...}]}
+compare.py iki dosyayı `name` alanı üzerinden eşleştirir.
+"""
+
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import time
+from typing import Dict, List, Any, Iterable
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def percentile(sorted_samples: List[float], pct: float) -> float:
+    """Sıralı örneklerde en yakın sıra yöntemiyle yüzdelik"""
+    if not sorted_samples:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_samples)))
+    return sorted_samples[rank - 1]
+
+
+def summarize(samples_ms: Iterable[float]) -> Dict[str, float]:
+    """
+    Süre örneklerinin özeti
+
+    Args:
+        samples_ms: Çağrı süreleri (milisaniye)
+
+    Returns:
+        Dict: count, mean_ms, p50_ms, p95_ms, p99_ms, max_ms
+    """
+    samples = sorted(samples_ms)
+    count = len(samples)
+    return {
+        'count': count,
+        'mean_ms': round(sum(samples) / count, 4) if count else 0.0,
+        'p50_ms': round(percentile(samples, 50), 4),
+        'p95_ms': round(percentile(samples, 95), 4),
+        'p99_ms': round(percentile(samples, 99), 4),
+        'max_ms': round(samples[-1], 4) if count else 0.0
+    }
+
+
+def run_meta() -> Dict[str, Any]:
+    """Sonuçların hangi kod ve makinede üretildiği"""
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=HERE,
+            capture_output=True, text=True, timeout=5
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'commit': commit,
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'cpus': os.cpu_count()
+    }
+
+
+def write_json(path: str, benchmark: str, config: Dict[str, Any], results: List[Dict[str, Any]]) -> None:
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({
+            'benchmark': benchmark,
+            'meta': run_meta(),
+            'config': config,
+            'results': results
+        }, f, ensure_ascii=False, indent=2)
@@ -0,0 +1,269 @@
+"""
+API Yük Testi - Konyalı Optik Sayım Sistemi
+Eşzamanlı kullanıcılarla endpoint başına p50/p95/p99 yanıt süreleri
+
+Flask uygulaması thread'li bir werkzeug sunucusunda, sahte Airtable'a
+(benchmarks/fake_airtable.py) karşı çalışır. Sahte sunucuya gecikme ve
+base başına saniyelik istek sınırı verilir (Airtable: 5 istek/s, aşılınca
+429); böylece kuyruklanma ve geri çekilme de ölçüme girer. Her kullanıcı
+sayım ekranındaki karışımı (barkod arama, kaydetme, manuel arama,
+istatistik, marka listesi) ardışık olarak çalıştırır.
+
+Sonuçlar PERFORMANCE_TEST_PLAN.md hedefleriyle karşılaştırılır: p95 hedef
+sürenin, p99 en fazla sürenin altında olmalı.
+
+--storage sqlite ile Airtable yerine yerel SQLite deposu kullanılır
+(STORAGE_BACKEND=sqlite); ağ gecikmesi olmadan uygulamanın kendi
+maliyeti ölçülür.
+
+Kullanım:
+    python benchmarks/bench_load.py
+    python benchmarks/bench_load.py --users 1,10,50 --requests 40 --latency 0.2 --json load.json
+"""
+
+import argparse
+import logging
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any, Optional, Tuple
+
+import requests
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+sys.path.insert(0, os.path.join(HERE, '..', 'backend'))
+
+from bench_common import summarize, write_json  # noqa: E402
+from bench_projection import BASE_ID, configure_env  # noqa: E402
+from fake_airtable import FakeAirtable  # noqa: E402
+from supplier_catalog import build_catalog  # noqa: E402
+
+# PERFORMANCE_TEST_PLAN.md: endpoint → (hedef ms, en fazla ms)
+TARGETS = {
+    'search-barcode': (500, 1000),
+    'search-manual': (800, 1500),
+    'save-count': (300, 800),
+    'brands': (200, 500),
+    'stats': (200, 500)
+}
+
+# Sayım ekranındaki istek karışımı (ağırlıklar)
+MIX = [
+    ('search-barcode', 50),
+    ('save-count', 25),
+    ('search-manual', 10),
+    ('stats', 10),
+    ('brands', 5)
+]
+
+
+class Scenario:
+    """Katalogdan rastgele ama tekrarlanabilir istekler üretir"""
+
+    def __init__(self, products: List[Dict[str, Any]], seed: int):
+        self.products = products
+        self.rng = random.Random(seed)
+        self.names = [name for name, _ in MIX]
+        self.weights = [weight for _, weight in MIX]
+
+    def next_request(self) -> Tuple[str, str, str, Optional[Dict[str, Any]]]:
+        """(endpoint, metot, yol, gövde)"""
+        name = self.rng.choices(self.names, self.weights)[0]
+        product = self.rng.choice(self.products)
+        fields = product['fields']
+
+        if name == 'search-barcode':
+            return name, 'POST', '/api/search-barcode', {'barkod': fields['Tedarikçi Barkodu'], 'category': 'OF'}
+        if name == 'save-count':
+            return name, 'POST', '/api/save-count', {
+                'category': 'OF',
+                'barkod': fields['Tedarikçi Barkodu'],
+                'sku_id': product['id'],
+                'eslesme_durumu': 'Direkt',
+                'sayim_yapan': 'Benchmark'
+            }
+        if name == 'search-manual':
+            model = fields.get('Model Kodu') or fields['Tedarikçi Barkodu']
+            return name, 'POST', '/api/search-manual', {'term': model[:4], 'category': 'OF'}
+        if name == 'stats':
+            return name, 'GET', '/api/stats?category=OF', None
+        return name, 'GET', '/api/brands?category=OF', None
+
+
+def run_user(base_url: str, scenario: Scenario, count: int,
+             samples: Dict[str, List[float]], errors: Dict[str, int], lock: threading.Lock) -> None:
+    """Bir kullanıcının `count` isteği; süreler ve hatalar paylaşılan sözlüklere yazılır"""
+    session = requests.Session()
+    for _ in range(count):
+        name, method, path, body = scenario.next_request()
+        started = time.perf_counter()
+        try:
+            response = session.request(method, base_url + path, json=body, timeout=60)
+            ok = response.status_code < 400
+        except requests.RequestException:
+            ok = False
+        elapsed_ms = (time.perf_counter() - started) * 1000
+
+        with lock:
+            samples.setdefault(name, []).append(elapsed_ms)
+            if not ok:
+                errors[name] = errors.get(name, 0) + 1
+    session.close()
+
+
+def run_level(base_url: str, products: List[Dict[str, Any]], users: int, requests_per_user: int,
+              seed: int) -> Tuple[Dict[str, List[float]], Dict[str, int], float]:
+    samples: Dict[str, List[float]] = {}
+    errors: Dict[str, int] = {}
+    lock = threading.Lock()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=users) as pool:
+        for user in range(users):
+            pool.submit(run_user, base_url, Scenario(products, seed + user), requests_per_user,
+                        samples, errors, lock)
+    return samples, errors, time.perf_counter() - started
+
+
+def seed_sqlite(data_dir: str, products: List[Dict[str, Any]], brands: List[Dict[str, Any]]) -> None:
+    """Yerel SQLite deposunu kataloğla doldur"""
+    from storage import create_backend
+
+    backend = create_backend('sqlite', BASE_ID, data_dir)
+    backend.table('Urun_Katalogu').import_records(products)
+    backend.table('Markalar').import_records(brands)
+
+
+def run(user_levels: List[int], requests_per_user: int, catalog_size: int, latency: float,
+        rate_limit: float, storage: str, seed: int = 1) -> Dict[str, Any]:
+    products, brands, source = build_catalog(catalog_size)
+    data_dir = tempfile.mkdtemp(prefix='bench-load-')
+
+    server = None
+    if storage == 'airtable':
+        server = FakeAirtable({
+            (BASE_ID, 'Urun_Katalogu'): products,
+            (BASE_ID, 'Markalar'): brands
+        }, latency=latency, jitter=latency / 2, rate_limit=rate_limit).start()
+        configure_env(server.url, data_dir)
+        # İstemci kendi bütçesini sunucunun sınırıyla aynı tutar (gerçek kurulumdaki gibi)
+        if rate_limit:
+            os.environ.update({'AIRTABLE_RATE_LIMIT': str(rate_limit), 'AIRTABLE_RATE_BURST': str(rate_limit)})
+    else:
+        configure_env('http://127.0.0.1:9', data_dir)
+        os.environ.pop('AIRTABLE_TOKEN', None)
+        seed_sqlite(data_dir, products, brands)
+
+    os.environ.update({
+        'STORAGE_BACKEND': storage,
+        'CATALOG_INDEX_ENABLED': 'true',
+        'LOG_LEVEL': 'ERROR',
+        'LOG_FILE': os.path.join(data_dir, 'app.log')
+    })
+
+    from werkzeug.serving import make_server
+    import app as app_module
+
+    # werkzeug kendi logger'ını INFO'ya çeker; her isteği yazmasın
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    http = make_server('127.0.0.1', 0, app_module.app, threaded=True)
+    thread = threading.Thread(target=http.serve_forever, daemon=True)
+    thread.start()
+    base_url = f"http://127.0.0.1:{http.server_port}"
+
+    try:
+        # Isınma: client, katalog indeksi ve matcher ölçüm dışında kurulur
+        app_module.get_matcher('OF').warm()
+        run_level(base_url, products, 1, len(MIX) * 2, seed)
+
+        results = []
+        for users in user_levels:
+            if server is not None:
+                server.reset_stats()
+            samples, errors, elapsed = run_level(base_url, products, users, requests_per_user, seed)
+            # Kaydetmenin arka plan işleri bir sonraki seviyeye taşmasın
+            app_module.get_job_queue().wait_idle(timeout=120)
+
+            total = sum(len(values) for values in samples.values())
+            level = {
+                'airtable_requests': server.requests_made() if server is not None else 0,
+                'throttled': server.throttled if server is not None else 0,
+                'throughput_rps': round(total / elapsed, 1) if elapsed else 0.0
+            }
+            for name, _ in MIX:
+                if name not in samples:
+                    continue
+                target_ms, max_ms = TARGETS[name]
+                row: Dict[str, Any] = {'name': f"{name}@{users}", 'endpoint': name, 'users': users}
+                row.update(summarize(samples[name]))
+                row.update({
+                    'errors': errors.get(name, 0),
+                    'target_ms': target_ms,
+                    'max_target_ms': max_ms,
+                    'meets_target': row['p95_ms'] <= target_ms and row['p99_ms'] <= max_ms
+                })
+                row.update(level)
+                results.append(row)
+
+        return {
+            'config': {
+                'users': user_levels,
+                'requests_per_user': requests_per_user,
+                'catalog': len(products),
+                'source': source,
+                'storage': storage,
+                'latency_ms': latency * 1000,
+                'rate_limit': rate_limit
+            },
+            'results': results
+        }
+    finally:
+        http.shutdown()
+        app_module.clear_job_queue()
+        if server is not None:
+            server.stop()
+
+
+def print_table(report: Dict[str, Any]) -> None:
+    config = report['config']
+    line = f"Katalog: {config['catalog']} ürün ({config['source']}), depolama: {config['storage']}"
+    if config['storage'] == 'airtable':
+        line += f", gecikme: {config['latency_ms']:.0f} ms, sınır: {config['rate_limit']} istek/s"
+    print(line)
+    header = (f"{'Endpoint':<16} {'Kull.':>5} {'İstek':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} "
+              f"{'Hata':>5} {'429':>5} {'Hedef':>7}")
+    print(header)
+    print('-' * len(header))
+    for row in report['results']:
+        print(f"{row['endpoint']:<16} {row['users']:>5} {row['count']:>6} {row['p50_ms']:>9.1f} "
+              f"{row['p95_ms']:>9.1f} {row['p99_ms']:>9.1f} {row['errors']:>5} {row['throttled']:>5} "
+              f"{'OK' if row['meets_target'] else 'AŞIM':>7}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='API yük testi (sahte Airtable ile)')
+    parser.add_argument('--users', default='1,5,10,20,50', help='Eşzamanlı kullanıcı seviyeleri (virgüllü)')
+    parser.add_argument('--requests', type=int, default=30, help='Seviye başına kullanıcı başı istek')
+    parser.add_argument('--catalog', type=int, default=5000, help='Katalog ürün sayısı')
+    parser.add_argument('--latency', type=float, default=0.15, help='Sahte Airtable gecikmesi (saniye)')
+    parser.add_argument('--rate-limit', type=float, default=5, help='Base başına saniyede istek; 0 = sınırsız')
+    parser.add_argument('--storage', choices=['airtable', 'sqlite'], default='airtable',
+                        help='sqlite: ağsız yerel depo (STORAGE_BACKEND=sqlite)')
+    parser.add_argument('--json', help='Sonuçların yazılacağı JSON dosyası')
+    args = parser.parse_args()
+
+    user_levels = [int(value) for value in args.users.split(',') if value.strip()]
+    report = run(user_levels, args.requests, args.catalog, args.latency, args.rate_limit, args.storage)
+    print_table(report)
+
+    if args.json:
+        write_json(args.json, 'load', report['config'], report['results'])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,176 @@
+"""
+Matcher Mikro Benchmark'ı - Konyalı Optik Sayım Sistemi
+BarcodeMatcher.match, _fuzzy_search ve search_sku_by_term çağrı süreleri
+
+Katalog tedarikçi listelerinden (supplier_catalog.py) kurulur ve sahte
+Airtable sunucusundan yüklenir; ölçümler katalog indeksi sıcakken yapılır.
+Sonuç önbelleği kapalıdır (MATCH_CACHE_TTL=0), yani her çağrı eşleştirmenin
+kendisini ölçer. --no-index ile indeks kapatılıp Airtable sorgu yolu
+(sahte sunucu gecikmesiyle) ölçülebilir.
+
+Kullanım:
+    python benchmarks/bench_matcher.py
+    python benchmarks/bench_matcher.py --catalog 20000 --calls 2000 --json matcher.json
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from typing import Dict, List, Set, Any, Callable
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+sys.path.insert(0, os.path.join(HERE, '..', 'backend'))
+
+from bench_common import summarize, write_json  # noqa: E402
+from bench_projection import BASE_ID, configure_env  # noqa: E402
+from fake_airtable import FakeAirtable  # noqa: E402
+from supplier_catalog import build_catalog  # noqa: E402
+
+
+def near_miss(barkod: str, rng: random.Random, position: int, known: Set[str]) -> str:
+    """Verilen hanesi değiştirilmiş, katalogda olmayan barkod (okuma hatası taklidi)"""
+    for step in rng.sample(range(1, 10), 9):
+        candidate = barkod[:position] + str((int(barkod[position]) + step) % 10) + barkod[position + 1:]
+        if candidate not in known:
+            return candidate
+    return barkod[:position] + 'X' + barkod[position + 1:]
+
+
+def make_inputs(products: List[Dict[str, Any]], calls: int, seed: int = 1) -> Dict[str, List[str]]:
+    """
+    Senaryo başına çağrı girdileri
+
+    - direct: katalogdaki barkodlar
+    - fuzzy_tail: son hanesi hatalı barkodlar (direkt kaçar, ilk 10 hane tutar)
+    - fuzzy_typo: ilk 10 hanesinde tek hata olan barkodlar
+    - not_found: katalogda olmayan barkodlar
+    - terms: model kodları ve marka adlarından arama terimleri
+    """
+    rng = random.Random(seed)
+    barcodes = [p['fields']['Tedarikçi Barkodu'] for p in products
+                if len(p['fields']['Tedarikçi Barkodu']) >= 12]
+    picks = [rng.choice(barcodes) for _ in range(calls)]
+    known = set(barcodes)
+
+    terms = []
+    for product in rng.sample(products, min(len(products), calls)):
+        fields = product['fields']
+        model = fields.get('Model Kodu') or ''
+        terms.append(model[:rng.randint(3, max(3, len(model)))] if model else fields['Marka Adı'][0])
+
+    return {
+        'direct': picks,
+        'fuzzy_tail': [near_miss(b, rng, len(b) - 1, known) for b in picks],
+        'fuzzy_typo': [near_miss(b, rng, rng.randint(4, 9), known) for b in picks],
+        'not_found': [b for b in (f"99{rng.randrange(10 ** 11):011d}" for _ in range(calls)) if b not in known],
+        'terms': terms
+    }
+
+
+def time_calls(func: Callable[[str], Any], inputs: List[str], warmup: int = 20) -> Dict[str, float]:
+    """Her girdi için bir çağrı; süre özeti ve saniyedeki çağrı"""
+    for value in inputs[:warmup]:
+        func(value)
+
+    samples = []
+    started = time.perf_counter()
+    for value in inputs:
+        t0 = time.perf_counter()
+        func(value)
+        samples.append((time.perf_counter() - t0) * 1000)
+    elapsed = time.perf_counter() - started
+
+    summary = summarize(samples)
+    summary['ops_per_sec'] = round(len(inputs) / elapsed, 1) if elapsed else 0.0
+    return summary
+
+
+def run(catalog_size: int, calls: int, use_index: bool, latency: float) -> Dict[str, Any]:
+    products, brands, source = build_catalog(catalog_size)
+    server = FakeAirtable({
+        (BASE_ID, 'Urun_Katalogu'): products,
+        (BASE_ID, 'Markalar'): brands
+    }, latency=latency).start()
+
+    try:
+        configure_env(server.url, tempfile.mkdtemp(prefix='bench-matcher-'))
+        os.environ.update({
+            'CATALOG_INDEX_ENABLED': 'true' if use_index else 'false',
+            'CATALOG_SNAPSHOT': 'false',
+            'MATCH_CACHE_TTL': '0',
+            'MATCH_CACHE_NEGATIVE_TTL': '0'
+        })
+        from airtable_client import AirtableClient
+        from matcher import BarcodeMatcher
+
+        client = AirtableClient(category='OF')
+        matcher = BarcodeMatcher(client)
+        warm_started = time.perf_counter()
+        matcher.warm()
+        warm_ms = (time.perf_counter() - warm_started) * 1000
+
+        inputs = make_inputs(products, calls)
+        scenarios = [
+            ('match.direct', matcher.match, inputs['direct']),
+            ('match.fuzzy_tail', matcher.match, inputs['fuzzy_tail']),
+            ('match.not_found', matcher.match, inputs['not_found']),
+            ('_fuzzy_search.typo', matcher._fuzzy_search, inputs['fuzzy_typo']),
+            ('search_sku_by_term', client.search_sku_by_term, inputs['terms']),
+            ('search_sku_by_term.fuzzy', lambda term: client.search_sku_by_term(term, fuzzy=True), inputs['terms'])
+        ]
+
+        results = []
+        for name, func, values in scenarios:
+            row: Dict[str, Any] = {'name': name}
+            row.update(time_calls(func, values))
+            results.append(row)
+
+        return {
+            'config': {
+                'catalog': len(products),
+                'source': source,
+                'calls': calls,
+                'index': use_index,
+                'latency_ms': latency * 1000,
+                'warm_ms': round(warm_ms, 1)
+            },
+            'results': results
+        }
+    finally:
+        server.stop()
+
+
+def print_table(report: Dict[str, Any]) -> None:
+    config = report['config']
+    print(f"Katalog: {config['catalog']} ürün ({config['source']}), indeks: {config['index']}, "
+          f"ısınma: {config['warm_ms']:.0f} ms")
+    header = f"{'Senaryo':<28} {'Çağrı':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'çağrı/s':>10}"
+    print(header)
+    print('-' * len(header))
+    for row in report['results']:
+        print(f"{row['name']:<28} {row['count']:>7} {row['p50_ms']:>9.3f} {row['p95_ms']:>9.3f} "
+              f"{row['p99_ms']:>9.3f} {row['ops_per_sec']:>10,.0f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='BarcodeMatcher ve manuel arama mikro benchmark\'ı')
+    parser.add_argument('--catalog', type=int, default=10000, help='Katalog ürün sayısı')
+    parser.add_argument('--calls', type=int, default=1000, help='Senaryo başına çağrı')
+    parser.add_argument('--no-index', action='store_true', help='Katalog indeksi kapalı (Airtable sorgu yolu)')
+    parser.add_argument('--latency', type=float, default=0.0, help='Sahte Airtable gecikmesi (saniye)')
+    parser.add_argument('--json', help='Sonuçların yazılacağı JSON dosyası')
+    args = parser.parse_args()
+
+    report = run(args.catalog, args.calls, not args.no_index, args.latency)
+    print_table(report)
+
+    if args.json:
+        write_json(args.json, 'matcher', report['config'], report['results'])
+
+
+if __name__ == '__main__':
+    main()
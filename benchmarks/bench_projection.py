@@ -0,0 +1,138 @@
+"""
+Alan Seçimi Benchmark'ı - Konyalı Optik Sayım Sistemi
+Airtable okumalarında çağrı başına aktarılan bayt: tüm alanlar vs. fields[]
+
+AirtableClient sahte Airtable sunucusuna (benchmarks/fake_airtable.py)
+bağlanır; her okuma yolu önce AIRTABLE_FIELD_PROJECTION=false (eski
+davranış, tüm alanlar), sonra true ile çalıştırılır.
+
+Kullanım:
+    python benchmarks/bench_projection.py
+    python benchmarks/bench_projection.py --catalog 5000 --sayim 2000 --json sonuc.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from typing import Dict, List, Any, Callable
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+sys.path.insert(0, os.path.join(HERE, '..', 'backend'))
+
+from fake_airtable import FakeAirtable  # noqa: E402
+from sample_data import make_brands, make_products, make_sayim_records  # noqa: E402
+
+BASE_ID = 'appBENCHOPTIK'
+
+
+def configure_env(endpoint_url: str, data_dir: str) -> None:
+    """Client'ı sahte sunucuya yönlendir; arka plan işleri ve hız sınırı kapalı"""
+    os.environ.update({
+        'AIRTABLE_TOKEN': 'patBENCH',
+        'AIRTABLE_BASE_OPTIK': BASE_ID,
+        'AIRTABLE_ENDPOINT_URL': endpoint_url,
+        'AIRTABLE_RATE_LIMIT': '100000',
+        'AIRTABLE_RATE_BURST': '100000',
+        'RATE_LIMIT_SHARED': 'false',
+        'CATALOG_INDEX_ENABLED': 'false',
+        'CATALOG_SYNC_INTERVAL': '0',
+        'STATS_RECONCILE_INTERVAL': '0',
+        'SAYIM_WRITE_BUFFER': 'false',
+        'DATA_DIR': data_dir
+    })
+
+
+def measure(server: FakeAirtable, call: Callable[[], Any], repeat: int) -> Dict[str, float]:
+    """Çağrı başına bayt, istek ve süre (ms)"""
+    server.reset_stats()
+    started = time.perf_counter()
+    for _ in range(repeat):
+        call()
+    elapsed = time.perf_counter() - started
+    return {
+        'bytes': server.bytes_sent() / repeat,
+        'requests': server.requests_made() / repeat,
+        'ms': elapsed / repeat * 1000
+    }
+
+
+def run(catalog_size: int, sayim_count: int, repeat: int) -> List[Dict[str, Any]]:
+    day = time.strftime('%Y-%m-%d')
+    products = make_products(catalog_size)
+    server = FakeAirtable({
+        (BASE_ID, 'Urun_Katalogu'): products,
+        (BASE_ID, 'Markalar'): make_brands(),
+        (BASE_ID, 'Sayim_Kayitlari'): make_sayim_records(sayim_count, day, products)
+    }).start()
+
+    try:
+        configure_env(server.url, tempfile.mkdtemp(prefix='bench-projection-'))
+        from airtable_client import AirtableClient
+
+        client = AirtableClient(category='OF')
+        barkod = products[0]['fields']['Tedarikçi Barkodu']
+
+        def load_brands():
+            client.invalidate_brands()
+            client.get_all_brands()
+
+        paths = [
+            ('search_by_barcode', lambda: client.search_by_barcode(barkod), repeat),
+            ('fuzzy_search_barcode', lambda: client.fuzzy_search_barcode(barkod), repeat),
+            ('search_sku_by_term', lambda: client.search_sku_by_term('black'), repeat),
+            ('get_today_stats (uzlaştırma)', client.reconcile_stats, max(1, repeat // 5)),
+            ('get_all_brands', load_brands, repeat),
+            ('load_catalog', client.load_catalog, 1)
+        ]
+
+        results = []
+        for name, call, times in paths:
+            row: Dict[str, Any] = {'path': name}
+            for label, flag in (('before', 'false'), ('after', 'true')):
+                os.environ['AIRTABLE_FIELD_PROJECTION'] = flag
+                row[label] = measure(server, call, times)
+            before, after = row['before']['bytes'], row['after']['bytes']
+            row['reduction_pct'] = round((1 - after / before) * 100, 1) if before else 0.0
+            results.append(row)
+        return results
+    finally:
+        server.stop()
+
+
+def print_table(results: List[Dict[str, Any]]) -> None:
+    header = f"{'Okuma yolu':<30} {'Önce (B)':>12} {'Sonra (B)':>12} {'Azalma':>8} {'Önce ms':>9} {'Sonra ms':>9}"
+    print(header)
+    print('-' * len(header))
+    for row in results:
+        print(f"{row['path']:<30} {row['before']['bytes']:>12,.0f} {row['after']['bytes']:>12,.0f} "
+              f"{row['reduction_pct']:>7.1f}% {row['before']['ms']:>9.1f} {row['after']['ms']:>9.1f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Airtable alan seçimi bayt benchmark\'ı')
+    parser.add_argument('--catalog', type=int, default=2000, help='Urun_Katalogu kayıt sayısı')
+    parser.add_argument('--sayim', type=int, default=1000, help='Bugünkü Sayim_Kayitlari kayıt sayısı')
+    parser.add_argument('--repeat', type=int, default=20, help='Okuma yolu başına tekrar')
+    parser.add_argument('--json', help='Sonuçların yazılacağı JSON dosyası')
+    args = parser.parse_args()
+
+    results = run(args.catalog, args.sayim, args.repeat)
+    print_table(results)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({
+                'benchmark': 'projection',
+                'catalog': args.catalog,
+                'sayim': args.sayim,
+                'repeat': args.repeat,
+                'results': results
+            }, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""
+Benchmark Karşılaştırma - Konyalı Optik Sayım Sistemi
+İki JSON sonucunu (önceki / şimdiki) satır satır karşılaştırır
+
+Satırlar `name` alanıyla eşleştirilir; bir yüzdelikteki artış hem oran
+(--threshold) hem mutlak (--min-delta-ms) eşiğini aşarsa gerileme sayılır.
+Mutlak eşik, mikrosaniyelik ölçümlerdeki gürültünün gerileme gibi
+görünmesini engeller. Gerileme varsa çıkış kodu 1'dir (CI'da kullanılabilir).
+
+Kullanım:
+    python benchmarks/compare.py onceki.json simdiki.json
+    python benchmarks/compare.py onceki.json simdiki.json --metric p99_ms --threshold 10
+"""
+
+import argparse
+import json
+import sys
+from typing import Dict, List, Any
+
+
+def load(path: str) -> Dict[str, Any]:
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], metric: str,
+            threshold: float, min_delta_ms: float) -> List[Dict[str, Any]]:
+    """
+    Ortak satırlar için değişim
+
+    Args:
+        baseline: Önceki sonuç dosyası
+        current: Şimdiki sonuç dosyası
+        metric: Karşılaştırılan alan (p50_ms, p95_ms, p99_ms, mean_ms)
+        threshold: Gerileme sayılacak artış yüzdesi
+        min_delta_ms: Gerileme sayılacak en küçük mutlak artış (ms)
+
+    Returns:
+        List[Dict]: name, before, after, change_pct, regression
+    """
+    before_rows = {row['name']: row for row in baseline.get('results', [])}
+    rows = []
+    for row in current.get('results', []):
+        previous = before_rows.get(row['name'])
+        if previous is None:
+            continue
+        before, after = previous[metric], row[metric]
+        change = (after - before) / before * 100 if before else 0.0
+        rows.append({
+            'name': row['name'],
+            'before': before,
+            'after': after,
+            'change_pct': round(change, 1),
+            'regression': change > threshold and after - before > min_delta_ms
+        })
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='İki benchmark JSON sonucunu karşılaştır')
+    parser.add_argument('baseline', help='Önceki sonuç')
+    parser.add_argument('current', help='Şimdiki sonuç')
+    parser.add_argument('--metric', default='p95_ms', help='Karşılaştırılan alan')
+    parser.add_argument('--threshold', type=float, default=20.0, help='Gerileme eşiği (yüzde)')
+    parser.add_argument('--min-delta-ms', type=float, default=0.5, help='En küçük mutlak artış (ms)')
+    args = parser.parse_args()
+
+    baseline, current = load(args.baseline), load(args.current)
+    if baseline.get('benchmark') != current.get('benchmark'):
+        print(f"Farklı benchmark'lar: {baseline.get('benchmark')} / {current.get('benchmark')}")
+        sys.exit(2)
+
+    rows = compare(baseline, current, args.metric, args.threshold, args.min_delta_ms)
+    header = f"{'Satır':<32} {'Önce':>10} {'Sonra':>10} {'Değişim':>9}"
+    print(f"{args.metric}: {baseline['meta'].get('commit')} → {current['meta'].get('commit')}")
+    print(header)
+    print('-' * len(header))
+    for row in rows:
+        flag = '  GERİLEME' if row['regression'] else ''
+        print(f"{row['name']:<32} {row['before']:>10.3f} {row['after']:>10.3f} {row['change_pct']:>8.1f}%{flag}")
+
+    regressions = sum(1 for row in rows if row['regression'])
+    print(f"\n{len(rows)} satır, {regressions} gerileme")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == '__main__':
+    main()
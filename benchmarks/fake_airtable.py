@@ -0,0 +1,242 @@
+"""
+Sahte Airtable Sunucusu - Konyalı Optik Sayım Sistemi
+Benchmark'lar için yerel, ağsız Airtable REST API taklidi
+
+Desteklenenler:
+- Listeleme (GET ve POST .../listRecords): pageSize/offset, maxRecords, fields[]
+- filterByFormula: formüldeki tırnaklı sabitlerden biri kaydın bir metin
+  alanında geçiyorsa kayıt eşleşir (barkod, önek, arama terimi, gün)
+- Tek kayıt okuma, oluşturma ve güncelleme
+- Tablo başına istek sayısı ve gönderilen yanıt baytları
+- Yapay gecikme ve base başına saniyelik istek sınırı (aşılınca 429 +
+  Retry-After, Airtable'daki gibi)
+
+Kullanım:
+    server = FakeAirtable({('appX', 'Urun_Katalogu'): records}, latency=0.05, rate_limit=5)
+    server.start()          # server.url → AIRTABLE_ENDPOINT_URL
+    ...
+    server.stop()
+"""
+
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Any, Optional, Tuple
+from urllib.parse import urlsplit, parse_qs, unquote
+
+# Airtable'ın sayfa başına en fazla kayıt sayısı
+MAX_PAGE_SIZE = 100
+
+# İstek sınırının uygulandığı pencere (saniye)
+RATE_WINDOW = 1.0
+
+LITERAL_RE = re.compile(r"'([^']+)'")
+
+
+def formula_matches(formula: str, fields: Dict[str, Any]) -> bool:
+    """Kayıt formüldeki sabitlerden birini içeriyor mu? (kaba ama yeterli)"""
+    literals = [lit.casefold() for lit in LITERAL_RE.findall(formula or '')]
+    if not literals:
+        return True
+    text = ' '.join(str(v) for v in fields.values() if isinstance(v, (str, int, float))).casefold()
+    return any(lit in text for lit in literals)
+
+
+class FakeAirtable:
+    """Thread'de çalışan sahte Airtable HTTP sunucusu"""
+
+    def __init__(self, tables: Optional[Dict[Tuple[str, str], List[Dict[str, Any]]]] = None,
+                 latency: float = 0.0, jitter: float = 0.0, rate_limit: float = 0.0):
+        """
+        Args:
+            tables: (base_id, tablo adı) → kayıtlar ({id, fields})
+            latency: Her yanıttan önce beklenecek süre (saniye)
+            jitter: Gecikmeye eklenecek rastgele süre üst sınırı (saniye)
+            rate_limit: Base başına saniyede en fazla istek; 0 = sınırsız
+        """
+        self.tables = tables or {}
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_limit = rate_limit
+        self._lock = threading.Lock()
+        self.stats: Dict[str, Dict[str, int]] = {}
+        # base_id → son penceredeki istek zamanları
+        self._windows: Dict[str, List[float]] = {}
+        self.throttled = 0
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> 'FakeAirtable':
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                fake._handle(self, 'GET')
+
+            def do_POST(self):
+                fake._handle(self, 'POST')
+
+            def do_PATCH(self):
+                fake._handle(self, 'PATCH')
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self.stats = {}
+            self.throttled = 0
+
+    def bytes_sent(self, table: Optional[str] = None) -> int:
+        """Gönderilen yanıt baytları (tablo verilmezse toplam)"""
+        with self._lock:
+            if table is not None:
+                return self.stats.get(table, {}).get('bytes', 0)
+            return sum(s['bytes'] for s in self.stats.values())
+
+    def requests_made(self, table: Optional[str] = None) -> int:
+        with self._lock:
+            if table is not None:
+                return self.stats.get(table, {}).get('requests', 0)
+            return sum(s['requests'] for s in self.stats.values())
+
+    # ========== İSTEK İŞLEME ==========
+
+    def _handle(self, handler: BaseHTTPRequestHandler, method: str) -> None:
+        if self.latency or self.jitter:
+            time.sleep(self.latency + random.uniform(0, self.jitter))
+
+        url = urlsplit(handler.path)
+        # /v0/{base}/{table}[/{record_id}|/listRecords]
+        parts = [unquote(p) for p in url.path.split('/')[2:]]
+        base_id, table = parts[0], parts[1]
+        tail = parts[2] if len(parts) > 2 else None
+        records = self.tables.setdefault((base_id, table), [])
+
+        length = int(handler.headers.get('Content-Length') or 0)
+        payload = json.loads(handler.rfile.read(length)) if length else {}
+
+        retry_after = self._throttle(base_id)
+        if retry_after is not None:
+            data = json.dumps({'errors': [{'error': 'RATE_LIMIT_REACHED'}]}).encode('utf-8')
+            handler.send_response(429)
+            handler.send_header('Content-Type', 'application/json')
+            handler.send_header('Retry-After', f"{retry_after:.3f}")
+            handler.send_header('Content-Length', str(len(data)))
+            handler.end_headers()
+            handler.wfile.write(data)
+            return
+
+        if method == 'GET' and tail is None:
+            status, body = 200, self._list(records, self._query_options(url.query))
+        elif method == 'POST' and tail == 'listRecords':
+            status, body = 200, self._list(records, payload)
+        elif method == 'GET':
+            record = next((r for r in records if r['id'] == tail), None)
+            status, body = (200, record) if record else (404, {'error': 'NOT_FOUND'})
+        elif method == 'POST':
+            created = [self._create(records, r['fields']) for r in payload.get('records', [payload])]
+            status, body = 200, ({'records': created} if 'records' in payload else created[0])
+        else:
+            updated = [self._update(records, r.get('id', tail), r['fields'])
+                       for r in payload.get('records', [dict(payload, id=tail)])]
+            status, body = 200, ({'records': updated} if 'records' in payload else updated[0])
+
+        data = json.dumps(body, ensure_ascii=False).encode('utf-8')
+        handler.send_response(status)
+        handler.send_header('Content-Type', 'application/json')
+        handler.send_header('Content-Length', str(len(data)))
+        handler.end_headers()
+        handler.wfile.write(data)
+
+        with self._lock:
+            entry = self.stats.setdefault(table, {'requests': 0, 'bytes': 0})
+            entry['requests'] += 1
+            entry['bytes'] += len(data)
+
+    def _throttle(self, base_id: str) -> Optional[float]:
+        """İstek base'in saniyelik sınırını aşıyorsa beklenecek süre, aşmıyorsa None"""
+        if not self.rate_limit:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            window = [t for t in self._windows.get(base_id, []) if now - t < RATE_WINDOW]
+            if len(window) >= self.rate_limit:
+                self._windows[base_id] = window
+                self.throttled += 1
+                return RATE_WINDOW - (now - window[0])
+            window.append(now)
+            self._windows[base_id] = window
+            return None
+
+    @staticmethod
+    def _query_options(query: str) -> Dict[str, Any]:
+        params = parse_qs(query)
+        options: Dict[str, Any] = {
+            key: values[0] for key, values in params.items() if key != 'fields[]'
+        }
+        if 'fields[]' in params:
+            options['fields'] = params['fields[]']
+        return options
+
+    @staticmethod
+    def _list(records: List[Dict[str, Any]], options: Dict[str, Any]) -> Dict[str, Any]:
+        matching = [r for r in records if formula_matches(options.get('filterByFormula'), r['fields'])]
+        max_records = int(options.get('maxRecords') or 0)
+        if max_records:
+            matching = matching[:max_records]
+
+        page_size = min(int(options.get('pageSize') or MAX_PAGE_SIZE), MAX_PAGE_SIZE)
+        start = int(options.get('offset') or 0)
+        page = matching[start:start + page_size]
+
+        fields = options.get('fields')
+        if fields:
+            wanted = set(fields)
+            page = [
+                dict(r, fields={k: v for k, v in r['fields'].items() if k in wanted})
+                for r in page
+            ]
+
+        body: Dict[str, Any] = {'records': page}
+        if start + page_size < len(matching):
+            body['offset'] = str(start + page_size)
+        return body
+
+    def _create(self, records: List[Dict[str, Any]], fields: Dict[str, Any]) -> Dict[str, Any]:
+        with self._lock:
+            record = {
+                'id': f"recFAKE{len(records) + 1:09d}",
+                'createdTime': time.strftime('%Y-%m-%dT%H:%M:%S.000Z', time.gmtime()),
+                'fields': dict(fields)
+            }
+            records.append(record)
+        return record
+
+    def _update(self, records: List[Dict[str, Any]], record_id: str, fields: Dict[str, Any]) -> Dict[str, Any]:
+        with self._lock:
+            for record in records:
+                if record['id'] == record_id:
+                    record['fields'].update(fields)
+                    return record
+        return {'id': record_id, 'fields': dict(fields)}
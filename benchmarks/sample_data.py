@@ -0,0 +1,121 @@
+"""
+Örnek Veri - Konyalı Optik Sayım Sistemi
+Benchmark'lar için gerçekçi Urun_Katalogu / Markalar / Sayim_Kayitlari kayıtları
+
+Kayıtlar uygulamanın kullanmadığı alanları da taşır (Fotograf ekleri,
+notlar, ters bağlantılar); gerçek tablolarda da yanıtların büyük kısmı
+bunlardan oluşur.
+"""
+
+import random
+from typing import Dict, List, Any
+
+BRANDS = [
+    ('RB', 'Ray-Ban'), ('OK', 'Oakley'), ('PR', 'Prada'), ('GU', 'Gucci'),
+    ('VO', 'Vogue'), ('PO', 'Persol'), ('TF', 'Tom Ford'), ('CH', 'Chanel'),
+    ('MK', 'Michael Kors'), ('EA', 'Emporio Armani'), ('BV', 'Bvlgari'), ('CA', 'Carrera')
+]
+
+COLORS = [('901', 'Black'), ('902', 'Tortoise'), ('601', 'Matte Black'), ('710', 'Havana'), ('001', 'Gold')]
+
+
+def _attachment(rng: random.Random, record_id: str, n: int) -> Dict[str, Any]:
+    """Airtable ek alanı değeri (URL'ler ve küçük resimlerle birlikte)"""
+    base = f"https://v5.airtableusercontent.com/v3/u/{rng.getrandbits(64):016x}/{record_id}"
+
+    def thumb(size: str, width: int, height: int) -> Dict[str, Any]:
+        return {'url': f"{base}/{size}/{rng.getrandbits(128):032x}", 'width': width, 'height': height}
+
+    return {
+        'id': f"att{rng.getrandbits(56):014x}",
+        'width': 3024,
+        'height': 4032,
+        'url': f"{base}/{rng.getrandbits(128):032x}",
+        'filename': f"IMG_{n:04d}.jpg",
+        'size': rng.randint(900_000, 4_500_000),
+        'type': 'image/jpeg',
+        'thumbnails': {
+            'small': thumb('small', 27, 36),
+            'large': thumb('large', 512, 683),
+            'full': thumb('full', 3000, 4000)
+        }
+    }
+
+
+def make_brands(category: str = 'OF') -> List[Dict[str, Any]]:
+    """Markalar kayıtları"""
+    return [
+        {
+            'id': f"recMARKA{i:09d}",
+            'createdTime': '2025-01-01T00:00:00.000Z',
+            'fields': {
+                'Marka Kodu': kod,
+                'Marka Adı': ad,
+                'Kategori': [category],
+                'Açıklama': f"{ad} ürün grubu; tedarikçi listesi her sezon güncellenir.",
+                'Urun_Katalogu': [f"recURUN{j:09d}" for j in range(i, 2000, len(BRANDS))][:60]
+            }
+        }
+        for i, (kod, ad) in enumerate(BRANDS)
+    ]
+
+
+def make_products(count: int, category: str = 'OF', seed: int = 42) -> List[Dict[str, Any]]:
+    """Urun_Katalogu kayıtları (her 3 üründen birinde fotoğraf)"""
+    rng = random.Random(seed)
+    brands = make_brands(category)
+    records = []
+    for i in range(count):
+        brand = brands[i % len(brands)]
+        kod = brand['fields']['Marka Kodu']
+        model = f"{rng.randint(1000, 9999)}"
+        renk, renk_adi = rng.choice(COLORS)
+        ekartman = str(rng.choice([50, 52, 54, 56]))
+        record_id = f"recURUN{i:09d}"
+        fields: Dict[str, Any] = {
+            'SKU': f"{category}-{kod}-{model}-{renk}-{ekartman}",
+            'Kategori': category,
+            'Marka': [brand['id']],
+            'Marka Adı': [brand['fields']['Marka Adı']],
+            'Marka Kodu': [kod],
+            'Model Kodu': f"{kod}{model}",
+            'Model Adı': f"{brand['fields']['Marka Adı']} {model}",
+            'Renk Kodu': renk,
+            'Renk Adı': renk_adi,
+            'Ekartman': ekartman,
+            'Birim Fiyat': rng.randint(1500, 12000),
+            'Durum': 'Aktif',
+            'Tedarikçi Barkodu': f"8056{i:09d}",
+            'Arama Kelimeleri': f"{kod} {model} {renk_adi} {brand['fields']['Marka Adı']}".lower(),
+            'Notlar': "Tedarikçi listesinden aktarıldı. Kutu içeriği ve garanti bilgisi ekte.",
+            'Stok_Kalemleri': [f"recSTOK{i:09d}"],
+            'Sayim_Kayitlari': [f"recSAYIM{i:05d}{k:04d}" for k in range(rng.randint(0, 12))],
+            'Son Güncelleme': '2025-09-30T08:15:00.000Z'
+        }
+        if i % 3 == 0:
+            fields['Fotograf'] = [_attachment(rng, record_id, i)]
+        records.append({'id': record_id, 'createdTime': '2025-01-01T00:00:00.000Z', 'fields': fields})
+    return records
+
+
+def make_sayim_records(count: int, day: str, products: List[Dict[str, Any]], seed: int = 7) -> List[Dict[str, Any]]:
+    """Bir günün Sayim_Kayitlari kayıtları (her 4 kayıttan birinde fotoğraf)"""
+    rng = random.Random(seed)
+    statuses = ['Direkt'] * 7 + ['Belirsiz'] * 2 + ['Bulunamadı']
+    records = []
+    for i in range(count):
+        product = rng.choice(products)
+        record_id = f"recSAYIM{i:09d}"
+        fields: Dict[str, Any] = {
+            'Timestamp': f"{day}T{8 + i % 10:02d}:{i % 60:02d}:00.000Z",
+            'Okutulan Barkod': product['fields']['Tedarikçi Barkodu'],
+            'SKU': [product['id']],
+            'Eşleşme Durumu': rng.choice(statuses),
+            'Sayım Yapan': rng.choice(['Ahmet', 'Elif', 'Mehmet', 'Zeynep']),
+            'Adet': 1,
+            'Notlar': ''
+        }
+        if i % 4 == 0:
+            fields['Fotograf'] = [_attachment(rng, record_id, i)]
+        records.append({'id': record_id, 'createdTime': f"{day}T08:00:00.000Z", 'fields': fields})
+    return records
@@ -0,0 +1,192 @@
+"""
+Tedarikçi Kataloğu - Konyalı Optik Sayım Sistemi
+Benchmark'lar için "Tedarikçi Dosyaları" Excel listelerinden Urun_Katalogu kayıtları
+
+Matcher ve arama performansı barkodların dağılımına (ortak önekler,
+benzer model kodları) bağlıdır; sentetik veri bunu tam yansıtmaz. Bu
+modül tedarikçi listelerini okuyup uygulamanın beklediği alanlarla
+kayıtlara çevirir. Sütunlar başlık adından (BARKOD, EAN, MARKA, MODEL,
+RENK, EKARTMAN ...) bulunur; başlıksız sayfalarda barkod sütunu
+değerlerden tahmin edilir.
+
+openpyxl kurulu değilse ya da dosya yoksa sample_data'daki sentetik
+katalog kullanılır; sonuçlardaki `source` alanı hangisinin kullanıldığını
+gösterir.
+"""
+
+import os
+import re
+from typing import Dict, List, Any, Optional, Tuple
+
+try:
+    import openpyxl
+except ImportError:
+    openpyxl = None
+
+from sample_data import make_brands, make_products
+
+SUPPLIER_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Tedarikçi Dosyaları')
+
+BARCODE_RE = re.compile(r'^\d{8,14}$')
+
+# Alan → olası başlıklar (öncelik sırasıyla)
+COLUMN_ALIASES = {
+    'barkod': ('BARKOD', 'EAN', 'UPC'),
+    'marka': ('MARKAADI', 'MARKA'),
+    'model': ('MODEL', 'STOKKODU', 'SAFILO SKU'),
+    'renk': ('RENK KODU', 'RENK'),
+    'renk_adi': ('RENK AÇIKLAMASI',),
+    'ekartman': ('EKARTMAN',),
+    'aciklama': ('MALZEMEACIKLAMASI',)
+}
+
+
+def _text(value: Any) -> str:
+    if value is None:
+        return ''
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip()
+
+
+def _header_columns(row: Tuple[Any, ...]) -> Optional[Dict[str, int]]:
+    """Başlık satırıysa alan → sütun numarası, değilse None"""
+    names = [_text(cell).upper() for cell in row]
+    columns: Dict[str, int] = {}
+    for field, aliases in COLUMN_ALIASES.items():
+        for alias in aliases:
+            # Aynı başlık iki kez geçiyorsa (kod + ad) sonuncusu adı taşır
+            found = [i for i, name in enumerate(names) if name == alias]
+            if found:
+                columns[field] = found[-1]
+                break
+    return columns if 'barkod' in columns else None
+
+
+def _guess_columns(row: Tuple[Any, ...]) -> Optional[Dict[str, int]]:
+    """Başlıksız sayfa: ilk barkod görünümlü sütun + ardındaki metin sütunları"""
+    cells = [_text(cell) for cell in row]
+    barcode = next((i for i, cell in enumerate(cells) if BARCODE_RE.match(cell)), None)
+    if barcode is None:
+        return None
+    texts = [i for i, cell in enumerate(cells) if i != barcode and cell and not BARCODE_RE.match(cell)]
+    columns = {'barkod': barcode}
+    for field, index in zip(('model', 'aciklama', 'marka'), texts):
+        columns[field] = index
+    return columns
+
+
+def read_supplier_rows(path: str, limit: int) -> List[Dict[str, str]]:
+    """
+    Bir tedarikçi dosyasındaki ürün satırları
+
+    Args:
+        path: .xlsx dosyası
+        limit: En fazla satır
+
+    Returns:
+        List[Dict]: COLUMN_ALIASES alanlarıyla satırlar
+    """
+    rows: List[Dict[str, str]] = []
+    workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        for sheet in workbook.worksheets:
+            columns = None
+            for row in sheet.iter_rows(values_only=True):
+                header = _header_columns(row)
+                if header is not None:
+                    columns = header
+                    continue
+                if columns is None:
+                    columns = _guess_columns(row)
+                    if columns is None:
+                        continue
+
+                values = {field: _text(row[i]) if i < len(row) else '' for field, i in columns.items()}
+                if BARCODE_RE.match(values['barkod']):
+                    rows.append(values)
+                    if len(rows) >= limit:
+                        return rows
+    finally:
+        workbook.close()
+    return rows
+
+
+def _brand_code(name: str) -> str:
+    letters = re.sub(r'[^A-Z]', '', name.upper())
+    return (letters[:2] or 'XX')
+
+
+def build_catalog(count: int, category: str = 'OF',
+                  directory: str = SUPPLIER_DIR) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]], str]:
+    """
+    Tedarikçi listelerinden Urun_Katalogu ve Markalar kayıtları
+
+    Her dosyadan eşit pay alınır; tekrar eden barkodlar atlanır.
+
+    Args:
+        count: İstenen ürün sayısı
+        category: Kayıtların kategorisi
+        directory: Tedarikçi dosyalarının klasörü
+
+    Returns:
+        (ürünler, markalar, kaynak): kaynak 'suppliers' ya da 'sample'
+    """
+    files = []
+    if openpyxl is not None and os.path.isdir(directory):
+        files = sorted(os.path.join(directory, name) for name in os.listdir(directory)
+                       if name.endswith('.xlsx'))
+    if not files:
+        return make_products(count, category), make_brands(category), 'sample'
+
+    rows: List[Dict[str, str]] = []
+    share = -(-count // len(files))
+    for path in files:
+        rows.extend(read_supplier_rows(path, share))
+
+    brands: Dict[str, Dict[str, Any]] = {}
+    products: List[Dict[str, Any]] = []
+    seen = set()
+    for row in rows:
+        barkod = row['barkod']
+        if barkod in seen:
+            continue
+        seen.add(barkod)
+
+        marka = row.get('marka') or 'DİĞER'
+        if marka not in brands:
+            brands[marka] = {
+                'id': f"recMARKA{len(brands):09d}",
+                'createdTime': '2025-01-01T00:00:00.000Z',
+                'fields': {'Marka Kodu': _brand_code(marka), 'Marka Adı': marka, 'Kategori': [category]}
+            }
+        brand = brands[marka]
+        kod = brand['fields']['Marka Kodu']
+        model = row.get('model') or barkod[-6:]
+        renk = row.get('renk', '')
+        ekartman = row.get('ekartman', '')
+
+        fields: Dict[str, Any] = {
+            'SKU': '-'.join(part for part in (category, kod, model, renk, ekartman) if part),
+            'Kategori': category,
+            'Marka': [brand['id']],
+            'Marka Adı': [marka],
+            'Marka Kodu': [kod],
+            'Model Kodu': model,
+            'Model Adı': row.get('aciklama') or f"{marka} {model}",
+            'Renk Kodu': renk,
+            'Renk Adı': row.get('renk_adi', ''),
+            'Ekartman': ekartman,
+            'Durum': 'Aktif',
+            'Tedarikçi Barkodu': barkod,
+            'Arama Kelimeleri': ' '.join(filter(None, (marka, model, renk, row.get('aciklama')))).lower()
+        }
+        products.append({
+            'id': f"recURUN{len(products):09d}",
+            'createdTime': '2025-01-01T00:00:00.000Z',
+            'fields': fields
+        })
+        if len(products) >= count:
+            break
+
+    return products, list(brands.values()), 'suppliers'
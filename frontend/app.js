@@ -437,14 +437,19 @@ async function saveNotFound() {
 
 async function uploadPhoto(recordId, photoFile) {
     try {
-        const formData = new FormData();
-        formData.append('photo', photoFile);
-        formData.append('record_id', recordId);
-        formData.append('category', getSelectedCategory());
+        // Dosya multipart yerine doğrudan binary gövde olarak gönderilir
+        const params = new URLSearchParams({
+            record_id: recordId,
+            category: getSelectedCategory(),
+            filename: photoFile.name || 'photo.jpg',
+            // Küçültme ve yükleme sunucuda yanıttan sonra yapılır
+            async: '1'
+        });
 
-        const response = await fetch(`${API_URL}/api/upload-photo`, {
+        const response = await fetch(`${API_URL}/api/upload-photo?${params}`, {
             method: 'POST',
-            body: formData
+            headers: { 'Content-Type': photoFile.type || 'image/jpeg' },
+            body: photoFile
         });
 
         const data = await response.json();
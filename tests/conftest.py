@@ -60,9 +60,13 @@ def sample_barcode():
 @pytest.fixture
 def flask_app():
     """Flask app instance for testing"""
-    from app import app
+    from app import app, clear_health_cache, clear_matcher_pool, clear_brands_cache, clear_job_queue
     app.config['TESTING'] = True
-    return app
+    clear_health_cache()
+    clear_matcher_pool()
+    clear_brands_cache()
+    yield app
+    clear_job_queue()
 
 
 @pytest.fixture
@@ -88,3 +92,9 @@ def setup_env_vars():
                 'AIRTABLE_BASE_LENS', 'FLASK_DEBUG', 'ALLOWED_ORIGINS']:
         os.environ.pop(key, None)
 
+
+@pytest.fixture(autouse=True)
+def isolated_data_dir(tmp_path, monkeypatch):
+    """Local state files (journals, rate limiter) go to a temp directory"""
+    import airtable_client
+    monkeypatch.setattr(airtable_client, 'DATA_DIR', str(tmp_path / 'data'))
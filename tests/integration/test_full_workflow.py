@@ -65,8 +65,11 @@ class TestBarcodeSearchToSaveWorkflow:
         assert save_data['success'] is True
         assert 'record_id' in save_data
         
-        # Verify stok update was called
+        # Verify stok update was called (runs on the job queue after the response)
+        from app import get_job_queue
+        assert get_job_queue().wait_idle(timeout=5)
         mock_client.update_stok_from_sayim.assert_called_once()
+        assert mock_client.update_stok_from_sayim.call_args.args == ('recABC123',)
     
     @patch('app.get_airtable_client')
     @patch('app.get_matcher')
@@ -82,9 +85,9 @@ class TestBarcodeSearchToSaveWorkflow:
         mock_get_matcher.return_value = mock_matcher
         
         mock_client = Mock()
-        mock_client.get_all_brands.return_value = [
+        mock_client.get_brands_snapshot.return_value = ([
             {'id': 'recMARKA1', 'kod': 'RB', 'ad': 'Ray-Ban'}
-        ]
+        ], 'etag1')
         mock_client.create_new_sku.return_value = {
             'success': True,
             'record_id': 'recNEW123',
@@ -323,9 +326,9 @@ class TestContextFilteringWorkflow:
         mock_get_matcher.return_value = mock_matcher
         
         mock_client = Mock()
-        mock_client.get_all_brands.return_value = [
+        mock_client.get_brands_snapshot.return_value = ([
             {'id': 'recMARKA1', 'kod': 'RB', 'ad': 'Ray-Ban'}
-        ]
+        ], 'etag1')
         mock_get_client.return_value = mock_client
         
         # Step 1: Get brands
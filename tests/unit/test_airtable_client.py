@@ -219,6 +219,71 @@ class TestSKUOperations:
         assert len(results) == 1
         assert results[0]['fields']['Model Kodu'] == '2140'
 
+    
+    @patch('airtable_client.Api')
+    def test_search_sku_by_term_uses_index(self, mock_api_class, sample_product_record):
+        """With the catalogue index, manual search sends no formula query"""
+        mock_table = Mock()
+        mock_table.all.return_value = [sample_product_record]
+        
+        mock_base = Mock()
+        mock_base.table.return_value = mock_table
+        
+        mock_api = Mock()
+        mock_api.base.return_value = mock_base
+        mock_api_class.return_value = mock_api
+        
+        client = AirtableClient(category='OF')
+        client.search_sku_by_term('wayfarer')
+        results = client.search_sku_by_term('WAYFARER', context_brand='recMARKA1', context_category='OF')
+        client.stop_catalog_sync()
+        
+        assert results[0]['id'] == 'recABC123'
+        for call in mock_table.all.call_args_list:
+            assert 'formula' not in call.kwargs
+    
+    @patch('airtable_client.Api')
+    def test_search_sku_by_term_fuzzy(self, mock_api_class, sample_product_record):
+        """Fuzzy mode returns typo matches with their edit distance"""
+        mock_table = Mock()
+        mock_table.all.return_value = [sample_product_record]
+        
+        mock_base = Mock()
+        mock_base.table.return_value = mock_table
+        
+        mock_api = Mock()
+        mock_api.base.return_value = mock_base
+        mock_api_class.return_value = mock_api
+        
+        client = AirtableClient(category='OF')
+        assert client.search_sku_by_term('RB214O') == []
+        fuzzy = client.search_sku_by_term('RB214O', fuzzy=True)
+        exact = client.search_sku_by_term('2140', fuzzy=True)
+        client.stop_catalog_sync()
+        
+        assert [(r['id'], r['distance']) for r in fuzzy] == [('recABC123', 1)]
+        assert [(r['id'], r['distance']) for r in exact] == [('recABC123', 0)]
+        assert 'distance' not in sample_product_record
+    
+    @patch('airtable_client.Api')
+    def test_search_sku_by_term_formula_fallback(self, mock_api_class, sample_product_record, monkeypatch):
+        """With the index disabled, the Airtable formula is used"""
+        monkeypatch.setenv('CATALOG_INDEX_ENABLED', 'false')
+        mock_table = Mock()
+        mock_table.all.return_value = [sample_product_record]
+        
+        mock_base = Mock()
+        mock_base.table.return_value = mock_table
+        
+        mock_api = Mock()
+        mock_api.base.return_value = mock_base
+        mock_api_class.return_value = mock_api
+        
+        client = AirtableClient(category='OF')
+        client.search_sku_by_term('2140')
+        
+        assert 'SEARCH' in mock_table.all.call_args.kwargs['formula']
+
 
 class TestSayimOperations:
     """Test sayim (count) operations"""
@@ -275,6 +340,53 @@ class TestSayimOperations:
         assert result['success'] is True
 
 
+class TestSayimPhoto:
+    """Test photo attachments on count records"""
+    
+    @patch('airtable_client.Api')
+    def test_upload_uses_attachment_endpoint(self, mock_api_class):
+        mock_table = Mock()
+        mock_table.upload_attachment.return_value = {
+            'id': 'recSAYIM1',
+            'fields': {'fldFOTO': [
+                {'id': 'att1', 'url': 'https://content.airtable.com/old.jpg'},
+                {'id': 'att2', 'url': 'https://content.airtable.com/new.jpg'}
+            ]}
+        }
+        
+        mock_base = Mock()
+        mock_base.table.return_value = mock_table
+        
+        mock_api = Mock()
+        mock_api.base.return_value = mock_base
+        mock_api_class.return_value = mock_api
+        
+        client = AirtableClient(category='OF')
+        result = client.upload_sayim_photo('recSAYIM1', 'photo.jpg', b'jpeg', 'image/jpeg')
+        
+        assert result == {'success': True, 'url': 'https://content.airtable.com/new.jpg'}
+        mock_table.upload_attachment.assert_called_once_with(
+            'recSAYIM1', 'Fotograf', 'photo.jpg', b'jpeg', 'image/jpeg'
+        )
+    
+    @patch('airtable_client.Api')
+    def test_upload_error(self, mock_api_class):
+        mock_table = Mock()
+        mock_table.upload_attachment.side_effect = Exception("API Error")
+        
+        mock_base = Mock()
+        mock_base.table.return_value = mock_table
+        
+        mock_api = Mock()
+        mock_api.base.return_value = mock_base
+        mock_api_class.return_value = mock_api
+        
+        client = AirtableClient(category='OF')
+        result = client.upload_sayim_photo('recSAYIM1', 'photo.jpg', b'jpeg')
+        
+        assert result['success'] is False
+
+
 class TestStatistics:
     """Test statistics methods"""
     
@@ -304,6 +416,88 @@ class TestStatistics:
         assert stats['belirsiz'] == 1
         assert stats['bulunamadi'] == 1
         assert stats['direkt_oran'] == 50.0
+        client.stop_stats_reconcile()
+    
+    @patch('airtable_client.Api')
+    def test_stats_served_from_memory(self, mock_api_class):
+        """Stats are fetched once (status field only) and then updated by writes"""
+        mock_table = Mock()
+        mock_table.all.return_value = [{'fields': {'Eşleşme Durumu': 'Direkt'}}]
+        mock_table.create.return_value = {'id': 'recSAYIM1', 'fields': {}}
+        
+        mock_base = Mock()
+        mock_base.table.return_value = mock_table
+        
+        mock_api = Mock()
+        mock_api.base.return_value = mock_base
+        mock_api_class.return_value = mock_api
+        
+        client = AirtableClient(category='OF')
+        client.get_today_stats()
+        client.create_sayim_record({'Okutulan Barkod': '111', 'Eşleşme Durumu': 'Bulunamadı'})
+        stats = client.get_today_stats()
+        client.stop_stats_reconcile()
+        
+        assert stats['total'] == 2
+        assert stats['direkt'] == 1
+        assert stats['bulunamadi'] == 1
+        mock_table.all.assert_called_once()
+        assert mock_table.all.call_args.kwargs['fields'] == ['Eşleşme Durumu']
+    
+    @patch('airtable_client.Api')
+    def test_stats_error_returns_zeros(self, mock_api_class):
+        """Reconcile errors fall back to empty stats"""
+        mock_table = Mock()
+        mock_table.all.side_effect = Exception("API Error")
+        
+        mock_base = Mock()
+        mock_base.table.return_value = mock_table
+        
+        mock_api = Mock()
+        mock_api.base.return_value = mock_base
+        mock_api_class.return_value = mock_api
+        
+        client = AirtableClient(category='OF')
+        
+        assert client.get_today_stats()['total'] == 0
+
+    @patch('airtable_client.Api')
+    def test_refresh_callback_defers_reconcile(self, mock_api_class):
+        """With a refresh callback the request does not fetch from Airtable"""
+        mock_table = Mock()
+        mock_base = Mock()
+        mock_base.table.return_value = mock_table
+        mock_api = Mock()
+        mock_api.base.return_value = mock_base
+        mock_api_class.return_value = mock_api
+        refresh = Mock()
+
+        client = AirtableClient(category='OF')
+        client.create_sayim_record({'Okutulan Barkod': '111', 'Eşleşme Durumu': 'Direkt'})
+        stats = client.get_today_stats(refresh=refresh)
+        client.stop_stats_reconcile()
+
+        refresh.assert_called_once_with()
+        mock_table.all.assert_not_called()
+        assert stats['direkt'] == 1
+
+    @patch('airtable_client.Api')
+    def test_stats_shared_between_workers(self, mock_api_class):
+        """A reconcile on one worker is seen by the other"""
+        mock_table = Mock()
+        mock_table.all.return_value = [{'fields': {'Eşleşme Durumu': 'Direkt'}}] * 3
+        mock_base = Mock()
+        mock_base.table.return_value = mock_table
+        mock_api = Mock()
+        mock_api.base.return_value = mock_base
+        mock_api_class.return_value = mock_api
+
+        first, second = AirtableClient(category='OF'), AirtableClient(category='OF')
+        first.reconcile_stats()
+
+        assert second.daily_stats.needs_reconcile() is False
+        assert second.get_today_stats()['direkt'] == 3
+        second.stop_stats_reconcile()
 
 
 class TestBrands:
@@ -347,6 +541,110 @@ class TestBrands:
         assert brands[1]['ad'] == 'Vogue Eyewear'
 
 
+class TestBrandCache:
+    """Test cached brand list, ETag and brand code lookup"""
+    
+    BRANDS = [
+        {'id': 'recMARKA1', 'fields': {'Marka Kodu': 'RB', 'Marka Adı': 'Ray-Ban'}},
+        {'id': 'recMARKA2', 'fields': {'Marka Kodu': 'VO', 'Marka Adı': 'Vogue Eyewear'}}
+    ]
+    
+    def _make_client(self, mock_api_class, markalar_table, urun_table=None):
+        mock_base = Mock()
+        mock_base.table.side_effect = lambda name: {
+            'Markalar': markalar_table,
+            'Urun_Katalogu': urun_table or Mock(),
+            'Sayim_Kayitlari': Mock(),
+            'Stok_Kalemleri': Mock()
+        }[name]
+        mock_api = Mock()
+        mock_api.base.return_value = mock_base
+        mock_api_class.return_value = mock_api
+        return AirtableClient(category='OF')
+    
+    @patch('airtable_client.Api')
+    def test_brand_list_cached(self, mock_api_class):
+        """Repeated calls should not refetch Markalar"""
+        mock_table = Mock()
+        mock_table.all.return_value = self.BRANDS
+        client = self._make_client(mock_api_class, mock_table)
+        
+        brands, etag = client.get_brands_snapshot()
+        again, etag2 = client.get_brands_snapshot()
+        
+        assert [b['kod'] for b in brands] == ['RB', 'VO']
+        assert etag and etag == etag2
+        mock_table.all.assert_called_once()
+    
+    @patch('airtable_client.Api')
+    def test_invalidate_and_ttl(self, mock_api_class, monkeypatch):
+        """Explicit invalidation and TTL expiry rebuild the list"""
+        monkeypatch.setenv('BRANDS_CACHE_TTL', '0')
+        mock_table = Mock()
+        mock_table.all.return_value = self.BRANDS
+        client = self._make_client(mock_api_class, mock_table)
+        
+        client.get_brands_snapshot()
+        client.get_brands_snapshot()
+        assert mock_table.all.call_count == 2
+        
+        monkeypatch.setenv('BRANDS_CACHE_TTL', '300')
+        client = self._make_client(mock_api_class, mock_table)
+        client.get_brands_snapshot()
+        client.invalidate_brands()
+        client.get_brands_snapshot()
+        assert mock_table.all.call_count == 4
+    
+    @patch('airtable_client.Api')
+    def test_etag_changes_with_synced_brands(self, mock_api_class):
+        """A brand upsert from catalogue sync yields a new list and ETag"""
+        mock_urun_table = Mock()
+        mock_urun_table.all.return_value = []
+        mock_table = Mock()
+        mock_table.all.return_value = self.BRANDS
+        client = self._make_client(mock_api_class, mock_table, mock_urun_table)
+        client.get_catalog_index()
+        client.stop_catalog_sync()
+        
+        _, etag = client.get_brands_snapshot()
+        client.catalog_index.upsert_brand({'id': 'recMARKA3', 'fields': {'Marka Kodu': 'OX', 'Marka Adı': 'Oakley'}})
+        brands, new_etag = client.get_brands_snapshot()
+        
+        assert new_etag != etag
+        assert [b['kod'] for b in brands] == ['OX', 'RB', 'VO']
+    
+    @patch('airtable_client.Api')
+    def test_load_error_not_cached(self, mock_api_class):
+        """Errors return an empty list without an ETag and are retried"""
+        mock_table = Mock()
+        mock_table.all.side_effect = [Exception("API Error"), self.BRANDS]
+        client = self._make_client(mock_api_class, mock_table)
+        
+        assert client.get_brands_snapshot() == ([], None)
+        assert len(client.get_brands_snapshot()[0]) == 2
+    
+    @patch('airtable_client.Api')
+    def test_create_new_sku_uses_cached_brand_code(self, mock_api_class):
+        """Brand code comes from the cache, not markalar.get"""
+        mock_table = Mock()
+        mock_table.all.return_value = self.BRANDS
+        mock_urun_table = Mock()
+        mock_urun_table.create.return_value = {'id': 'recNEW', 'fields': {}}
+        client = self._make_client(mock_api_class, mock_table, mock_urun_table)
+        client.get_brands_snapshot()
+        
+        result = client.create_new_sku({
+            'Kategori': 'OF',
+            'Marka': ['recMARKA2'],
+            'Model_Kodu': '4115',
+            'Renk_Kodu': 'W44',
+            'Ekartman': 52
+        })
+        
+        assert result['sku'] == 'OF-VO-4115-W44-52'
+        mock_table.get.assert_not_called()
+
+
 class TestHealthCheck:
     """Test health check"""
     
@@ -386,3 +684,658 @@ class TestHealthCheck:
         
         assert result is False
 
+
+
+class TestFieldProjection:
+    """Reads should request only the fields the app uses"""
+    
+    def _client(self, mock_api_class):
+        mock_urun_table = Mock()
+        mock_urun_table.all.return_value = []
+        mock_markalar_table = Mock()
+        mock_markalar_table.all.return_value = []
+        
+        mock_base = Mock()
+        mock_base.table.side_effect = lambda name: {
+            'Markalar': mock_markalar_table,
+            'Urun_Katalogu': mock_urun_table,
+            'Sayim_Kayitlari': Mock(),
+            'Stok_Kalemleri': Mock()
+        }[name]
+        
+        mock_api = Mock()
+        mock_api.base.return_value = mock_base
+        mock_api_class.return_value = mock_api
+        
+        return AirtableClient(category='OF'), mock_urun_table, mock_markalar_table
+    
+    @patch('airtable_client.Api')
+    def test_product_reads_are_projected(self, mock_api_class):
+        """Barcode, prefix and manual searches send the product field list"""
+        from airtable_client import PRODUCT_FIELDS
+        client, urun, _ = self._client(mock_api_class)
+        client._catalog_enabled = False
+        
+        client.search_by_barcode('8056597412261')
+        client.search_by_barcodes(['8056597412261'])
+        client.fuzzy_search_barcode('8056597412261')
+        client.search_sku_by_term('RB2140')
+        
+        assert urun.all.call_count == 4
+        for call in urun.all.call_args_list:
+            assert call.kwargs['fields'] == PRODUCT_FIELDS
+        assert 'Fotograf' not in PRODUCT_FIELDS
+    
+    @patch('airtable_client.Api')
+    def test_catalog_load_is_projected(self, mock_api_class):
+        """Full catalogue and brand loads are projected too"""
+        from airtable_client import PRODUCT_FIELDS, BRAND_FIELDS
+        client, urun, markalar = self._client(mock_api_class)
+        
+        assert client.load_catalog() is True
+        
+        assert urun.all.call_args.kwargs['fields'] == PRODUCT_FIELDS
+        assert markalar.all.call_args.kwargs['fields'] == BRAND_FIELDS
+    
+    @patch('airtable_client.Api')
+    def test_projection_can_be_disabled(self, mock_api_class, monkeypatch):
+        """AIRTABLE_FIELD_PROJECTION=false fetches every field"""
+        monkeypatch.setenv('AIRTABLE_FIELD_PROJECTION', 'false')
+        client, urun, _ = self._client(mock_api_class)
+        
+        client.search_by_barcode('8056597412261')
+        
+        assert 'fields' not in urun.all.call_args.kwargs
+
+
+class TestCatalogIndexLoading:
+    """Test lazy loading of the in-memory catalogue index"""
+    
+    @patch('airtable_client.Api')
+    def test_get_catalog_index_loads_once(self, mock_api_class, sample_product_record):
+        """Catalogue should be fetched only on first access"""
+        mock_urun_table = Mock()
+        mock_urun_table.all.return_value = [sample_product_record]
+        mock_markalar_table = Mock()
+        mock_markalar_table.all.return_value = []
+        
+        mock_base = Mock()
+        mock_base.table.side_effect = lambda name: {
+            'Markalar': mock_markalar_table,
+            'Urun_Katalogu': mock_urun_table,
+            'Sayim_Kayitlari': Mock(),
+            'Stok_Kalemleri': Mock()
+        }[name]
+        
+        mock_api = Mock()
+        mock_api.base.return_value = mock_base
+        mock_api_class.return_value = mock_api
+        
+        client = AirtableClient(category='OF')
+        index = client.get_catalog_index()
+        client.get_catalog_index()
+        client.stop_catalog_sync()
+        
+        assert index is not None
+        assert index.get('8056597412261')[0]['id'] == 'recABC123'
+        mock_urun_table.all.assert_called_once()
+    
+    @patch('airtable_client.Api')
+    def test_get_catalog_index_load_failure(self, mock_api_class):
+        """Load errors should disable the index instead of raising"""
+        mock_table = Mock()
+        mock_table.all.side_effect = Exception("API Error")
+        
+        mock_base = Mock()
+        mock_base.table.return_value = mock_table
+        
+        mock_api = Mock()
+        mock_api.base.return_value = mock_base
+        mock_api_class.return_value = mock_api
+        
+        client = AirtableClient(category='OF')
+        
+        assert client.get_catalog_index() is None
+    
+    @patch('airtable_client.Api')
+    def test_get_catalog_index_disabled(self, mock_api_class):
+        """CATALOG_INDEX_ENABLED=false keeps the network path"""
+        import os
+        os.environ['CATALOG_INDEX_ENABLED'] = 'false'
+        try:
+            client = AirtableClient(category='OF')
+            assert client.get_catalog_index() is None
+        finally:
+            os.environ.pop('CATALOG_INDEX_ENABLED', None)
+
+
+class TestCatalogSync:
+    """Test incremental catalogue sync"""
+    
+    def _make_client(self, mock_api_class, urun_table, markalar_table):
+        mock_base = Mock()
+        mock_base.table.side_effect = lambda name: {
+            'Markalar': markalar_table,
+            'Urun_Katalogu': urun_table,
+            'Sayim_Kayitlari': Mock(),
+            'Stok_Kalemleri': Mock()
+        }[name]
+        
+        mock_api = Mock()
+        mock_api.base.return_value = mock_base
+        mock_api_class.return_value = mock_api
+        
+        client = AirtableClient(category='OF')
+        client._sync_interval = 0
+        return client
+    
+    @patch('airtable_client.Api')
+    def test_sync_applies_delta(self, mock_api_class, sample_product_record):
+        """Changed records are fetched with a watermark formula and upserted"""
+        mock_urun_table = Mock()
+        mock_urun_table.all.return_value = [sample_product_record]
+        mock_markalar_table = Mock()
+        mock_markalar_table.all.return_value = [
+            {'id': 'recMARKA1', 'fields': {'Marka Adı': 'Ray-Ban', 'Marka Kodu': 'RB'}}
+        ]
+        
+        client = self._make_client(mock_api_class, mock_urun_table, mock_markalar_table)
+        client.get_catalog_index()
+        
+        new_record = {'id': 'recNEW1', 'fields': {'Tedarikçi Barkodu': '111222333444'}}
+        mock_urun_table.all.return_value = [new_record]
+        mock_markalar_table.all.return_value = []
+        
+        result = client.sync_catalog()
+        
+        assert result == {'urun': 1, 'marka': 0, 'silinen': 0}
+        assert client.catalog_index.get('111222333444')[0]['id'] == 'recNEW1'
+        formula = mock_urun_table.all.call_args.kwargs['formula']
+        assert 'LAST_MODIFIED_TIME()' in formula
+    
+    @patch('airtable_client.Api')
+    def test_reconcile_removes_deleted(self, mock_api_class, sample_product_record):
+        """Records missing from Airtable are dropped during reconciliation"""
+        mock_urun_table = Mock()
+        mock_urun_table.all.return_value = [sample_product_record]
+        mock_markalar_table = Mock()
+        mock_markalar_table.all.return_value = [{'id': 'recMARKA1', 'fields': {}}]
+        
+        client = self._make_client(mock_api_class, mock_urun_table, mock_markalar_table)
+        client.get_catalog_index()
+        
+        mock_urun_table.all.return_value = []
+        mock_markalar_table.all.return_value = []
+        
+        removed = client.reconcile_catalog()
+        
+        assert removed == 2
+        assert client.catalog_index.get('8056597412261') == []
+        assert client.catalog_index.brands() == []
+    
+    @patch('airtable_client.Api')
+    def test_sync_without_loaded_catalog(self, mock_api_class):
+        """Sync is a no-op before the catalogue is loaded"""
+        mock_table = Mock()
+        client = self._make_client(mock_api_class, mock_table, mock_table)
+        
+        assert client.sync_catalog() == {'urun': 0, 'marka': 0, 'silinen': 0}
+        mock_table.all.assert_not_called()
+
+
+class TestCatalogSnapshot:
+    """Test cold start from the on-disk catalogue snapshot"""
+    
+    def _make_client(self, mock_api_class, urun_table, markalar_table):
+        mock_base = Mock()
+        mock_base.table.side_effect = lambda name: {
+            'Markalar': markalar_table,
+            'Urun_Katalogu': urun_table,
+            'Sayim_Kayitlari': Mock(),
+            'Stok_Kalemleri': Mock()
+        }[name]
+        
+        mock_api = Mock()
+        mock_api.base.return_value = mock_base
+        mock_api_class.return_value = mock_api
+        
+        client = AirtableClient(category='OF')
+        client._sync_interval = 0
+        return client
+    
+    def _tables(self, sample_product_record):
+        urun = Mock()
+        urun.all.return_value = [sample_product_record]
+        markalar = Mock()
+        markalar.all.return_value = [{'id': 'recMARKA1', 'fields': {'Marka Adı': 'Ray-Ban', 'Marka Kodu': 'RB'}}]
+        return urun, markalar
+    
+    @patch('airtable_client.Api')
+    def test_restart_loads_snapshot_then_delta(self, mock_api_class, sample_product_record):
+        """A second worker reads the snapshot and only asks for changes"""
+        urun, markalar = self._tables(sample_product_record)
+        first = self._make_client(mock_api_class, urun, markalar)
+        assert first.load_catalog() is True
+        
+        urun, markalar = Mock(), Mock()
+        changed = {'id': 'recNEW1', 'fields': {'Tedarikçi Barkodu': '111222333444'}}
+        urun.all.return_value = [changed]
+        markalar.all.return_value = []
+        second = self._make_client(mock_api_class, urun, markalar)
+        
+        assert second.load_catalog() is True
+        
+        assert second.catalog_index.get('8056597412261')[0]['id'] == 'recABC123'
+        assert second.catalog_index.get('111222333444')[0]['id'] == 'recNEW1'
+        assert second.catalog_index.get_brand('recMARKA1')['fields']['Marka Kodu'] == 'RB'
+        # Sadece watermark formülüyle delta istendi
+        urun.all.assert_called_once()
+        assert 'LAST_MODIFIED_TIME()' in urun.all.call_args.kwargs['formula']
+        assert second._catalog_watermark > first._catalog_watermark
+    
+    @patch('airtable_client.Api')
+    def test_stale_snapshot_triggers_full_load(self, mock_api_class, sample_product_record):
+        urun, markalar = self._tables(sample_product_record)
+        self._make_client(mock_api_class, urun, markalar).load_catalog()
+        
+        urun, markalar = self._tables(sample_product_record)
+        client = self._make_client(mock_api_class, urun, markalar)
+        client._snapshot_max_age = -1
+        
+        assert client.load_catalog() is True
+        assert 'formula' not in urun.all.call_args.kwargs
+    
+    @patch('airtable_client.Api')
+    def test_corrupted_snapshot_triggers_full_load(self, mock_api_class, sample_product_record):
+        urun, markalar = self._tables(sample_product_record)
+        first = self._make_client(mock_api_class, urun, markalar)
+        first.load_catalog()
+        with open(first._snapshot_path, 'r+b') as f:
+            f.seek(-1, 2)
+            last = f.read(1)[0]
+            f.seek(-1, 2)
+            f.write(bytes([last ^ 0xFF]))
+        
+        urun, markalar = self._tables(sample_product_record)
+        client = self._make_client(mock_api_class, urun, markalar)
+        
+        assert client.load_catalog() is True
+        assert 'formula' not in urun.all.call_args.kwargs
+        assert client.catalog_index.get('8056597412261')[0]['id'] == 'recABC123'
+    
+    @patch('airtable_client.Api')
+    def test_changed_field_list_triggers_full_load(self, mock_api_class, sample_product_record, monkeypatch):
+        """Snapshots taken with another projection lack fields and are ignored"""
+        urun, markalar = self._tables(sample_product_record)
+        self._make_client(mock_api_class, urun, markalar).load_catalog()
+        
+        monkeypatch.setenv('AIRTABLE_FIELD_PROJECTION', 'false')
+        urun, markalar = self._tables(sample_product_record)
+        client = self._make_client(mock_api_class, urun, markalar)
+        
+        assert client.load_catalog() is True
+        assert 'formula' not in urun.all.call_args.kwargs
+    
+    @patch('airtable_client.Api')
+    def test_snapshot_served_when_delta_fails(self, mock_api_class, sample_product_record):
+        """Airtable errors after boot keep the snapshot instead of failing"""
+        urun, markalar = self._tables(sample_product_record)
+        self._make_client(mock_api_class, urun, markalar).load_catalog()
+        
+        urun, markalar = Mock(), Mock()
+        urun.all.side_effect = Exception("API Error")
+        client = self._make_client(mock_api_class, urun, markalar)
+        
+        assert client.load_catalog() is True
+        assert client.catalog_index.get('8056597412261')[0]['id'] == 'recABC123'
+    
+    @patch('airtable_client.Api')
+    def test_empty_delta_advances_stored_watermark(self, mock_api_class, sample_product_record):
+        """A quiet catalogue keeps its snapshot fresh instead of aging into full reloads"""
+        urun, markalar = self._tables(sample_product_record)
+        first = self._make_client(mock_api_class, urun, markalar)
+        first.load_catalog()
+        first._catalog_watermark -= 6 * 24 * 3600
+        first.save_catalog_snapshot()
+        
+        urun.all.return_value = []
+        markalar.all.return_value = []
+        first.sync_catalog()
+        
+        urun, markalar = Mock(), Mock()
+        urun.all.return_value = []
+        markalar.all.return_value = []
+        second = self._make_client(mock_api_class, urun, markalar)
+        second._snapshot_max_age = 24 * 3600
+        
+        assert second.load_catalog() is True
+        assert 'LAST_MODIFIED_TIME()' in urun.all.call_args.kwargs['formula']
+        assert second.catalog_index.get('8056597412261')[0]['id'] == 'recABC123'
+    
+    @patch('airtable_client.Api')
+    def test_snapshot_disabled(self, mock_api_class, sample_product_record, monkeypatch):
+        monkeypatch.setenv('CATALOG_SNAPSHOT', 'false')
+        urun, markalar = self._tables(sample_product_record)
+        client = self._make_client(mock_api_class, urun, markalar)
+        
+        assert client.load_catalog() is True
+        assert client.save_catalog_snapshot() is False
+
+
+class TestBatchBarcodeSearch:
+    """Test combined OR(...) barcode lookups"""
+    
+    @patch('airtable_client.Api')
+    def test_search_by_barcodes_groups_results(self, mock_api_class, sample_product_record):
+        """Records are grouped back to the barcode that found them"""
+        numeric_record = {'id': 'recNUM', 'fields': {'Tedarikçi Barkodu': 1234567890123.0}}
+        mock_table = Mock()
+        mock_table.all.return_value = [sample_product_record, numeric_record]
+        
+        mock_base = Mock()
+        mock_base.table.return_value = mock_table
+        
+        mock_api = Mock()
+        mock_api.base.return_value = mock_base
+        mock_api_class.return_value = mock_api
+        
+        client = AirtableClient(category='OF')
+        results = client.search_by_barcodes(['8056597412261', '1234567890123', '000'])
+        
+        assert [r['id'] for r in results['8056597412261']] == ['recABC123']
+        assert [r['id'] for r in results['1234567890123']] == ['recNUM']
+        assert results['000'] == []
+        mock_table.all.assert_called_once()
+        assert mock_table.all.call_args.kwargs['formula'].startswith('OR(')
+    
+    @patch('airtable_client.Api')
+    def test_search_by_barcodes_chunks(self, mock_api_class):
+        """Large batches are split into several formula queries"""
+        mock_table = Mock()
+        mock_table.all.return_value = []
+        
+        mock_base = Mock()
+        mock_base.table.return_value = mock_table
+        
+        mock_api = Mock()
+        mock_api.base.return_value = mock_base
+        mock_api_class.return_value = mock_api
+        
+        client = AirtableClient(category='OF')
+        results = client.search_by_barcodes([str(i) for i in range(120)])
+        
+        assert len(results) == 120
+        assert mock_table.all.call_count == 3
+
+
+class TestSayimWriteBuffer:
+    """Test the optional write-behind buffer for count records"""
+    
+    @patch('airtable_client.Api')
+    def test_create_sayim_record_buffered(self, mock_api_class, tmp_path, monkeypatch):
+        """With SAYIM_WRITE_BUFFER the record is journaled and a local ID returned"""
+        import airtable_client
+        monkeypatch.setenv('SAYIM_WRITE_BUFFER', 'true')
+        monkeypatch.setattr(airtable_client, 'DATA_DIR', str(tmp_path))
+        
+        mock_table = Mock()
+        mock_table.batch_create.return_value = [{'id': 'recSAYIM1', 'fields': {}}]
+        
+        mock_base = Mock()
+        mock_base.table.return_value = mock_table
+        
+        mock_api = Mock()
+        mock_api.base.return_value = mock_base
+        mock_api_class.return_value = mock_api
+        
+        client = AirtableClient(category='OF')
+        try:
+            result = client.create_sayim_record({'Okutulan Barkod': '8056597412261'})
+            
+            assert result['success'] is True
+            assert result['pending'] is True
+            mock_table.create.assert_not_called()
+            assert client.resolve_sayim_record_id(result['record_id'], wait=5) == 'recSAYIM1'
+            assert client.get_sayim_record_status(result['record_id']) == 'committed'
+        finally:
+            client.write_buffer.stop(timeout=5)
+    
+    @patch('airtable_client.Api')
+    def test_reconcile_counts_buffered_records(self, mock_api_class, monkeypatch):
+        """Scans still waiting in the write buffer survive a stats reconcile"""
+        monkeypatch.setenv('SAYIM_WRITE_BUFFER', 'true')
+        monkeypatch.setenv('SAYIM_FLUSH_INTERVAL', '60')
+        
+        mock_table = Mock()
+        mock_table.all.return_value = [{'id': 'recOLD', 'fields': {'Eşleşme Durumu': 'Direkt'}}]
+        mock_table.batch_create.return_value = [{'id': 'recNEW', 'fields': {}}]
+        
+        mock_base = Mock()
+        mock_base.table.return_value = mock_table
+        
+        mock_api = Mock()
+        mock_api.base.return_value = mock_base
+        mock_api_class.return_value = mock_api
+        
+        client = AirtableClient(category='OF')
+        try:
+            client.create_sayim_record({'Okutulan Barkod': '111', 'Eşleşme Durumu': 'Belirsiz'})
+            client.reconcile_stats()
+            assert client.daily_stats.snapshot()['total'] == 2
+            assert client.daily_stats.snapshot()['belirsiz'] == 1
+            
+            # Çekim sürerken yazılan kayıt Airtable sonucunda da görünür; iki kez sayılmaz
+            def fetch_during_flush(**kwargs):
+                client.write_buffer.flush()
+                return [{'id': 'recOLD', 'fields': {'Eşleşme Durumu': 'Direkt'}},
+                        {'id': 'recNEW', 'fields': {'Eşleşme Durumu': 'Belirsiz'}}]
+            mock_table.all.side_effect = fetch_during_flush
+            client.reconcile_stats()
+            assert client.daily_stats.snapshot()['total'] == 2
+        finally:
+            client.write_buffer.stop(timeout=5)
+    
+    @patch('airtable_client.Api')
+    def test_local_store_serves_stats_and_recent(self, mock_api_class, monkeypatch):
+        """SAYIM_LOCAL_STORE writes to SQLite and reads stats without Airtable"""
+        monkeypatch.setenv('SAYIM_LOCAL_STORE', 'true')
+        monkeypatch.setenv('STATS_RECONCILE_INTERVAL', '0')
+        
+        mock_table = Mock()
+        mock_table.batch_create.side_effect = lambda records: [
+            {'id': f"recSAYIM{i}", 'fields': fields} for i, fields in enumerate(records)
+        ]
+        mock_base = Mock()
+        mock_base.table.return_value = mock_table
+        mock_api_class.return_value.base.return_value = mock_base
+        
+        client = AirtableClient(category='OF')
+        try:
+            result = client.create_sayim_record({'Okutulan Barkod': '1', 'Eşleşme Durumu': 'Direkt'})
+            client.create_sayim_record({'Okutulan Barkod': '2', 'Eşleşme Durumu': 'Bulunamadı'})
+            
+            assert result['pending'] is True
+            assert client.write_buffer is client.sayim_store
+            stats = client.get_today_stats()
+            assert stats['total'] == 2
+            assert stats['direkt'] == 1
+            mock_table.all.assert_not_called()
+            
+            recent = client.get_recent_sayim_records(limit=5)
+            assert [r['fields']['Okutulan Barkod'] for r in recent] == ['2', '1']
+            
+            assert client.resolve_sayim_record_id(result['record_id'], wait=5) == 'recSAYIM0'
+        finally:
+            client.sayim_store.stop(timeout=5)
+    
+    @patch('airtable_client.Api')
+    def test_recent_records_from_airtable(self, mock_api_class):
+        """Without the local store recent scans come from Airtable, newest first"""
+        mock_table = Mock()
+        mock_table.all.return_value = [{'id': 'recA', 'createdTime': '2025-10-30T10:00:00.000Z', 'fields': {}}]
+        mock_base = Mock()
+        mock_base.table.return_value = mock_table
+        mock_api_class.return_value.base.return_value = mock_base
+        
+        client = AirtableClient(category='OF')
+        recent = client.get_recent_sayim_records(limit=5)
+        
+        assert recent[0]['id'] == 'recA'
+        assert mock_table.all.call_args.kwargs == {'sort': ['-Timestamp'], 'max_records': 5}
+    
+    @patch('airtable_client.Api')
+    def test_resolve_real_id_passthrough(self, mock_api_class):
+        """Real Airtable IDs resolve to themselves"""
+        client = AirtableClient(category='OF')
+        
+        assert client.resolve_sayim_record_id('recSAYIM123') == 'recSAYIM123'
+        assert client.get_sayim_record_status('recSAYIM123') == 'committed'
+
+
+class TestStokUpdate:
+    """Test stock updates backed by shared counters"""
+    
+    @pytest.fixture(autouse=True)
+    def direct_writes(self, monkeypatch):
+        """These tests cover the direct (non-aggregated) write path"""
+        monkeypatch.setenv('STOK_UPDATE_WINDOW', '0')
+    
+    def _client(self, mock_api_class, sayim_records, stok_records):
+        mock_sayim_table = Mock()
+        mock_sayim_table.all.return_value = sayim_records
+        mock_stok_table = Mock()
+        mock_stok_table.all.return_value = stok_records
+        mock_stok_table.create.return_value = {'id': 'recSTOKNEW', 'fields': {}}
+        
+        mock_base = Mock()
+        mock_base.table.side_effect = lambda name: {
+            'Markalar': Mock(),
+            'Urun_Katalogu': Mock(),
+            'Sayim_Kayitlari': mock_sayim_table,
+            'Stok_Kalemleri': mock_stok_table
+        }[name]
+        
+        mock_api = Mock()
+        mock_api.base.return_value = mock_base
+        mock_api_class.return_value = mock_api
+        
+        return AirtableClient(category='OF'), mock_sayim_table, mock_stok_table
+    
+    @patch('airtable_client.Api')
+    def test_update_existing_stok_single_call(self, mock_api_class):
+        """Repeated scans reuse the seeded counters and do one update each"""
+        client, sayim_table, stok_table = self._client(
+            mock_api_class,
+            [{'id': 'recS1', 'fields': {'SKU': ['recSKU1']}}],
+            [{'id': 'recSTOK1', 'fields': {'SKU': ['recSKU1'], 'Mevcut_Miktar': 4}}]
+        )
+        
+        assert client.update_stok_from_sayim('recSKU1') is True
+        assert client.update_stok_from_sayim('recSKU1') is True
+        
+        sayim_table.all.assert_called_once()
+        stok_table.all.assert_called_once()
+        assert stok_table.update.call_count == 2
+        record_id, fields = stok_table.update.call_args.args
+        assert record_id == 'recSTOK1'
+        assert fields['Mevcut_Miktar'] == 6
+        assert fields['Son_Sayim_Miktari'] == 3
+    
+    @patch('airtable_client.Api')
+    def test_create_then_update(self, mock_api_class):
+        """Unknown SKUs create a stock item once, then update it"""
+        client, _, stok_table = self._client(mock_api_class, [], [])
+        
+        client.update_stok_from_sayim('recSKU2', konum='Vitrin')
+        client.update_stok_from_sayim('recSKU2')
+        
+        stok_table.create.assert_called_once()
+        assert stok_table.create.call_args.args[0]['Konum'] == 'Vitrin'
+        stok_table.update.assert_called_once_with('recSTOKNEW', {
+            'Son_Sayim_Tarihi': stok_table.create.call_args.args[0]['Son_Sayim_Tarihi'],
+            'Son_Sayim_Miktari': 2,
+            'Mevcut_Miktar': 2
+        })
+    
+    @patch('airtable_client.Api')
+    def test_update_failure_rolls_back(self, mock_api_class):
+        """A failed update does not leave the cached quantity ahead"""
+        client, _, stok_table = self._client(
+            mock_api_class, [],
+            [{'id': 'recSTOK1', 'fields': {'SKU': ['recSKU1'], 'Mevcut_Miktar': 4}}]
+        )
+        stok_table.update.side_effect = Exception("API Error")
+        
+        assert client.update_stok_from_sayim('recSKU1') is False
+        assert client.stok_tracker.stok_record('recSKU1') == ('recSTOK1', 4)
+        # Sayaç da geri alınır; tekrar deneme çift saymaz
+        assert client.stok_tracker.count('recSKU1') == 0
+
+    @patch('airtable_client.Api')
+    def test_two_workers_share_counters(self, mock_api_class):
+        """Scans on two workers add up instead of overwriting each other"""
+        stok_records = [{'id': 'recSTOK1', 'fields': {'SKU': ['recSKU1'], 'Mevcut_Miktar': 10}}]
+        first, _, first_table = self._client(mock_api_class, [], stok_records)
+        second, _, second_table = self._client(mock_api_class, [], stok_records)
+
+        for client in (first, second, first, second):
+            assert client.update_stok_from_sayim('recSKU1') is True
+
+        writes = [call.args[1] for call in first_table.update.call_args_list + second_table.update.call_args_list]
+        assert sorted(fields['Mevcut_Miktar'] for fields in writes) == [11, 12, 13, 14]
+        assert second_table.update.call_args.args[1]['Son_Sayim_Miktari'] == 4
+
+    @patch('airtable_client.Api')
+    def test_aggregated_updates(self, mock_api_class, monkeypatch):
+        """With STOK_UPDATE_WINDOW, repeated scans become one batch_update"""
+        monkeypatch.setenv('STOK_UPDATE_WINDOW', '30')
+        client, _, stok_table = self._client(
+            mock_api_class, [],
+            [{'id': 'recSTOK1', 'fields': {'SKU': ['recSKU1'], 'Mevcut_Miktar': 4}}]
+        )
+        
+        for _ in range(30):
+            assert client.update_stok_from_sayim('recSKU1') is True
+        client.stok_aggregator.stop(timeout=5)
+        
+        stok_table.update.assert_not_called()
+        stok_table.batch_update.assert_called_once()
+        records = stok_table.batch_update.call_args.args[0]
+        assert records[0]['id'] == 'recSTOK1'
+        assert records[0]['fields']['Mevcut_Miktar'] == 34
+        assert records[0]['fields']['Son_Sayim_Miktari'] == 30
+
+
+class TestSqliteStorageBackend:
+    """Test AirtableClient on the local SQLite backend (no network)"""
+    
+    @pytest.fixture
+    def client(self, monkeypatch):
+        monkeypatch.setenv('STORAGE_BACKEND', 'sqlite')
+        monkeypatch.setenv('STOK_UPDATE_WINDOW', '0')
+        monkeypatch.setenv('STATS_RECONCILE_INTERVAL', '0')
+        monkeypatch.delenv('AIRTABLE_TOKEN')
+        client = AirtableClient(category='OF')
+        client.urun_katalogu.import_records([
+            {'id': 'recA', 'fields': {'Tedarikçi Barkodu': '8056597412261', 'SKU': 'OF-RB-2140-901-50'}}
+        ])
+        return client
+    
+    def test_no_token_or_api_needed(self, client):
+        assert client.api is None
+        assert client.storage.name == 'sqlite'
+    
+    def test_count_workflow(self, client):
+        """Search, save, stock update and stats all run against SQLite"""
+        assert client.search_by_barcode('8056597412261')[0]['id'] == 'recA'
+        
+        result = client.create_sayim_record({
+            'Okutulan Barkod': '8056597412261', 'SKU': ['recA'], 'Eşleşme Durumu': 'Direkt'
+        })
+        assert result['success'] is True
+        assert client.update_stok_from_sayim('recA') is True
+        
+        assert client.get_today_stats()['direkt'] == 1
+        stok = client.stok_kalemleri.all()
+        assert stok[0]['fields']['SKU'] == ['recA']
+        assert client.get_recent_sayim_records(1)[0]['id'] == result['record_id']
@@ -4,6 +4,8 @@ Unit Tests - Flask API Endpoints
 
 import pytest
 import json
+import os
+import time
 from unittest.mock import Mock, patch, MagicMock
 
 
@@ -47,6 +49,64 @@ class TestHealthEndpoint:
         assert data['categories']['LN'] is True
 
 
+class TestHealthProbes:
+    """Test liveness/readiness split and cached concurrent probes"""
+    
+    @patch('app.get_airtable_client')
+    def test_live_does_not_touch_airtable(self, mock_get_client, flask_client):
+        """Liveness never creates a client or probes Airtable"""
+        response = flask_client.get('/api/health/live')
+        data = json.loads(response.data)
+        
+        assert response.status_code == 200
+        assert data['status'] == 'alive'
+        mock_get_client.assert_not_called()
+    
+    @patch('app.get_airtable_client')
+    def test_health_result_cached(self, mock_get_client, flask_client):
+        """A second call within the TTL reuses the probe results"""
+        mock_client = Mock()
+        mock_client.health_check.return_value = True
+        mock_get_client.return_value = mock_client
+        
+        first = json.loads(flask_client.get('/api/health').data)
+        second = json.loads(flask_client.get('/api/health').data)
+        
+        assert first['cached'] is False
+        assert second['cached'] is True
+        assert mock_client.health_check.call_count == 3
+    
+    @patch('app.get_airtable_client')
+    def test_probes_run_concurrently(self, mock_get_client, flask_client):
+        """Three slow probes take about one probe's time"""
+        import time
+        
+        def slow_probe():
+            time.sleep(0.3)
+            return True
+        
+        mock_client = Mock()
+        mock_client.health_check.side_effect = slow_probe
+        mock_get_client.return_value = mock_client
+        
+        started = time.time()
+        response = flask_client.get('/api/health')
+        
+        assert json.loads(response.data)['status'] == 'healthy'
+        assert time.time() - started < 0.8
+    
+    @patch('app.get_airtable_client')
+    def test_ready_returns_503_when_degraded(self, mock_get_client, flask_client):
+        """Readiness fails when a category is unreachable"""
+        mock_get_client.side_effect = Exception("Base not configured")
+        
+        response = flask_client.get('/api/health/ready')
+        data = json.loads(response.data)
+        
+        assert response.status_code == 503
+        assert data['status'] == 'degraded'
+
+
 class TestSearchBarcodeEndpoint:
     """Test /api/search-barcode endpoint"""
     
@@ -179,6 +239,82 @@ class TestSaveCountEndpoint:
         assert response.status_code == 200
         assert data['success'] is True
         assert data['record_id'] == 'recSAYIM123'
+        
+        from app import get_job_queue
+        assert get_job_queue().wait_idle(timeout=5)
+        mock_client.update_stok_from_sayim.assert_called_once()
+        assert mock_client.update_stok_from_sayim.call_args.args == ('recABC123',)
+    
+    @patch('app.get_airtable_client')
+    def test_save_count_stok_update_is_queued(self, mock_get_client, flask_client):
+        """The response does not wait for the stock update"""
+        import threading
+        release = threading.Event()
+        mock_client = Mock()
+        mock_client.create_sayim_record.return_value = {'success': True, 'record_id': 'recSAYIM123'}
+        mock_client.update_stok_from_sayim.side_effect = lambda sku_id, **kwargs: release.wait(5)
+        mock_get_client.return_value = mock_client
+        
+        response = flask_client.post('/api/save-count',
+            data=json.dumps({'category': 'OF', 'barkod': '8056597412261',
+                             'sku_id': 'recABC123', 'eslesme_durumu': 'Direkt'}),
+            content_type='application/json'
+        )
+        
+        assert response.status_code == 200
+        from app import get_job_queue
+        assert get_job_queue().snapshot()['enqueued'] == 1
+        release.set()
+        assert get_job_queue().wait_idle(timeout=5)
+    
+    @patch('app.get_airtable_client')
+    def test_failed_stok_update_is_retried(self, mock_get_client, flask_client):
+        """A failed stock update raises so the queue retries it with backoff"""
+        from app import _run_stok_update
+        mock_client = Mock()
+        mock_client.update_stok_from_sayim.return_value = False
+        mock_get_client.return_value = mock_client
+        
+        with pytest.raises(RuntimeError):
+            _run_stok_update({'category': 'OF', 'sku_id': 'recABC123'})
+
+    @patch('app.get_airtable_client')
+    def test_stok_flush_is_a_retried_job(self, mock_get_client, flask_client):
+        """Coalesced deltas are written by a queued 'stok_flush' job that is retried on error"""
+        from app import _run_stok_update, get_job_queue
+        scheduled = []
+        mock_client = Mock()
+        mock_client.stok_aggregator.window = 0
+        mock_client.stok_aggregator.flush.side_effect = [RuntimeError("Connection reset"), 1]
+        mock_client.update_stok_from_sayim.side_effect = (
+            lambda sku_id, schedule_flush: scheduled.append(schedule_flush()) or True
+        )
+        mock_get_client.return_value = mock_client
+
+        _run_stok_update({'category': 'OF', 'sku_id': 'recABC123'})
+        queue = get_job_queue()
+        assert queue.wait_idle(timeout=5)
+
+        job = queue.get_job(scheduled[0])
+        assert job['status'] == 'queued'
+        assert job['attempts'] == 1
+
+    @patch('app.get_airtable_client')
+    def test_save_count_without_queue(self, mock_get_client, flask_client, monkeypatch):
+        """JOB_QUEUE_ENABLED=false updates stock inside the request"""
+        monkeypatch.setattr('app.JOB_QUEUE_ENABLED', False)
+        mock_client = Mock()
+        mock_client.create_sayim_record.return_value = {'success': True, 'record_id': 'recSAYIM123'}
+        mock_get_client.return_value = mock_client
+        
+        response = flask_client.post('/api/save-count',
+            data=json.dumps({'category': 'OF', 'barkod': '8056597412261',
+                             'sku_id': 'recABC123', 'eslesme_durumu': 'Direkt'}),
+            content_type='application/json'
+        )
+        
+        assert response.status_code == 200
+        mock_client.update_stok_from_sayim.assert_called_once_with('recABC123')
     
     def test_save_count_missing_fields(self, flask_client):
         """Test save count with missing required fields"""
@@ -231,6 +367,34 @@ class TestManualSearchEndpoint:
         assert data['count'] == 1
         assert len(data['products']) == 1
     
+    @patch('app.get_airtable_client')
+    def test_manual_search_fuzzy(self, mock_get_client, flask_client):
+        """Fuzzy manual search passes the mode through and returns distances"""
+        mock_client = Mock()
+        mock_client.search_sku_by_term.return_value = [
+            {
+                'id': 'recABC123',
+                'fields': {'SKU': 'OF-RB-2140-901-50', 'Model Kodu': '2140'},
+                'distance': 1
+            }
+        ]
+        mock_get_client.return_value = mock_client
+        
+        response = flask_client.post('/api/search-manual',
+            data=json.dumps({
+                'category': 'OF',
+                'term': 'RB214O',
+                'fuzzy': True
+            }),
+            content_type='application/json'
+        )
+        
+        data = json.loads(response.data)
+        
+        assert response.status_code == 200
+        assert data['products'][0]['distance'] == 1
+        mock_client.search_sku_by_term.assert_called_once_with('RB214O', None, None, fuzzy=True)
+    
     def test_manual_search_short_term(self, flask_client):
         """Test manual search with too short term"""
         response = flask_client.post('/api/search-manual',
@@ -254,10 +418,10 @@ class TestBrandsEndpoint:
     def test_get_brands_success(self, mock_get_client, flask_client):
         """Test getting brands list"""
         mock_client = Mock()
-        mock_client.get_all_brands.return_value = [
+        mock_client.get_brands_snapshot.return_value = ([
             {'id': 'rec1', 'kod': 'RB', 'ad': 'Ray-Ban'},
             {'id': 'rec2', 'kod': 'VOGUE', 'ad': 'Vogue Eyewear'}
-        ]
+        ], 'etag1')
         mock_get_client.return_value = mock_client
         
         response = flask_client.get('/api/brands?category=OF')
@@ -271,7 +435,7 @@ class TestBrandsEndpoint:
     def test_get_brands_post_method(self, mock_get_client, flask_client):
         """Test getting brands via POST"""
         mock_client = Mock()
-        mock_client.get_all_brands.return_value = []
+        mock_client.get_brands_snapshot.return_value = ([], 'etag0')
         mock_get_client.return_value = mock_client
         
         response = flask_client.post('/api/brands',
@@ -282,6 +446,43 @@ class TestBrandsEndpoint:
         assert response.status_code == 200
 
 
+class TestBrandsETag:
+    """Test ETag/304 handling on /api/brands"""
+    
+    @patch('app.get_airtable_client')
+    def test_etag_and_not_modified(self, mock_get_client, flask_client):
+        """Matching If-None-Match returns 304 without a body"""
+        mock_client = Mock()
+        mock_client.get_brands_snapshot.return_value = ([{'id': 'rec1', 'kod': 'RB', 'ad': 'Ray-Ban'}], 'abc123')
+        mock_get_client.return_value = mock_client
+        
+        first = flask_client.get('/api/brands?category=OF')
+        second = flask_client.get('/api/brands?category=OF', headers={'If-None-Match': '"abc123"'})
+        
+        assert first.status_code == 200
+        assert first.headers['ETag'] == '"abc123"'
+        assert first.headers['Cache-Control'] == 'no-cache'
+        assert second.status_code == 304
+        assert second.data == b''
+    
+    @patch('app.get_airtable_client')
+    def test_body_serialized_once_per_etag(self, mock_get_client, flask_client):
+        """The JSON body is reused until the ETag changes"""
+        import app as app_module
+        mock_client = Mock()
+        mock_client.get_brands_snapshot.return_value = ([{'id': 'rec1', 'kod': 'RB', 'ad': 'Ray-Ban'}], 'v1')
+        mock_get_client.return_value = mock_client
+        
+        flask_client.get('/api/brands?category=OF')
+        body = app_module._brands_bodies['OF'][1]
+        flask_client.get('/api/brands?category=OF')
+        assert app_module._brands_bodies['OF'][1] is body
+        
+        mock_client.get_brands_snapshot.return_value = ([], 'v2')
+        data = json.loads(flask_client.get('/api/brands?category=OF').data)
+        assert data == {'success': True, 'brands': []}
+
+
 class TestStatsEndpoint:
     """Test /api/stats endpoint"""
     
@@ -305,6 +506,173 @@ class TestStatsEndpoint:
         assert data['success'] is True
         assert data['stats']['total'] == 100
         assert data['stats']['direkt_oran'] == 85.0
+    
+    @patch('app.get_airtable_client')
+    def test_stats_refresh_is_queued(self, mock_get_client, flask_client):
+        """The reconcile runs as one background job, not inside the request"""
+        mock_client = Mock()
+        mock_client.get_today_stats.return_value = {'total': 0}
+        mock_get_client.return_value = mock_client
+        
+        flask_client.get('/api/stats?category=OF')
+        refresh = mock_client.get_today_stats.call_args.kwargs['refresh']
+        from app import get_job_queue
+        queue = get_job_queue()
+        queue.stop(timeout=5)
+        first, second = refresh(), refresh()
+        
+        assert first == second
+        assert queue.get_job(first)['kind'] == 'stats_refresh'
+        assert queue.run_next() is True
+        mock_client.reconcile_stats.assert_called_once_with()
+
+
+class TestUploadPhotoEndpoint:
+    """Test /api/upload-photo endpoint"""
+    
+    def _jpeg(self):
+        Image = pytest.importorskip('PIL.Image')
+        import io
+        output = io.BytesIO()
+        Image.new('RGB', (3000, 2000), (0, 0, 0)).save(output, 'JPEG')
+        return output.getvalue()
+    
+    @patch('app.get_airtable_client')
+    def test_multipart_upload_goes_to_attachment_endpoint(self, mock_get_client, flask_client):
+        """Photos are downscaled and sent as raw bytes, not a data: URL"""
+        import io
+        mock_client = Mock()
+        mock_client.resolve_sayim_record_id.return_value = 'recSAYIM1'
+        mock_client.upload_sayim_photo.return_value = {'success': True, 'url': 'https://content.airtable.com/x.jpg'}
+        mock_get_client.return_value = mock_client
+        photo = self._jpeg()
+        
+        response = flask_client.post('/api/upload-photo', data={
+            'photo': (io.BytesIO(photo), 'IMG 1.jpg'),
+            'record_id': 'recSAYIM1',
+            'category': 'OF'
+        }, content_type='multipart/form-data')
+        data = json.loads(response.data)
+        
+        assert response.status_code == 200
+        assert data['success'] is True
+        assert data['url'] == 'https://content.airtable.com/x.jpg'
+        record_id, filename, content, content_type = mock_client.upload_sayim_photo.call_args.args
+        assert record_id == 'recSAYIM1'
+        assert filename == 'IMG_1.jpg'
+        assert content_type == 'image/jpeg'
+        assert content[:2] == b'\xff\xd8'
+        assert data['size'] == len(content)
+        mock_client.sayim_kayitlari.update.assert_not_called()
+    
+    @patch('app.get_airtable_client')
+    def test_binary_upload_to_local_store(self, mock_get_client, flask_client, monkeypatch):
+        """Raw image bodies are streamed; PHOTO_STORE=local writes to disk"""
+        monkeypatch.setattr('app.PHOTO_STORE', 'local')
+        mock_get_client.return_value = Mock()
+        photo = self._jpeg()
+        
+        response = flask_client.post(
+            '/api/upload-photo?record_id=loc_1&category=GN&filename=a.jpg',
+            data=photo,
+            content_type='image/jpeg'
+        )
+        data = json.loads(response.data)
+        
+        assert response.status_code == 200
+        assert data['url'].startswith('/api/photos/GN/loc_1-')
+        served = flask_client.get(data['url'])
+        assert served.status_code == 200
+        assert served.data[:2] == b'\xff\xd8'
+        assert len(served.data) == data['size'] < len(photo)
+    
+    @patch('app.get_airtable_client')
+    def test_upload_too_large(self, mock_get_client, flask_client, monkeypatch):
+        monkeypatch.setattr('app.PHOTO_STORE', 'local')
+        monkeypatch.setattr('app.PHOTO_MAX_UPLOAD_BYTES', 1024)
+        mock_get_client.return_value = Mock()
+        
+        response = flask_client.post(
+            '/api/upload-photo?record_id=loc_1&category=OF',
+            data=b'x' * 4096,
+            content_type='image/jpeg'
+        )
+        
+        assert response.status_code == 413
+        assert json.loads(response.data)['success'] is False
+    
+    @patch('app.get_airtable_client')
+    def test_async_upload_is_processed_after_response(self, mock_get_client, flask_client):
+        """async=1 spools the photo and returns 202; the job uploads it"""
+        mock_client = Mock()
+        mock_client.resolve_sayim_record_id.return_value = 'recSAYIM1'
+        mock_client.upload_sayim_photo.return_value = {'success': True, 'url': 'https://content.airtable.com/x.jpg'}
+        mock_get_client.return_value = mock_client
+        
+        response = flask_client.post(
+            '/api/upload-photo?record_id=loc_1&category=OF&filename=a.jpg&async=1',
+            data=self._jpeg(),
+            content_type='image/jpeg'
+        )
+        data = json.loads(response.data)
+        
+        assert response.status_code == 202
+        assert data['queued'] is True
+        from app import get_job_queue
+        import airtable_client
+        assert get_job_queue().wait_idle(timeout=10)
+        assert get_job_queue().get_job(data['job_id']) is None
+        record_id, filename, content, _ = mock_client.upload_sayim_photo.call_args.args
+        assert (record_id, filename) == ('recSAYIM1', 'a.jpg')
+        assert content[:2] == b'\xff\xd8'
+        assert os.listdir(os.path.join(airtable_client.DATA_DIR, 'uploads')) == []
+    
+    @patch('app.get_airtable_client')
+    def test_async_upload_retries_unresolved_record(self, mock_get_client, flask_client):
+        """The job backs off while the buffered record is not yet in Airtable"""
+        mock_client = Mock()
+        mock_client.resolve_sayim_record_id.return_value = None
+        mock_get_client.return_value = mock_client
+        
+        response = flask_client.post(
+            '/api/upload-photo?record_id=loc_1&category=OF&async=1',
+            data=b'jpeg',
+            content_type='image/jpeg'
+        )
+        
+        assert response.status_code == 202
+        from app import get_job_queue
+        queue = get_job_queue()
+        job_id = json.loads(response.data)['job_id']
+        deadline = time.time() + 5
+        while queue.get_job(job_id)['attempts'] == 0 and time.time() < deadline:
+            time.sleep(0.01)
+        assert queue.wait_idle(timeout=5)
+        job = queue.get_job(job_id)
+        assert job['status'] == 'queued'
+        assert job['attempts'] == 1
+        mock_client.upload_sayim_photo.assert_not_called()
+    
+    @patch('app.get_airtable_client')
+    def test_upload_waits_for_buffered_record(self, mock_get_client, flask_client):
+        """Unresolved local IDs return 409 before the photo is processed"""
+        mock_client = Mock()
+        mock_client.resolve_sayim_record_id.return_value = None
+        mock_get_client.return_value = mock_client
+        
+        response = flask_client.post(
+            '/api/upload-photo?record_id=loc_1&category=OF',
+            data=b'jpeg',
+            content_type='image/jpeg'
+        )
+        
+        assert response.status_code == 409
+        mock_client.upload_sayim_photo.assert_not_called()
+    
+    def test_upload_requires_record_id(self, flask_client):
+        response = flask_client.post('/api/upload-photo?category=OF', data=b'jpeg', content_type='image/jpeg')
+        
+        assert response.status_code == 400
 
 
 class TestUnlistedProductEndpoint:
@@ -432,3 +800,307 @@ class TestCategoryValidation:
         
         assert response.status_code == 200
 
+
+
+class TestSearchBarcodeBatchEndpoint:
+    """Test /api/search-barcode/batch endpoint"""
+    
+    @patch('app.get_matcher')
+    def test_batch_search_preserves_order(self, mock_get_matcher, flask_client):
+        """Results come back in input order"""
+        mock_matcher = Mock()
+        mock_matcher.match_many.return_value = [
+            {'status': 'direkt', 'confidence': 100, 'product': {'sku': 'OF-A'}},
+            {'status': 'bulunamadi', 'confidence': 0, 'product': None}
+        ]
+        mock_get_matcher.return_value = mock_matcher
+        
+        response = flask_client.post('/api/search-barcode/batch',
+            data=json.dumps({
+                'barkodlar': ['8056597412261', ' 999 '],
+                'category': 'OF'
+            }),
+            content_type='application/json'
+        )
+        
+        data = json.loads(response.data)
+        
+        assert response.status_code == 200
+        assert data['count'] == 2
+        assert data['results'][0]['barkod'] == '8056597412261'
+        assert data['results'][0]['found'] is True
+        assert data['results'][1]['barkod'] == '999'
+        assert data['results'][1]['found'] is False
+        mock_matcher.match_many.assert_called_once_with(['8056597412261', '999'], None, None)
+    
+    def test_batch_search_requires_list(self, flask_client):
+        """Missing or empty barcode list is rejected"""
+        response = flask_client.post('/api/search-barcode/batch',
+            data=json.dumps({'category': 'OF', 'barkodlar': []}),
+            content_type='application/json'
+        )
+        
+        assert response.status_code == 400
+    
+    @patch('app.get_matcher')
+    def test_batch_search_rejects_non_string_barcodes(self, mock_get_matcher, flask_client):
+        """null or numeric entries are rejected, not stringified"""
+        for barkodlar in ([None], ['8056597412261', 123.0]):
+            response = flask_client.post('/api/search-barcode/batch',
+                data=json.dumps({'category': 'OF', 'barkodlar': barkodlar}),
+                content_type='application/json'
+            )
+
+            assert response.status_code == 400
+        mock_get_matcher.assert_not_called()
+    
+    def test_batch_search_too_many(self, flask_client):
+        """Oversized batches are rejected"""
+        response = flask_client.post('/api/search-barcode/batch',
+            data=json.dumps({'category': 'OF', 'barkodlar': ['1'] * 201}),
+            content_type='application/json'
+        )
+        
+        assert response.status_code == 400
+
+
+class TestSayimRecordStatusEndpoint:
+    """Test /api/sayim-kaydi/<record_id> endpoint"""
+    
+    @patch('app.get_airtable_client')
+    def test_status_committed(self, mock_get_client, flask_client):
+        """Committed local records report their Airtable ID"""
+        mock_client = Mock()
+        mock_client.get_sayim_record_status.return_value = 'committed'
+        mock_client.resolve_sayim_record_id.return_value = 'recSAYIM123'
+        mock_get_client.return_value = mock_client
+        
+        response = flask_client.get('/api/sayim-kaydi/loc123?category=OF')
+        data = json.loads(response.data)
+        
+        assert response.status_code == 200
+        assert data['status'] == 'committed'
+        assert data['record_id'] == 'recSAYIM123'
+    
+    @patch('app.get_airtable_client')
+    def test_status_pending(self, mock_get_client, flask_client):
+        """Pending records have no Airtable ID yet"""
+        mock_client = Mock()
+        mock_client.get_sayim_record_status.return_value = 'pending'
+        mock_get_client.return_value = mock_client
+        
+        response = flask_client.get('/api/sayim-kaydi/loc123?category=OF')
+        data = json.loads(response.data)
+        
+        assert data['status'] == 'pending'
+        assert data['record_id'] is None
+
+
+class TestMetricsEndpoint:
+    """Test /api/metrics endpoint"""
+    
+    def test_metrics_includes_rate_limiter(self, flask_client):
+        """Rate limiter counters are exposed per base"""
+        from rate_limiter import get_bucket
+        get_bucket('appMETRICS').acquire()
+        
+        response = flask_client.get('/api/metrics')
+        data = json.loads(response.data)
+        
+        assert response.status_code == 200
+        assert data['rate_limiter']['appMETRICS']['acquired'] >= 1
+    
+    @patch('app.get_airtable_client')
+    def test_metrics_includes_match_cache(self, mock_get_client, flask_client):
+        """Per-category match cache size and hit rate are exposed"""
+        from app import get_matcher
+        mock_get_client.return_value = Mock()
+        get_matcher('OF')
+        
+        response = flask_client.get('/api/metrics')
+        data = json.loads(response.data)
+        
+        assert data['match_cache']['OF']['size'] == 0
+        assert 'hit_rate' in data['match_cache']['OF']
+    
+    @patch('app.get_airtable_client')
+    def test_recent_sayim_records(self, mock_get_client, flask_client):
+        """Recent scans are listed with a clamped limit"""
+        mock_client = Mock()
+        mock_client.get_recent_sayim_records.return_value = [{'id': 'loc1', 'status': 'pending', 'fields': {}}]
+        mock_get_client.return_value = mock_client
+        
+        response = flask_client.get('/api/sayim-kayitlari?category=GN&limit=500')
+        data = json.loads(response.data)
+        
+        assert response.status_code == 200
+        assert data['records'][0]['id'] == 'loc1'
+        mock_get_client.assert_called_with('GN')
+        mock_client.get_recent_sayim_records.assert_called_once_with(100)
+    
+    def test_recent_sayim_records_invalid_limit(self, flask_client):
+        response = flask_client.get('/api/sayim-kayitlari?limit=abc')
+        
+        assert response.status_code == 400
+    
+    def test_metrics_includes_job_queue(self, flask_client):
+        """Job queue depth and lag are exposed"""
+        from app import get_job_queue
+        get_job_queue().enqueue('stok_update', {'category': 'OF', 'sku_id': 'recX'}, delay=60)
+        
+        response = flask_client.get('/api/metrics')
+        data = json.loads(response.data)
+        
+        assert data['jobs']['enabled'] is True
+        assert data['jobs']['depth'] == 1
+        assert data['jobs']['lag_seconds'] == 0.0
+
+
+class TestMatcherPool:
+    """Test per-category shared matchers"""
+    
+    @patch('app.get_airtable_client')
+    def test_matcher_reused_per_category(self, mock_get_client, flask_app):
+        """The same matcher should serve every request of a category"""
+        from app import get_matcher
+        clients = {'OF': Mock(), 'GN': Mock()}
+        mock_get_client.side_effect = lambda category: clients[category]
+        
+        assert get_matcher('OF') is get_matcher('OF')
+        assert get_matcher('OF') is not get_matcher('GN')
+        assert get_matcher('GN').client is clients['GN']
+    
+    @patch('app.get_airtable_client')
+    def test_matcher_rebuilt_when_client_changes(self, mock_get_client, flask_app):
+        """A new pooled client gets a new matcher"""
+        from app import get_matcher
+        mock_get_client.return_value = Mock()
+        first = get_matcher('OF')
+        
+        mock_get_client.return_value = Mock()
+        
+        assert get_matcher('OF') is not first
+    
+    @patch('app.get_airtable_client')
+    def test_matcher_pool_thread_safe(self, mock_get_client, flask_app):
+        """Concurrent first requests should share one matcher"""
+        from concurrent.futures import ThreadPoolExecutor
+        from app import get_matcher
+        mock_get_client.return_value = Mock()
+        
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            matchers = list(executor.map(lambda _: get_matcher('OF'), range(32)))
+        
+        assert len({id(m) for m in matchers}) == 1
+    
+    @patch('app.get_airtable_client')
+    def test_unlisted_product_invalidates_matcher(self, mock_get_client, flask_client):
+        """Adding a barcode should invalidate the category's matcher"""
+        from app import get_matcher
+        mock_client = Mock()
+        mock_client.create_new_sku.return_value = {
+            'success': True,
+            'record_id': 'recNEW123',
+            'sku': 'OF-RB-9999-001-50'
+        }
+        mock_client.create_sayim_record.return_value = {'success': True, 'record_id': 'recSAYIM123'}
+        mock_get_client.return_value = mock_client
+        matcher = get_matcher('OF')
+        matcher.warmed = True
+        
+        flask_client.post('/api/save-unlisted-product',
+            data=json.dumps({
+                'category': 'OF',
+                'barkod': '999999999999',
+                'kategori': 'OF',
+                'marka_id': 'recMARKA1',
+                'model_kodu': '9999',
+                'renk_kodu': '001',
+                'ekartman': 50
+            }),
+            content_type='application/json'
+        )
+        
+        assert matcher.warmed is False
+
+
+class TestClientPool:
+    """Test locked client pool and warm-up"""
+    
+    @patch('app.AirtableClient')
+    def test_concurrent_first_requests_build_one_client(self, mock_client_class, flask_app):
+        """Only one client should be constructed per category"""
+        import time
+        from concurrent.futures import ThreadPoolExecutor
+        from app import get_airtable_client, clear_client_pool
+        
+        def slow_client(category):
+            time.sleep(0.05)
+            return Mock(category=category)
+        mock_client_class.side_effect = slow_client
+        clear_client_pool()
+        
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            clients = list(executor.map(lambda _: get_airtable_client('OF'), range(16)))
+        clear_client_pool()
+        
+        assert len({id(c) for c in clients}) == 1
+        assert mock_client_class.call_count == 1
+    
+    @patch('app.AirtableClient')
+    def test_warm_up_pool(self, mock_client_class, flask_app):
+        """Warm-up builds every category and reports failures"""
+        import app as app_module
+        from app import warm_up_pool, clear_client_pool
+        
+        def build(category):
+            if category == 'LN':
+                raise ValueError("AIRTABLE_BASE_LENS eksik")
+            client = Mock(category=category)
+            client.get_catalog_index.return_value = None
+            return client
+        mock_client_class.side_effect = build
+        clear_client_pool()
+        
+        results = warm_up_pool()
+        pooled = set(app_module._client_pool)
+        clear_client_pool()
+        
+        assert results == {'OF': False, 'GN': False, 'LN': False}
+        assert pooled == {'OF', 'GN'}
+    
+    def test_gunicorn_post_fork_warms_worker(self, flask_app, monkeypatch):
+        """post_fork hook resets the pool and warms the worker"""
+        import importlib.util
+        import os
+        path = os.path.join(os.path.dirname(__file__), '..', '..', 'backend', 'gunicorn.conf.py')
+        spec = importlib.util.spec_from_file_location('gunicorn_conf', path)
+        conf = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(conf)
+        
+        warm_up = Mock(return_value={'OF': True})
+        monkeypatch.setattr('app.warm_up_pool', warm_up)
+        conf.post_fork(Mock(), Mock(pid=123))
+        
+        assert conf.preload_app is True
+        warm_up.assert_called_once()
+    
+    @patch('app.AirtableClient')
+    def test_gunicorn_worker_exit_flushes_stock_deltas(self, mock_client_class, flask_app):
+        """worker_exit stops the job queue and writes pending stock deltas"""
+        import importlib.util
+        import os
+        from app import get_airtable_client, get_job_queue, clear_client_pool
+        path = os.path.join(os.path.dirname(__file__), '..', '..', 'backend', 'gunicorn.conf.py')
+        spec = importlib.util.spec_from_file_location('gunicorn_conf', path)
+        conf = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(conf)
+        clear_client_pool()
+        client = get_airtable_client('OF')
+        queue = get_job_queue()
+        
+        conf.worker_exit(Mock(), Mock(pid=123))
+        clear_client_pool()
+        
+        client.stok_aggregator.stop.assert_called_once()
+        assert not queue.running
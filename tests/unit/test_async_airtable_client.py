@@ -0,0 +1,351 @@
+"""
+Unit Tests - AsyncAirtableClient (httpx.MockTransport ile sahte Airtable)
+"""
+
+import asyncio
+import base64
+import json
+import time
+import httpx
+import pytest
+from urllib.parse import unquote
+from rate_limiter import TokenBucket
+from async_airtable_client import AsyncAirtableClient, make_http_client, fan_out
+
+
+class FakeAirtable:
+    """Minimal Airtable REST API: list (with pagination), get, create, update, upload"""
+
+    def __init__(self, tables=None, page_size=2, latency=0.0):
+        self.tables = tables or {}
+        self.page_size = page_size
+        self.latency = latency
+        self.requests = []
+        self.throttle_next = 0
+        self.fail_method = None
+        self.uploads = []
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if self.throttle_next:
+            self.throttle_next -= 1
+            return httpx.Response(429, headers={'Retry-After': '0'}, json={'errors': [{'error': 'RATE_LIMIT'}]})
+
+        if request.method == self.fail_method:
+            return httpx.Response(503, json={'error': 'SERVICE_UNAVAILABLE'})
+
+        parts = request.url.path.split('/')
+        if parts[-1] == 'uploadAttachment':
+            self.uploads.append(json.loads(request.content))
+            return httpx.Response(200, json={'id': parts[3], 'fields': {'fldPhoto': [
+                {'id': 'att1', 'url': 'https://content.example/a.jpg'}
+            ]}})
+
+        base_id, table = parts[2], unquote(parts[3])
+        record_id = parts[4] if len(parts) > 4 else None
+        records = self.tables.setdefault((base_id, table), [])
+
+        if request.method == 'GET' and record_id:
+            for record in records:
+                if record['id'] == record_id:
+                    return httpx.Response(200, json=record)
+            return httpx.Response(404, json={'error': 'NOT_FOUND'})
+
+        if request.method == 'GET':
+            formula = request.url.params.get('filterByFormula', '')
+            matching = [r for r in records if all(v in formula for v in r.get('_match', []))]
+            max_records = int(request.url.params.get('maxRecords', 0)) or len(matching)
+            matching = matching[:max_records]
+            start = int(request.url.params.get('offset', 0))
+            page = matching[start:start + self.page_size]
+            body = {'records': page}
+            if start + self.page_size < len(matching):
+                body['offset'] = str(start + self.page_size)
+            return httpx.Response(200, json=body)
+
+        payload = json.loads(request.content)
+        if request.method == 'POST':
+            record = {'id': f"rec{len(records) + 1}", 'fields': payload['fields']}
+            records.append(record)
+            return httpx.Response(200, json=record)
+
+        if request.method == 'PATCH':
+            return httpx.Response(200, json={'id': record_id, 'fields': payload['fields']})
+
+        return httpx.Response(405)
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+@pytest.fixture(autouse=True)
+def fast_bucket(monkeypatch):
+    """Tests should not wait on the real 5 req/s budget"""
+    import async_airtable_client
+    monkeypatch.setattr(async_airtable_client, 'get_bucket',
+                        lambda base_id, state_dir=None: TokenBucket(rate=1000, burst=1000))
+
+
+def product(record_id, barkod):
+    return {'id': record_id, 'fields': {'Tedarikçi Barkodu': barkod}, '_match': [barkod]}
+
+
+class TestAsyncAirtableClient:
+    """Test async queries against a fake Airtable"""
+
+    def test_pagination(self):
+        """All pages are followed via offset"""
+        fake = FakeAirtable({('appTEST_OPTIK', 'Markalar'): [
+            {'id': f'recM{i}', 'fields': {'Marka Adı': f'Marka {i}'}} for i in range(5)
+        ]})
+
+        async def scenario():
+            async with make_http_client(httpx.MockTransport(fake)) as http:
+                client = AsyncAirtableClient('OF', http=http)
+                return await client.get_all_brands()
+
+        brands = run(scenario())
+
+        assert len(brands) == 5
+        assert len(fake.requests) == 3
+
+    def test_search_by_barcode(self):
+        fake = FakeAirtable({('appTEST_OPTIK', 'Urun_Katalogu'): [product('recABC123', '8056597412261')]})
+
+        async def scenario():
+            async with make_http_client(httpx.MockTransport(fake)) as http:
+                return await AsyncAirtableClient('OF', http=http).search_by_barcode('8056597412261')
+
+        results = run(scenario())
+
+        assert results[0]['id'] == 'recABC123'
+        assert fake.requests[0].headers['Authorization'] == 'Bearer test_token_123'
+
+    def test_search_by_barcodes_chunks_concurrently(self):
+        """Formula chunks are sent concurrently, not one after another"""
+        barkodlar = [f"869{i:010d}" for i in range(120)]
+        fake = FakeAirtable(
+            {('appTEST_OPTIK', 'Urun_Katalogu'): [product('recX', barkodlar[70])]},
+            latency=0.2
+        )
+
+        async def scenario():
+            async with make_http_client(httpx.MockTransport(fake)) as http:
+                return await AsyncAirtableClient('OF', http=http).search_by_barcodes(barkodlar)
+
+        started = time.time()
+        results = run(scenario())
+        elapsed = time.time() - started
+
+        assert len(fake.requests) == 3
+        assert elapsed < 0.5
+        assert results[barkodlar[70]][0]['id'] == 'recX'
+        assert results[barkodlar[0]] == []
+
+    def test_create_and_update_sayim_record(self):
+        fake = FakeAirtable()
+
+        async def scenario():
+            async with make_http_client(httpx.MockTransport(fake)) as http:
+                client = AsyncAirtableClient('OF', http=http)
+                created = await client.create_sayim_record({'Okutulan Barkod': '123'})
+                updated = await client.update_sayim_record(created['record_id'], {'Notlar': 'x'})
+                return created, updated
+
+        created, updated = run(scenario())
+
+        assert created['success'] is True
+        assert updated['data'] == {'Notlar': 'x'}
+        assert fake.requests[1].method == 'PATCH'
+
+    def test_retries_after_429(self):
+        """Rate-limit responses are retried"""
+        fake = FakeAirtable({('appTEST_OPTIK', 'Markalar'): [{'id': 'recM1', 'fields': {}}]})
+        fake.throttle_next = 1
+
+        async def scenario():
+            async with make_http_client(httpx.MockTransport(fake)) as http:
+                return await AsyncAirtableClient('OF', http=http).health_check()
+
+        assert run(scenario()) is True
+        assert len(fake.requests) == 2
+
+    def test_errors_return_defaults(self):
+        """HTTP errors follow the sync client's error contract"""
+        transport = httpx.MockTransport(lambda request: httpx.Response(500))
+
+        async def scenario():
+            async with make_http_client(transport) as http:
+                client = AsyncAirtableClient('OF', http=http)
+                return (
+                    await client.search_by_barcode('123'),
+                    await client.get_sku_details('recX'),
+                    await client.create_sayim_record({}),
+                    await client.health_check()
+                )
+
+        barcode, details, created, health = run(scenario())
+
+        assert barcode == []
+        assert details is None
+        assert created['success'] is False
+        assert health is False
+
+    def test_reads_are_projected(self):
+        """Only the needed fields are requested (no attachments)"""
+        fake = FakeAirtable({('appTEST_OPTIK', 'Sayim_Kayitlari'): [
+            {'id': 'recS1', 'fields': {'Eşleşme Durumu': 'Direkt'}},
+            {'id': 'recS2', 'fields': {'Eşleşme Durumu': 'Bulunamadı'}}
+        ]})
+
+        async def scenario():
+            async with make_http_client(httpx.MockTransport(fake)) as http:
+                client = AsyncAirtableClient('OF', http=http)
+                await client.search_by_barcode('8056597412261')
+                return await client.get_today_stats()
+
+        stats = run(scenario())
+
+        assert 'Tedarikçi Barkodu' in fake.requests[0].url.params.get_list('fields[]')
+        assert 'Fotograf' not in fake.requests[0].url.params.get_list('fields[]')
+        assert fake.requests[1].url.params.get_list('fields[]') == ['Eşleşme Durumu']
+        assert stats['total'] == 2
+        assert stats['direkt'] == 1
+        assert stats['bulunamadi'] == 1
+
+    def test_stats_use_shared_counters(self):
+        """Only the first call scans the day; writes and sync workers share the counters"""
+        import os
+        import airtable_client
+        from stats_aggregator import DailyStats
+        fake = FakeAirtable({('appTEST_OPTIK', 'Sayim_Kayitlari'): [
+            {'id': 'recS1', 'fields': {'Eşleşme Durumu': 'Direkt'}}
+        ]})
+
+        async def scenario():
+            async with make_http_client(httpx.MockTransport(fake)) as http:
+                client = AsyncAirtableClient('OF', http=http)
+                first = await client.get_today_stats()
+                await client.create_sayim_record({'Eşleşme Durumu': 'Bulunamadı'})
+                return first, await client.get_today_stats()
+
+        first, second = run(scenario())
+
+        scans = [r for r in fake.requests if r.method == 'GET' and 'Sayim_Kayitlari' in r.url.path]
+        assert len(scans) == 1
+        assert first['total'] == 1
+        assert second['total'] == 2
+        assert second['bulunamadi'] == 1
+        shared = DailyStats(os.path.join(airtable_client.DATA_DIR, 'stats', 'stats-OF-appTEST_OPTIK.sqlite3'))
+        assert shared.snapshot() == second
+
+    def test_missing_base_raises(self, monkeypatch):
+        monkeypatch.delenv('AIRTABLE_BASE_LENS')
+        with pytest.raises(ValueError):
+            AsyncAirtableClient('LN')
+
+
+class TestAsyncWrites:
+    """Test SKU creation, brand codes, photo upload and stock updates"""
+
+    def test_create_new_sku_uses_cached_brand_code(self):
+        fake = FakeAirtable({('appTEST_OPTIK', 'Markalar'): [
+            {'id': 'recRB', 'fields': {'Marka Adı': 'Ray-Ban', 'Marka Kodu': 'RB'}}
+        ]})
+        data = {'Kategori': 'OF', 'Marka': ['recRB'], 'Model_Kodu': 'RB2140', 'Renk_Kodu': '901', 'Ekartman': 50}
+
+        async def scenario():
+            async with make_http_client(httpx.MockTransport(fake)) as http:
+                client = AsyncAirtableClient('OF', http=http)
+                return [await client.create_new_sku(dict(data)) for _ in range(2)]
+
+        results = run(scenario())
+
+        assert [r['sku'] for r in results] == ['OF-RB-RB2140-901-50'] * 2
+        assert results[0]['data']['Durum'] == 'Aktif'
+        brand_requests = [r for r in fake.requests if 'Markalar' in r.url.path]
+        assert len(brand_requests) == 1
+
+    def test_brand_code_falls_back_to_record(self):
+        fake = FakeAirtable({('appTEST_OPTIK', 'Markalar'): [
+            {'id': 'recX', 'fields': {'Marka Kodu': 'XY'}}
+        ]})
+
+        async def scenario():
+            async with make_http_client(httpx.MockTransport(fake)) as http:
+                return await AsyncAirtableClient('OF', http=http).get_brand_code('recX')
+
+        assert run(scenario()) == 'XY'
+        assert fake.requests[-1].url.path.endswith('/Markalar/recX')
+
+    def test_upload_sayim_photo(self):
+        fake = FakeAirtable()
+
+        async def scenario():
+            async with make_http_client(httpx.MockTransport(fake)) as http:
+                client = AsyncAirtableClient('OF', http=http)
+                return await client.upload_sayim_photo('recS1', 'a.jpg', b'jpeg')
+
+        result = run(scenario())
+
+        assert result == {'success': True, 'url': 'https://content.example/a.jpg'}
+        assert fake.requests[0].url.path == '/v0/appTEST_OPTIK/recS1/Fotograf/uploadAttachment'
+        assert base64.b64decode(fake.uploads[0]['file']) == b'jpeg'
+        assert fake.uploads[0]['contentType'] == 'image/jpeg'
+
+    def test_update_stok_creates_then_bumps(self):
+        fake = FakeAirtable()
+
+        async def scenario():
+            async with make_http_client(httpx.MockTransport(fake)) as http:
+                client = AsyncAirtableClient('OF', http=http)
+                return [await client.update_stok_from_sayim('recSKU', 'Raf 1') for _ in range(2)]
+
+        assert run(scenario()) == [True, True]
+        created = json.loads(fake.requests[-2].content)['fields']
+        updated = json.loads(fake.requests[-1].content)['fields']
+        assert created['Mevcut_Miktar'] == 1
+        assert fake.requests[-1].method == 'PATCH'
+        assert updated['Mevcut_Miktar'] == 2
+        assert updated['Son_Sayim_Miktari'] == 2
+
+    def test_failed_stok_update_reverts_counters(self):
+        fake = FakeAirtable({('appTEST_OPTIK', 'Stok_Kalemleri'): [
+            {'id': 'recST', 'fields': {'SKU': ['recSKU'], 'Mevcut_Miktar': 5}}
+        ]})
+        fake.fail_method = 'PATCH'
+
+        async def scenario():
+            async with make_http_client(httpx.MockTransport(fake)) as http:
+                client = AsyncAirtableClient('OF', http=http)
+                ok = await client.update_stok_from_sayim('recSKU')
+                return ok, client.stok_tracker
+
+        ok, tracker = run(scenario())
+
+        assert ok is False
+        assert tracker.count('recSKU') == 0
+        assert tracker.stok_record('recSKU') == ('recST', 5)
+
+
+class TestFanOut:
+    """Test cross-base fan-out"""
+
+    def test_fan_out_runs_bases_concurrently(self):
+        fake = FakeAirtable(latency=0.2)
+
+        async def scenario():
+            async with make_http_client(httpx.MockTransport(fake)) as http:
+                return await fan_out(lambda c: c.health_check(), http=http)
+
+        started = time.time()
+        results = run(scenario())
+        elapsed = time.time() - started
+
+        assert results == {'OF': True, 'GN': True, 'LN': True}
+        assert elapsed < 0.5
+        bases = {request.url.path.split('/')[2] for request in fake.requests}
+        assert bases == {'appTEST_OPTIK', 'appTEST_GUNES', 'appTEST_LENS'}
@@ -0,0 +1,65 @@
+"""
+Unit Tests - PeriodicTask
+"""
+
+import threading
+from background import PeriodicTask
+
+
+class TestPeriodicTask:
+    """Test periodic background execution"""
+
+    def test_runs_until_stopped(self):
+        """Task runs repeatedly and stops cleanly"""
+        ran = threading.Event()
+        calls = []
+
+        def func():
+            calls.append(1)
+            if len(calls) >= 2:
+                ran.set()
+
+        task = PeriodicTask('test-task', 0.01, func)
+        task.start()
+        assert ran.wait(2)
+        task.stop(timeout=2)
+
+        assert task.running is False
+        assert len(calls) >= 2
+
+    def test_errors_do_not_stop_loop(self):
+        """Exceptions are logged and the loop keeps going"""
+        ran = threading.Event()
+        calls = []
+
+        def func():
+            calls.append(1)
+            if len(calls) == 1:
+                raise RuntimeError("boom")
+            ran.set()
+
+        task = PeriodicTask('test-task-errors', 0.01, func)
+        task.start()
+        assert ran.wait(2)
+        task.stop(timeout=2)
+
+    def test_concurrent_start_spawns_one_thread(self):
+        """start() racing from many request threads starts a single loop"""
+        task = PeriodicTask('test-task-race', 60, lambda: None)
+        barrier = threading.Barrier(8)
+
+        def start():
+            barrier.wait()
+            task.start()
+
+        threads = [threading.Thread(target=start) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        try:
+            names = [t.name for t in threading.enumerate() if t.name == 'test-task-race']
+            assert names == ['test-task-race']
+        finally:
+            task.stop(timeout=2)
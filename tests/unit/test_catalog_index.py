@@ -0,0 +1,141 @@
+"""
+Unit Tests - CatalogIndex
+"""
+
+import pytest
+from catalog_index import CatalogIndex, normalize_barcode
+
+
+def make_record(record_id, barkod, **fields):
+    """Build a minimal Urun_Katalogu record"""
+    fields['Tedarikçi Barkodu'] = barkod
+    return {'id': record_id, 'fields': fields}
+
+
+class TestNormalizeBarcode:
+    """Test barcode key normalization"""
+
+    def test_numeric_float_barcode(self):
+        """Numeric barcode fields should map to the same key as text"""
+        assert normalize_barcode(8056597412261.0) == '8056597412261'
+
+    def test_whitespace_and_none(self):
+        """Whitespace is stripped, None becomes empty"""
+        assert normalize_barcode(' 8056597412261 ') == '8056597412261'
+        assert normalize_barcode(None) == ''
+
+
+class TestCatalogIndex:
+    """Test barcode lookups on the in-memory index"""
+
+    def test_load_and_get(self):
+        """Test loading records and exact lookup"""
+        index = CatalogIndex()
+        index.load([
+            make_record('rec1', '8056597412261'),
+            make_record('rec2', '8056597412262'),
+        ])
+
+        assert index.loaded is True
+        assert len(index) == 2
+        assert [r['id'] for r in index.get('8056597412261')] == ['rec1']
+        assert index.get('999') == []
+
+    def test_duplicate_barcodes_keep_order(self):
+        """Records sharing a barcode are returned in load order"""
+        index = CatalogIndex()
+        index.load([
+            make_record('rec1', '8056597412261'),
+            make_record('rec2', '8056597412261'),
+        ])
+
+        assert [r['id'] for r in index.get('8056597412261')] == ['rec1', 'rec2']
+
+    def test_upsert_moves_barcode(self):
+        """Updating a record's barcode re-indexes it"""
+        index = CatalogIndex()
+        index.load([make_record('rec1', '111')])
+
+        index.upsert(make_record('rec1', '222'))
+
+        assert index.get('111') == []
+        assert [r['id'] for r in index.get('222')] == ['rec1']
+        assert len(index) == 1
+
+    def test_remove(self):
+        """Removed records are no longer returned"""
+        index = CatalogIndex()
+        index.load([make_record('rec1', '111'), make_record('rec2', '111')])
+
+        index.remove('rec1')
+        index.remove('recMISSING')
+
+        assert [r['id'] for r in index.get('111')] == ['rec2']
+
+    def test_records_without_barcode(self):
+        """Records without a barcode are stored but not barcode-indexed"""
+        index = CatalogIndex()
+        index.load([{'id': 'rec1', 'fields': {'SKU': 'OF-X'}}])
+
+        assert len(index) == 1
+        assert index.get('') == []
+
+
+class TestBrandStore:
+    """Test the brand records kept next to the catalogue"""
+
+    def test_brand_upsert_and_remove(self):
+        """Brands can be loaded, updated and removed"""
+        index = CatalogIndex()
+        index.load_brands([{'id': 'recM1', 'fields': {'Marka Adı': 'Ray-Ban'}}])
+
+        index.upsert_brand({'id': 'recM2', 'fields': {'Marka Adı': 'Vogue'}})
+        index.remove_brand('recM1')
+
+        assert index.get_brand('recM1') is None
+        assert index.get_brand('recM2')['fields']['Marka Adı'] == 'Vogue'
+        assert index.brand_ids() == {'recM2'}
+
+
+class TestPrefixSearch:
+    """Test prefix and near-prefix lookups through the catalogue index"""
+
+    def test_search_prefix_and_near(self):
+        """Prefix search is exact; near search tolerates mistyped digits"""
+        index = CatalogIndex()
+        index.load([
+            make_record('rec1', '8056597412261'),
+            make_record('rec2', '8056597412262'),
+            make_record('rec3', '8056597512261'),
+        ])
+
+        assert [r['id'] for r in index.search_prefix('8056597412')] == ['rec1', 'rec2']
+        near = [r['id'] for r in index.search_near('8056597412', max_distance=1)]
+        assert near[:2] == ['rec1', 'rec2']
+        assert 'rec3' in near
+
+    def test_prefix_tracks_upserts(self):
+        """New and removed barcodes are reflected in prefix search"""
+        index = CatalogIndex()
+        index.load([make_record('rec1', '8056597412261')])
+
+        index.upsert(make_record('rec2', '8056597412999'))
+        index.remove('rec1')
+
+        assert [r['id'] for r in index.search_prefix('8056597412')] == ['rec2']
+
+
+class TestTextSearch:
+    """Test manual search through the catalogue index"""
+
+    def test_search_text_follows_upserts(self, sample_product_record):
+        index = CatalogIndex()
+        index.load([sample_product_record])
+
+        assert index.search_text('wayfa')[0]['id'] == 'recABC123'
+
+        index.upsert({'id': 'recNEW', 'fields': {'SKU': 'OF-RB-3025-001-58', 'Model Kodu': '3025'}})
+        assert index.search_text('3025')[0]['id'] == 'recNEW'
+
+        index.remove('recABC123')
+        assert index.search_text('wayfa') == []
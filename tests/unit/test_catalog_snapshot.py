@@ -0,0 +1,147 @@
+"""
+Unit Tests - Catalogue snapshot file
+"""
+
+import threading
+import pytest
+from catalog_snapshot import (
+    SnapshotError, encode_records, decode_records, read_snapshot, write_snapshot, snapshot_path,
+    read_watermark, write_watermark
+)
+
+
+def make_snapshot(products=None, brands=None):
+    return {
+        'category': 'OF',
+        'base_id': 'appTEST_OPTIK',
+        'fields': ['SKU', 'Tedarikçi Barkodu'],
+        'brand_fields': ['Marka Adı'],
+        'watermark': 1700000000.0,
+        'last_reconcile': 1699990000.0,
+        'saved_at': 1700000001.0,
+        'products': products if products is not None else [
+            {'id': 'recA', 'fields': {'SKU': 'OF-RB-2140-901-50', 'Tedarikçi Barkodu': '8056597412261'}},
+            {'id': 'recB', 'fields': {'SKU': 'OF-RB-3025-001-58', 'Marka': ['recMARKA1']}}
+        ],
+        'brands': brands if brands is not None else [{'id': 'recMARKA1', 'fields': {'Marka Adı': 'Ray-Ban'}}]
+    }
+
+
+class TestColumnarEncoding:
+    """Test the column-wise record layout"""
+
+    def test_round_trip_keeps_missing_fields_missing(self):
+        """Fields absent from a record are not recreated as None"""
+        records = make_snapshot()['products']
+
+        encoded = encode_records(records)
+
+        assert encoded['ids'] == ['recA', 'recB']
+        assert encoded['columns']['Marka'] == [None, ['recMARKA1']]
+        assert decode_records(encoded) == records
+
+    def test_empty(self):
+        assert decode_records(encode_records([])) == []
+
+
+class TestSnapshotFile:
+    """Test writing and validating snapshot files"""
+
+    def test_write_and_read(self, tmp_path):
+        path = snapshot_path(str(tmp_path), 'OF', 'appTEST_OPTIK')
+        snapshot = make_snapshot()
+
+        size = write_snapshot(path, snapshot)
+        loaded = read_snapshot(path)
+
+        assert size > 0
+        assert loaded['products'] == snapshot['products']
+        assert loaded['brands'] == snapshot['brands']
+        assert loaded['watermark'] == snapshot['watermark']
+        assert loaded['fields'] == snapshot['fields']
+        assert not list(tmp_path.glob('*.tmp'))
+
+    def test_concurrent_writes_in_one_process(self, tmp_path):
+        """Startup load and the sync thread may write the same snapshot at once"""
+        path = snapshot_path(str(tmp_path), 'OF', 'appTEST_OPTIK')
+        errors = []
+
+        def writer(n):
+            try:
+                for i in range(20):
+                    write_snapshot(path, make_snapshot())
+                    write_watermark(path, 1700000001.0, 1700000000.0 + n * 100 + i, None)
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=writer, args=(n,)) for n in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert errors == []
+        assert read_snapshot(path)['products'] == make_snapshot()['products']
+        assert read_watermark(path, 1700000001.0) is not None
+        assert not list(tmp_path.glob('*.tmp'))
+
+    def test_missing_file_returns_none(self, tmp_path):
+        assert read_snapshot(str(tmp_path / 'yok.snap')) is None
+
+    def test_corrupted_payload_is_rejected(self, tmp_path):
+        """A flipped byte fails the checksum"""
+        path = str(tmp_path / 'catalog.snap')
+        write_snapshot(path, make_snapshot())
+        raw = bytearray(open(path, 'rb').read())
+        raw[-1] ^= 0xFF
+        open(path, 'wb').write(bytes(raw))
+
+        with pytest.raises(SnapshotError, match='Sağlama'):
+            read_snapshot(path)
+
+    def test_truncated_file_is_rejected(self, tmp_path):
+        path = str(tmp_path / 'catalog.snap')
+        write_snapshot(path, make_snapshot())
+        raw = open(path, 'rb').read()
+        open(path, 'wb').write(raw[:len(raw) // 2])
+
+        with pytest.raises(SnapshotError):
+            read_snapshot(path)
+
+    def test_unknown_version_is_rejected(self, tmp_path):
+        import catalog_snapshot
+        path = str(tmp_path / 'catalog.snap')
+        write_snapshot(path, make_snapshot())
+        raw = bytearray(open(path, 'rb').read())
+        raw[len(catalog_snapshot.MAGIC) + 1] = 99
+        open(path, 'wb').write(bytes(raw))
+
+        with pytest.raises(SnapshotError, match='sürüm'):
+            read_snapshot(path)
+
+    def test_foreign_file_is_rejected(self, tmp_path):
+        path = str(tmp_path / 'catalog.snap')
+        open(path, 'wb').write(b'{"records": []}' * 10)
+
+        with pytest.raises(SnapshotError):
+            read_snapshot(path)
+
+
+class TestWatermarkFile:
+    """Test the side file that advances the watermark without rewriting the snapshot"""
+
+    def test_round_trip(self, tmp_path):
+        path = str(tmp_path / 'catalog.snap')
+
+        write_watermark(path, 1700000001.0, 1800000000.0, 1700000500.0)
+
+        marker = read_watermark(path, 1700000001.0)
+        assert marker['watermark'] == 1800000000.0
+        assert marker['last_reconcile'] == 1700000500.0
+
+    def test_other_snapshot_version_is_ignored(self, tmp_path):
+        path = str(tmp_path / 'catalog.snap')
+        write_watermark(path, 1700000001.0, 1800000000.0, None)
+
+        assert read_watermark(path, 1700000002.0) is None
+        assert read_watermark(str(tmp_path / 'missing.snap'), 1700000001.0) is None
@@ -0,0 +1,143 @@
+"""
+Unit Tests - BKTree / FuzzyCodeIndex
+"""
+
+import Levenshtein
+import fuzzy_index
+from fuzzy_index import BKTree, FuzzyCodeIndex, compact, default_max_distance
+
+
+def product(record_id, sku, model_kodu='', marka='recMARKA1', kategori='OF', **extra):
+    fields = {
+        'SKU': sku,
+        'Model Kodu': model_kodu,
+        'Marka': [marka],
+        'Kategori': kategori
+    }
+    fields.update(extra)
+    return {'id': record_id, 'fields': fields}
+
+
+class TestBKTree:
+    """Test bounded edit-distance queries"""
+
+    def test_matches_brute_force(self):
+        words = ['2140', '2132', '3025', '2141', '21400', '5228', 'rb2140', 'rb3025', 'ox8156', 'ox8165']
+        tree = BKTree(words)
+
+        for query in ['2140', 'rb214o', 'ox8516', '9999']:
+            for max_distance in (1, 2):
+                expected = sorted(
+                    (w, Levenshtein.distance(query, w)) for w in words
+                    if Levenshtein.distance(query, w) <= max_distance
+                )
+                assert sorted(tree.search(query, max_distance)) == expected
+
+    def test_results_sorted_by_distance(self):
+        tree = BKTree(['2140', '2141', '2100'])
+
+        assert tree.search('2140', 2) == [('2140', 0), ('2100', 1), ('2141', 1)]
+
+    def test_duplicates_ignored(self):
+        tree = BKTree(['2140', '2140', '2141'])
+
+        assert len(tree) == 2
+
+    def test_visit_budget_bounds_work(self):
+        calls = []
+
+        def distance(a, b):
+            calls.append((a, b))
+            return Levenshtein.distance(a, b)
+
+        tree = BKTree([f"{i:05d}" for i in range(500)], distance=distance)
+        calls.clear()
+        tree.search('00000', 5, max_visits=10)
+
+        assert len(calls) == 10
+
+    def test_empty_tree(self):
+        assert BKTree().search('2140', 2) == []
+
+
+class TestCompact:
+    """Test key normalisation"""
+
+    def test_strips_separators_and_folds(self):
+        assert compact('OF-RB 2140') == 'ofrb2140'
+        assert compact('GÜNEŞ.01') == 'gunes01'
+        assert compact(None) == ''
+
+    def test_default_max_distance(self):
+        assert default_max_distance('rb2') == 0
+        assert default_max_distance('rb214o') == 1
+        assert default_max_distance('rb2140901') == 2
+
+
+class TestFuzzyCodeIndex:
+    """Test typo-tolerant product code search"""
+
+    def test_typo_in_model_code(self):
+        index = FuzzyCodeIndex([
+            product('rec1', 'OF-RB-2140-901-50', '2140', **{'Marka Kodu': ['RB']}),
+            product('rec2', 'OF-RB-3025-001-58', '3025', **{'Marka Kodu': ['RB']})
+        ])
+
+        results = index.search('RB214O')
+
+        assert [(r['id'], d) for r, d in results] == [('rec1', 1)]
+
+    def test_brand_code_taken_from_sku(self):
+        index = FuzzyCodeIndex([product('rec1', 'OF-RB-2140-901-50', '2140')])
+
+        assert index.search('rb-2l40')[0][1] == 1
+
+    def test_ranked_by_distance_then_sku(self):
+        index = FuzzyCodeIndex([
+            product('rec1', 'OF-OX-8156-01-50', '8156'),
+            product('rec2', 'OF-OX-8165-01-50', '8165'),
+            product('rec3', 'OF-OX-8157-01-50', '8157'),
+            product('rec4', 'OF-OX-8157-02-52', '8157')
+        ])
+
+        results = index.search('OX8157')
+
+        assert [(r['id'], d) for r, d in results] == [('rec3', 0), ('rec4', 0), ('rec1', 1)]
+
+    def test_short_query_returns_nothing(self):
+        index = FuzzyCodeIndex([product('rec1', 'OF-RB-214-901-50', '214')])
+
+        assert index.search('215') == []
+
+    def test_filters(self):
+        index = FuzzyCodeIndex([
+            product('rec1', 'OF-RB-2140-901-50', '2140'),
+            product('rec2', 'GN-RB-2140-901-50', '2140', kategori='GN'),
+            product('rec3', 'OF-VO-2140-901-50', '2140', marka='recMARKA2')
+        ])
+
+        assert [r['id'] for r, _ in index.search('2141', category='GN')] == ['rec2']
+        assert [r['id'] for r, _ in index.search('2141', brand='recMARKA2')] == ['rec3']
+
+    def test_update_and_remove(self):
+        index = FuzzyCodeIndex([product('rec1', 'OF-RB-2140-901-50', '2140')])
+
+        index.add(product('rec1', 'OF-RB-3025-901-50', '3025'))
+        assert index.search('2141') == []
+        assert index.search('3026')[0][0]['id'] == 'rec1'
+
+        index.remove('rec1')
+        assert index.search('3026') == []
+        assert len(index) == 0
+
+    def test_rebuild_drops_orphan_keys(self, monkeypatch):
+        monkeypatch.setattr(fuzzy_index, 'REBUILD_RATIO', 0.0)
+        index = FuzzyCodeIndex([
+            product('rec1', 'OF-RB-2140-901-50', '2140'),
+            product('rec2', 'OF-RB-3025-901-50', '3025')
+        ])
+
+        index.remove('rec1')
+
+        assert len(index._tree) == len(index._owners)
+        assert index.search('3026')[0][0]['id'] == 'rec2'
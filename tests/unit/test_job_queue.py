@@ -0,0 +1,174 @@
+"""
+Unit Tests - Persistent background job queue
+"""
+
+import time
+import pytest
+from job_queue import JobQueue, PermanentJobError, backoff_delay
+
+
+@pytest.fixture
+def queue(tmp_path):
+    """Queue without worker threads; tests drive it with run_next()"""
+    q = JobQueue(str(tmp_path / 'jobs.sqlite3'), workers=1, max_attempts=3,
+                 backoff_base=0.0, backoff_max=0.0)
+    yield q
+    q.stop(timeout=5)
+
+
+class TestJobQueue:
+    """Test enqueue, retry and failure handling"""
+
+    def test_runs_job_and_deletes_it(self, queue):
+        seen = []
+        queue.register('echo', seen.append)
+
+        job_id = queue.enqueue('echo', {'sku_id': 'recSKU1'})
+
+        assert queue.run_next() is True
+        assert seen == [{'sku_id': 'recSKU1'}]
+        assert queue.get_job(job_id) is None
+        assert queue.run_next() is False
+        assert queue.snapshot()['succeeded'] == 1
+
+    def test_retries_until_success(self, queue):
+        calls = []
+
+        def flaky(payload):
+            calls.append(payload)
+            if len(calls) < 3:
+                raise RuntimeError("429")
+
+        queue.register('flaky', flaky)
+        job_id = queue.enqueue('flaky', {})
+
+        queue.run_next()
+        assert queue.get_job(job_id)['status'] == 'queued'
+        assert queue.get_job(job_id)['last_error'] == '429'
+        queue.run_next()
+        queue.run_next()
+
+        assert len(calls) == 3
+        assert queue.get_job(job_id) is None
+        assert queue.snapshot()['retried'] == 2
+
+    def test_marks_failed_after_max_attempts(self, queue):
+        failures = []
+
+        def broken(payload):
+            raise RuntimeError("boom")
+
+        queue.register('broken', broken, on_failure=lambda payload, error: failures.append(error))
+        job_id = queue.enqueue('broken', {'path': '/tmp/x'})
+
+        while queue.run_next():
+            pass
+
+        job = queue.get_job(job_id)
+        assert job['status'] == 'failed'
+        assert job['attempts'] == 3
+        assert failures == ['boom']
+        assert queue.snapshot()['failed'] == 1
+
+    def test_permanent_error_is_not_retried(self, queue):
+        calls = []
+
+        def reject(payload):
+            calls.append(payload)
+            raise PermanentJobError("bozuk dosya")
+
+        queue.register('reject', reject)
+        job_id = queue.enqueue('reject', {})
+        queue.run_next()
+
+        assert len(calls) == 1
+        assert queue.get_job(job_id)['status'] == 'failed'
+
+    def test_delayed_job_waits(self, queue):
+        queue.register('echo', lambda payload: None)
+        queue.enqueue('echo', {}, delay=60)
+
+        assert queue.run_next() is False
+        snapshot = queue.snapshot()
+        assert snapshot['depth'] == 1
+        assert snapshot['ready'] == 0
+        assert snapshot['lag_seconds'] == 0.0
+
+    def test_jobs_survive_restart(self, tmp_path):
+        """Queued jobs are picked up by a new queue on the same file"""
+        path = str(tmp_path / 'jobs.sqlite3')
+        JobQueue(path).enqueue('echo', {'n': 1})
+
+        seen = []
+        queue = JobQueue(path)
+        queue.register('echo', seen.append)
+
+        assert queue.run_next() is True
+        assert seen == [{'n': 1}]
+
+    def test_expired_lease_is_reclaimed(self, tmp_path):
+        """A job left 'running' by a crashed worker is retried after its lease"""
+        path = str(tmp_path / 'jobs.sqlite3')
+        crashed = JobQueue(path)
+        crashed.enqueue('echo', {})
+        crashed._claim()
+
+        seen = []
+        queue = JobQueue(path, lease_seconds=0.0)
+        queue.register('echo', seen.append)
+
+        assert queue.run_next() is True
+        assert seen == [{}]
+
+    def test_unique_enqueue_coalesces(self, queue):
+        seen = []
+        queue.register('echo', seen.append)
+
+        first = queue.enqueue('echo', {'category': 'OF'}, unique=True)
+        assert queue.enqueue('echo', {'category': 'OF'}, unique=True) == first
+        assert queue.enqueue('echo', {'category': 'GN'}, unique=True) != first
+
+        while queue.run_next():
+            pass
+        assert seen == [{'category': 'OF'}, {'category': 'GN'}]
+        assert queue.enqueue('echo', {'category': 'OF'}, unique=True) != first
+
+    def test_unique_enqueue_ignores_running_job(self, queue):
+        """A running job may have read its input already, so a new one is queued"""
+        ids = []
+        queue.register('flush', lambda payload: ids.append(queue.enqueue('flush', payload, unique=True)))
+
+        first = queue.enqueue('flush', {'category': 'OF'}, unique=True)
+        queue.run_next()
+
+        assert ids[0] != first
+        assert queue.get_job(ids[0])['status'] == 'queued'
+
+    def test_lag_reports_oldest_ready_job(self, queue):
+        queue.enqueue('echo', {})
+        time.sleep(0.05)
+
+        snapshot = queue.snapshot()
+        assert snapshot['depth'] == 1
+        assert snapshot['ready'] == 1
+        assert snapshot['lag_seconds'] >= 0.05
+
+    def test_workers_drain_queue(self, queue):
+        seen = []
+        queue.register('echo', seen.append)
+        queue.start()
+
+        for i in range(20):
+            queue.enqueue('echo', {'n': i})
+
+        assert queue.wait_idle(timeout=5)
+        assert sorted(p['n'] for p in seen) == list(range(20))
+
+
+class TestBackoffDelay:
+    """Test exponential backoff with jitter"""
+
+    def test_grows_and_caps(self):
+        assert 0.5 <= backoff_delay(1, base=1, maximum=300) <= 1
+        assert 4 <= backoff_delay(4, base=1, maximum=300) <= 8
+        assert backoff_delay(20, base=1, maximum=300) <= 300
@@ -5,6 +5,7 @@ Unit Tests - BarcodeMatcher
 import pytest
 from unittest.mock import Mock, MagicMock
 from matcher import BarcodeMatcher
+from catalog_index import CatalogIndex
 
 
 class TestMatcherInit:
@@ -18,6 +19,133 @@ class TestMatcherInit:
         assert matcher.client == mock_client
 
 
+class TestMatcherLifecycle:
+    """Test warm-up and invalidation hooks"""
+    
+    def test_warm_loads_catalog_index(self, sample_product_record):
+        """warm() should load the client's catalogue index"""
+        index = CatalogIndex()
+        index.load([sample_product_record])
+        mock_client = Mock()
+        mock_client.get_catalog_index.return_value = index
+        
+        matcher = BarcodeMatcher(mock_client)
+        
+        assert matcher.warm() is True
+        assert matcher.warmed is True
+        mock_client.get_catalog_index.assert_called_once()
+    
+    def test_warm_without_index(self):
+        """Without an index the matcher still works against Airtable"""
+        mock_client = Mock()
+        mock_client.get_catalog_index.return_value = None
+        
+        matcher = BarcodeMatcher(mock_client)
+        
+        assert matcher.warm() is False
+    
+    def test_invalidate(self, sample_product_record):
+        """invalidate() should drop warm state"""
+        index = CatalogIndex()
+        index.load([sample_product_record])
+        mock_client = Mock()
+        mock_client.get_catalog_index.return_value = index
+        
+        matcher = BarcodeMatcher(mock_client)
+        matcher.warm()
+        matcher.invalidate()
+        
+        assert matcher.warmed is False
+
+
+class TestMatchCache:
+    """Test LRU/TTL caching of match results"""
+    
+    def test_repeat_scan_served_from_cache(self, sample_product_record):
+        """Rescanning the same barcode should not query again"""
+        mock_client = Mock()
+        mock_client.get_catalog_index.return_value = None
+        mock_client.search_by_barcode.return_value = [sample_product_record]
+        
+        matcher = BarcodeMatcher(mock_client)
+        first = matcher.match('8056597412261')
+        first['product']['sku'] = 'changed'
+        second = matcher.match('8056597412261')
+        
+        assert second['product']['sku'] == 'OF-RB-2140-901-50'
+        mock_client.search_by_barcode.assert_called_once()
+        assert matcher.cache_stats()['hits'] == 1
+    
+    def test_context_is_part_of_key(self, sample_product_record):
+        """Different brand/category context should not share a result"""
+        mock_client = Mock()
+        mock_client.get_catalog_index.return_value = None
+        mock_client.search_by_barcode.return_value = [sample_product_record]
+        
+        matcher = BarcodeMatcher(mock_client)
+        matcher.match('8056597412261')
+        matcher.match('8056597412261', context_brand='recMARKA2')
+        
+        assert mock_client.search_by_barcode.call_count == 2
+    
+    def test_negative_results_use_short_ttl(self, monkeypatch):
+        """'bulunamadi' results are cached with MATCH_CACHE_NEGATIVE_TTL"""
+        monkeypatch.setenv('MATCH_CACHE_NEGATIVE_TTL', '0')
+        mock_client = Mock()
+        mock_client.get_catalog_index.return_value = None
+        mock_client.search_by_barcode.return_value = []
+        mock_client.fuzzy_search_barcode.return_value = []
+        
+        matcher = BarcodeMatcher(mock_client)
+        matcher.match('999999999999')
+        matcher.match('999999999999')
+        
+        assert mock_client.search_by_barcode.call_count == 2
+    
+    def test_index_change_invalidates(self, sample_product_record):
+        """A new SKU in the catalogue index makes cached misses stale"""
+        index = CatalogIndex()
+        index.load([])
+        mock_client = Mock()
+        mock_client.get_catalog_index.return_value = index
+        mock_client.fuzzy_search_barcode.return_value = []
+        
+        matcher = BarcodeMatcher(mock_client)
+        assert matcher.match('8056597412261')['status'] == 'bulunamadi'
+        
+        index.upsert(sample_product_record)
+        
+        assert matcher.match('8056597412261')['status'] == 'direkt'
+    
+    def test_invalidate_clears_cache(self, sample_product_record):
+        """invalidate() should empty the cache"""
+        mock_client = Mock()
+        mock_client.get_catalog_index.return_value = None
+        mock_client.search_by_barcode.return_value = [sample_product_record]
+        
+        matcher = BarcodeMatcher(mock_client)
+        matcher.match('8056597412261')
+        matcher.invalidate()
+        matcher.match('8056597412261')
+        
+        assert mock_client.search_by_barcode.call_count == 2
+    
+    def test_match_many_uses_cache(self, sample_product_record):
+        """Batch matching only looks up barcodes missing from the cache"""
+        mock_client = Mock()
+        mock_client.get_catalog_index.return_value = None
+        mock_client.search_by_barcode.return_value = [sample_product_record]
+        mock_client.search_by_barcodes.return_value = {}
+        mock_client.fuzzy_search_barcode.return_value = []
+        
+        matcher = BarcodeMatcher(mock_client)
+        matcher.match('8056597412261')
+        results = matcher.match_many(['8056597412261', '111', '111'])
+        
+        assert results[0]['status'] == 'direkt'
+        mock_client.search_by_barcodes.assert_called_once_with(['111'])
+
+
 class TestDirectMatch:
     """Test direct barcode matching"""
     
@@ -312,3 +440,89 @@ class TestCandidatesOrdering:
             # First candidate should have highest score
             assert result['candidates'][0]['sku_id'] == 'rec1'
 
+
+
+class TestCatalogIndexLookup:
+    """Test that the matcher serves exact matches from the local index"""
+    
+    def test_match_uses_loaded_index(self, sample_product_record):
+        """Indexed barcodes should not hit Airtable"""
+        from catalog_index import CatalogIndex
+        index = CatalogIndex()
+        index.load([sample_product_record])
+        
+        mock_client = Mock()
+        mock_client.get_catalog_index.return_value = index
+        
+        matcher = BarcodeMatcher(mock_client)
+        result = matcher.match('8056597412261')
+        
+        assert result['status'] == 'direkt'
+        assert result['sku_id'] == 'recABC123'
+        mock_client.search_by_barcode.assert_not_called()
+    
+    def test_match_falls_back_without_index(self, sample_product_record):
+        """Without a loaded index the Airtable search is used"""
+        mock_client = Mock()
+        mock_client.get_catalog_index.return_value = None
+        mock_client.search_by_barcode.return_value = [sample_product_record]
+        
+        matcher = BarcodeMatcher(mock_client)
+        result = matcher.match('8056597412261')
+        
+        assert result['status'] == 'direkt'
+        mock_client.search_by_barcode.assert_called_once_with('8056597412261')
+    
+    def test_fuzzy_match_uses_loaded_index(self, sample_product_record):
+        """Fuzzy candidates come from the local prefix index, including typos"""
+        from catalog_index import CatalogIndex
+        index = CatalogIndex()
+        index.load([sample_product_record])
+        
+        mock_client = Mock()
+        mock_client.get_catalog_index.return_value = index
+        
+        matcher = BarcodeMatcher(mock_client)
+        # 8. hane hatalı okunmuş
+        result = matcher.match('8056597312261')
+        
+        assert result['status'] == 'direkt'
+        assert result['confidence'] == 90
+        assert result['sku_id'] == 'recABC123'
+        mock_client.fuzzy_search_barcode.assert_not_called()
+
+
+class TestMatchMany:
+    """Test batch matching"""
+    
+    def test_match_many_combines_lookups(self, sample_product_record):
+        """Exact lookups for the batch go through one client call"""
+        mock_client = Mock()
+        mock_client.get_catalog_index.return_value = None
+        mock_client.search_by_barcodes.return_value = {
+            '8056597412261': [sample_product_record],
+            '999999999999': []
+        }
+        mock_client.fuzzy_search_barcode.return_value = []
+        
+        matcher = BarcodeMatcher(mock_client)
+        results = matcher.match_many(['999999999999', '8056597412261', '999999999999'])
+        
+        assert [r['status'] for r in results] == ['bulunamadi', 'direkt', 'bulunamadi']
+        mock_client.search_by_barcodes.assert_called_once()
+        mock_client.search_by_barcode.assert_not_called()
+    
+    def test_match_many_with_index(self, sample_product_record):
+        """With a loaded index the batch is resolved in process"""
+        from catalog_index import CatalogIndex
+        index = CatalogIndex()
+        index.load([sample_product_record])
+        
+        mock_client = Mock()
+        mock_client.get_catalog_index.return_value = index
+        
+        matcher = BarcodeMatcher(mock_client)
+        results = matcher.match_many(['8056597412261'], context_brand='recMARKA1')
+        
+        assert results[0]['status'] == 'direkt'
+        mock_client.search_by_barcodes.assert_not_called()
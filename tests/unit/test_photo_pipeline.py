@@ -0,0 +1,120 @@
+"""
+Unit Tests - Photo pipeline (spooling, downscaling, local store)
+"""
+
+import io
+import os
+import pytest
+from photo_pipeline import (
+    PhotoPipeline, LocalPhotoStore, PhotoError, spool_upload, prepare_photo, AIRTABLE_ATTACHMENT_LIMIT
+)
+
+
+def jpeg_bytes(width=4000, height=3000):
+    """Large test JPEG"""
+    Image = pytest.importorskip('PIL.Image')
+    output = io.BytesIO()
+    Image.new('RGB', (width, height), (200, 30, 30)).save(output, 'JPEG')
+    return output.getvalue()
+
+
+class TestSpoolUpload:
+    """Test streaming uploads to a temp file"""
+
+    def test_spools_to_disk(self, tmp_path):
+        data = os.urandom(300 * 1024)
+
+        path = spool_upload(io.BytesIO(data), str(tmp_path))
+
+        assert open(path, 'rb').read() == data
+
+    def test_rejects_oversized_stream(self, tmp_path):
+        """Stops reading past the limit and leaves no temp file"""
+        with pytest.raises(PhotoError) as exc:
+            spool_upload(io.BytesIO(b'x' * 2048), str(tmp_path), max_bytes=1024)
+
+        assert exc.value.status == 413
+        assert os.listdir(tmp_path) == []
+
+    def test_rejects_empty_stream(self, tmp_path):
+        with pytest.raises(PhotoError):
+            spool_upload(io.BytesIO(b''), str(tmp_path))
+        assert os.listdir(tmp_path) == []
+
+
+class TestPreparePhoto:
+    """Test downscaling and re-encoding"""
+
+    def test_downscales_large_photo(self, tmp_path):
+        Image = pytest.importorskip('PIL.Image')
+        path = tmp_path / 'IMG_0001.png'
+        Image.new('RGB', (4000, 3000), (10, 120, 200)).save(path)
+
+        result = prepare_photo(str(path), 'IMG_0001.png', max_dimension=1600)
+
+        assert result['filename'] == 'IMG_0001.jpg'
+        assert result['content_type'] == 'image/jpeg'
+        assert result['original_size'] == os.path.getsize(path)
+        assert Image.open(io.BytesIO(result['content'])).size == (1600, 1200)
+
+    def test_unreadable_small_file_passes_through(self, tmp_path):
+        """Formats Pillow cannot decode (e.g. HEIC) are sent as they are"""
+        path = tmp_path / 'photo.heic'
+        path.write_bytes(b'not really an image')
+
+        result = prepare_photo(str(path), 'photo.heic')
+
+        assert result['content'] == b'not really an image'
+        assert result['filename'] == 'photo.heic'
+
+    def test_unreadable_large_file_rejected(self, tmp_path):
+        path = tmp_path / 'photo.heic'
+        path.write_bytes(b'\0' * (AIRTABLE_ATTACHMENT_LIMIT + 1))
+
+        with pytest.raises(PhotoError) as exc:
+            prepare_photo(str(path), 'photo.heic')
+        assert exc.value.status == 413
+
+
+class TestPhotoPipeline:
+    """Test the worker pool"""
+
+    def test_process_removes_spool_and_counts_bytes(self, tmp_path):
+        data = jpeg_bytes()
+        path = spool_upload(io.BytesIO(data), str(tmp_path))
+        pipeline = PhotoPipeline(workers=1)
+
+        result = pipeline.process(path, 'photo.jpg', timeout=30)
+        stats = pipeline.snapshot()
+        pipeline.shutdown()
+
+        assert not os.path.exists(path)
+        assert stats['processed'] == 1
+        assert stats['in_flight'] == 0
+        assert stats['bytes_in'] == len(data)
+        assert stats['bytes_out'] == len(result['content']) < len(data)
+
+    def test_failures_are_counted(self, tmp_path):
+        path = tmp_path / 'photo.heic'
+        path.write_bytes(b'\0' * (AIRTABLE_ATTACHMENT_LIMIT + 1))
+        pipeline = PhotoPipeline(workers=1)
+
+        with pytest.raises(PhotoError):
+            pipeline.process(str(path), 'photo.heic', timeout=30)
+        pipeline.shutdown()
+
+        assert pipeline.snapshot()['failed'] == 1
+        assert not path.exists()
+
+
+class TestLocalPhotoStore:
+    """Test the on-disk store"""
+
+    def test_put_writes_file(self, tmp_path):
+        store = LocalPhotoStore(str(tmp_path))
+
+        result = store.put('OF', 'recSAYIM1', 'photo.jpg', b'jpeg')
+
+        assert result['success'] is True
+        assert result['url'] == f"/api/photos/OF/{result['filename']}"
+        assert (tmp_path / 'OF' / result['filename']).read_bytes() == b'jpeg'
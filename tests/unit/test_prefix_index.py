@@ -0,0 +1,79 @@
+"""
+Unit Tests - BarcodePrefixIndex
+"""
+
+import pytest
+from prefix_index import BarcodePrefixIndex
+
+
+class TestPrefixLookup:
+    """Test exact prefix lookups"""
+
+    def test_prefix(self):
+        """Only barcodes starting with the prefix are returned, sorted"""
+        index = BarcodePrefixIndex(['8056597412261', '8056597412262', '8056597499999', '123'])
+
+        assert index.prefix('8056597412') == ['8056597412261', '8056597412262']
+        assert index.prefix('9') == []
+        assert len(index.prefix('')) == 4
+
+    def test_add_and_discard(self):
+        """Barcodes can be added and removed incrementally"""
+        index = BarcodePrefixIndex(['111'])
+        index.add('112')
+        index.add('112')
+        index.discard('111')
+        index.discard('999')
+
+        assert index.prefix('11') == ['112']
+        assert len(index) == 1
+
+
+class TestWithinDistance:
+    """Test edit-distance prefix lookups"""
+
+    def test_single_substitution(self):
+        """A single mistyped digit is found at distance 1"""
+        index = BarcodePrefixIndex(['8056597412261', '8056597412262', '1234567890123'])
+
+        results = dict(index.within_distance('8056597413', 1))
+
+        assert results == {'8056597412261': 1, '8056597412262': 1}
+
+    def test_exact_prefix_is_distance_zero(self):
+        """Exact prefix matches come back with distance 0"""
+        index = BarcodePrefixIndex(['8056597412261'])
+
+        assert index.within_distance('8056597412', 2) == [('8056597412261', 0)]
+
+    def test_transposition_needs_two_edits(self):
+        """Swapped adjacent digits are caught with max_distance=2"""
+        index = BarcodePrefixIndex(['8056597412261'])
+
+        assert index.within_distance('8056594712', 1) == []
+        assert index.within_distance('8056594712', 2) == [('8056597412261', 2)]
+
+    def test_missing_digit(self):
+        """A dropped digit is matched through an insertion"""
+        index = BarcodePrefixIndex(['8056597412261'])
+
+        assert dict(index.within_distance('805659741', 1))['8056597412261'] == 0
+        assert dict(index.within_distance('80565974122', 1))['8056597412261'] <= 1
+
+    def test_matches_brute_force(self):
+        """Results agree with a brute-force Levenshtein scan"""
+        import random
+        import Levenshtein
+
+        rng = random.Random(7)
+        keys = [''.join(rng.choice('0129') for _ in range(rng.randint(4, 12))) for _ in range(300)]
+        index = BarcodePrefixIndex(keys)
+
+        for _ in range(20):
+            query = ''.join(rng.choice('0129') for _ in range(6))
+            expected = {}
+            for key in set(keys):
+                d = min(Levenshtein.distance(query, key[:n]) for n in range(len(key) + 1))
+                if d <= 2:
+                    expected[key] = d
+            assert dict(index.within_distance(query, 2)) == expected
@@ -0,0 +1,233 @@
+"""
+Unit Tests - Rate Limiter
+"""
+
+import io
+import multiprocessing
+import threading
+import time
+import pytest
+import requests
+from unittest.mock import Mock, patch
+from requests.adapters import HTTPAdapter
+from rate_limiter import TokenBucket, RateLimitedAdapter, get_bucket, install_rate_limiter
+
+
+def _take_tokens(state_path, count, out):
+    bucket = TokenBucket(rate=5, burst=5, state_path=state_path)
+    for _ in range(count):
+        bucket.acquire()
+    out.put(time.time())
+
+
+def _hold_state_lock(bucket, held, release):
+    with bucket._shared_state():
+        held.set()
+        release.wait(5)
+
+
+class TestTokenBucket:
+    """Test token bucket behaviour"""
+
+    def test_burst_without_waiting(self):
+        """Up to `burst` tokens are available immediately"""
+        bucket = TokenBucket(rate=5, burst=5)
+
+        waited = sum(bucket.acquire() for _ in range(5))
+
+        assert waited == 0
+        assert bucket.stats['acquired'] == 5
+        assert bucket.stats['waited'] == 0
+
+    def test_waits_after_burst(self):
+        """Requests beyond the burst are spaced at `rate`"""
+        bucket = TokenBucket(rate=20, burst=2)
+
+        started = time.time()
+        for _ in range(6):
+            bucket.acquire()
+        elapsed = time.time() - started
+
+        # 4 tokens beyond the burst at 20/s
+        assert elapsed >= 0.18
+        assert bucket.stats['waited'] >= 1
+        assert bucket.snapshot()['wait_seconds'] > 0
+
+    def test_threads_share_budget(self):
+        """Threads draw from one budget instead of each getting their own"""
+        bucket = TokenBucket(rate=20, burst=1)
+
+        def worker():
+            for _ in range(3):
+                bucket.acquire()
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        started = time.time()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # 12 acquisitions, 1 free: >= 11 / 20 s
+        assert time.time() - started >= 0.5
+        assert bucket.stats['acquired'] == 12
+
+    def test_acquire_async_waits_without_blocking(self):
+        """The asyncio variant shares the same budget"""
+        import asyncio
+        bucket = TokenBucket(rate=20, burst=1)
+
+        async def scenario():
+            started = time.time()
+            await asyncio.gather(*(bucket.acquire_async() for _ in range(3)))
+            return time.time() - started
+
+        assert asyncio.run(scenario()) >= 0.09
+        assert bucket.stats['acquired'] == 3
+
+    def test_acquire_async_waits_for_file_lock_off_loop(self, tmp_path):
+        """Another worker holding the state file lock does not stall the event loop"""
+        import asyncio
+        import os
+        from file_lock import locked
+        state_path = str(tmp_path / 'appTEST.bucket')
+        bucket = TokenBucket(rate=100, burst=10, state_path=state_path)
+        fd = os.open(state_path, os.O_RDWR)
+        ticks = []
+
+        def hold_lock(held):
+            with locked(fd):
+                held.set()
+                time.sleep(0.3)
+
+        async def ticker():
+            for _ in range(5):
+                ticks.append(time.time())
+                await asyncio.sleep(0.02)
+
+        async def scenario():
+            held = threading.Event()
+            holder = threading.Thread(target=hold_lock, args=(held,))
+            holder.start()
+            held.wait()
+            await asyncio.gather(bucket.acquire_async(), ticker())
+            holder.join()
+
+        started = time.time()
+        asyncio.run(scenario())
+        os.close(fd)
+
+        assert len(ticks) == 5
+        assert ticks[-1] - started < 0.25
+        assert bucket.stats['acquired'] == 1
+
+    def test_penalize_blocks(self):
+        """A 429 empties the bucket for the given time"""
+        bucket = TokenBucket(rate=100, burst=10)
+        bucket.penalize(0.2)
+
+        started = time.time()
+        bucket.acquire()
+
+        assert time.time() - started >= 0.15
+        assert bucket.stats['throttled'] == 1
+
+    def test_shared_state_across_processes(self, tmp_path):
+        """Two processes using the same state file share one budget"""
+        state_path = str(tmp_path / 'appTEST.bucket')
+        out = multiprocessing.get_context('fork').Queue()
+        started = time.time()
+        procs = [
+            multiprocessing.get_context('fork').Process(target=_take_tokens, args=(state_path, 5, out))
+            for _ in range(2)
+        ]
+        for proc in procs:
+            proc.start()
+        for proc in procs:
+            proc.join(10)
+
+        finished = max(out.get(timeout=5) for _ in procs)
+        # 10 tokens, 5 burst: the second five need ~1 s
+        assert finished - started >= 0.8
+
+
+    def test_forked_worker_reopens_state_file(self, tmp_path):
+        """A bucket created before fork (preload_app) still excludes sibling workers"""
+        from file_lock import try_lock, unlock
+        bucket = TokenBucket(rate=5, burst=5, state_path=str(tmp_path / 'appTEST.bucket'))
+        bucket.acquire()
+        ctx = multiprocessing.get_context('fork')
+        held, release = ctx.Event(), ctx.Event()
+        child = ctx.Process(target=_hold_state_lock, args=(bucket, held, release))
+        child.start()
+
+        try:
+            assert held.wait(5)
+            locked_by_parent = try_lock(bucket._state_fd())
+            if locked_by_parent:
+                unlock(bucket._state_fd())
+        finally:
+            release.set()
+            child.join(5)
+
+        assert locked_by_parent is False
+
+
+class TestRegistry:
+    """Test per-base bucket registry"""
+
+    def test_same_base_same_bucket(self):
+        assert get_bucket('appREGISTRY1') is get_bucket('appREGISTRY1')
+        assert get_bucket('appREGISTRY1') is not get_bucket('appREGISTRY2')
+
+    def test_install_mounts_adapter(self):
+        api = Mock()
+
+        bucket = install_rate_limiter(api, 'appREGISTRY3')
+
+        adapter = api.session.mount.call_args.args[1]
+        assert isinstance(adapter, RateLimitedAdapter)
+        assert adapter.bucket is bucket
+
+
+class TestRateLimitedAdapter:
+    """Test HTTP-level limiting and 429 handling"""
+
+    def _response(self, status, headers=None):
+        response = requests.Response()
+        response.status_code = status
+        response.raw = io.BytesIO(b'')
+        response.headers.update(headers or {})
+        return response
+
+    def test_retries_429_with_retry_after(self):
+        """429 responses are retried after Retry-After and counted"""
+        bucket = TokenBucket(rate=100, burst=10)
+        adapter = RateLimitedAdapter(bucket)
+        responses = [self._response(429, {'Retry-After': '0.1'}), self._response(200)]
+
+        with patch.object(HTTPAdapter, 'send', side_effect=responses) as send:
+            response = adapter.send(Mock())
+
+        assert response.status_code == 200
+        assert send.call_count == 2
+        assert bucket.stats['throttled'] == 1
+        assert bucket.stats['acquired'] == 2
+
+    def test_gives_up_after_max_retries(self):
+        """Persistent 429s are returned to the caller"""
+        bucket = TokenBucket(rate=1000, burst=10)
+        adapter = RateLimitedAdapter(bucket, max_throttle_retries=2)
+        responses = [self._response(429, {'Retry-After': '0'}) for _ in range(3)]
+
+        with patch.object(HTTPAdapter, 'send', side_effect=responses) as send:
+            response = adapter.send(Mock())
+
+        assert response.status_code == 429
+        assert send.call_count == 3
+
+    def test_urllib3_leaves_429_to_adapter(self):
+        """urllib3 must not retry (and raise on) a 429 that carries Retry-After"""
+        adapter = RateLimitedAdapter(TokenBucket(rate=100, burst=10))
+
+        assert adapter.max_retries.is_retry('GET', 429, has_retry_after=True) is False
@@ -0,0 +1,86 @@
+"""
+Unit Tests - TTLCache
+"""
+
+import result_cache
+from result_cache import TTLCache, MISS
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestTTLCache:
+    """Test bounded LRU cache with per-entry TTL"""
+
+    def test_get_and_miss(self):
+        cache = TTLCache(maxsize=4, ttl=60)
+        cache.set('a', 1)
+
+        assert cache.get('a') == 1
+        assert cache.get('b') is MISS
+        assert cache.get('b', None) is None
+
+    def test_none_is_a_valid_value(self):
+        cache = TTLCache()
+        cache.set('a', None)
+
+        assert cache.get('a') is None
+
+    def test_lru_eviction(self):
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+
+        assert cache.get('b') is MISS
+        assert cache.get('a') == 1
+        assert cache.get('c') == 3
+        assert cache.snapshot()['evictions'] == 1
+
+    def test_ttl_expiry(self, monkeypatch):
+        clock = FakeClock()
+        monkeypatch.setattr(result_cache.time, 'monotonic', clock)
+        cache = TTLCache(maxsize=4, ttl=60)
+        cache.set('long', 1)
+        cache.set('short', 2, ttl=5)
+
+        clock.now += 10
+
+        assert cache.get('short') is MISS
+        assert cache.get('long') == 1
+        assert cache.snapshot()['expired'] == 1
+
+    def test_zero_ttl_disables(self):
+        cache = TTLCache(maxsize=4, ttl=0)
+        cache.set('a', 1)
+        cache.set('b', 2, ttl=0)
+
+        assert len(cache) == 0
+
+    def test_snapshot(self):
+        cache = TTLCache(maxsize=4, ttl=60)
+        cache.set('a', 1)
+        cache.get('a')
+        cache.get('a')
+        cache.get('b')
+
+        stats = cache.snapshot()
+
+        assert stats['size'] == 1
+        assert stats['maxsize'] == 4
+        assert stats['hits'] == 2
+        assert stats['misses'] == 1
+        assert stats['hit_rate'] == 0.667
+
+    def test_clear(self):
+        cache = TTLCache()
+        cache.set('a', 1)
+        cache.clear()
+
+        assert cache.get('a') is MISS
@@ -0,0 +1,162 @@
+"""
+Unit Tests - SayimStore (local SQLite count records + replication)
+"""
+
+import pytest
+from unittest.mock import Mock
+from sayim_store import SayimStore
+from write_buffer import is_local_id, BATCH_SIZE
+from stok_tracker import today_str
+
+
+def make_table():
+    """Mock Sayim_Kayitlari table that assigns sequential record IDs"""
+    table = Mock()
+    counter = {'n': 0}
+
+    def batch_create(records):
+        created = []
+        for fields in records:
+            counter['n'] += 1
+            created.append({'id': f"rec{counter['n']}", 'fields': fields})
+        return created
+
+    table.batch_create.side_effect = batch_create
+    return table
+
+
+def make_store(tmp_path, table=None, **kwargs):
+    kwargs.setdefault('min_batch_interval', 0)
+    return SayimStore(table or make_table(), str(tmp_path / 'sayim.sqlite3'), **kwargs)
+
+
+class TestSayimStore:
+    """Test local writes and batched replication"""
+
+    def test_add_returns_local_id(self, tmp_path):
+        store = make_store(tmp_path)
+
+        local_id = store.add({'Okutulan Barkod': '123'})
+
+        assert is_local_id(local_id)
+        assert store.status(local_id) == 'pending'
+        assert store.resolve(local_id) is None
+        assert store.pending_count == 1
+
+    def test_add_with_known_id_is_idempotent(self, tmp_path):
+        table = make_table()
+        store = make_store(tmp_path, table)
+
+        store.add({'Okutulan Barkod': '123'}, local_id='lrecA')
+        store.flush()
+        store.add({'Okutulan Barkod': '123'}, local_id='lrecA')
+
+        assert store.flush() == 0
+        assert store.resolve('lrecA') == 'rec1'
+        assert table.batch_create.call_count == 1
+
+    def test_flush_groups_by_ten(self, tmp_path):
+        table = make_table()
+        store = make_store(tmp_path, table)
+        ids = [store.add({'Okutulan Barkod': str(i)}) for i in range(BATCH_SIZE + 3)]
+
+        written = store.flush()
+
+        assert written == 13
+        assert table.batch_create.call_count == 2
+        assert len(table.batch_create.call_args_list[0].args[0]) == 10
+        assert store.resolve(ids[0]) == 'rec1'
+        assert store.status(ids[-1]) == 'committed'
+        assert store.pending_count == 0
+
+    def test_records_survive_restart(self, tmp_path):
+        """Unsent records are replicated by the next process"""
+        table = make_table()
+        local_id = make_store(tmp_path, table).add({'Okutulan Barkod': '1'})
+
+        restarted = make_store(tmp_path, table)
+
+        assert restarted.status(local_id) == 'pending'
+        restarted.flush()
+        assert restarted.resolve(local_id) == 'rec1'
+
+    def test_stores_on_one_file_never_send_twice(self, tmp_path):
+        """A batch claimed by one worker is skipped by the other"""
+        table = make_table()
+        first = make_store(tmp_path, table)
+        second = make_store(tmp_path, table)
+        first.add({'Okutulan Barkod': '1'})
+
+        claimed = first._claim_batch()
+
+        assert len(claimed) == 1
+        assert second.flush() == 0
+        table.batch_create.assert_not_called()
+
+    def test_transient_error_keeps_records(self, tmp_path):
+        table = Mock()
+        table.batch_create.side_effect = Exception("Connection reset")
+        store = make_store(tmp_path, table)
+        local_id = store.add({'Okutulan Barkod': '1'})
+
+        with pytest.raises(Exception):
+            store.flush()
+
+        assert store.status(local_id) == 'pending'
+        table.batch_create.side_effect = make_table().batch_create.side_effect
+        assert store.flush() == 1
+
+    def test_permanent_error_isolates_bad_record(self, tmp_path):
+        error = Exception("INVALID_VALUE_FOR_COLUMN")
+        error.response = Mock(status_code=422)
+
+        table = Mock()
+        table.batch_create.side_effect = error
+        table.create.side_effect = lambda fields: (
+            (_ for _ in ()).throw(error) if fields['Okutulan Barkod'] == 'bad'
+            else {'id': 'recOK', 'fields': fields}
+        )
+        store = make_store(tmp_path, table)
+        good = store.add({'Okutulan Barkod': 'good'})
+        bad = store.add({'Okutulan Barkod': 'bad'})
+
+        store.flush()
+
+        assert store.resolve(good) == 'recOK'
+        assert store.status(bad) == 'failed'
+        assert store.snapshot()['failed'] == 1
+
+    def test_wait_for_with_background_thread(self, tmp_path):
+        store = make_store(tmp_path, flush_interval=30)
+        store.start()
+        try:
+            local_id = store.add({'Okutulan Barkod': '1'})
+            assert store.wait_for(local_id, timeout=5) == 'rec1'
+        finally:
+            store.stop(timeout=5)
+
+    def test_reads_include_unsent_records(self, tmp_path):
+        """Stats and recent scans are served locally, before replication"""
+        store = make_store(tmp_path)
+        store.add({'Okutulan Barkod': '1', 'Eşleşme Durumu': 'Direkt'})
+        store.add({'Okutulan Barkod': '2', 'Eşleşme Durumu': 'Belirsiz'})
+
+        records = store.day_records(today_str())
+        recent = store.recent(limit=1)
+
+        assert sorted(r['fields']['Eşleşme Durumu'] for r in records) == ['Belirsiz', 'Direkt']
+        assert len(recent) == 1
+        assert recent[0]['fields']['Okutulan Barkod'] == '2'
+        assert recent[0]['status'] == 'pending'
+
+    def test_prune_keeps_recent_and_pending(self, tmp_path):
+        store = make_store(tmp_path, retention_days=7)
+        old = store.add({'Okutulan Barkod': 'old'})
+        pending = store.add({'Okutulan Barkod': 'pending'})
+        store.flush()
+        store._connect().execute("UPDATE sayim SET day = '2000-01-01'")
+        store._connect().execute("UPDATE sayim SET status = 'pending' WHERE local_id = ?", (pending,))
+
+        assert store.prune() == 1
+        assert store.status(old) == 'unknown'
+        assert store.status(pending) == 'pending'
@@ -0,0 +1,44 @@
+"""
+Unit Tests - Batch similarity scoring
+"""
+
+import random
+import pytest
+from fuzzywuzzy import fuzz
+from scoring import batch_ratio, VECTOR_MIN_BATCH
+
+
+def random_codes(rng, count, width, alphabet='0123456789'):
+    return [''.join(rng.choice(alphabet) for _ in range(width)) for _ in range(count)]
+
+
+class TestBatchRatio:
+    """batch_ratio must return exactly what fuzz.ratio returns"""
+
+    @pytest.mark.parametrize('width', [1, 7, 10, 13, 62])
+    def test_vectorized_matches_fuzz_ratio(self, width):
+        """Fixed-width numeric codes go through the NumPy kernel"""
+        rng = random.Random(width)
+        query = random_codes(rng, 1, width)[0]
+        candidates = random_codes(rng, VECTOR_MIN_BATCH * 4, width) + [query]
+
+        assert batch_ratio(query, candidates) == [fuzz.ratio(query, c) for c in candidates]
+
+    def test_mixed_lengths_and_non_ascii(self):
+        """Codes that don't fit the kernel fall back to fuzz.ratio"""
+        rng = random.Random(1)
+        query = '8056597412'
+        candidates = random_codes(rng, VECTOR_MIN_BATCH, 10)
+        candidates += ['805659741', '80565974122', 'ÇÇÇÇÇÇÇÇÇÇ', 'ABCDEFGHIJ', '']
+
+        assert batch_ratio(query, candidates) == [fuzz.ratio(query, c) for c in candidates]
+
+    def test_small_batch(self):
+        """Small batches use the plain loop and keep order"""
+        candidates = ['8056597412', '8056597413', '1234567890']
+
+        assert batch_ratio('8056597412', candidates) == [100, 90, fuzz.ratio('8056597412', '1234567890')]
+
+    def test_empty_candidates(self):
+        """No candidates yields no scores"""
+        assert batch_ratio('8056597412', []) == []
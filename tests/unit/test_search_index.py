@@ -0,0 +1,111 @@
+"""
+Unit Tests - SearchIndex
+"""
+
+from search_index import SearchIndex, fold
+
+
+def product(record_id, sku, model_kodu='', model_adi='', marka='recMARKA1', kategori='OF', **extra):
+    fields = {
+        'SKU': sku,
+        'Model Kodu': model_kodu,
+        'Model Adı': model_adi,
+        'Marka': [marka],
+        'Kategori': kategori
+    }
+    fields.update(extra)
+    return {'id': record_id, 'fields': fields}
+
+
+class TestFold:
+    """Test Turkish-aware case folding"""
+
+    def test_dotted_and_dotless_i(self):
+        assert fold('İSTANBUL') == 'istanbul'
+        assert fold('IŞIK') == fold('ışık') == 'isik'
+
+    def test_accents(self):
+        assert fold('GÜNEŞ Gözlüğü') == 'gunes gozlugu'
+
+    def test_numbers_and_lists(self):
+        assert fold(8056597412261.0) == '8056597412261'
+        assert fold(['Ray', 'Ban']) == 'ray ban'
+        assert fold(None) == ''
+
+
+class TestSearchIndex:
+    """Test n-gram substring search"""
+
+    def test_substring_match(self):
+        index = SearchIndex([
+            product('rec1', 'OF-RB-2140-901-50', '2140', 'Wayfarer'),
+            product('rec2', 'OF-RB-3025-001-58', '3025', 'Aviator')
+        ])
+
+        assert [r['id'] for r in index.search('ayfar')] == ['rec1']
+        assert [r['id'] for r in index.search('3025')] == ['rec2']
+        assert index.search('xyz') == []
+
+    def test_turkish_case_insensitive(self):
+        index = SearchIndex([product('rec1', 'OF-XX-1-1-50', model_adi='Işıltı')])
+
+        assert index.search('IŞIL')[0]['id'] == 'rec1'
+        assert index.search('isilti')[0]['id'] == 'rec1'
+        assert index.search('ışıltı')[0]['id'] == 'rec1'
+
+    def test_short_query(self):
+        """Two-character queries fall back to scanning distinct values"""
+        index = SearchIndex([product('rec1', 'OF-RB-1-1-50', '21')])
+
+        assert index.search('21')[0]['id'] == 'rec1'
+
+    def test_ranking_exact_before_substring(self):
+        """Exact field matches rank above prefix and substring matches"""
+        index = SearchIndex([
+            product('rec1', 'OF-RB-12140-1-50', '12140'),
+            product('rec2', 'OF-RB-21400-1-50', '21400'),
+            product('rec3', 'OF-RB-2140-1-50', '2140')
+        ])
+
+        assert [r['id'] for r in index.search('2140')] == ['rec3', 'rec2', 'rec1']
+
+    def test_brand_and_category_filters(self):
+        index = SearchIndex([
+            product('rec1', 'OF-RB-2140-1-50', '2140', marka='recRB'),
+            product('rec2', 'GN-RB-2140-1-50', '2140', marka='recRB', kategori='GN'),
+            product('rec3', 'OF-PR-2140-1-50', '2140', marka='recPR')
+        ])
+
+        assert [r['id'] for r in index.search('2140', brand='recRB')] == ['rec2', 'rec1']
+        assert [r['id'] for r in index.search('2140', category='OF')] == ['rec3', 'rec1']
+
+    def test_limit(self):
+        index = SearchIndex([product(f'rec{i}', f'OF-RB-{i:03d}-1-50', model_adi='Wayfarer') for i in range(50)])
+
+        results = index.search('wayfarer')
+
+        assert len(results) == 20
+        assert results[0]['id'] == 'rec0'
+
+    def test_update_and_remove(self):
+        """Updated records are re-indexed, removed ones disappear"""
+        index = SearchIndex([product('rec1', 'OF-RB-2140-1-50', '2140')])
+
+        index.add(product('rec1', 'OF-RB-3025-1-50', '3025'))
+        assert index.search('2140') == []
+        assert index.search('3025')[0]['id'] == 'rec1'
+
+        index.remove('rec1')
+        assert index.search('3025') == []
+        assert len(index) == 0
+
+    def test_rebuild_after_many_removals(self):
+        """Tombstones are compacted and search stays correct"""
+        index = SearchIndex([product(f'rec{i}', f'OF-RB-{i}-1-50', str(1000 + i)) for i in range(40)])
+
+        for i in range(30):
+            index.remove(f'rec{i}')
+
+        assert index._tombstones < 0.25 * len(index._values) + 1
+        assert [r['id'] for r in index.search('1035')] == ['rec35']
+        assert len(index.search('of-rb')) == 10
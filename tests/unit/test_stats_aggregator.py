@@ -0,0 +1,115 @@
+"""
+Unit Tests - DailyStats
+"""
+
+import pytest
+from stats_aggregator import DailyStats, empty_stats
+
+
+def sayim(status, field='Eşleşme Durumu'):
+    return {'id': 'rec', 'fields': {field: status}}
+
+
+class TestDailyStats:
+    """Test daily status counters"""
+
+    def test_empty(self):
+        stats = DailyStats()
+
+        assert stats.snapshot() == empty_stats()
+        assert stats.needs_reconcile('2025-10-30') is True
+
+    def test_record_counts_statuses(self):
+        stats = DailyStats()
+        for status in ['Direkt', 'Direkt', 'Belirsiz', 'Bulunamadı', 'Manuel']:
+            stats.record(status, day='2025-10-30')
+
+        assert stats.snapshot() == {
+            'total': 5, 'direkt': 2, 'belirsiz': 1, 'bulunamadi': 1, 'direkt_oran': 40.0
+        }
+
+    def test_reconcile_replaces_counts(self):
+        stats = DailyStats()
+        stats.record('Direkt', day='2025-10-30')
+
+        fetched = stats.reconcile('2025-10-30', lambda: [sayim('Belirsiz'), sayim('Direkt', 'Eslesme_Durumu')])
+
+        assert fetched == 2
+        assert stats.snapshot()['total'] == 2
+        assert stats.snapshot()['belirsiz'] == 1
+        assert stats.snapshot()['direkt'] == 1
+        assert stats.needs_reconcile('2025-10-30') is False
+
+    def test_writes_during_reconcile_are_kept(self):
+        stats = DailyStats()
+
+        def fetch():
+            # Çekim sürerken başka bir thread kayıt yazıyor
+            stats.record('Direkt', day='2025-10-30')
+            return [sayim('Direkt')]
+
+        stats.reconcile('2025-10-30', fetch)
+
+        assert stats.snapshot()['direkt'] == 2
+
+    def test_day_rollover_resets(self):
+        stats = DailyStats()
+        stats.reconcile('2025-10-30', lambda: [sayim('Direkt')])
+
+        stats.record('Belirsiz', day='2025-10-31')
+
+        assert stats.snapshot()['total'] == 1
+        assert stats.snapshot()['direkt'] == 0
+        assert stats.needs_reconcile('2025-10-31') is True
+
+    def test_stale_reconcile_discarded(self):
+        stats = DailyStats()
+
+        def fetch():
+            stats.record('Belirsiz', day='2025-10-31')
+            return [sayim('Direkt'), sayim('Direkt')]
+
+        stats.reconcile('2025-10-30', fetch)
+
+        assert stats.snapshot()['total'] == 1
+        assert stats.snapshot()['belirsiz'] == 1
+
+    def test_fetch_error_keeps_counts(self):
+        stats = DailyStats()
+        stats.record('Direkt', day='2025-10-30')
+
+        def fetch():
+            raise RuntimeError("API Error")
+
+        with pytest.raises(RuntimeError):
+            stats.reconcile('2025-10-30', fetch)
+        stats.record('Direkt', day='2025-10-30')
+
+        assert stats.snapshot()['direkt'] == 2
+
+
+class TestSharedDailyStats:
+    """Test counters shared between workers through one SQLite file"""
+
+    def test_workers_share_counts(self, tmp_path):
+        path = str(tmp_path / 'stats.sqlite3')
+        first, second = DailyStats(path), DailyStats(path)
+
+        first.record('Direkt', day='2025-10-30')
+        second.record('Belirsiz', day='2025-10-30')
+
+        assert first.snapshot()['total'] == 2
+        assert second.snapshot()['direkt'] == 1
+
+    def test_other_worker_writes_during_reconcile_are_kept(self, tmp_path):
+        path = str(tmp_path / 'stats.sqlite3')
+        first, second = DailyStats(path), DailyStats(path)
+
+        def fetch():
+            second.record('Direkt', day='2025-10-30')
+            return [sayim('Direkt')]
+
+        first.reconcile('2025-10-30', fetch)
+
+        assert second.snapshot()['direkt'] == 2
+        assert second.needs_reconcile('2025-10-30') is False
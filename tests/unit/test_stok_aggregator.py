@@ -0,0 +1,256 @@
+"""
+Unit Tests - StokUpdateAggregator
+"""
+
+import threading
+import pytest
+from unittest.mock import Mock, patch
+from stok_tracker import StokTracker
+from stok_aggregator import StokUpdateAggregator
+from job_queue import PermanentJobError
+
+
+def make_tracker(stok_records=()):
+    tracker = StokTracker()
+    tracker.seed('2026-01-01', [], list(stok_records))
+    return tracker
+
+
+def stok(record_id, sku_id, mevcut):
+    return {'id': record_id, 'fields': {'SKU': [sku_id], 'Mevcut_Miktar': mevcut}}
+
+
+class TestStokUpdateAggregator:
+    """Test coalescing of stock deltas"""
+
+    def test_coalesces_same_sku(self):
+        """Many scans of one SKU become one write with the summed delta"""
+        table = Mock()
+        tracker = make_tracker([stok('recSTOK1', 'recA', 10)])
+        aggregator = StokUpdateAggregator(table, tracker, window=60)
+        for _ in range(30):
+            tracker.increment('recA')
+            aggregator.add('recA')
+
+        assert aggregator.flush() == 1
+
+        table.batch_update.assert_called_once()
+        record = table.batch_update.call_args.args[0][0]
+        assert record['id'] == 'recSTOK1'
+        assert record['fields']['Mevcut_Miktar'] == 40
+        assert record['fields']['Son_Sayim_Miktari'] == 30
+        aggregator.stop(timeout=5)
+
+    def test_batches_of_ten(self):
+        """Updates for many SKUs are split into groups of 10"""
+        table = Mock()
+        tracker = make_tracker([stok(f'recSTOK{i}', f'rec{i}', 0) for i in range(25)])
+        aggregator = StokUpdateAggregator(table, tracker, window=60)
+        for i in range(25):
+            aggregator.add(f'rec{i}')
+
+        aggregator.flush()
+
+        sizes = [len(call.args[0]) for call in table.batch_update.call_args_list]
+        assert sizes == [10, 10, 5]
+        aggregator.stop(timeout=5)
+
+    def test_creates_missing_stok(self):
+        """Unknown SKUs are created with batch_create and remembered"""
+        table = Mock()
+        table.batch_create.return_value = [{'id': 'recNEW', 'fields': {}}]
+        tracker = make_tracker()
+        aggregator = StokUpdateAggregator(table, tracker, window=60)
+        aggregator.add('recA', konum='Vitrin')
+        aggregator.add('recA')
+
+        aggregator.flush()
+
+        fields = table.batch_create.call_args.args[0][0]
+        assert fields['Mevcut_Miktar'] == 2
+        assert fields['Konum'] == 'Vitrin'
+        assert tracker.stok_record('recA') == ('recNEW', 2)
+        aggregator.stop(timeout=5)
+
+    def test_failed_write_is_requeued(self):
+        """Transient errors keep the delta for the next flush"""
+        table = Mock()
+        table.batch_update.side_effect = [Exception("Connection reset"), None]
+        tracker = make_tracker([stok('recSTOK1', 'recA', 10)])
+        aggregator = StokUpdateAggregator(table, tracker, window=60)
+        aggregator.add('recA', delta=3)
+
+        with pytest.raises(RuntimeError):
+            aggregator.flush()
+        assert tracker.stok_record('recA') == ('recSTOK1', 10)
+        aggregator.add('recA')
+        assert aggregator.flush() == 1
+
+        assert table.batch_update.call_args.args[0][0]['fields']['Mevcut_Miktar'] == 14
+        aggregator.stop(timeout=5)
+
+    def test_permanent_error_drops_delta(self):
+        """4xx errors are not retried forever"""
+        error = Exception("INVALID_VALUE_FOR_COLUMN")
+        error.response = Mock(status_code=422)
+        table = Mock()
+        table.batch_update.side_effect = error
+        tracker = make_tracker([stok('recSTOK1', 'recA', 10)])
+        aggregator = StokUpdateAggregator(table, tracker, window=60)
+        tracker.increment('recA')
+        aggregator.add('recA')
+
+        with pytest.raises(PermanentJobError):
+            aggregator.flush()
+
+        assert aggregator.pending_count == 0
+        assert aggregator.stats['dropped'] == 1
+        assert tracker.count('recA') == 0
+        assert tracker.stok_record('recA') == ('recSTOK1', 10)
+        aggregator._task.stop(timeout=5)
+
+    def test_rejected_delta_waits_for_transient_retry(self):
+        """A flush that will be retried keeps rejected deltas too; the retry drops them"""
+        error = Exception("INVALID_VALUE_FOR_COLUMN")
+        error.response = Mock(status_code=422)
+        table = Mock()
+        table.batch_update.side_effect = error
+        table.batch_create.side_effect = [Exception("Connection reset"), [{'id': 'recNEW', 'fields': {}}]]
+        tracker = make_tracker([stok('recSTOK1', 'recA', 10)])
+        aggregator = StokUpdateAggregator(table, tracker, window=60)
+        aggregator.add('recA')
+        aggregator.add('recB')
+
+        with pytest.raises(RuntimeError):
+            aggregator.flush()
+        assert aggregator.pending_count == 2
+        with pytest.raises(PermanentJobError):
+            aggregator.flush()
+
+        assert aggregator.pending_count == 0
+        assert tracker.stok_record('recB') == ('recNEW', 1)
+        aggregator._task.stop(timeout=5)
+
+    def test_write_before_commit_is_not_applied_twice(self):
+        """If the process dies after the write, the retry writes the same absolute value"""
+        table = Mock()
+        tracker = make_tracker([stok('recSTOK1', 'recA', 10)])
+        aggregator = StokUpdateAggregator(table, tracker, window=60)
+        aggregator.add('recA', delta=3)
+
+        with patch.object(tracker, 'commit_delta', side_effect=RuntimeError("killed")):
+            with pytest.raises(RuntimeError):
+                aggregator.flush()
+        aggregator.flush()
+
+        writes = [call.args[0][0]['fields']['Mevcut_Miktar'] for call in table.batch_update.call_args_list]
+        assert writes == [13, 13]
+        assert tracker.stok_record('recA') == ('recSTOK1', 13)
+        assert aggregator.pending_count == 0
+
+    def test_schedule_replaces_thread(self):
+        """With a scheduler (job queue) no flush thread is started"""
+        schedule = Mock()
+        aggregator = StokUpdateAggregator(Mock(), make_tracker(), window=60)
+
+        aggregator.add('recA', schedule=schedule)
+
+        schedule.assert_called_once_with()
+        assert not aggregator._task.running
+        assert aggregator.pending_count == 1
+
+    def test_failed_schedule_discards_delta(self):
+        """The caller retries, so a delta whose flush could not be planned is removed"""
+        aggregator = StokUpdateAggregator(Mock(), make_tracker(), window=60)
+
+        with pytest.raises(OSError):
+            aggregator.add('recA', schedule=Mock(side_effect=OSError("disk full")))
+
+        assert aggregator.pending_count == 0
+
+    def test_concurrent_adds_not_lost(self):
+        """Increments from many threads all reach Airtable"""
+        table = Mock()
+        tracker = make_tracker([stok('recSTOK1', 'recA', 0)])
+        aggregator = StokUpdateAggregator(table, tracker, window=0.01)
+
+        def scan():
+            for _ in range(50):
+                aggregator.add('recA')
+
+        threads = [threading.Thread(target=scan) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        aggregator.stop(timeout=5)
+
+        assert tracker.stok_record('recA') == ('recSTOK1', 400)
+        last = table.batch_update.call_args.args[0][0]
+        assert last['fields']['Mevcut_Miktar'] == 400
+
+
+class TestSharedStokUpdateAggregator:
+    """Test aggregators of two workers writing through one shared tracker file"""
+
+    def _workers(self, tmp_path, stok_records=()):
+        path = str(tmp_path / 'stok.sqlite3')
+        trackers = [StokTracker(db_path=path), StokTracker(db_path=path)]
+        trackers[0].seed('2026-01-01', [], list(stok_records))
+        tables = [Mock(), Mock()]
+        aggregators = [StokUpdateAggregator(table, tracker, window=60)
+                       for table, tracker in zip(tables, trackers)]
+        return trackers, tables, aggregators
+
+    def _scan(self, trackers, aggregators, scans):
+        for i in range(scans):
+            trackers[i % 2].increment('recA')
+            aggregators[i % 2].add('recA')
+
+    def test_pending_deltas_survive_restart(self, tmp_path):
+        """Deltas are kept in the shared file, not in the worker's memory"""
+        trackers, tables, aggregators = self._workers(tmp_path, [stok('recSTOK1', 'recA', 10)])
+        self._scan(trackers, aggregators, 3)
+        aggregators[0]._task.stop(timeout=5)
+
+        restarted = StokUpdateAggregator(tables[0], StokTracker(db_path=str(tmp_path / 'stok.sqlite3')), window=60)
+
+        assert restarted.flush() == 1
+        assert tables[0].batch_update.call_args.args[0][0]['fields']['Mevcut_Miktar'] == 13
+        for aggregator in aggregators:
+            aggregator.stop(timeout=5)
+
+    def test_no_increments_lost(self, tmp_path):
+        """Four scans split over two workers take Mevcut_Miktar from 10 to 14"""
+        trackers, tables, aggregators = self._workers(tmp_path, [stok('recSTOK1', 'recA', 10)])
+        self._scan(trackers, aggregators, 4)
+
+        threads = [threading.Thread(target=aggregator.flush) for aggregator in aggregators]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        writes = [call.args[0][0]['fields'] for table in tables for call in table.batch_update.call_args_list]
+        assert [fields['Mevcut_Miktar'] for fields in writes] == [14]
+        assert writes[0]['Son_Sayim_Miktari'] == 4
+        assert trackers[1].stok_record('recA') == ('recSTOK1', 14)
+        for aggregator in aggregators:
+            aggregator.stop(timeout=5)
+
+    def test_new_stok_created_once(self, tmp_path):
+        """The second worker updates the item the first one created"""
+        trackers, tables, aggregators = self._workers(tmp_path)
+        tables[0].batch_create.return_value = [{'id': 'recNEW', 'fields': {}}]
+        self._scan(trackers, aggregators, 2)
+        aggregators[0].flush()
+        self._scan(trackers, aggregators, 2)
+        aggregators[1].flush()
+
+        assert tables[0].batch_create.call_args.args[0][0]['Mevcut_Miktar'] == 2
+        tables[1].batch_create.assert_not_called()
+        record = tables[1].batch_update.call_args.args[0][0]
+        assert record['id'] == 'recNEW'
+        assert record['fields']['Mevcut_Miktar'] == 4
+        for aggregator in aggregators:
+            aggregator.stop(timeout=5)
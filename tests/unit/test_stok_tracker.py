@@ -0,0 +1,103 @@
+"""
+Unit Tests - StokTracker
+"""
+
+import time
+from stok_tracker import StokTracker
+
+
+def sayim(sku_id):
+    return {'id': f'recS{sku_id}', 'fields': {'SKU': [sku_id]}}
+
+
+class TestStokTracker:
+    """Test daily counters and stock item map"""
+
+    def test_needs_seed_initially(self):
+        """A fresh tracker must be seeded before use"""
+        assert StokTracker().needs_seed('2026-01-01') is True
+
+    def test_seed_counts_today(self):
+        """Seeding counts today's scans per SKU"""
+        tracker = StokTracker()
+        tracker.seed('2026-01-01', [sayim('recA'), sayim('recA'), sayim('recB')], [])
+
+        assert tracker.count('recA') == 2
+        assert tracker.increment('recA') == 3
+        assert tracker.increment('recC') == 1
+
+    def test_day_rollover_requires_seed(self):
+        """A new day triggers reseeding"""
+        tracker = StokTracker(reseed_interval=0)
+        tracker.seed('2026-01-01', [], [])
+
+        assert tracker.needs_seed('2026-01-01') is False
+        assert tracker.needs_seed('2026-01-02') is True
+
+    def test_reseed_interval(self):
+        """Counters are refreshed after reseed_interval"""
+        tracker = StokTracker(reseed_interval=300)
+        tracker.seed('2026-01-01', [], [])
+        seeded_at = time.time()
+
+        assert tracker.needs_seed('2026-01-01', now=seeded_at + 10) is False
+        assert tracker.needs_seed('2026-01-01', now=seeded_at + 301) is True
+
+    def test_bump_mevcut(self):
+        """Known stock items are incremented without a read"""
+        tracker = StokTracker()
+        tracker.seed('2026-01-01', [], [
+            {'id': 'recSTOK1', 'fields': {'SKU': ['recA'], 'Mevcut_Miktar': 5}},
+            {'id': 'recSTOK2', 'fields': {'SKU': ['recA'], 'Mevcut_Miktar': 9}}
+        ])
+
+        assert tracker.bump_mevcut('recA') == ('recSTOK1', 6)
+        assert tracker.bump_mevcut('recA', -1) == ('recSTOK1', 5)
+        assert tracker.bump_mevcut('recB') is None
+
+    def test_set_stok_record(self):
+        """Newly created stock items are remembered"""
+        tracker = StokTracker()
+        tracker.set_stok_record('recA', 'recSTOK9', 1)
+
+        assert tracker.stok_record('recA') == ('recSTOK9', 1)
+
+
+class TestSharedStokTracker:
+    """Test counters shared between workers through one SQLite file"""
+
+    def test_increments_from_two_workers_add_up(self, tmp_path):
+        """Each worker sees the other's scans in the daily count"""
+        path = str(tmp_path / 'stok.sqlite3')
+        first, second = StokTracker(db_path=path), StokTracker(db_path=path)
+        first.seed('2026-01-01', [sayim('recA')], [])
+
+        assert first.increment('recA') == 2
+        assert second.increment('recA') == 3
+        assert first.count('recA') == 3
+        assert second.needs_seed('2026-01-01') is False
+
+    def test_mevcut_is_shared(self, tmp_path):
+        """Stock deltas from both workers apply to the same value"""
+        path = str(tmp_path / 'stok.sqlite3')
+        first, second = StokTracker(db_path=path), StokTracker(db_path=path)
+        first.seed('2026-01-01', [], [{'id': 'recSTOK1', 'fields': {'SKU': ['recA'], 'Mevcut_Miktar': 10}}])
+
+        assert first.bump_mevcut('recA', 2) == ('recSTOK1', 12)
+        assert second.bump_mevcut('recA', 2) == ('recSTOK1', 14)
+
+        second.set_stok_record('recB', 'recSTOK2', 1)
+        assert first.stok_record('recB') == ('recSTOK2', 1)
+
+    def test_reseed_keeps_unsynced_counts(self, tmp_path):
+        """Reseeding the same day never lowers a counter"""
+        tracker = StokTracker(db_path=str(tmp_path / 'stok.sqlite3'))
+        tracker.seed('2026-01-01', [], [])
+        tracker.increment('recA')
+        tracker.increment('recA')
+
+        tracker.seed('2026-01-01', [sayim('recA')], [])
+        assert tracker.count('recA') == 2
+
+        tracker.seed('2026-01-02', [sayim('recA')], [])
+        assert tracker.count('recA') == 1
@@ -0,0 +1,290 @@
+"""
+Unit Tests - Storage backends (SQLite tables, structured queries)
+"""
+
+import time
+import pytest
+from unittest.mock import Mock
+from storage import (
+    SqliteBackend, AirtableBackend, StorageTable, create_backend, push_to_airtable, seed_from_airtable
+)
+from airtable_client import (
+    barcode_formula, barcodes_formula, barcode_prefix_formula, sku_search_formula, day_formula,
+    modified_since_formula
+)
+from stok_tracker import today_str
+
+
+def product(record_id, barkod, **fields):
+    return {'id': record_id, 'createdTime': '2025-01-01T00:00:00.000Z',
+            'fields': dict({'Tedarikçi Barkodu': barkod}, **fields)}
+
+
+def remote_backend():
+    """Tablo başına Mock; batch_create sıralı Airtable ID'leri döndürür"""
+    tables = {}
+    created = []
+
+    def batch_create(records):
+        result = [{'id': f"recNEW{len(created) + i}", 'fields': fields} for i, fields in enumerate(records)]
+        created.extend(result)
+        return result
+
+    def table(name):
+        if name not in tables:
+            tables[name] = Mock()
+            tables[name].batch_create.side_effect = batch_create
+        return tables[name]
+
+    remote = Mock()
+    remote.table.side_effect = table
+    remote.created = created
+    return remote
+
+
+@pytest.fixture
+def backend(tmp_path):
+    return SqliteBackend(str(tmp_path / 'storage' / 'appTEST.sqlite3'))
+
+
+@pytest.fixture
+def catalog(backend):
+    table = backend.table('Urun_Katalogu')
+    table.import_records([
+        product('recA', '8056597412261', SKU='OF-RB-2140-901-50', **{'Model Kodu': 'RB2140', 'Marka': ['recRB']}),
+        product('recB', '8056597412278', SKU='OF-RB-3025-001-58', **{'Model Kodu': 'RB3025', 'Marka': ['recRB']}),
+        product('recC', '0713132552120', SKU='OF-OK-9208-920-61', **{'Model Kodu': 'OO9208', 'Marka': ['recOK']}),
+    ])
+    return table
+
+
+class TestFormula:
+    """Query helpers carry both the Airtable formula and a structured query"""
+
+    def test_formula_is_a_string(self):
+        formula = barcode_formula('8056597412261')
+
+        assert isinstance(formula, str)
+        assert formula.startswith('OR(')
+        assert formula.query == ('any_eq', 'Tedarikçi Barkodu', ['8056597412261'])
+
+    def test_raw_formula_is_rejected(self, catalog):
+        with pytest.raises(ValueError):
+            catalog.all(formula="{SKU} = 'x'")
+
+
+class TestStorageInterface:
+    """Backends must implement the whole table interface"""
+
+    def test_incomplete_table_cannot_be_created(self):
+        class ReadOnlyTable(StorageTable):
+            def all(self, formula=None, fields=None, sort=None, max_records=None):
+                return []
+
+        with pytest.raises(TypeError):
+            ReadOnlyTable()
+
+
+class TestSqliteTable:
+    """Test reads and writes against the SQLite backend"""
+
+    def test_barcode_lookup_uses_index(self, backend, catalog):
+        records = catalog.all(formula=barcode_formula('8056597412261'))
+
+        assert [r['id'] for r in records] == ['recA']
+        plan = backend.connect().execute(
+            "EXPLAIN QUERY PLAN SELECT id FROM records WHERE tbl = ? AND barcode IN (?)",
+            ('Urun_Katalogu', '8056597412261')
+        ).fetchall()
+        assert 'records_barcode' in str(plan)
+
+    def test_batch_barcodes_and_prefix(self, catalog):
+        found = catalog.all(formula=barcodes_formula(['8056597412278', '0713132552120', '999']))
+        prefixed = catalog.all(formula=barcode_prefix_formula('805659741'))
+
+        assert sorted(r['id'] for r in found) == ['recB', 'recC']
+        assert sorted(r['id'] for r in prefixed) == ['recA', 'recB']
+
+    def test_search_with_brand_context(self, catalog):
+        records = catalog.all(formula=sku_search_formula('rb', context_brand='recRB'), max_records=1)
+        none = catalog.all(formula=sku_search_formula('rb', context_brand='recOK'))
+
+        assert len(records) == 1
+        assert records[0]['id'] in ('recA', 'recB')
+        assert none == []
+
+    def test_projection(self, catalog):
+        record = catalog.all(formula=barcode_formula('8056597412261'), fields=['SKU'])[0]
+
+        assert record['fields'] == {'SKU': 'OF-RB-2140-901-50'}
+
+    def test_create_update_get(self, backend):
+        table = backend.table('Stok_Kalemleri')
+
+        created = table.create({'SKU': ['recA'], 'Mevcut_Miktar': 1})
+        table.batch_update([{'id': created['id'], 'fields': {'Mevcut_Miktar': 2}}])
+
+        assert created['id'].startswith('lrec')
+        assert table.get(created['id'])['fields'] == {'SKU': ['recA'], 'Mevcut_Miktar': 2}
+        with pytest.raises(KeyError):
+            table.get('recMISSING')
+
+    def test_day_and_recent_order(self, backend):
+        table = backend.table('Sayim_Kayitlari')
+        for barkod in ('1', '2', '3'):
+            table.create({'Okutulan Barkod': barkod, 'Eşleşme Durumu': 'Direkt'})
+
+        today = table.all(formula=day_formula(today_str()))
+        recent = table.all(sort=['-Timestamp'], max_records=2)
+
+        assert len(today) == 3
+        assert [r['fields']['Okutulan Barkod'] for r in recent] == ['3', '2']
+        assert table.all(formula=day_formula('2000-01-01')) == []
+
+    def test_modified_since(self, catalog):
+        since = time.time()
+        catalog.update('recB', {'Durum': 'Pasif'})
+
+        changed = catalog.all(formula=modified_since_formula(since))
+
+        assert [r['id'] for r in changed] == ['recB']
+
+    def test_upload_attachment(self, backend):
+        table = backend.table('Sayim_Kayitlari')
+        record = table.create({'Okutulan Barkod': '1'})
+
+        result = table.upload_attachment(record['id'], 'Fotograf', 'a.jpg', b'jpeg', 'image/jpeg')
+
+        attachment = result['fields']['Fotograf'][0]
+        assert attachment['size'] == 4
+        assert open(attachment['url'][len('file://'):], 'rb').read() == b'jpeg'
+
+
+class TestAirtableSync:
+    """Test seeding from and pushing to Airtable"""
+
+    def test_push_sends_local_records_once(self, backend):
+        table = backend.table('Sayim_Kayitlari')
+        table.import_records([{'id': 'recOLD', 'fields': {'Okutulan Barkod': 'old'}}])
+        for i in range(12):
+            table.create({'Okutulan Barkod': str(i)})
+        remote = remote_backend()
+
+        assert push_to_airtable(backend, remote)['Sayim_Kayitlari'] == 12
+        assert push_to_airtable(backend, remote)['Sayim_Kayitlari'] == 0
+        assert remote.table('Sayim_Kayitlari').batch_create.call_count == 2
+        assert table.unsynced() == []
+
+    def test_interrupted_push_resumes_without_duplicates(self, backend):
+        table = backend.table('Sayim_Kayitlari')
+        for i in range(12):
+            table.create({'Okutulan Barkod': str(i)})
+        remote = remote_backend()
+        remote_table = remote.table('Sayim_Kayitlari')
+        create = remote_table.batch_create.side_effect
+        calls = []
+
+        def flaky(records):
+            calls.append(records)
+            if len(calls) == 2:
+                raise ConnectionError('ağ kesildi')
+            return create(records)
+
+        remote_table.batch_create.side_effect = flaky
+
+        with pytest.raises(ConnectionError):
+            push_to_airtable(backend, remote)
+        pushed = push_to_airtable(backend, remote)
+
+        assert pushed['Sayim_Kayitlari'] == 12
+        assert sorted(r['fields']['Okutulan Barkod'] for r in remote.created) == sorted(str(i) for i in range(12))
+
+    def test_new_sku_and_links_are_pushed_in_order(self, backend, catalog):
+        sku = backend.table('Urun_Katalogu').create({'Tedarikçi Barkodu': '999', 'Marka': ['recRB']})
+        stok = backend.table('Stok_Kalemleri').create({'SKU': [sku['id']], 'Mevcut_Miktar': 1})
+        backend.table('Sayim_Kayitlari').create({'Okutulan Barkod': '999', 'SKU': [sku['id']]})
+        remote = remote_backend()
+
+        pushed = push_to_airtable(backend, remote)
+
+        assert pushed == {'Markalar': 0, 'Urun_Katalogu': 1, 'Stok_Kalemleri': 1, 'Sayim_Kayitlari': 1}
+        sku_remote, stok_remote, sayim_remote = remote.created
+        assert sku_remote['fields']['Marka'] == ['recRB']
+        assert stok_remote['fields']['SKU'] == [sku_remote['id']]
+        assert sayim_remote['fields']['SKU'] == [sku_remote['id']]
+        assert backend.link_ids()[0][stok['id']] == stok_remote['id']
+
+    def test_unpushed_link_defers_record(self, backend):
+        backend.table('Urun_Katalogu').create({'Tedarikçi Barkodu': '999'})
+        sku_id = backend.table('Urun_Katalogu').unsynced()[0]['id']
+        backend.table('Sayim_Kayitlari').create({'Okutulan Barkod': '999', 'SKU': [sku_id]})
+        remote = remote_backend()
+
+        pushed = push_to_airtable(backend, remote, tables=['Sayim_Kayitlari'])
+
+        assert pushed == {'Sayim_Kayitlari': 0}
+        assert remote.created == []
+
+    def test_changed_fields_of_existing_records_are_updated(self, backend):
+        table = backend.table('Stok_Kalemleri')
+        table.import_records([{'id': 'recS', 'fields': {'SKU': ['recA'], 'Mevcut_Miktar': 1, 'Marka Adı': ['RB']}}])
+        table.update('recS', {'Mevcut_Miktar': 2})
+        remote = remote_backend()
+
+        assert push_to_airtable(backend, remote)['Stok_Kalemleri'] == 1
+        assert push_to_airtable(backend, remote)['Stok_Kalemleri'] == 0
+        remote.table('Stok_Kalemleri').batch_update.assert_called_once_with(
+            [{'id': 'recS', 'fields': {'Mevcut_Miktar': 2}}]
+        )
+        assert remote.created == []
+
+    def test_change_after_create_is_pushed_as_update(self, backend):
+        table = backend.table('Stok_Kalemleri')
+        created = table.create({'SKU': ['recA'], 'Mevcut_Miktar': 1})
+        remote = remote_backend()
+        push_to_airtable(backend, remote)
+
+        table.update(created['id'], {'Mevcut_Miktar': 3})
+        push_to_airtable(backend, remote)
+
+        remote.table('Stok_Kalemleri').batch_update.assert_called_once_with(
+            [{'id': 'recNEW0', 'fields': {'Mevcut_Miktar': 3}}]
+        )
+
+    def test_local_attachments_are_uploaded(self, backend):
+        table = backend.table('Sayim_Kayitlari')
+        record = table.create({'Okutulan Barkod': '1'})
+        table.upload_attachment(record['id'], 'Fotograf', 'a.jpg', b'jpeg', 'image/jpeg')
+        remote = remote_backend()
+
+        push_to_airtable(backend, remote)
+
+        assert remote.created[0]['fields'] == {'Okutulan Barkod': '1'}
+        remote.table('Sayim_Kayitlari').upload_attachment.assert_called_once_with(
+            'recNEW0', 'Fotograf', 'a.jpg', b'jpeg', 'image/jpeg'
+        )
+
+    def test_seed_keeps_ids(self, backend):
+        remote = Mock()
+        remote.table.return_value.all.return_value = [product('recA', '1')]
+
+        counts = seed_from_airtable(remote, backend, tables=['Urun_Katalogu'])
+
+        assert counts == {'Urun_Katalogu': 1}
+        assert backend.table('Urun_Katalogu').get('recA')['fields']['Tedarikçi Barkodu'] == '1'
+
+
+class TestCreateBackend:
+    """Test backend selection"""
+
+    def test_airtable_backend_delegates_to_pyairtable(self):
+        api = Mock()
+
+        backend = create_backend('airtable', 'appTEST', '/tmp', api=api)
+
+        assert isinstance(backend, AirtableBackend)
+        assert backend.table('Markalar') is api.base.return_value.table.return_value
+
+    def test_unknown_backend(self, tmp_path):
+        with pytest.raises(ValueError):
+            create_backend('postgres', 'appTEST', str(tmp_path))
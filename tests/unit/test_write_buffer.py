@@ -0,0 +1,172 @@
+"""
+Unit Tests - SayimWriteBuffer
+"""
+
+import json
+import threading
+import pytest
+from unittest.mock import Mock
+import write_buffer
+from write_buffer import SayimWriteBuffer, is_local_id, BATCH_SIZE
+
+
+def make_table():
+    """Mock Sayim_Kayitlari table that assigns sequential record IDs"""
+    table = Mock()
+    counter = {'n': 0}
+
+    def batch_create(records):
+        created = []
+        for fields in records:
+            counter['n'] += 1
+            created.append({'id': f"rec{counter['n']}", 'fields': fields})
+        return created
+
+    table.batch_create.side_effect = batch_create
+    return table
+
+
+class TestWriteBuffer:
+    """Test buffered batch creates"""
+
+    def test_add_returns_local_id(self, tmp_path):
+        """Adds return immediately with a local ID"""
+        buffer = SayimWriteBuffer(make_table(), str(tmp_path), 'sayim-OF', min_batch_interval=0)
+
+        local_id = buffer.add({'Okutulan Barkod': '123'})
+
+        assert is_local_id(local_id)
+        assert buffer.status(local_id) == 'pending'
+        assert buffer.resolve(local_id) is None
+
+    def test_flush_groups_by_ten(self, tmp_path):
+        """Pending records are written with batch_create in groups of 10"""
+        table = make_table()
+        buffer = SayimWriteBuffer(table, str(tmp_path), 'sayim-OF', min_batch_interval=0)
+        ids = [buffer.add({'Okutulan Barkod': str(i)}) for i in range(BATCH_SIZE + 3)]
+
+        written = buffer.flush()
+
+        assert written == 13
+        assert table.batch_create.call_count == 2
+        assert len(table.batch_create.call_args_list[0].args[0]) == 10
+        assert buffer.resolve(ids[0]) == 'rec1'
+        assert buffer.status(ids[-1]) == 'committed'
+        assert buffer.pending_count == 0
+
+    def test_journal_survives_restart(self, tmp_path):
+        """Uncommitted records are replayed after a crash"""
+        table = make_table()
+        buffer = SayimWriteBuffer(table, str(tmp_path), 'sayim-OF', min_batch_interval=0)
+        committed = buffer.add({'Okutulan Barkod': '1'})
+        buffer.flush()
+        pending = buffer.add({'Okutulan Barkod': '2'})
+        # Simulate a crash: release the slot without flushing
+        buffer._lock_handle.close()
+
+        restarted = SayimWriteBuffer(table, str(tmp_path), 'sayim-OF', min_batch_interval=0)
+
+        assert restarted.status(pending) == 'pending'
+        assert restarted.resolve(committed) == 'rec1'
+        restarted.flush()
+        assert restarted.resolve(pending) == 'rec2'
+
+    def test_transient_error_keeps_records(self, tmp_path):
+        """Network errors leave records pending for the next flush"""
+        table = Mock()
+        table.batch_create.side_effect = Exception("Connection reset")
+        buffer = SayimWriteBuffer(table, str(tmp_path), 'sayim-OF', min_batch_interval=0)
+        local_id = buffer.add({'Okutulan Barkod': '1'})
+
+        with pytest.raises(Exception):
+            buffer.flush()
+
+        assert buffer.status(local_id) == 'pending'
+
+    def test_permanent_error_isolates_bad_record(self, tmp_path):
+        """A 422 on a batch is retried per record and only the bad one fails"""
+        error = Exception("INVALID_VALUE_FOR_COLUMN")
+        error.response = Mock(status_code=422)
+
+        table = Mock()
+        table.batch_create.side_effect = error
+        table.create.side_effect = lambda fields: (
+            (_ for _ in ()).throw(error) if fields['Okutulan Barkod'] == 'bad'
+            else {'id': 'recOK', 'fields': fields}
+        )
+        buffer = SayimWriteBuffer(table, str(tmp_path), 'sayim-OF', min_batch_interval=0)
+        good = buffer.add({'Okutulan Barkod': 'good'})
+        bad = buffer.add({'Okutulan Barkod': 'bad'})
+
+        buffer.flush()
+
+        assert buffer.resolve(good) == 'recOK'
+        assert buffer.status(bad) == 'failed'
+
+    def test_wait_for_with_background_thread(self, tmp_path):
+        """wait_for wakes the flusher and returns the real ID"""
+        buffer = SayimWriteBuffer(make_table(), str(tmp_path), 'sayim-OF',
+                                  flush_interval=30, min_batch_interval=0)
+        buffer.start()
+        try:
+            local_id = buffer.add({'Okutulan Barkod': '1'})
+            assert buffer.wait_for(local_id, timeout=5) == 'rec1'
+        finally:
+            buffer.stop(timeout=5)
+
+    def test_second_worker_gets_own_slot(self, tmp_path):
+        """Two live buffers never share a journal file"""
+        first = SayimWriteBuffer(make_table(), str(tmp_path), 'sayim-OF')
+        second = SayimWriteBuffer(make_table(), str(tmp_path), 'sayim-OF')
+
+        assert first._journal_path != second._journal_path
+
+    def test_sibling_worker_resolves_local_id(self, tmp_path):
+        """A local ID created on one worker resolves on another"""
+        first = SayimWriteBuffer(make_table(), str(tmp_path), 'sayim-OF', min_batch_interval=0)
+        second = SayimWriteBuffer(make_table(), str(tmp_path), 'sayim-OF', min_batch_interval=0)
+        local_id = first.add({'Okutulan Barkod': '1'})
+
+        assert second.status(local_id) == 'pending'
+        assert second.resolve(local_id) is None
+
+        first.flush()
+
+        assert second.status(local_id) == 'committed'
+        assert second.resolve(local_id) == 'rec1'
+
+    def test_pending_records_include_sibling_workers(self, tmp_path):
+        """Unflushed records of every worker are listed until they are written"""
+        first = SayimWriteBuffer(make_table(), str(tmp_path), 'sayim-OF', min_batch_interval=0)
+        second = SayimWriteBuffer(make_table(), str(tmp_path), 'sayim-OF', min_batch_interval=0)
+        local_id = first.add({'Eşleşme Durumu': 'Direkt'})
+
+        assert second.pending_records() == [{'id': local_id, 'fields': {'Eşleşme Durumu': 'Direkt'}}]
+
+        first.flush()
+
+        assert second.pending_records() == []
+
+    def test_sibling_worker_waits_for_owner_flush(self, tmp_path):
+        first = SayimWriteBuffer(make_table(), str(tmp_path), 'sayim-OF', min_batch_interval=0)
+        second = SayimWriteBuffer(make_table(), str(tmp_path), 'sayim-OF', min_batch_interval=0)
+        local_id = first.add({'Okutulan Barkod': '1'})
+
+        flusher = threading.Timer(0.2, first.flush)
+        flusher.start()
+        try:
+            assert second.wait_for(local_id, timeout=5) == 'rec1'
+        finally:
+            flusher.join()
+
+    def test_evicted_mapping_still_resolves(self, tmp_path, monkeypatch):
+        """IDs dropped from the in-memory cache are read from the shared map"""
+        monkeypatch.setattr(write_buffer, 'MAX_RESOLVED', 1)
+        buffer = SayimWriteBuffer(make_table(), str(tmp_path), 'sayim-OF', min_batch_interval=0)
+        old = buffer.add({'Okutulan Barkod': '1'})
+        buffer.add({'Okutulan Barkod': '2'})
+        buffer.flush()
+
+        assert old not in buffer._resolved
+        assert buffer.status(old) == 'committed'
+        assert buffer.resolve(old) == 'rec1'